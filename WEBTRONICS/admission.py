@@ -0,0 +1,290 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException
+
+from auth import decode_access_token_cached
+from metrics import Counter, Gauge, registry
+from serialization import dumps
+
+admission_queue_depth = registry.register(Gauge(
+    "webtronics_admission_queue_depth", "Requests waiting for a concurrency slot.", ("route_class",),
+))
+admission_in_flight = registry.register(Gauge(
+    "webtronics_admission_in_flight", "Admitted requests being processed.", ("route_class",),
+))
+admission_shed = registry.register(Counter(
+    "webtronics_admission_shed_total", "Requests rejected with 503 by admission control.", ("route_class", "reason"),
+))
+rate_limited = registry.register(Counter(
+    "webtronics_rate_limited_total", "Requests rejected with 429 by the per-client rate limiter.",
+))
+
+
+class AdmissionLimiter:
+    """
+    Ограничение числа одновременно обрабатываемых запросов одного класса.
+
+    Запросы сверх лимита ждут в очереди (FIFO) ограниченной длины. Запрос
+    отклоняется сразу, если очередь заполнена или если оценка ожидания
+    (длина очереди, умноженная на среднее время обработки и деленная на
+    лимит) превышает дедлайн; запрос, прождавший дедлайн, тоже отклоняется.
+    Среднее время обработки — экспоненциальное скользящее среднее.
+
+    Attributes:
+        name (str): Класс маршрутов (метка метрик).
+        limit (int): Максимальное число одновременно обрабатываемых запросов.
+        queue_limit (int): Максимальная длина очереди ожидания.
+        deadline (float): Максимальное время ожидания в очереди, в секундах.
+        in_flight (int): Число обрабатываемых запросов.
+        queued (int): Число ожидающих запросов.
+        service_time (float): Среднее время обработки запроса, в секундах.
+    """
+
+    def __init__(self, name: str, limit: int, queue_limit: int, deadline: float):
+        self.name = name
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.deadline = deadline
+        self.in_flight = 0
+        self.queued = 0
+        self.service_time = 0.0
+        self._waiters: deque = deque()
+
+    def estimated_wait(self) -> float:
+        """
+        Оценивает, сколько будет ждать новый запрос, вставший в очередь.
+
+        Returns:
+            float: Ожидаемое время ожидания в секундах.
+        """
+        return (self.queued + 1) * self.service_time / self.limit
+
+    def _update_gauges(self) -> None:
+        admission_queue_depth.set(self.queued, self.name)
+        admission_in_flight.set(self.in_flight, self.name)
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Занимает место для обработки запроса, при необходимости дожидаясь очереди.
+
+        Returns:
+            Optional[str]: None, если запрос допущен, иначе причина отказа:
+            "queue_full" или "deadline".
+        """
+        if self.in_flight < self.limit and not self.queued:
+            self.in_flight += 1
+            self._update_gauges()
+            return None
+        if self.queued >= self.queue_limit:
+            return "queue_full"
+        if self.estimated_wait() > self.deadline:
+            return "deadline"
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append(future)
+        self.queued += 1
+        self._update_gauges()
+        timer = loop.call_later(self.deadline, self._expire, future)
+        try:
+            admitted = await future
+        except asyncio.CancelledError:
+            # Клиент ушел: если место уже передано этому запросу, возвращаем его
+            if future.cancelled():
+                self.queued -= 1
+                self._update_gauges()
+            elif future.result():
+                self.release()
+            raise
+        finally:
+            timer.cancel()
+        return None if admitted else "deadline"
+
+    def _expire(self, future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(False)
+            self.queued -= 1
+            self._update_gauges()
+
+    def release(self) -> None:
+        """Освобождает место; оно сразу передается первому ожидающему запросу."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(True)
+                self.queued -= 1
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    def observe(self, duration: float) -> None:
+        """
+        Учитывает время обработки запроса в среднем.
+
+        Args:
+            duration (float): Время обработки в секундах.
+        """
+        self.service_time += (duration - self.service_time) * 0.05
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов клиента алгоритмом token bucket.
+
+    Для каждого клиента хранится корзина с запасом токенов, который
+    пополняется со скоростью rate в секунду до burst. Корзины лежат в
+    LRU-словаре ограниченного размера, поэтому память не растет с числом
+    клиентов; вытесненный клиент начинает с полной корзиной.
+
+    Attributes:
+        rate (float): Скорость пополнения, токенов в секунду.
+        burst (int): Емкость корзины.
+        max_clients (int): Максимальное число хранимых корзин.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """
+        Забирает токен из корзины клиента.
+
+        Args:
+            key (str): Идентификатор клиента.
+
+        Returns:
+            float: 0, если запрос разрешен, иначе сколько секунд ждать следующего токена.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+def route_class(method: str, path: str) -> str:
+    """
+    Определяет класс маршрута для ограничения конкурентности.
+
+    Args:
+        method (str): HTTP-метод.
+        path (str): Путь запроса.
+
+    Returns:
+        str: "auth" для входа и регистрации, "stream" для подписок на счетчики и
+        выгрузки и загрузки данных, "read" для GET/HEAD, иначе "write".
+    """
+    if path.endswith("/live") or path in ("/export", "/import"):
+        return "stream"
+    if path in ("/login", "/register") or path.startswith("/auth/"):
+        return "auth"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+def client_key(scope: dict) -> str:
+    """
+    Возвращает ключ клиента для ограничения частоты: sub из JWT или IP-адрес.
+
+    Args:
+        scope (dict): ASGI scope запроса.
+
+    Returns:
+        str: Ключ вида "user:<sub>" или "ip:<адрес>".
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    return "user:" + str(decode_access_token_cached(token)["sub"])
+                except (HTTPException, KeyError):
+                    pass
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    ASGI-middleware контроля допуска: ограничение частоты и конкурентности.
+
+    Сначала запрос проверяется ограничителем частоты клиента (429 при
+    превышении), затем ограничителем конкурентности своего класса маршрутов
+    (503 при перегрузке). Оба отказа отправляются сразу, без обработчика, и
+    содержат заголовок Retry-After. Классы маршрутов без ограничителя (долгие
+    подписки SSE, выгрузка и загрузка данных) проходят только проверку частоты.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiters: Dict[str, AdmissionLimiter],
+        rate_limiter: Optional[RateLimiter] = None,
+        exempt: Iterable[str] = ("/metrics",),
+    ):
+        self.app = app
+        self.limiters = limiters
+        self.rate_limiter = rate_limiter
+        self.exempt = frozenset(exempt)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.take(client_key(scope))
+            if wait:
+                rate_limited.inc()
+                await _reject(send, 429, "Too many requests", wait)
+                return
+
+        limiter = self.limiters.get(route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        reason = await limiter.acquire()
+        if reason is not None:
+            admission_shed.inc(limiter.name, reason)
+            await _reject(send, 503, "Server is overloaded", limiter.estimated_wait())
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.observe(time.perf_counter() - started)
+            limiter.release()
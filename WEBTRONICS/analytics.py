@@ -0,0 +1,281 @@
+import bisect
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+from reactions import DISLIKE, LIKE
+
+try:
+    import numpy
+except ImportError:  # numpy — необязательная зависимость
+    numpy = None
+
+# Колонки блока: ID постов, ID пользователей, типы реакций, время в секундах
+_TYPECODES = ("I", "I", "b", "I")
+# ID постов и пользователей должны помещаться в колонки uint32
+_ID_LIMIT = 2 ** 32
+# Время событий (Unix time) тоже хранится в колонке uint32
+EVENT_TIME_LIMIT = 2 ** 32
+_DTYPES = (numpy.uint32, numpy.uint32, numpy.int8, numpy.uint32) if numpy is not None else ()
+
+
+def _new_chunk() -> tuple:
+    return tuple(array(typecode) for typecode in _TYPECODES)
+
+
+def _count_unique(parts: list) -> int:
+    # Для плотных ID битовая карта быстрее сортировки в numpy.unique
+    if not parts:
+        return 0
+    top = max(int(part.max()) for part in parts)
+    if top <= 8 * sum(part.size for part in parts) + 1024:
+        seen = numpy.zeros(top + 1, numpy.bool_)
+        for part in parts:
+            seen[part] = True
+        return int(numpy.count_nonzero(seen))
+    return int(numpy.unique(numpy.concatenate(parts)).size)
+
+
+class ReactionSnapshot:
+    """
+    Выборка событий журнала за период.
+
+    Держит ссылки на заполненные блоки журнала (они больше не меняются) и
+    копию нужной части незаполненного блока, поэтому агрегаты можно считать
+    в отдельном потоке, пока журнал пополняется.
+
+    Если установлен numpy, колонки оборачиваются массивами numpy без
+    копирования и считаются векторно (bincount, битовая карта для уникальных
+    пользователей); иначе — циклом на Python.
+    """
+
+    def __init__(self, pieces: List[tuple]):
+        # Части выборки: (блок, начало, конец) в порядке времени
+        self._pieces = pieces
+
+    def _columns(self, post_id: Optional[int], *indexes: int):
+        # Для каждой части — колонки indexes событий поста (или всех постов)
+        for chunk, lo, hi in self._pieces:
+            if numpy is not None:
+                columns = [numpy.frombuffer(chunk[i], _DTYPES[i])[lo:hi] for i in indexes]
+                if post_id is not None:
+                    mask = numpy.frombuffer(chunk[0], numpy.uint32)[lo:hi] == post_id
+                    columns = [column[mask] for column in columns]
+            elif post_id is None:
+                columns = [chunk[i][lo:hi] for i in indexes]
+            else:
+                posts = chunk[0]
+                rows = [row for row in range(lo, hi) if posts[row] == post_id]
+                columns = [[chunk[i][row] for row in rows] for i in indexes]
+            yield columns
+
+    def histogram(self, post_id: Optional[int], since: int, until: int, bucket: int) -> List[Tuple[int, int, int]]:
+        """
+        Считает лайки и дизлайки по интервалам времени.
+
+        Args:
+            post_id (Optional[int]): Идентификатор поста или None для всех постов.
+            since (int): Начало первого интервала (Unix time), не позже начала выборки.
+            until (int): Конец периода (Unix time, не включительно).
+            bucket (int): Длина интервала в секундах.
+
+        Returns:
+            List[Tuple[int, int, int]]: Для каждого интервала периода — его начало,
+            число лайков и число дизлайков.
+        """
+        count = max(0, -(-(until - since) // bucket))
+        if numpy is not None:
+            totals = numpy.zeros(2 * count, numpy.int64)
+            for times, kinds in self._columns(post_id, 3, 2):
+                # Один bincount по ключу «интервал * 2 + признак дизлайка»; since <= times, поэтому хватает uint32
+                keys = (times - numpy.uint32(since)) // numpy.uint32(bucket) * 2 + (kinds == DISLIKE)
+                totals += numpy.bincount(keys, minlength=2 * count)
+            likes, dislikes = totals[0::2].tolist(), totals[1::2].tolist()
+        else:
+            likes, dislikes = [0] * count, [0] * count
+            for times, kinds in self._columns(post_id, 3, 2):
+                for second, kind in zip(times, kinds):
+                    (likes if kind == LIKE else dislikes)[(second - since) // bucket] += 1
+        return [(since + i * bucket, likes[i], dislikes[i]) for i in range(count)]
+
+    def summary(self, post_id: Optional[int]) -> dict:
+        """
+        Считает итоги реакций.
+
+        Args:
+            post_id (Optional[int]): Идентификатор поста или None для всех постов.
+
+        Returns:
+            dict: Число событий, лайков, дизлайков, уникальных пользователей и
+            доля лайков (null, если событий нет).
+        """
+        events = likes = 0
+        if numpy is not None:
+            parts = []
+            for kinds, users in self._columns(post_id, 2, 1):
+                events += int(kinds.size)
+                likes += int(numpy.count_nonzero(kinds == LIKE))
+                if users.size:
+                    parts.append(users)
+            unique = _count_unique(parts)
+        else:
+            seen = set()
+            for kinds, users in self._columns(post_id, 2, 1):
+                events += len(kinds)
+                likes += kinds.count(LIKE)
+                seen.update(users)
+            unique = len(seen)
+        return {
+            "events": events,
+            "likes": likes,
+            "dislikes": events - likes,
+            "unique_reactors": unique,
+            "like_ratio": likes / events if events else None,
+        }
+
+
+class ReactionEventLog:
+    """
+    Колоночный журнал событий реакций для аналитики.
+
+    Каждое событие — ID поста, ID пользователя, тип реакции и время в
+    секундах — хранится в четырех массивах (array), то есть 13 байт на
+    событие вместо сотен байт словаря. Массивы разбиты на блоки по
+    chunk_size событий: заполненный блок больше не меняется, поэтому выборку
+    можно обрабатывать в другом потоке, а рост журнала не копирует уже
+    записанные события. События дописываются в порядке времени, и выборка за
+    период — двоичный поиск по колонке времени только в крайних блоках.
+
+    Блоки, все события которых старше retention секунд, удаляются целиком
+    при заполнении очередного блока.
+
+    Attributes:
+        retention (float): Срок хранения событий в секундах (0 — без ограничения).
+        chunk_size (int): Число событий в блоке.
+        skipped (int): Число событий с ID вне диапазона uint32, не попавших в журнал.
+    """
+
+    def __init__(self, retention: float = 0.0, chunk_size: int = 1 << 20):
+        self.retention = retention
+        self.chunk_size = chunk_size
+        self._chunks: List[tuple] = []
+        self._tail = _new_chunk()
+        self._last = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._chunks) * self.chunk_size + len(self._tail[3])
+
+    def append(self, post_id: int, user_id: int, kind: int, timestamp: Optional[float] = None) -> None:
+        """
+        Дописывает событие реакции.
+
+        Время не может идти назад: событие с меньшим временем, чем у
+        последнего, записывается со временем последнего. Событие с ID, который
+        не помещается в колонку uint32, не записывается и учитывается в skipped:
+        реакция уже сохранена, и журнал не должен превращать ее в ошибку.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+            kind (int): Тип реакции: LIKE или DISLIKE.
+            timestamp (Optional[float]): Время события (Unix time); по умолчанию текущее.
+        """
+        if not (0 <= post_id < _ID_LIMIT and 0 <= user_id < _ID_LIMIT):
+            self.skipped += 1
+            return
+        second = int(time.time() if timestamp is None else timestamp)
+        if second < self._last:
+            second = self._last
+        self._last = second
+        posts, users, kinds, times = self._tail
+        posts.append(post_id)
+        users.append(user_id)
+        kinds.append(kind)
+        times.append(second)
+        if len(times) >= self.chunk_size:
+            self._seal()
+
+    def extend(self, posts: array, users: array, kinds: array, times: array) -> None:
+        """
+        Дописывает пачку событий, уже упорядоченных по времени.
+
+        Args:
+            posts (array): ID постов (array("I")).
+            users (array): ID пользователей (array("I")).
+            kinds (array): Типы реакций (array("b")).
+            times (array): Время событий в секундах (array("I")), не раньше уже записанных.
+        """
+        offset = 0
+        while offset < len(times):
+            room = self.chunk_size - len(self._tail[3])
+            for column, values in zip(self._tail, (posts, users, kinds, times)):
+                column.extend(values[offset:offset + room])
+            offset += room
+            self._last = self._tail[3][-1]
+            if len(self._tail[3]) >= self.chunk_size:
+                self._seal()
+
+    def _seal(self) -> None:
+        self._chunks.append(self._tail)
+        self._tail = _new_chunk()
+        if self.retention:
+            self.expire(self._last - self.retention)
+
+    def expire(self, before: float) -> None:
+        """
+        Удаляет заполненные блоки, все события которых старше указанного момента.
+
+        Args:
+            before (float): Граница времени (Unix time).
+        """
+        stale = 0
+        while stale < len(self._chunks) and self._chunks[stale][3][-1] < before:
+            stale += 1
+        del self._chunks[:stale]
+
+    def snapshot(self, since: float, until: float) -> ReactionSnapshot:
+        """
+        Выбирает события за период.
+
+        Вызывается в потоке, который пополняет журнал; полученная выборка от
+        журнала больше не зависит.
+
+        Args:
+            since (float): Начало периода (Unix time, включительно).
+            until (float): Конец периода (Unix time, не включительно).
+
+        Returns:
+            ReactionSnapshot: Выборка для подсчета агрегатов.
+        """
+        pieces = []
+        for chunk in self._chunks:
+            times = chunk[3]
+            if times[-1] < since or times[0] >= until:
+                continue
+            lo = bisect.bisect_left(times, since) if times[0] < since else 0
+            hi = bisect.bisect_left(times, until) if times[-1] >= until else len(times)
+            pieces.append((chunk, lo, hi))
+        times = self._tail[3]
+        lo, hi = bisect.bisect_left(times, since), bisect.bisect_left(times, until)
+        if lo < hi:
+            pieces.append((tuple(column[lo:hi] for column in self._tail), 0, hi - lo))
+        return ReactionSnapshot(pieces)
+
+    def stats(self) -> dict:
+        """
+        Возвращает размер журнала.
+
+        Returns:
+            dict: Число событий и заполненных блоков, объем колонок в байтах,
+            признак векторных вычислений и число пропущенных событий.
+        """
+        return {
+            "events": len(self),
+            "chunks": len(self._chunks),
+            "bytes": sum(
+                len(column) * column.itemsize for chunk in self._chunks + [self._tail] for column in chunk
+            ),
+            "vectorized": numpy is not None,
+            "skipped": self.skipped,
+        }
@@ -1,12 +1,31 @@
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional
+
 import jwt
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from datetime import datetime, timedelta
 
+import config
+from metrics import timed
+from revocation import RevocationList
+
 SECRET_KEY = "your_secret_key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = config.REFRESH_TOKEN_EXPIRE_DAYS
+
+
+def _encode_token(data: dict, token_type: str, expires: timedelta) -> str:
+    to_encode = data.copy()
+    # Случайный jti позволяет отозвать конкретный токен
+    to_encode.update({"exp": datetime.utcnow() + expires, "jti": secrets.token_hex(16), "type": token_type})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+@timed("create_access_token")
 def create_access_token(data: dict) -> str:
     """
     Создает JWT-токен на основе предоставленных данных.
@@ -17,13 +36,23 @@ def create_access_token(data: dict) -> str:
     Returns:
         str: Сгенерированный JWT-токен.
     """
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return _encode_token(data, "access", timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def create_refresh_token(data: dict) -> str:
+    """
+    Создает долгоживущий refresh-токен, по которому выдается новая пара токенов.
+
+    Parameters:
+        data (dict): Словарь данных, которые будут закодированы в токене.
+
+    Returns:
+        str: Сгенерированный JWT-токен с type="refresh".
+    """
+    return _encode_token(data, "refresh", timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
 
 
+@timed("decode_access_token")
 def decode_access_token(token: str) -> dict:
     """
     Раскодирует JWT-токен и возвращает его содержимое (payload).
@@ -44,3 +73,176 @@ def decode_access_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+
+class TokenCache:
+    """
+    Ограниченный LRU-кэш проверенных JWT-токенов.
+
+    Повторный запрос с тем же токеном не требует проверки подписи и разбора
+    JSON. Запись перестает выдаваться и удаляется, как только наступает ее
+    exp, а при переполнении вытесняется давно не использованный токен.
+
+    Attributes:
+        maxsize (int): Максимальное количество токенов в кэше (0 отключает кэш).
+        hits (int): Количество попаданий в кэш.
+        misses (int): Количество промахов.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Возвращает содержимое токена из кэша, если оно еще действительно.
+
+        Parameters:
+            token (str): JWT-токен.
+
+        Returns:
+            Optional[dict]: Содержимое токена или None при промахе.
+        """
+        payload = self._entries.get(token)
+        if payload is None:
+            self.misses += 1
+            return None
+        if payload["exp"] <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        """
+        Сохраняет проверенный токен в кэше.
+
+        Parameters:
+            token (str): JWT-токен.
+            payload (dict): Содержимое токена; должно содержать exp.
+        """
+        if self.maxsize <= 0 or "exp" not in payload:
+            return
+        self._entries[token] = payload
+        self._entries.move_to_end(token)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики кэша.
+
+        Returns:
+            dict: Количество попаданий, промахов и токенов в кэше.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+token_cache = TokenCache(config.TOKEN_CACHE_SIZE)
+revoked_tokens = RevocationList(config.REVOCATION_CAPACITY, config.REVOCATION_ERROR_RATE)
+bearer_scheme = HTTPBearer()
+
+
+def decode_access_token_cached(token: str) -> dict:
+    """
+    Раскодирует JWT-токен, используя кэш уже проверенных токенов.
+
+    Parameters:
+        token (str): JWT-токен для раскодирования.
+
+    Returns:
+        dict: Содержимое токена (payload) в виде словаря.
+
+    Raises:
+        HTTPException: Если токен истек или недействителен, возбуждается исключение.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        token_cache.put(token, payload)
+    return payload
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> dict:
+    """
+    Зависимость FastAPI: аутентифицирует запрос по заголовку Authorization: Bearer.
+
+    Parameters:
+        credentials (HTTPAuthorizationCredentials): Данные из заголовка Authorization.
+
+    Returns:
+        dict: Содержимое токена текущего пользователя.
+
+    Raises:
+        HTTPException: Если токен отсутствует, истек, недействителен, отозван
+            или является refresh-токеном.
+    """
+    payload = decode_access_token_cached(credentials.credentials)
+    if payload.get("type", "access") != "access":
+        raise HTTPException(status_code=401, detail="Invalid token")
+    # Токены без jti выданы до появления отзыва и отозваны быть не могут
+    jti = payload.get("jti")
+    if jti is not None and revoked_tokens.is_revoked(jti):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return payload
+
+
+async def get_current_user_id(user: dict = Depends(get_current_user)) -> int:
+    """
+    Зависимость FastAPI: возвращает ID текущего пользователя из claim uid токена.
+
+    От имени этого пользователя создаются посты и ставятся реакции; ID из тела
+    запроса должен с ним совпадать.
+
+    Parameters:
+        user (dict): Содержимое токена текущего пользователя.
+
+    Returns:
+        int: Идентификатор пользователя.
+
+    Raises:
+        HTTPException: Если в токене нет ID пользователя (код 403).
+    """
+    user_id = user.get("uid")
+    if not isinstance(user_id, int):
+        raise HTTPException(status_code=403, detail="Token does not identify a user")
+    return user_id
+
+
+def decode_refresh_token(token: str) -> dict:
+    """
+    Проверяет refresh-токен: подпись, срок, тип и отсутствие в списке отзыва.
+
+    Parameters:
+        token (str): Refresh-токен.
+
+    Returns:
+        dict: Содержимое токена.
+
+    Raises:
+        HTTPException: Если токен истек, недействителен, отозван или не является refresh-токеном.
+    """
+    payload = decode_access_token(token)
+    if payload.get("type") != "refresh" or "jti" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if revoked_tokens.is_revoked(payload["jti"]):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return payload
+
+
+def revoke_token(payload: dict) -> None:
+    """
+    Отзывает токен по его содержимому до момента истечения.
+
+    Parameters:
+        payload (dict): Содержимое токена с полями jti и exp.
+    """
+    if "jti" in payload:
+        revoked_tokens.revoke(payload["jti"], payload["exp"])
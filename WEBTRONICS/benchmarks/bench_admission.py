@@ -0,0 +1,79 @@
+"""
+Всплеск нагрузки с контролем допуска и без него.
+
+Одновременно приходит --burst чтений и --logins входов (хэширование пароля).
+Без контроля допуска все запросы обрабатываются одновременно и задержка
+растет у всех; с ним лишние запросы сразу получают 503 с Retry-After, а
+допущенные укладываются в дедлайн очереди. Выводятся p50/p99 успешных
+ответов и количество и задержка отказов. Каждый режим запускается в
+отдельном процессе, так как middleware настраивается при импорте приложения.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_admission.py [--burst 5000] [--logins 200] [--deadline 0.2]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _percentiles(values: list) -> str:
+    if not values:
+        return "       -"
+    values.sort()
+    return f"p50 {values[len(values) // 2]:7.1f} ms, p99 {values[int(len(values) * 0.99) - 1]:7.1f} ms"
+
+
+async def _run(burst: int, logins: int) -> None:
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await main.open_storage()
+        await client.post("/register", params={"username": "bench", "password": "secret"})
+        results = {}
+
+        async def request(kind: str, method: str, url: str, **kwargs) -> None:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            results.setdefault((kind, response.status_code), []).append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(request("read", "GET", "/posts/1") for _ in range(burst)),
+            *(request("login", "POST", "/login", params={"username": "bench", "password": "secret"})
+              for _ in range(logins)),
+        )
+        elapsed = time.perf_counter() - started
+        await main.close_storage()
+
+    print("admission on" if main.config.ADMISSION_ENABLED else "admission off", f"(burst done in {elapsed:.1f} s)")
+    for (kind, status), latencies in sorted(results.items()):
+        print(f"  {kind:>5} {status}: {len(latencies):6} requests, {_percentiles(latencies)}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=5000)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--deadline", type=float, default=0.2)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_run(args.burst, args.logins))
+        return
+    for enabled in ("false", "true"):
+        env = {**os.environ, "ADMISSION_ENABLED": enabled, "ADMISSION_DEADLINE": str(args.deadline),
+               "METRICS_ENABLED": "false"}
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *sys.argv[1:]], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,115 @@
+"""
+Бенчмарк колоночного журнала реакций и запросов аналитики.
+
+Заполняет журнал событиями за неделю (популярность постов распределена по
+закону Ципфа), затем измеряет объем памяти на событие, скорость записи и
+время выборки за период и запросов по ней: почасовой гистограммы и итогов
+по посту и по всем постам.
+Для сравнения выводится объем памяти события в виде словаря.
+
+Для генерации и векторных запросов нужен numpy; без него запросы
+считаются циклом на Python (используйте меньшее --events).
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_analytics.py [--events 50000000] [--posts 100000] [--users 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+from analytics import ReactionEventLog  # noqa: E402
+from reactions import DISLIKE, LIKE  # noqa: E402
+
+WEEK = 7 * 24 * 3600
+CHUNK = 5_000_000
+
+
+def _fill(log: ReactionEventLog, events: int, posts: int, users: int, start: int) -> None:
+    numpy = analytics.numpy
+    if numpy is None:
+        rnd = random.Random(1)
+        for i in range(events):
+            log.append((int(rnd.paretovariate(1.0)) - 1) % posts + 1, rnd.randrange(1, users), rnd.choice((LIKE, DISLIKE)),
+                       start + i * WEEK // events)
+        return
+    rng = numpy.random.default_rng(1)
+    for offset in range(0, events, CHUNK):
+        size = min(CHUNK, events - offset)
+        post_ids = ((rng.zipf(1.3, size) - 1) % posts + 1).astype(numpy.uint32)
+        user_ids = rng.integers(1, users, size, dtype=numpy.uint32)
+        kinds = numpy.where(rng.random(size) < 0.7, LIKE, DISLIKE).astype(numpy.int8)
+        times = (start + (numpy.arange(offset, offset + size, dtype=numpy.int64) * WEEK) // events).astype(numpy.uint32)
+        log.extend(array("I", post_ids.tobytes()), array("I", user_ids.tobytes()),
+                   array("b", kinds.tobytes()), array("I", times.tobytes()))
+
+
+def _time(label: str, fn, number: int = 5):
+    started = time.perf_counter()
+    for _ in range(number):
+        result = fn()
+    print(f"{label:<46} {(time.perf_counter() - started) / number * 1000:9.2f} ms")
+    return result
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50_000_000)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    sample = [{"post_id": i, "user_id": i, "kind": "like", "created_at": time.time()} for i in range(100_000)]
+    dict_bytes = tracemalloc.get_traced_memory()[0] / len(sample)
+    del sample
+    tracemalloc.stop()
+
+    start = int(time.time()) - WEEK
+    log = ReactionEventLog()
+    started = time.perf_counter()
+    _fill(log, args.events, args.posts, args.users, start)
+    stats = log.stats()
+    print(f"loaded {stats['events']:,} events in {time.perf_counter() - started:.1f} s: "
+          f"{stats['bytes'] / 2 ** 20:,.0f} MiB, {stats['bytes'] / stats['events']:.0f} bytes/event "
+          f"(dict per event: {dict_bytes:.0f} bytes); vectorized: {stats['vectorized']}")
+
+    appender = ReactionEventLog()
+    number = 1_000_000
+    started = time.perf_counter()
+    for i in range(number):
+        appender.append(i % 1000, i, LIKE)
+    print(f"{'append':<46} {(time.perf_counter() - started) / number * 1e9:9.0f} ns/event")
+
+    end = start + WEEK
+    day = end - 24 * 3600
+    week = _time("snapshot, week", lambda: log.snapshot(start, end), number=100)
+    last_day = log.snapshot(day, end)
+    _time("histogram, hot post, week by hour", lambda: week.histogram(1, start, end, 3600))
+    _time("histogram, cold post, week by hour", lambda: week.histogram(args.posts // 2, start, end, 3600))
+    _time("histogram, hot post, last day by hour", lambda: last_day.histogram(1, day, end, 3600))
+    _time("histogram, all posts, week by hour", lambda: week.histogram(None, start, end, 3600))
+    summary = _time("summary, hot post, week", lambda: week.summary(1))
+    print(f"    {summary}")
+    _time("summary, all posts, last day", lambda: last_day.summary(None), number=1)
+    _time("summary, all posts, week", lambda: week.summary(None), number=1)
+
+    # Запрос в потоке не мешает дописывать журнал: заполненные блоки не меняются, хвост скопирован
+    query = threading.Thread(target=week.histogram, args=(None, start, end, 3600))
+    query.start()
+    appended = 0
+    while query.is_alive():
+        log.append(1, 1, LIKE, end)
+        appended += 1
+    print(f"appended {appended:,} events while a week histogram ran in a thread")
+
+
+if __name__ == "__main__":
+    main_cli()
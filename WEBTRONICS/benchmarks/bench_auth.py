@@ -0,0 +1,60 @@
+"""
+Бенчмарк аутентифицированных запросов с кэшем проверенных токенов и без него.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_auth.py [--requests 5000] [--clients 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth  # noqa: E402
+import main  # noqa: E402
+
+
+async def _run(cache_size: int, requests: int, clients: int) -> float:
+    auth.token_cache = auth.TokenCache(cache_size)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tokens = [auth.create_access_token({"sub": f"user{i}", "uid": i}) for i in range(clients)]
+
+        async def worker(user_id: int, token: str, count: int) -> None:
+            headers = {"Authorization": f"Bearer {token}"}
+            for _ in range(count):
+                await client.post("/posts/1/like/", json={"user_id": user_id, "post_id": 1}, headers=headers)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i, token, requests // clients) for i, token in enumerate(tokens)))
+        elapsed = time.perf_counter() - started
+    print(f"cache size {cache_size:>6}: {requests // clients * clients / elapsed:>8,.0f} req/s, {auth.token_cache.stats()}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args()
+
+    for cache_size in (0, 10000):
+        asyncio.run(_run(cache_size, args.requests, args.clients))
+    number = 20000
+    token = auth.create_access_token({"sub": "user1"})
+    started = time.perf_counter()
+    for _ in range(number):
+        auth.decode_access_token(token)
+    print(f"decode_access_token: {(time.perf_counter() - started) / number * 1e6:.2f} us/call")
+    auth.token_cache = auth.TokenCache(10000)
+    started = time.perf_counter()
+    for _ in range(number):
+        auth.decode_access_token_cached(token)
+    print(f"decode_access_token_cached: {(time.perf_counter() - started) / number * 1e6:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,78 @@
+"""
+Бенчмарк пропускной способности API для бэкендов хранения memory и sqlite.
+
+Приложение вызывается напрямую через ASGI-транспорт httpx, без сети.
+Нагрузка: чтение поста, создание поста и лайк в заданной пропорции.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_backends.py [--requests 5000] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from storage import create_storage  # noqa: E402
+
+
+async def _run(backend: str, requests: int, concurrency: int) -> float:
+    main.db = create_storage(backend, users=main.users_db, posts=main.posts_db)
+    await main.db.open()
+    rnd = random.Random(1)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/login", params={"username": "user1", "password": "password1"})
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        for i in range(100):
+            await client.post("/posts/", json={"id": 0, "title": f"t{i}", "content": "c"})
+        # Лайки ставят другие пользователи: токен у каждого свой
+        likers = {
+            user_id: {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+            for user_id in range(1000, 2001)
+        }
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                roll = rnd.random()
+                post_id = rnd.randint(1, 100)
+                if roll < 0.7:
+                    await client.get(f"/posts/{post_id}")
+                elif roll < 0.8:
+                    await client.post("/posts/", json={"id": 0, "title": "t", "content": "c"})
+                else:
+                    user_id = rnd.randint(1000, 2000)
+                    await client.post(f"/posts/{post_id}/like/", json={"user_id": user_id, "post_id": post_id},
+                                      headers=likers[user_id])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    await main.db.close()
+    return (requests // concurrency * concurrency) / elapsed
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.SQLITE_PATH = os.path.join(tmp, "bench.db")
+        for backend in ("memory", "sqlite"):
+            rps = asyncio.run(_run(backend, args.requests, args.concurrency))
+            print(f"{backend:>7}: {rps:>9,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,70 @@
+"""
+Бенчмарк пакетной загрузки реакций против одиночных маршрутов like/dislike.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_batch.py [--events 5000] [--batch 500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth  # noqa: E402
+import main  # noqa: E402
+
+
+def _events(count: int, batch: int) -> list:
+    # Пачку отправляет один пользователь: user_id совпадает у всех реакций пачки
+    rnd = random.Random(1)
+    return [
+        {"post_id": rnd.randint(1, 2), "user_id": 1000 + i // batch, "kind": rnd.choice(("like", "dislike"))}
+        for i in range(count)
+    ]
+
+
+async def _run(events: list, batch: int) -> None:
+    transport = httpx.ASGITransport(app=main.app)
+    headers = {
+        user_id: {"Authorization": f"Bearer {auth.create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+        for user_id in {event["user_id"] for event in events}
+    }
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for event in events:
+            await client.post(f"/posts/{event['post_id']}/{event['kind']}/", json=event, headers=headers[event["user_id"]])
+        single = len(events) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for i in range(0, len(events), batch):
+            await client.post("/reactions/batch", json=events[i:i + batch], headers=headers[events[i]["user_id"]])
+        array = len(events) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for i in range(0, len(events), batch):
+            body = "\n".join(json.dumps(event) for event in events[i:i + batch])
+            await client.post("/reactions/batch", content=body,
+                              headers={**headers[events[i]["user_id"]], "Content-Type": "application/x-ndjson"})
+        ndjson = len(events) / (time.perf_counter() - started)
+
+    print(f"single routes:      {single:>10,.0f} events/s")
+    print(f"batch, JSON array:  {array:>10,.0f} events/s")
+    print(f"batch, NDJSON:      {ndjson:>10,.0f} events/s")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(_run(_events(args.events, args.batch), args.batch))
+
+
+if __name__ == "__main__":
+    main_cli()
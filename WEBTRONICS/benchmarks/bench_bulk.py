@@ -0,0 +1,186 @@
+"""
+Бенчмарк выгрузки и загрузки данных в NDJSON (GET /export, POST /import).
+
+Для каждого бэкенда хранения загружает через POST /import сгенерированную
+выгрузку двумя запросами (пользователи и посты, затем реакции), затем
+выгружает ее через GET /export, пока параллельный клиент ставит новые реакции.
+Выводит записи в секунду, прирост памяти процесса (RSS) за время загрузки
+(в него входят сами данные и индексы в памяти) и выгрузки и проверяет, что
+в выгрузке все исходные записи, а также согласована ли она на момент начала
+(реакции параллельного клиента — только целыми пачками; так у бэкенда sqlite,
+memory и journal читают живые данные).
+Тело запроса и ответа передается приложению напрямую по ASGI фрагментами и
+целиком в памяти не собирается.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_bulk.py [--posts 100000] [--reactions 1000000] [--users 10000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+config.BULK_USERS = ["bench"]
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from storage import create_storage  # noqa: E402
+
+TOKEN = create_access_token({"sub": "bench"}).encode()
+
+
+def _rss() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _dump_posts(users: int, posts: int):
+    # Выгрузка генерируется по строкам и не хранится целиком
+    for user_id in range(1, users + 1):
+        yield b'{"type":"user","id":%d,"username":"bench-%d","password":"x"}\n' % (user_id, user_id)
+    for post_id in range(1, posts + 1):
+        yield (b'{"type":"post","id":%d,"title":"Post %d","content":"Lorem ipsum dolor sit amet","user_id":%d}\n'
+               % (post_id, post_id, post_id % users + 1))
+
+
+def _dump_reactions(users: int, posts: int, reactions: int):
+    # Пары (пост, пользователь) различны, и автор не реагирует на свой пост, пока reactions < posts * users
+    for i in range(reactions):
+        post_id, round_ = i % posts + 1, i // posts + 1
+        user_id = (round_ * 7919 + post_id) % users + 1
+        yield b'{"type":"reaction","post_id":%d,"user_id":%d,"kind":"%s"}\n' % (
+            post_id, user_id, b"dislike" if i % 10 < 3 else b"like")
+
+
+async def _call(method: str, path: str, body=(), on_body=None) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"authorization", b"Bearer " + TOKEN)],
+        "server": ("bench", 80), "client": ("bench", 1),
+    }
+    lines = iter(body)
+    status = 0
+    done = False
+
+    async def receive():
+        nonlocal done
+        if done:
+            await asyncio.Event().wait()
+        # Тело отправляется фрагментами по 64 КиБ, как его читал бы сервер из сокета
+        chunk, size = [], 0
+        for line in lines:
+            chunk.append(line)
+            size += len(line)
+            if size >= 1 << 16:
+                break
+        done = size < 1 << 16
+        await asyncio.sleep(0)
+        return {"type": "http.request", "body": b"".join(chunk), "more_body": not done}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and on_body is not None:
+            on_body(message.get("body", b""))
+
+    await main.app(scope, receive, send)
+    return status
+
+
+async def _run(backend: str, users: int, posts: int, reactions: int) -> None:
+    main.db = create_storage(backend)
+    await main.db.open()
+    for label, body, records in (
+        ("users and posts", _dump_posts(users, posts), users + posts),
+        ("reactions", _dump_reactions(users, posts, reactions), reactions),
+    ):
+        rss = _rss()
+        started = time.perf_counter()
+        response = []
+        status = await _call("POST", "/import", body, response.append)
+        elapsed = time.perf_counter() - started
+        assert status == 200, b"".join(response)
+        print(f"{backend:>7} import {label}: {records:,} records in {elapsed:5.1f} s = "
+              f"{records / elapsed:>9,.0f} records/s, RSS +{(_rss() - rss) / 2 ** 20:,.0f} MiB")
+
+    # Параллельный клиент ставит новые реакции, пока идет выгрузка
+    stop = False
+
+    async def writer() -> int:
+        written = 0
+        while not stop:
+            events = [(random.randrange(1, posts + 1), users + 1 + written + i, 1) for i in range(100)]
+            await main.db.apply_reactions(events)
+            written += len(events)
+            await asyncio.sleep(0.001)
+        return written
+
+    counts = {b"user": 0, b"post": 0, b"reaction": 0, b"written": 0}
+    peak = rss = _rss()
+    tail = b""
+
+    def on_body(data: bytes) -> None:
+        nonlocal tail, peak
+        lines = (tail + data).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            kind = line[9:line.index(b'"', 9)]
+            # Реакции параллельного клиента — от пользователей с ID больше users
+            if kind == b"reaction" and int(line.split(b'"user_id":')[1].split(b",")[0]) > users:
+                kind = b"written"
+            counts[kind] += 1
+        peak = max(peak, _rss())
+
+    writing = asyncio.create_task(writer())
+    started = time.perf_counter()
+    status = await _call("GET", "/export", on_body=on_body)
+    elapsed = time.perf_counter() - started
+    stop = True
+    written = await writing
+    assert status == 200 and not tail
+    exported = sum(counts.values())
+    # Выгрузка содержит все исходные записи; согласованная на момент начала — и только целые пачки клиента
+    complete = (counts[b"user"], counts[b"post"], counts[b"reaction"]) == (users, posts, reactions)
+    consistent = complete and counts[b"written"] % 100 == 0
+    print(f"{backend:>7} export: {exported:,} records in {elapsed:5.1f} s = {exported / elapsed:>9,.0f} records/s, "
+          f"peak RSS +{(peak - rss) / 2 ** 20:,.0f} MiB; {written:,} reactions written during export "
+          f"({counts[b'written']:,} of them exported), complete: {complete}, point-in-time: {consistent}")
+    await main.db.close()
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--reactions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--backends", default="memory,journal,sqlite")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    if len(backends) > 1:
+        # Каждый бэкенд — в отдельном процессе: индексы и рейтинги прошлого прогона не должны влиять на результат
+        for backend in backends:
+            subprocess.run([sys.executable, __file__, "--backends", backend, "--posts", str(args.posts),
+                            "--reactions", str(args.reactions), "--users", str(args.users)], check=True)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        config.JOURNAL_DIR = os.path.join(tmp, "journal")
+        config.SQLITE_PATH = os.path.join(tmp, "bench.db")
+        asyncio.run(_run(backends[0], args.users, args.posts, args.reactions))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,150 @@
+"""
+Бенчмарк сжатия ответов.
+
+Для схемы OpenAPI, большого поста и страницы списка постов сравнивает
+пропускную способность и размер ответа без сжатия (Accept-Encoding:
+identity), со сжатием и кэшем сжатых ответов и со сжатием без кэша. Затем
+измеряет наибольшую задержку цикла событий, пока параллельно отдается
+сжатый пост размером в несколько мегабайт: со сжатием в пуле потоков и без него.
+
+Запросы передаются приложению напрямую по протоколу ASGI, без HTTP-клиента.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_compression.py [--requests 2000] [--encoding gzip]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from response_compression import CompressionMiddleware  # noqa: E402
+
+TOKEN = create_access_token({"sub": "user1", "uid": 1}).encode()
+
+# Словарь из случайных слов: текст постов не должен сжиматься лучше настоящего
+_random = random.Random(1)
+WORDS = ["".join(_random.choice("абвгдежзиклмнопрстуфхцчшэюяabcdefghijklmnopqrstuvwxyz") for _ in range(_random.randint(2, 10)))
+         for _ in range(5000)]
+
+
+async def _call(method: str, path: str, query: str = "", encoding: str = "identity", body: bytes = b"") -> int:
+    headers = [(b"authorization", b"Bearer " + TOKEN), (b"accept-encoding", encoding.encode())]
+    if body:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    size = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            # Запись в сокет отдает управление циклу событий
+            await asyncio.sleep(0)
+
+    await main.app(scope, receive, send)
+    return size
+
+
+def _middleware() -> CompressionMiddleware:
+    app = main.app.middleware_stack
+    while not isinstance(app, CompressionMiddleware):
+        app = app.app
+    return app
+
+
+async def _throughput(label: str, path: str, query: str, encoding: str, requests: int) -> None:
+    size = await _call("GET", path, query, encoding)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await _call("GET", path, query, encoding)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {requests / elapsed:9,.0f} req/s {size:>10,} bytes")
+
+
+async def _stalls(path: str, encoding: str, offload_size: int, requests: int) -> float:
+    # Наибольшая задержка тикера, пока 4 клиента запрашивают большой пост (кэш сжатых ответов выключен)
+    middleware = _middleware()
+    middleware.offload_size = offload_size
+    cache, middleware.cache = middleware.cache, None
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, time.perf_counter() - started - 0.001)
+
+    async def client():
+        for _ in range(requests):
+            await _call("GET", path, "", encoding)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.gather(*(client() for _ in range(4)))
+    done = True
+    await tick
+    middleware.cache = cache
+    return worst
+
+
+async def _run(requests: int, encoding: str) -> None:
+    await main.open_storage()
+    for i in range(10_000):
+        content = " ".join(_random.choices(WORDS, k=60 + i % 40))
+        await _call("POST", "/posts/", body=main.dumps({"id": 0, "title": f"Post {i}", "content": content}))
+    big = await main.db.create_post({"id": 0, "title": "Big", "content": " ".join(_random.choices(WORDS, k=3000)),
+                                     "user_id": None})
+    huge = await main.db.create_post({"id": 0, "title": "Huge", "content": " ".join(_random.choices(WORDS, k=300_000)),
+                                      "user_id": None})
+
+    cases = [
+        ("GET /openapi.json", "/openapi.json", ""),
+        ("GET /posts/{big}", f"/posts/{big['id']}", ""),
+        ("GET /posts?limit=100", "/posts", "limit=100"),
+    ]
+    middleware = _middleware()
+    for label, path, query in cases:
+        await _throughput(f"{label}, identity", path, query, "identity", requests)
+        await _throughput(f"{label}, {encoding}", path, query, encoding, requests)
+        cache, middleware.cache = middleware.cache, None
+        await _throughput(f"{label}, {encoding}, no cache", path, query, encoding, requests)
+        middleware.cache = cache
+    print(f"compressed response cache: {main.compressed_responses.stats()}")
+
+    path = f"/posts/{huge['id']}"
+    size = await _call("GET", path)
+    for label, offload_size in (("in thread pool", middleware.offload_size), ("on event loop", 1 << 62)):
+        worst = await _stalls(path, encoding, offload_size, 10)
+        print(f"max event loop stall, {encoding} of a {size / 2 ** 20:.1f} MiB post {label}: {worst * 1000:7.1f} ms")
+    await main.close_storage()
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--encoding", default="gzip")
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests, args.encoding))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,93 @@
+"""
+Пропускная способность отдельных эндпоинтов.
+
+Запросы передаются приложению напрямую по протоколу ASGI, без HTTP-клиента,
+чтобы в замерах оставалась только работа фреймворка и обработчиков.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_endpoints.py [--requests 5000]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+@functools.lru_cache(maxsize=None)
+def _token(user_id: int) -> bytes:
+    return create_access_token({"sub": f"user{user_id}", "uid": user_id}).encode()
+
+
+async def _call(method: str, path: str, payload=None, query: str = "", user_id: int = 1) -> int:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    headers = [(b"authorization", b"Bearer " + _token(user_id))]
+    if payload is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await main.app(scope, receive, send)
+    return status
+
+
+async def _run(requests: int) -> None:
+    post = {"id": 0, "title": "Bench", "content": "x" * 200}
+    cases = [
+        ("GET /openapi.json", lambda i: _call("GET", "/openapi.json")),
+        ("GET /docs", lambda i: _call("GET", "/docs")),
+        ("GET /posts/1", lambda i: _call("GET", "/posts/1")),
+        ("POST /posts/", lambda i: _call("POST", "/posts/", post)),
+        ("PUT /posts/3", lambda i: _call("PUT", "/posts/3", {**post, "id": 3})),
+        ("POST like", lambda i: _call("POST", "/posts/2/like/", {"user_id": i, "post_id": 2}, user_id=i)),
+        ("GET /posts/top", lambda i: _call("GET", "/posts/top", query="limit=50")),
+    ]
+    await main.open_storage()
+    for i in range(3, 200):
+        await _call("POST", "/posts/", post)
+        await _call("POST", f"/posts/{i}/like/", {"user_id": 2, "post_id": i}, user_id=2)
+    # Токены лайкающих пользователей выпускаются заранее, вне замера
+    for i in range(requests):
+        _token(i)
+    for label, request in cases:
+        started = time.perf_counter()
+        for i in range(requests):
+            status = await request(i)
+            assert status == 200, (label, status)
+        elapsed = time.perf_counter() - started
+        print(f"{label:>18}: {requests / elapsed:8.0f} req/s")
+    await main.close_storage()
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,87 @@
+"""
+Бенчмарк журнала изменений: скорость записи и время восстановления.
+
+Заполняет JournaledStorage постами и реакциями, снимает снимок (с задержкой
+цикла событий), дописывает хвост журнала и измеряет время запуска нового
+экземпляра до готовности.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_journal.py [--posts 200000] [--reactions 2000000] [--tail 100000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal import JournaledStorage  # noqa: E402
+from reactions import LIKE, DISLIKE  # noqa: E402
+
+
+async def _fill(directory: str, posts: int, reactions: int, tail: int) -> None:
+    storage = JournaledStorage(directory, fsync_wait=False, snapshot_interval=3600)
+    await storage.open()
+    rnd = random.Random(1)
+    for i in range(posts):
+        await storage.create_post({"title": f"Post {i}", "content": "content", "user_id": i % 1000})
+    for _ in range(reactions):
+        await storage.set_reaction(rnd.randint(1, posts), rnd.randrange(100000), LIKE if rnd.random() < 0.8 else DISLIKE)
+    # Снимок пишется в потоке: цикл событий останавливается только на копирование контейнеров
+    stall = 0.0
+    done = False
+
+    async def ticker() -> None:
+        nonlocal stall
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - started)
+
+    ticking = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await storage.snapshot()
+    elapsed = time.perf_counter() - started
+    done = True
+    await ticking
+    print(f"snapshot: {elapsed:.2f} s, max event loop stall {stall * 1000:.1f} ms")
+
+    # Хвост журнала после снимка, с ожиданием fsync и конкурентными писателями
+    async def writer(count: int) -> None:
+        for _ in range(count):
+            await storage._journal(["react", rnd.randint(1, posts), rnd.randrange(100000), LIKE])
+
+    storage.fsync_wait = True
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(tail // 64) for _ in range(64)))
+    elapsed = time.perf_counter() - started
+    print(f"journal append with group fsync: {tail // 64 * 64 / elapsed:,.0f} records/s")
+    await storage.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=200_000)
+    parser.add_argument("--reactions", type=int, default=2_000_000)
+    parser.add_argument("--tail", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(_fill(directory, args.posts, args.reactions, args.tail))
+        sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+        print("files:", ", ".join(f"{name} {size / 2 ** 20:.1f} MiB" for name, size in sorted(sizes.items())))
+
+        started = time.perf_counter()
+        storage = JournaledStorage(directory)
+        storage.recover()
+        elapsed = time.perf_counter() - started
+        print(f"restart-to-ready: {elapsed:.3f}s for {len(storage.posts):,} posts "
+              f"and {len(storage.reactions):,} reactions")
+
+
+if __name__ == "__main__":
+    main()
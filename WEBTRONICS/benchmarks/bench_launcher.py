@@ -0,0 +1,237 @@
+"""
+Бенчмарк запуска в продакшене.
+
+Сравнивает пропускную способность по HTTP команды разработки
+`uvicorn main:app --reload` и serve.py: один воркер на asyncio и h11, один
+воркер на uvloop и httptools и N воркеров. Затем под нагрузкой выполняет
+поочередный перезапуск воркеров (SIGHUP) и считает неудачные запросы, а также
+измеряет задержку первого запроса к каждому адресу без прогрева и с прогревом.
+
+Серверы запускаются отдельными процессами с бэкендом sqlite во временной
+директории и общими счетчиками реакций; нагрузку создают клиенты с постоянными
+соединениями HTTP/1.1 в процессе бенчмарка. Клиент повторяет запрос, если сервер
+закрыл простаивающее соединение, не ответив (так поступают HTTP-клиенты с
+идемпотентными запросами).
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_launcher.py [--seconds 5] [--connections 32] [--workers 2]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA = tempfile.mkdtemp(prefix="webtronics-bench-")
+os.environ.update(STORAGE_BACKEND="sqlite", SQLITE_PATH=os.path.join(DATA, "bench.db"), SHARED_COUNTERS="true")
+
+import main  # noqa: E402
+
+POSTS = 1000
+PATHS = [f"/posts/{i % POSTS + 1}" for i in range(0, 10 * POSTS, 7)] + ["/posts?limit=20"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(command: list, env: dict = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        command, cwd=ROOT, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+
+
+def _stop(process: subprocess.Popen) -> None:
+    # Сигнал всей группе процессов: у uvicorn --reload сервер — дочерний процесс
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+class Connection:
+    """Постоянное соединение HTTP/1.1 с сервером."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path: str) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        length = 0
+        chunked = False
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.lower() == b"content-length":
+                length = int(value)
+            elif name.lower() == b"transfer-encoding":
+                chunked = b"chunked" in value.lower()
+        if chunked:
+            # Потоковые ответы (GET /posts) передаются частями
+            while length := int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                await self.reader.readexactly(length + 2)
+            await self.reader.readuntil(b"\r\n")
+        else:
+            await self.reader.readexactly(length)
+        if b"connection: close" in head.lower():
+            self.close()
+        return int(head.split(b" ", 2)[1])
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _load(port: int, seconds: float, connections: int) -> dict:
+    result = {"requests": 0, "errors": 0, "retries": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def client(offset: int) -> None:
+        connection = Connection(port)
+        i = offset
+        while time.perf_counter() < deadline:
+            i += connections
+            path = PATHS[i % len(PATHS)]
+            try:
+                status = await connection.get(path)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Воркер закрыл простаивающее соединение при остановке: повтор на новом
+                connection.close()
+                result["retries"] += 1
+                try:
+                    status = await connection.get(path)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    connection.close()
+                    status = 0
+            result["requests"] += 1
+            result["errors"] += status != 200
+        connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(connections)))
+    result["rate"] = result["requests"] / (time.perf_counter() - started)
+    return result
+
+
+async def _wait_ready(port: int, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if await Connection(port).get("/posts/1") == 200:
+                return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def _seed() -> None:
+    await main.open_storage()
+    for i in range(POSTS):
+        await main.db.create_post({"id": 0, "title": f"Post {i}", "content": "lorem ipsum " * 20, "user_id": None})
+    await main.close_storage()
+
+
+async def _throughput(seconds: float, connections: int, workers: int) -> None:
+    serve = [sys.executable, "serve.py", "--host", "127.0.0.1"]
+    cases = [
+        ("uvicorn main:app --reload", lambda port: _start(
+            [sys.executable, "-m", "uvicorn", "main:app", "--reload", "--port", str(port)])),
+        ("serve.py, 1 worker, asyncio + h11", lambda port: _start(
+            serve + ["--port", str(port), "--workers", "1"], {"LAUNCHER_LOOP": "asyncio", "LAUNCHER_HTTP": "h11"})),
+        ("serve.py, 1 worker", lambda port: _start(serve + ["--port", str(port), "--workers", "1"])),
+        (f"serve.py, {workers} workers", lambda port: _start(serve + ["--port", str(port), "--workers", str(workers)])),
+    ]
+    for label, start in cases:
+        port = _free_port()
+        process = start(port)
+        try:
+            await _wait_ready(port)
+            await _load(port, 1, connections)
+            result = await _load(port, seconds, connections)
+        finally:
+            _stop(process)
+        print(f"{label:<36} {result['rate']:9,.0f} req/s, {result['errors']} errors")
+
+
+async def _rolling_restart(seconds: float, connections: int, workers: int) -> None:
+    port = _free_port()
+    process = _start([sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+                      "--workers", str(workers)])
+    try:
+        await _wait_ready(port)
+
+        async def reload() -> None:
+            await asyncio.sleep(1)
+            process.send_signal(signal.SIGHUP)
+
+        # Перезапуск занимает несколько секунд: нагрузка длится дольше
+        result, _ = await asyncio.gather(_load(port, max(seconds, 4.0 * workers + 4), connections), reload())
+    finally:
+        _stop(process)
+    print(f"rolling restart of {workers} workers under load: {result['requests']:,} requests, "
+          f"{result['errors']} failed, {result['retries']} retried on closed idle connections, "
+          f"{result['rate']:,.0f} req/s")
+
+
+async def _first_request() -> None:
+    for label, env in (("no warmup", {"LAUNCHER_WARMUP_ROUNDS": "0"}), ("warmup", {})):
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", "1"],
+            cwd=ROOT, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+        try:
+            # Готовность — по журналу супервизора, без запросов, чтобы не прогреть сервер
+            for line in process.stderr:
+                if b"workers ready" in line:
+                    break
+            process.stderr.close()
+            latencies = []
+            for path in ("/openapi.json", "/posts?limit=10", "/posts/search?q=lorem"):
+                connection = Connection(port)
+                started = time.perf_counter()
+                await connection.get(path)
+                latencies.append(f"{path} {(time.perf_counter() - started) * 1000:.1f} ms")
+                connection.close()
+        finally:
+            _stop(process)
+        print(f"first request latency, {label:<10} " + ", ".join(latencies))
+
+
+async def _run(seconds: float, connections: int, workers: int) -> None:
+    print(f"{os.cpu_count()} CPU(s), {connections} keep-alive connections, GET /posts/{{id}} and /posts?limit=20")
+    await _seed()
+    await _throughput(seconds, connections, workers)
+    await _rolling_restart(seconds, connections, workers)
+    await _first_request()
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    asyncio.run(_run(args.seconds, args.connections, args.workers))
+
+
+if __name__ == "__main__":
+    main_cli()
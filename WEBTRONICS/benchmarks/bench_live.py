@@ -0,0 +1,210 @@
+"""
+Бенчмарк подписок на счетчики реакций: склейка обновлений и медленные клиенты.
+
+Открывает простаивающие подписки WebSocket на посты без реакций и активные
+подписки (поровну WebSocket и SSE) на несколько «горячих» постов, затем
+отправляет всплеск лайков в горячие посты. Выводит число сообщений на
+подписчика (против числа лайков), задержку доставки, стоимость тика с
+простаивающими подписчиками и поведение медленных клиентов.
+
+Соединения и запросы передаются приложению напрямую по протоколу ASGI.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_live.py [--idle 10000] [--active 1000] [--likes 10000] [--hot-posts 10]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import live  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+@functools.lru_cache(maxsize=None)
+def _token(user_id: int) -> bytes:
+    return create_access_token({"sub": f"user{user_id}", "uid": user_id}).encode()
+
+
+async def _call(method: str, path: str, payload=None, user_id: int = 1) -> int:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    headers = [(b"authorization", b"Bearer " + _token(user_id)), (b"content-type", b"application/json")]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await main.app(scope, receive, send)
+    return status
+
+
+class Subscriber:
+    """
+    Клиент подписки: считает полученные сообщения и задержку их доставки.
+
+    Attributes:
+        messages (int): Количество полученных обновлений.
+        last (dict): Последнее полученное обновление.
+        delays (list): Задержки от последнего лайка до получения, в секундах.
+    """
+
+    def __init__(self, post_id: int, sse: bool, slow: float, stats: dict):
+        self.post_id = post_id
+        self.sse = sse
+        self.slow = slow
+        self.stats = stats
+        self.messages = 0
+        self.last = None
+        self.delays = []
+        self.accepted = asyncio.Event()
+        self._closed = asyncio.Event()
+        self._connected = False
+        self.task = None
+
+    def start(self) -> None:
+        path = f"/posts/{self.post_id}/live"
+        if self.sse:
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+                "root_path": "", "headers": [], "server": ("bench", 80), "client": ("bench", 1),
+            }
+        else:
+            scope = {
+                "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": path,
+                "raw_path": path.encode(), "query_string": b"", "root_path": "", "headers": [],
+                "server": ("bench", 80), "client": ("bench", 1), "subprotocols": [],
+            }
+        self.task = asyncio.create_task(main.app(scope, self._receive, self._send))
+
+    async def _receive(self):
+        if not self._connected:
+            self._connected = True
+            return {"type": "http.request", "body": b"", "more_body": False} if self.sse else {"type": "websocket.connect"}
+        await self._closed.wait()
+        return {"type": "http.disconnect"} if self.sse else {"type": "websocket.disconnect", "code": 1000}
+
+    async def _send(self, message):
+        kind = message["type"]
+        if kind in ("websocket.accept", "http.response.start"):
+            self.accepted.set()
+            return
+        if kind == "websocket.send":
+            payload = message["text"]
+        elif kind == "http.response.body" and message.get("body", b"").startswith(b"data: "):
+            payload = message["body"][6:]
+        else:
+            return
+        self.last = json.loads(payload)
+        self.messages += 1
+        if self.stats["last_like"]:
+            self.delays.append(time.perf_counter() - self.stats["last_like"])
+        if self.slow:
+            await asyncio.sleep(self.slow)
+
+    async def close(self) -> None:
+        self._closed.set()
+        await self.task
+
+
+async def _run(idle: int, active: int, likes: int, hot_posts: int, slow: int, slow_delay: float) -> None:
+    await main.open_storage()
+    post = {"id": 0, "title": "Live", "content": "x"}
+    idle_posts = [(await main.db.create_post(dict(post)))["id"] for _ in range(max(1, idle // 10))]
+    hot = [(await main.db.create_post(dict(post)))["id"] for _ in range(hot_posts)]
+    stats = {"last_like": 0.0}
+
+    started = time.perf_counter()
+    idle_subscribers = [Subscriber(idle_posts[i % len(idle_posts)], False, 0, stats) for i in range(idle)]
+    active_subscribers = [
+        Subscriber(hot[i % hot_posts], i % 2 == 1, slow_delay if i < slow else 0, stats) for i in range(active)
+    ]
+    for subscriber in idle_subscribers + active_subscribers:
+        subscriber.start()
+    for subscriber in idle_subscribers + active_subscribers:
+        await subscriber.accepted.wait()
+    await asyncio.sleep(main.live_counts.tick * 2)
+    print(f"opened {idle:,} idle and {active:,} active subscriptions in {time.perf_counter() - started:.2f} s")
+
+    number = 50
+    started = time.perf_counter()
+    for _ in range(number):
+        await main.live_counts.publish()
+    print(f"tick with no changes: {(time.perf_counter() - started) / number * 1000:.2f} ms "
+          f"for {len(idle_posts) + hot_posts:,} subscribed posts")
+
+    for subscriber in active_subscribers:
+        subscriber.messages = 0
+    for i in range(likes):
+        _token(i + 1)
+    started = time.perf_counter()
+    for i in range(likes):
+        post_id = hot[i % hot_posts]
+        status = await _call("POST", f"/posts/{post_id}/like/", {"user_id": i + 1, "post_id": post_id}, i + 1)
+        assert status == 200, status
+        stats["last_like"] = time.perf_counter()
+        # Хранилище в памяти не отдает управление; отдаем его сами, чтобы тики шли во время всплеска
+        if i % 200 == 0:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(max(1.0, slow_delay * 2 + main.live_counts.tick * 2))
+
+    fast = [s for s in active_subscribers if not s.slow]
+    slow_subscribers = [s for s in active_subscribers if s.slow]
+    expected = likes // hot_posts
+    consistent = all(s.last["like_count"] == expected for s in active_subscribers)
+    delays = sorted(s.delays[-1] for s in fast if s.delays)
+    print(f"{likes:,} likes to {hot_posts} posts in {elapsed:.2f} s ({likes / elapsed:,.0f}/s), "
+          f"{expected:,} likes per post")
+    print(f"messages per fast subscriber: avg {sum(s.messages for s in fast) / len(fast):.1f}, "
+          f"max {max(s.messages for s in fast)}; final counts correct: {consistent}")
+    if slow_subscribers:
+        print(f"messages per slow subscriber ({slow_delay:.1f} s per message): "
+              f"avg {sum(s.messages for s in slow_subscribers) / len(slow_subscribers):.1f}; "
+              f"conflated updates: {live.live_conflated._values.get((), 0):,.0f}")
+    if delays:
+        print(f"delay from last like to final update: p50 {delays[len(delays) // 2] * 1000:.1f} ms, "
+              f"max {delays[-1] * 1000:.1f} ms (tick {main.live_counts.tick * 1000:.0f} ms)")
+    print(f"idle subscribers that received only the initial snapshot: "
+          f"{sum(s.messages == 1 for s in idle_subscribers):,} of {idle:,}")
+
+    for subscriber in idle_subscribers + active_subscribers:
+        await subscriber.close()
+    print(f"subscriptions left after close: {main.live_counts.subscribers}")
+    await main.close_storage()
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=int, default=10_000)
+    parser.add_argument("--active", type=int, default=1_000)
+    parser.add_argument("--likes", type=int, default=10_000)
+    parser.add_argument("--hot-posts", type=int, default=10)
+    parser.add_argument("--slow", type=int, default=100, help="сколько активных подписчиков читают медленно")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="время обработки сообщения медленным клиентом")
+    args = parser.parse_args()
+    asyncio.run(_run(args.idle, args.active, args.likes, args.hot_posts, args.slow, args.slow_delay))
+
+
+if __name__ == "__main__":
+    main_cli()
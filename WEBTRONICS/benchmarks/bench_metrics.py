@@ -0,0 +1,73 @@
+"""
+Накладные расходы сбора метрик на один запрос.
+
+Сравнивает вызов пустого ASGI-приложения напрямую и через MetricsMiddleware,
+а также измеряет отдельное наблюдение гистограммы и Timer.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_metrics.py [--requests 200000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsMiddleware, Timer, operation_duration  # noqa: E402
+
+
+async def endpoint():
+    pass
+
+
+async def noop_app(scope, receive, send):
+    # Как маршрутизатор Starlette: записываем найденный обработчик в scope
+    scope["endpoint"] = endpoint
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _send(message):
+    pass
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _measure(app, requests: int) -> float:
+    fake_app = SimpleNamespace(routes=[SimpleNamespace(endpoint=endpoint, path="/posts/{post_id}")])
+    headers = [(b"host", b"bench"), (b"content-length", b"0")]
+    started = time.perf_counter()
+    for _ in range(requests):
+        scope = {"type": "http", "method": "GET", "path": "/posts/1", "headers": headers, "app": fake_app}
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(_measure(noop_app, args.requests))
+    wrapped = asyncio.run(_measure(MetricsMiddleware(noop_app), args.requests))
+    print(f"request without middleware: {bare:6.2f} us")
+    print(f"request with metrics:       {wrapped:6.2f} us (overhead {wrapped - bare:.2f} us)")
+
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        operation_duration.observe(0.0001, "bench")
+    print(f"histogram observe:          {(time.perf_counter() - started) / args.requests * 1e6:6.2f} us")
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        with Timer(operation_duration, "bench"):
+            pass
+    print(f"Timer block:                {(time.perf_counter() - started) / args.requests * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Нагрузочный тест: задержка не связанных с паролями запросов во время массовых входов.
+
+Пока несколько клиентов непрерывно вызывают /login, другой клиент читает пост;
+для чтений считаются p50 и p99. Для сравнения тот же тест выполняется с
+хэшированием прямо в цикле событий.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_passwords.py [--reads 2000] [--logins 64]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import passwords  # noqa: E402
+
+
+async def _inline_submit(fn, *args):
+    return fn(*args)
+
+
+async def _run(label: str, reads: int, logins: int) -> None:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/register", params={"username": "bench", "password": "secret"})
+        stop = asyncio.Event()
+        login_count = 0
+        rejected = 0
+
+        async def login_storm() -> None:
+            nonlocal login_count, rejected
+            while not stop.is_set():
+                response = await client.post("/login", params={"username": "bench", "password": "secret"})
+                login_count += 1
+                rejected += response.status_code == 503
+                # Внутрипроцессный транспорт может не отдавать управление циклу
+                await asyncio.sleep(0)
+
+        storm = [asyncio.create_task(login_storm()) for _ in range(logins)]
+        await asyncio.sleep(0.2)
+        latencies = []
+        logins_before = login_count
+        started = time.perf_counter()
+        for _ in range(reads):
+            request_started = time.perf_counter()
+            # Запрос сначала ждет своей очереди в цикле событий, как при реальной сети
+            await asyncio.sleep(0)
+            await client.get("/posts/1")
+            latencies.append((time.perf_counter() - request_started) * 1000)
+        elapsed = time.perf_counter() - started
+        login_count -= logins_before
+        stop.set()
+        await asyncio.gather(*storm)
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:>22}: read p50 {statistics.median(latencies):7.2f} ms, p99 {p99:7.2f} ms, "
+          f"logins {login_count / elapsed:7.0f}/s, rejected {rejected}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+
+    asyncio.run(_run("no logins", args.reads, 0))
+    asyncio.run(_run("logins, worker pool", args.reads, args.logins))
+    # Без пула каждое чтение ждет все входы в очереди цикла, поэтому чтений меньше
+    passwords.password_hasher._submit = _inline_submit
+    asyncio.run(_run("logins, inline hashing", min(args.reads, 30), args.logins))
+
+
+if __name__ == "__main__":
+    main_cli()
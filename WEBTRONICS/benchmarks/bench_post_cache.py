@@ -0,0 +1,48 @@
+"""
+Бенчмарк чтения поста: ответ из кэша, сборка заново и условный запрос с ETag.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_post_cache.py [--requests 5000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+async def _measure(client: httpx.AsyncClient, label: str, requests: int, before=None, headers=None) -> None:
+    started = time.perf_counter()
+    for _ in range(requests):
+        if before is not None:
+            before()
+        await client.get("/posts/1", headers=headers)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>16}: {requests / elapsed:8.0f} req/s")
+
+
+async def _run(requests: int) -> None:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _measure(client, "rebuild", requests, before=lambda: main.post_cache.bump(1))
+        etag = (await client.get("/posts/1")).headers["etag"]
+        await _measure(client, "cached body", requests)
+        await _measure(client, "304 by ETag", requests, headers={"If-None-Match": etag})
+        print((await client.get("/cache/posts")).json())
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,49 @@
+"""
+Микробенчмарк хранилища постов.
+
+Сравнивает время поиска, проверки авторства и выдачи ID в PostRepository
+с линейным проходом по списку (как было раньше) при росте числа постов.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_posts.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import PostRepository  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000, 500_000)
+NUMBER = 1_000
+
+
+def _make_posts(n: int) -> list:
+    return [{"id": i, "title": f"Post {i}", "content": "x", "user_id": i % 1000} for i in range(1, n + 1)]
+
+
+def _usec(stmt, number: int = NUMBER) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    print(f"{'posts':>9} | {'list get':>10} | {'repo get':>9} | {'repo is_author':>14} | {'list new id':>11} | {'repo new id':>11}")
+    for n in SIZES:
+        posts = _make_posts(n)
+        repo = PostRepository(dict(p) for p in posts)
+        target = n // 2
+        list_number = max(1, NUMBER * 1_000 // n)
+
+        list_get = _usec(lambda: next(p for p in posts if p["id"] == target), list_number)
+        repo_get = _usec(lambda: repo.get(target))
+        repo_author = _usec(lambda: repo.is_author(target, target % 1000))
+        list_new_id = _usec(lambda: max(p["id"] for p in posts) + 1, list_number)
+        repo_new_id = _usec(repo.next_id)
+
+        print(f"{n:>9} | {list_get:>8.2f}us | {repo_get:>7.3f}us | {repo_author:>12.3f}us "
+              f"| {list_new_id:>9.2f}us | {repo_new_id:>9.3f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Накладные расходы профилирования.
+
+Измеряет пропускную способность смеси запросов (чтение поста, лайк, список
+постов) без профилирования, во время сеанса выборочного профилировщика по
+всем потокам и по одному маршруту, а также с cProfile на каждом запросе
+маршрута. Для сеансов выводит число выборок и долю времени, занятую ими
+по оценке профилировщика. Варианты чередуются по кругу, выводится медиана.
+
+Запросы передаются приложению напрямую по протоколу ASGI, без HTTP-клиента.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_profiling.py [--seconds 3] [--rounds 5]
+"""
+import argparse
+import asyncio
+import functools
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+config.PROFILING_USERS = ["bench"]
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+USERS = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def _token(user_id: int) -> bytes:
+    return create_access_token({"sub": f"user{user_id}", "uid": user_id}).encode()
+
+
+async def _call(method: str, path: str, query: str = "", body: bytes = b"", user_id: int = 1) -> int:
+    headers = [(b"authorization", b"Bearer " + _token(user_id))]
+    if body:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        # Запись в сокет отдает управление циклу событий
+        await asyncio.sleep(0)
+
+    await main.app(scope, receive, send)
+    return status
+
+
+async def _mix(seconds: float) -> float:
+    requests = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(offset: int) -> None:
+        nonlocal requests
+        i = offset
+        while time.perf_counter() < deadline:
+            i += 8
+            await _call("GET", f"/posts/{i % 500 + 1}")
+            user_id = i % USERS + 1
+            await _call("POST", f"/posts/{i % 500 + 1}/like/",
+                        body=b'{"user_id": %d, "post_id": %d}' % (user_id, i % 500 + 1), user_id=user_id)
+            await _call("GET", "/posts", "limit=20")
+            requests += 3
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(8)))
+    return requests / (time.perf_counter() - started)
+
+
+async def _run(seconds: float, rounds: int) -> None:
+    await main.open_storage()
+    for i in range(500):
+        await main.db.create_post({"id": 0, "title": f"Post {i}", "content": "lorem ipsum " * 20, "user_id": None})
+    for user_id in range(1, USERS + 1):
+        _token(user_id)
+    await _mix(1)
+
+    profiled = 0
+
+    async def rearm(deadline: float) -> None:
+        # cProfile на каждом запросе маршрута: профилировщик снова включается по окончании предыдущего
+        nonlocal profiled
+        while time.perf_counter() < deadline:
+            if main.request_profiler.route is None:
+                main.request_profiler.arm("/posts/{post_id}")
+                profiled += 1
+            await asyncio.sleep(0)
+        main.request_profiler.route = None
+
+    cases = [
+        ("no profiling", None, None),
+        ("sampler, all threads", "sampler", (None, 1)),
+        ("sampler, GET /posts/{post_id}", "sampler", ("/posts/{post_id}", 1)),
+        ("sampler, every 10th /posts/{post_id}", "sampler", ("/posts/{post_id}", 10)),
+        ("cProfile, back-to-back requests", "cprofile", None),
+    ]
+    # Варианты чередуются по кругу, чтобы дрейф производительности не влиял на сравнение
+    rates = {label: [] for label, _, _ in cases}
+    samples = {}
+    for _ in range(rounds):
+        for label, kind, args in cases:
+            if kind == "sampler":
+                main.stack_sampler.start(seconds, *args)
+            elif kind == "cprofile":
+                arming = asyncio.create_task(rearm(time.perf_counter() + seconds))
+            rates[label].append(await _mix(seconds))
+            if kind == "sampler":
+                main.stack_sampler.stop()
+                stats = main.stack_sampler.stats()
+                samples.setdefault(label, []).append(
+                    f"{stats['samples']:,} samples, estimated overhead {stats['overhead']:.2%}")
+            elif kind == "cprofile":
+                await arming
+
+    baseline = statistics.median(rates["no profiling"])
+    for label, _, _ in cases:
+        rate = statistics.median(rates[label])
+        note = f"; {samples[label][-1]}" if label in samples else ""
+        if label.startswith("cProfile"):
+            note = f"; {profiled:,} requests profiled"
+        print(f"{label:<36} {rate:9,.0f} req/s ({rate / baseline - 1:+6.1%}){note}")
+    await main.close_storage()
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(_run(args.seconds, args.rounds))
+
+
+if __name__ == "__main__":
+    main_cli()
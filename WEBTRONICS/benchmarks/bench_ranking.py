@@ -0,0 +1,63 @@
+"""
+Бенчмарк рейтингов «лучшие» и «в тренде».
+
+Сравнивает выборку K лучших из инкрементальных рейтингов с полной
+сортировкой всех постов по счетчикам реакций.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_ranking.py [--posts 100000] [--reactions 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import TopRanking, TrendingRanking  # noqa: E402
+from reactions import LIKE, DISLIKE, ReactionStore  # noqa: E402
+
+
+def _usec(fn, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--reactions", type=int, default=1_000_000)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    store = ReactionStore()
+    top = TopRanking()
+    trending = TrendingRanking(refresh_interval=0)
+    started = time.perf_counter()
+    for _ in range(args.reactions):
+        post_id = int(rnd.paretovariate(1.2)) % args.posts
+        kind = LIKE if rnd.random() < 0.8 else DISLIKE
+        previous = store.set(post_id, rnd.randrange(50_000), kind)
+        top.apply(post_id, previous, kind)
+        if previous != kind:
+            trending.record(post_id)
+    elapsed = time.perf_counter() - started
+    print(f"reaction + ranking updates: {args.reactions / elapsed:,.0f} ev/s")
+
+    def full_sort():
+        scores = [(likes - dislikes, post_id) for post_id, likes, dislikes in store.iter_counts()]
+        return sorted(scores, reverse=True)[:args.k]
+
+    print(f"top {args.k}, full sort:        {_usec(full_sort, 5):>10.1f} us")
+    print(f"top {args.k}, TopRanking:       {_usec(lambda: top.top(args.k), 10_000):>10.1f} us")
+    print(f"trending {args.k}, cached list: {_usec(lambda: trending.top(args.k), 10_000):>10.1f} us")
+    trending.record(1)
+    print(f"trending {args.k}, refresh:     {_usec(lambda: (trending.record(1), trending.top(args.k)), 5):>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
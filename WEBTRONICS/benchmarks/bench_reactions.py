@@ -0,0 +1,60 @@
+"""
+Бенчмарк хранилища реакций.
+
+Сравнивает память и время чтения счетчиков у ReactionStore и у прежних
+списков словарей, куда каждая реакция дописывалась без дедупликации.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_reactions.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reactions import ReactionStore, LIKE, DISLIKE  # noqa: E402
+
+EVENTS = 1_000_000
+POSTS = 10_000
+USERS = 5_000
+
+
+def _events(n: int) -> list:
+    rnd = random.Random(42)
+    return [(rnd.randrange(POSTS), rnd.randrange(USERS), rnd.random() < 0.8) for _ in range(n)]
+
+
+def _measure(name: str, fill) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    fill()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>14} | {EVENTS / elapsed:>12,.0f} ev/s | {peak / 2 ** 20:>8.1f} MiB")
+
+
+def main() -> None:
+    events = _events(EVENTS)
+
+    def fill_lists():
+        likes, dislikes = {}, {}
+        for post_id, user_id, is_like in events:
+            cache = likes if is_like else dislikes
+            cache.setdefault(post_id, []).append({"user_id": user_id, "post_id": post_id})
+
+    def fill_store():
+        store = ReactionStore()
+        for post_id, user_id, is_like in events:
+            store.set(post_id, user_id, LIKE if is_like else DISLIKE)
+
+    print(f"{'variant':>14} | {'throughput':>17} | {'peak mem':>12}")
+    _measure("list of dicts", fill_lists)
+    _measure("ReactionStore", fill_store)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Бенчмарк проверки отзыва токенов: накладные расходы на запрос.
+
+Сравнивает проверку токена из кэша без списка отзыва и с ним (пустым и
+заполненным), а также отдельные проверки неотозванного и отозванного jti.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_revocation.py [--revoked 100000] [--number 200000]
+"""
+import argparse
+import os
+import secrets
+import sys
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth  # noqa: E402
+import config  # noqa: E402
+from revocation import RevocationList  # noqa: E402
+
+
+def _measure(label: str, fn, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    per_call = (time.perf_counter() - started) / number * 1e6
+    print(f"{label:<44} {per_call:>7.3f} us/call")
+    return per_call
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revoked", type=int, default=100_000)
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "user1"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    jti = auth.decode_access_token(token)["jti"]
+
+    async def without_revocation(credentials: HTTPAuthorizationCredentials) -> dict:
+        return auth.decode_access_token_cached(credentials.credentials)
+
+    def run(dependency) -> None:
+        # Корутина зависимости не ждет ввода-вывода и завершается на первом send
+        try:
+            dependency(credentials).send(None)
+        except StopIteration:
+            pass
+
+    def check() -> None:
+        run(auth.get_current_user)
+
+    baseline = _measure("cached decode only (no revocation check)", lambda: run(without_revocation), args.number)
+    auth.revoked_tokens = RevocationList(config.REVOCATION_CAPACITY, config.REVOCATION_ERROR_RATE)
+    empty = _measure("get_current_user, empty revocation list", check, args.number)
+
+    expires = time.time() + 3600
+    started = time.perf_counter()
+    for _ in range(args.revoked):
+        auth.revoked_tokens.revoke(secrets.token_hex(16), expires)
+    print(f"revoked {args.revoked:,} tokens in {time.perf_counter() - started:.2f} s")
+    full = _measure(f"get_current_user, {args.revoked:,} revoked", check, args.number)
+
+    revoked = secrets.token_hex(16)
+    auth.revoked_tokens.revoke(revoked, expires)
+    _measure("is_revoked, not revoked (filter only)", lambda: auth.revoked_tokens.is_revoked(jti), args.number)
+    _measure("is_revoked, revoked (filter + exact set)", lambda: auth.revoked_tokens.is_revoked(revoked), args.number)
+
+    misses = [secrets.token_hex(16) for _ in range(args.number)]
+    before = auth.revoked_tokens.filter_hits
+    for candidate in misses:
+        auth.revoked_tokens.is_revoked(candidate)
+    print(f"false positives: {auth.revoked_tokens.filter_hits - before} of {args.number:,} "
+          f"({auth.revoked_tokens.stats()['filter_bytes']:,} filter bytes)")
+    print(f"overhead per request: {empty - baseline:.3f} us (empty), {full - baseline:.3f} us (full)")
+
+
+if __name__ == "__main__":
+    main_cli()
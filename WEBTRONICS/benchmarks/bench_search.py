@@ -0,0 +1,93 @@
+"""
+Бенчмарк полнотекстового индекса: построение, память и задержка запросов.
+
+Посты генерируются из словаря русских и английских слов с распределением
+Ципфа. Для сравнения приводится время полного перебора постов с подсчетом
+вхождений слов запроса.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_search.py [--posts 1000000] [--queries 200]
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import SearchIndex, tokenize  # noqa: E402
+
+_SYLLABLES = ["ка", "ро", "ми", "ля", "но", "ст", "ве", "ду", "ba", "ko", "ri", "te", "lo", "sa", "mu", "ne"]
+
+
+def _vocabulary(size: int, rnd: random.Random) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(2, 4))))
+    return sorted(words)
+
+
+def _index_memory(index: SearchIndex) -> int:
+    """Оценивает память индекса: массивы, словари и строки слов."""
+    size = sys.getsizeof(index._term_ids) + sum(sys.getsizeof(term) for term in index._term_ids)
+    size += sys.getsizeof(index._postings) + sys.getsizeof(index._frequencies)
+    size += sum(sys.getsizeof(item) for item in index._postings)
+    size += sum(sys.getsizeof(item) for item in index._frequencies)
+    size += sys.getsizeof(index._doc_terms) + sum(sys.getsizeof(item) for item in index._doc_terms.values())
+    # Ключи _doc_terms — ID постов; малые int кэшируются интерпретатором лишь частично
+    size += sum(sys.getsizeof(post_id) for post_id in index._doc_terms)
+    return size + sys.getsizeof(index._lengths)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    vocabulary = _vocabulary(args.vocabulary, rnd)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+    def text(words: int) -> str:
+        return " ".join(rnd.choices(vocabulary, cum_weights=cum_weights, k=words))
+
+    posts = [{"id": i, "title": text(5), "content": text(30)} for i in range(1, args.posts + 1)]
+    index = SearchIndex()
+    started = time.perf_counter()
+    for post in posts:
+        index.add(post)
+    elapsed = time.perf_counter() - started
+    memory = _index_memory(index)
+    print(f"indexed {args.posts:,} posts in {elapsed:.1f} s ({args.posts / elapsed:,.0f} posts/s), "
+          f"index memory {memory / 2 ** 20:,.0f} MiB")
+
+    # Запросы из двух слов: одно частое и одно редкое
+    queries = [f"{rnd.choice(vocabulary[:100])} {rnd.choice(vocabulary[1000:])}" for _ in range(args.queries)]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, 10)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(f"BM25 top-10: p50 {statistics.median(latencies):.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f} ms")
+
+    query_terms = tokenize(queries[0])
+    started = time.perf_counter()
+    sum(1 for post in posts if any(term in (post["title"] + "\n" + post["content"]).casefold() for term in query_terms))
+    print(f"full scan, one query: {(time.perf_counter() - started) * 1000:,.0f} ms")
+
+    post_id = args.posts // 2
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.add({"id": post_id, "title": text(5), "content": text(30)})
+    print(f"update of an indexed post: {(time.perf_counter() - started):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
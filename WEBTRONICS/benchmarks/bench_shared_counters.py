@@ -0,0 +1,72 @@
+"""
+Масштабирование общих счетчиков реакций по числу воркеров (процессов).
+
+Каждый процесс подключается к одному сегменту разделяемой памяти и ставит
+реакции на случайные посты, перемежая их чтениями счетчиков. В конце
+проверяется, что сумма счетчиков совпадает с числом реакций всех процессов.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_shared_counters.py [--ops 200000] [--posts 10000]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reactions import LIKE, DISLIKE  # noqa: E402
+from shared_counters import SharedReactionCounters  # noqa: E402
+
+
+def _worker(name: str, capacity: int, ops: int, posts: int, seed: int, start, result) -> None:
+    counters = SharedReactionCounters(name, capacity)
+    counters.open()
+    rnd = random.Random(seed)
+    start.wait()
+    started = time.perf_counter()
+    for i in range(ops):
+        post_id = rnd.randrange(1, posts)
+        counters.apply(post_id, None, LIKE if i % 4 else DISLIKE)
+        counters.counts(rnd.randrange(1, posts))
+    result.put(time.perf_counter() - started)
+    counters.close()
+
+
+def _run(workers: int, ops: int, posts: int) -> None:
+    name = f"bench-counters-{os.getpid()}-{workers}"
+    owner = SharedReactionCounters(name, posts)
+    owner.open()
+    start = multiprocessing.Event()
+    result = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(name, posts, ops, posts, i, start, result))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)
+    start.set()
+    elapsed = max(result.get() for _ in processes)
+    for process in processes:
+        process.join()
+
+    total = sum(sum(owner.counts(post_id)) for post_id in range(1, posts))
+    owner.close()
+    status = "ok" if total == workers * ops else f"MISMATCH {total} != {workers * ops}"
+    print(f"{workers} workers: {workers * ops / elapsed:12,.0f} reactions/s, counters {status}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--posts", type=int, default=10_000)
+    args = parser.parse_args()
+    for workers in (1, 2, 4, 8):
+        _run(workers, args.ops, args.posts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Бенчмарк реестра пользователей: регистрация и вход при 1M пользователей.
+
+Измеряет сами операции реестра (без scrypt, который не зависит от числа
+пользователей) и для сравнения поиск линейным проходом по списку.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_users.py [--users 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import UserRegistry  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registry = UserRegistry()
+    names = [f"User{i}" for i in range(args.users)]
+    started = time.perf_counter()
+    for name in names:
+        registry.add(name, "hash")
+    elapsed = time.perf_counter() - started
+    print(f"register: {args.users / elapsed:>12,.0f} ops/s ({len(registry):,} users)")
+
+    lookups = [random.choice(names).lower() for _ in range(200_000)]
+    started = time.perf_counter()
+    for name in lookups:
+        registry.get(name)
+    elapsed = time.perf_counter() - started
+    print(f"login lookup: {len(lookups) / elapsed:>8,.0f} ops/s")
+
+    started = time.perf_counter()
+    duplicates = sum(registry.add(name.upper(), "hash") is None for name in lookups[:100_000])
+    elapsed = time.perf_counter() - started
+    print(f"duplicate register: {100_000 / elapsed:>8,.0f} ops/s ({duplicates:,} rejected)")
+
+    users = [{"username": name, "password": "hash"} for name in names]
+    started = time.perf_counter()
+    for name in random.sample(names, 20):
+        next(user for user in users if user["username"] == name)
+    elapsed = time.perf_counter() - started
+    print(f"list scan lookup (before): {20 / elapsed:>8,.1f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
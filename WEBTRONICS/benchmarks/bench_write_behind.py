@@ -0,0 +1,154 @@
+"""
+Бенчмарк отложенной записи реакций против применения в обработчике.
+
+Для каждого бэкенда хранения параллельные клиенты отправляют лайки и
+дизлайки; выводятся пропускная способность, задержки p50/p99, время
+дописывания очереди при остановке и итоговые счетчики, которые должны
+совпасть в обоих режимах. Запросы передаются приложению напрямую по ASGI.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/bench_write_behind.py [--requests 20000] [--concurrency 64] [--users 5000]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from storage import create_storage  # noqa: E402
+from write_behind import ReactionQueue  # noqa: E402
+
+POSTS = 100
+
+
+@functools.lru_cache(maxsize=None)
+def _token(user_id: int) -> bytes:
+    return create_access_token({"sub": f"user{user_id}", "uid": user_id}).encode()
+
+
+async def _call(method: str, path: str, payload, user_id: int) -> int:
+    body = json.dumps(payload).encode()
+    headers = [(b"authorization", b"Bearer " + _token(user_id)), (b"content-type", b"application/json")]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await main.app(scope, receive, send)
+    return status
+
+
+async def _run(backend: str, write_behind: bool, requests: int, concurrency: int, users: int) -> dict:
+    main.db = create_storage(backend, users=main.users_db, posts=main.posts_db)
+    await main.db.open()
+    post_ids = [(await main.db.create_post({"id": 0, "title": "t", "content": "c", "user_id": None}))["id"]
+                for _ in range(POSTS)]
+    main.reaction_queue = (
+        ReactionQueue(main.db.apply_reactions, main.reaction_applied, config.REACTIONS_QUEUE_SIZE,
+                      config.REACTIONS_QUEUE_BATCH)
+        if write_behind else None
+    )
+    if main.reaction_queue is not None:
+        main.reaction_queue.start()
+
+    rnd = random.Random(1)
+    events = [(rnd.choice(post_ids), rnd.randrange(1, users), rnd.choice(("like", "dislike")))
+              for _ in range(requests)]
+    for user_id in range(1, users):
+        _token(user_id)
+    latencies = []
+    position = 0
+
+    async def worker() -> None:
+        nonlocal position
+        while position < len(events):
+            post_id, user_id, kind = events[position]
+            position += 1
+            started = time.perf_counter()
+            status = await _call("POST", f"/posts/{post_id}/{kind}/", {"user_id": user_id, "post_id": post_id}, user_id)
+            latencies.append(time.perf_counter() - started)
+            assert status in (200, 202), status
+            # Сервер отдает управление циклу между запросами (сетевой ввод-вывод); в ASGI-вызове его нет
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = {}
+    flush = 0.0
+    if main.reaction_queue is not None:
+        flush_started = time.perf_counter()
+        await main.reaction_queue.close()
+        flush = time.perf_counter() - flush_started
+        stats = main.reaction_queue.stats()
+        main.reaction_queue = None
+    totals = [0, 0]
+    for post_id in post_ids:
+        likes, dislikes = await main.db.reaction_counts(post_id)
+        totals[0] += likes
+        totals[1] += dislikes
+    await main.db.close()
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "flush_ms": flush * 1000,
+        "totals": tuple(totals),
+        "stats": stats,
+    }
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--backends", default="memory,journal,sqlite")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends.split(","):
+            for write_behind in (False, True):
+                # Каждому прогону — чистые файлы хранилища
+                run_dir = os.path.join(tmp, f"{backend}-{int(write_behind)}")
+                config.JOURNAL_DIR = run_dir
+                config.SQLITE_PATH = run_dir + ".db"
+                result = asyncio.run(_run(backend, write_behind, args.requests, args.concurrency, args.users))
+                mode = "write-behind" if write_behind else "inline"
+                print(f"{backend:>7} {mode:>12}: {result['rps']:>8,.0f} req/s, p50 {result['p50_ms']:7.2f} ms, "
+                      f"p99 {result['p99_ms']:7.2f} ms, flush {result['flush_ms']:7.1f} ms, "
+                      f"likes/dislikes {result['totals']}")
+                if result["stats"]:
+                    stats = result["stats"]
+                    print(f"{'':>21}batches {stats['batches']:,} (avg {stats['accepted'] / stats['batches']:.0f}), "
+                          f"merged {stats['merged']:,}, max lag {stats['max_lag_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,308 @@
+"""
+Нагрузочный тест API без сети: запросы передаются приложению через ASGI-транспорт.
+
+Несколько параллельных клиентов выполняют смесь операций (регистрация, вход,
+создание, чтение, изменение и удаление постов, лайки и дизлайки). Для каждой
+операции выводятся пропускная способность и задержки p50/p95/p99 — таблицей
+и, при необходимости, в JSON. Результат можно сохранить как базовый и
+сравнивать с ним следующие запуски: при ухудшении больше порога скрипт
+завершается с кодом 1.
+
+Запуск из директории WEBTRONICS:
+    python benchmarks/loadtest.py [--requests 20000] [--concurrency 32]
+        [--mix read=50,like=15,dislike=5,create=10,update=10,delete=5,login=4,register=1]
+        [--json results.json] [--save-baseline baseline.json]
+        [--baseline baseline.json] [--threshold 0.15]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+OPERATIONS = ("register", "login", "create", "read", "update", "delete", "like", "dislike")
+DEFAULT_MIX = "read=50,like=15,dislike=5,create=10,update=10,delete=5,login=4,register=1"
+USERS = 16
+PASSWORD = "loadtest-password"
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """
+    Разбирает смесь операций вида "read=50,like=15".
+
+    Args:
+        text (str): Описание смеси.
+
+    Returns:
+        Dict[str, int]: Веса операций.
+
+    Raises:
+        ValueError: Если указана неизвестная операция.
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {name}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+class LoadTest:
+    """
+    Состояние прогона: клиент, токены пользователей, созданные посты и замеры.
+
+    Attributes:
+        client (httpx.AsyncClient): Клиент с ASGI-транспортом.
+        rnd (random.Random): Генератор случайных чисел прогона.
+        latencies (Dict[str, List[float]]): Задержки по операциям, в секундах.
+        errors (Dict[str, int]): Количество неуспешных ответов по операциям.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, seed: int):
+        self.client = client
+        self.rnd = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+        self.errors: Dict[str, int] = {name: 0 for name in OPERATIONS}
+        self.users: List[dict] = []
+        self.posts: List[int] = []
+        self.authors: Dict[int, dict] = {}
+        self._registered = 0
+
+    async def setup(self, posts: int) -> None:
+        """
+        Регистрирует пользователей и создает начальные посты.
+
+        Args:
+            posts (int): Количество начальных постов.
+        """
+        for i in range(USERS):
+            username = f"loadtest-{os.getpid()}-{i}"
+            registered = await self.client.post("/register", params={"username": username, "password": PASSWORD})
+            response = await self.client.post("/login", params={"username": username, "password": PASSWORD})
+            self.users.append({
+                "username": username,
+                "id": registered.json()["user_id"],
+                "headers": {"Authorization": "Bearer " + response.json()["access_token"]},
+            })
+        for _ in range(posts):
+            await self.create()
+
+    async def _call(self, operation: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.latencies[operation].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[operation] += 1
+        return response
+
+    def _post_body(self) -> dict:
+        words = " ".join(self.rnd.choice(("кошки", "собаки", "cats", "news", "погода", "fastapi")) for _ in range(20))
+        return {"id": 0, "title": words[:40], "content": words}
+
+    async def read(self) -> None:
+        await self._call("read", "GET", f"/posts/{self.rnd.choice(self.posts)}")
+
+    async def create(self) -> None:
+        user = self.rnd.choice(self.users)
+        response = await self._call("create", "POST", "/posts/", json=self._post_body(), headers=user["headers"])
+        if response.status_code == 200:
+            self.posts.append(response.json()["id"])
+            self.authors[response.json()["id"]] = user
+
+    async def update(self) -> None:
+        post_id = self.rnd.choice(self.posts)
+        body = {**self._post_body(), "id": post_id}
+        # Изменять и удалять пост может только его автор
+        await self._call("update", "PUT", f"/posts/{post_id}", json=body, headers=self.authors[post_id]["headers"])
+
+    async def delete(self) -> None:
+        # Оставляем посты для остальных операций
+        if len(self.posts) < 10:
+            return await self.create()
+        post_id = self.posts.pop(self.rnd.randrange(len(self.posts)))
+        await self._call("delete", "DELETE", f"/posts/{post_id}", headers=self.authors.pop(post_id)["headers"])
+
+    async def _react(self, operation: str) -> None:
+        post_id = self.rnd.choice(self.posts)
+        # Реакцию ставит пользователь из токена, не автор поста
+        user = self.rnd.choice([user for user in self.users if user is not self.authors.get(post_id)])
+        body = {"user_id": user["id"], "post_id": post_id}
+        await self._call(operation, "POST", f"/posts/{post_id}/{operation}/", json=body, headers=user["headers"])
+
+    async def like(self) -> None:
+        await self._react("like")
+
+    async def dislike(self) -> None:
+        await self._react("dislike")
+
+    async def login(self) -> None:
+        user = self.rnd.choice(self.users)
+        await self._call("login", "POST", "/login", params={"username": user["username"], "password": PASSWORD})
+
+    async def register(self) -> None:
+        self._registered += 1
+        username = f"loadtest-{os.getpid()}-new-{self._registered}"
+        await self._call("register", "POST", "/register", params={"username": username, "password": PASSWORD})
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(test: LoadTest, elapsed: float) -> dict:
+    """
+    Сводит замеры прогона в результаты по операциям.
+
+    Args:
+        test (LoadTest): Завершенный прогон.
+        elapsed (float): Длительность прогона в секундах.
+
+    Returns:
+        dict: Общая пропускная способность и показатели по операциям
+        (количество, ошибки, запросы в секунду, p50/p95/p99 в миллисекундах).
+    """
+    routes = {}
+    for name, latencies in test.latencies.items():
+        if not latencies:
+            continue
+        latencies = sorted(latencies)
+        routes[name] = {
+            "requests": len(latencies),
+            "errors": test.errors[name],
+            "rps": len(latencies) / elapsed,
+            "p50_ms": _percentile(latencies, 0.50) * 1000,
+            "p95_ms": _percentile(latencies, 0.95) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+        }
+    total = sum(route["requests"] for route in routes.values())
+    return {"elapsed_s": elapsed, "total_rps": total / elapsed, "routes": routes}
+
+
+def print_table(results: dict) -> None:
+    """Печатает результаты прогона таблицей."""
+    print(f"{'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, route in results["routes"].items():
+        print(f"{name:<10} {route['requests']:>9} {route['errors']:>7} {route['rps']:>9.0f} "
+              f"{route['p50_ms']:>8.2f} {route['p95_ms']:>8.2f} {route['p99_ms']:>8.2f}")
+    print(f"{'total':<10} {'':>9} {'':>7} {results['total_rps']:>9.0f}")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Сравнивает результаты с базовыми.
+
+    Регрессией считается падение пропускной способности операции или рост ее
+    p99 больше чем на threshold (доля).
+
+    Args:
+        results (dict): Результаты текущего прогона.
+        baseline (dict): Сохраненные базовые результаты.
+        threshold (float): Допустимое ухудшение, например 0.15 для 15%.
+
+    Returns:
+        List[str]: Описания регрессий (пустой список, если их нет).
+    """
+    regressions = []
+    for name, base in baseline["routes"].items():
+        route = results["routes"].get(name)
+        if route is None:
+            continue
+        if route["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {route['rps']:.0f} req/s vs baseline {base['rps']:.0f} req/s")
+        if route["p99_ms"] > base["p99_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p99 {route['p99_ms']:.2f} ms vs baseline {base['p99_ms']:.2f} ms")
+    return regressions
+
+
+async def run(requests: int, concurrency: int, mix: Dict[str, int], seed: int, initial_posts: int) -> dict:
+    """
+    Выполняет прогон: создает начальные данные и запускает параллельных клиентов.
+
+    Args:
+        requests (int): Общее количество запросов.
+        concurrency (int): Количество параллельных клиентов.
+        mix (Dict[str, int]): Веса операций.
+        seed (int): Начальное значение генератора случайных чисел.
+        initial_posts (int): Количество постов перед прогоном.
+
+    Returns:
+        dict: Результаты прогона (см. summarize).
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        await main.open_storage()
+        try:
+            test = LoadTest(client, seed)
+            await test.setup(initial_posts)
+            for latencies in test.latencies.values():
+                latencies.clear()
+            for name in test.errors:
+                test.errors[name] = 0
+
+            remaining = requests
+
+            async def worker() -> None:
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    operation = test.rnd.choices(names, weights)[0]
+                    await getattr(test, operation)()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+        finally:
+            await main.close_storage()
+    return summarize(test, elapsed)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--posts", type=int, default=1000, help="количество постов перед прогоном")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="записать результаты в JSON-файл ('-' — в stdout)")
+    parser.add_argument("--save-baseline", help="сохранить результаты как базовые")
+    parser.add_argument("--baseline", help="сравнить с базовыми результатами")
+    parser.add_argument("--threshold", type=float, default=0.15, help="допустимое ухудшение (доля)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, args.concurrency, parse_mix(args.mix), args.seed, args.posts))
+    results["config"] = {"requests": args.requests, "concurrency": args.concurrency, "mix": args.mix,
+                         "storage": main.config.STORAGE_BACKEND}
+    print_table(results)
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main_cli()
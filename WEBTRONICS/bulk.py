@@ -0,0 +1,239 @@
+from typing import Annotated, AsyncIterator, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+
+from pydantic import Field, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+from models import ID_LIMIT
+from reactions import DISLIKE, LIKE
+from serialization import dumps, loads
+
+# Строк NDJSON в одном фрагменте выгрузки
+EXPORT_CHUNK_LINES = 1000
+
+# Реакций в выгрузке больше всего; их строки собираются по шаблону без сериализации словаря
+_REACTION_LINES = {
+    LIKE: b'{"type":"reaction","post_id":%d,"user_id":%d,"kind":"like"}',
+    DISLIKE: b'{"type":"reaction","post_id":%d,"user_id":%d,"kind":"dislike"}',
+}
+
+
+# ID в строках выгрузки: вне диапазона строка отклоняется при проверке, до записи в хранилище
+# (поисковый индекс и журнал аналитики хранят ID как uint32)
+RecordId = Annotated[int, Field(ge=1, lt=ID_LIMIT)]
+
+
+# Схемы строк выгрузки — TypedDict, а не модели: проверка возвращает готовые
+# словари и на миллионах строк идет в несколько раз быстрее создания моделей.
+class UserRecord(TypedDict):
+    type: Literal["user"]
+    id: RecordId
+    username: str
+    password: str
+
+
+class PostRecord(TypedDict):
+    type: Literal["post"]
+    id: RecordId
+    title: str
+    content: str
+    user_id: NotRequired[Optional[RecordId]]
+
+
+class ReactionRecord(TypedDict):
+    type: Literal["reaction"]
+    post_id: RecordId
+    user_id: RecordId
+    kind: Literal["like", "dislike"]
+
+
+bulk_records_adapter = TypeAdapter(
+    List[Annotated[Union[UserRecord, PostRecord, ReactionRecord], Field(discriminator="type")]]
+)
+
+
+def _export_lines(
+    users: Iterable[dict], posts: Iterable[dict], reactions: Iterable[Tuple[int, int, int]]
+) -> Iterator[bytes]:
+    for user in users:
+        yield dumps({"type": "user", "id": user["id"], "username": user["username"], "password": user["password"]})
+    for post in posts:
+        yield dumps({
+            "type": "post",
+            "id": post["id"],
+            "title": post["title"],
+            "content": post["content"],
+            "user_id": post.get("user_id"),
+        })
+    for post_id, user_id, kind in reactions:
+        yield _REACTION_LINES[kind] % (post_id, user_id)
+
+
+def encode_export(
+    users: Iterable[dict],
+    posts: Iterable[dict],
+    reactions: Iterable[Tuple[int, int, int]],
+    chunk_lines: int = EXPORT_CHUNK_LINES,
+) -> Iterator[bytes]:
+    """
+    Сериализует пользователей, посты и реакции в NDJSON фрагментами.
+
+    Каждая строка — объект с полем type: "user" (id, username, password),
+    "post" (id, title, content, user_id) или "reaction" (post_id, user_id,
+    kind). Пользователи идут первыми, затем посты, затем реакции, поэтому
+    выгрузку можно загрузить обратно по порядку. Источники читаются лениво.
+
+    Args:
+        users (Iterable[dict]): Пользователи.
+        posts (Iterable[dict]): Посты.
+        reactions (Iterable[Tuple[int, int, int]]): Тройки (ID поста, ID пользователя, LIKE или DISLIKE).
+        chunk_lines (int): Количество строк в одном фрагменте.
+
+    Yields:
+        bytes: Очередной фрагмент из целых строк.
+    """
+    chunk = []
+    for line in _export_lines(users, posts, reactions):
+        chunk.append(line)
+        if len(chunk) >= chunk_lines:
+            chunk.append(b"")
+            yield b"\n".join(chunk)
+            chunk = []
+    if chunk:
+        chunk.append(b"")
+        yield b"\n".join(chunk)
+
+
+async def iter_line_chunks(
+    stream: AsyncIterator[bytes], chunk_lines: int, max_line: int
+) -> AsyncIterator[List[Optional[bytes]]]:
+    """
+    Разбивает поток тела запроса на строки и группирует их.
+
+    В памяти держится не больше одной группы и одной незаконченной строки:
+    строка длиннее max_line байт не накапливается, а заменяется на None.
+
+    Args:
+        stream (AsyncIterator[bytes]): Фрагменты тела запроса.
+        chunk_lines (int): Количество строк в группе.
+        max_line (int): Максимальная длина строки в байтах.
+
+    Yields:
+        List[Optional[bytes]]: Очередные строки без перевода строки (пустые строки
+        сохраняются, чтобы номера строк совпадали); None вместо слишком длинной строки.
+    """
+    chunk: List[Optional[bytes]] = []
+    tail = b""
+    # Начало слишком длинной строки уже отброшено; ее конец нужно пропустить
+    skipping = False
+    async for data in stream:
+        lines = (tail + data).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            if skipping:
+                skipping = False
+                line = None
+            chunk.append(line if line is None or len(line) <= max_line else None)
+        if len(tail) > max_line:
+            tail = b""
+            skipping = True
+        if len(chunk) >= chunk_lines:
+            yield chunk
+            chunk = []
+    if skipping or tail:
+        chunk.append(None if skipping or len(tail) > max_line else tail)
+    if chunk:
+        yield chunk
+
+
+def parse_records(lines: List[Optional[bytes]]) -> Tuple[List[Tuple[int, Tuple[str, object]]], Dict[int, str]]:
+    """
+    Разбирает и проверяет строки выгрузки одним проходом TypeAdapter.
+
+    Пустые строки пропускаются. Если в группе есть ошибки, их индексы
+    попадают в словарь ошибок, а остальные строки проверяются повторно без них.
+
+    Args:
+        lines (List[Optional[bytes]]): Строки NDJSON (None — слишком длинная строка).
+
+    Returns:
+        Tuple[list, dict]: Пары (индекс строки, запись для хранилища) и ошибки
+        {индекс строки: сообщение}. Запись — ("user", {"id", "username", "password"}),
+        ("post", пост) или ("reaction", (ID поста, ID пользователя, LIKE или DISLIKE)).
+    """
+    indexes, items, errors = [], [], {}
+    for index, line in enumerate(lines):
+        if line is None:
+            errors[index] = "Line too long"
+        elif line.strip():
+            try:
+                items.append(loads(line))
+                indexes.append(index)
+            except ValueError:
+                errors[index] = "Invalid JSON"
+
+    try:
+        valid = bulk_records_adapter.validate_python(items)
+    except ValidationError as exc:
+        failed = set()
+        for error in exc.errors():
+            position = error["loc"][0]
+            failed.add(position)
+            errors.setdefault(indexes[position], error["msg"])
+        indexes = [index for position, index in enumerate(indexes) if position not in failed]
+        valid = bulk_records_adapter.validate_python([item for i, item in enumerate(items) if i not in failed])
+
+    records = []
+    for index, data in zip(indexes, valid):
+        kind = data.pop("type")
+        if kind == "reaction":
+            data = (data["post_id"], data["user_id"], LIKE if data["kind"] == "like" else DISLIKE)
+        elif kind == "post":
+            data.setdefault("user_id", None)
+        records.append((index, (kind, data)))
+    return records, errors
+
+
+class ImportReport:
+    """
+    Итоги загрузки выгрузки NDJSON.
+
+    Attributes:
+        lines (int): Количество прочитанных строк.
+        imported (Dict[str, int]): Количество загруженных записей по типам.
+        rejected (Dict[str, int]): Количество отклоненных строк по причинам.
+        errors (List[dict]): Первые max_errors отклоненных строк с номерами.
+        max_errors (int): Сколько отклоненных строк перечислять.
+    """
+
+    def __init__(self, max_errors: int):
+        self.lines = 0
+        self.imported = {"user": 0, "post": 0, "reaction": 0}
+        self.rejected: Dict[str, int] = {}
+        self.errors: List[dict] = []
+        self.max_errors = max_errors
+
+    def reject(self, line: int, status: str, detail: Optional[str] = None) -> None:
+        """
+        Учитывает отклоненную строку.
+
+        Args:
+            line (int): Номер строки (с единицы).
+            status (str): Причина: "invalid", "not_found", "own_post" или "conflict".
+            detail (Optional[str]): Пояснение.
+        """
+        self.rejected[status] = self.rejected.get(status, 0) + 1
+        if len(self.errors) < self.max_errors:
+            error = {"line": line, "status": status}
+            if detail is not None:
+                error["detail"] = detail
+            self.errors.append(error)
+
+    def as_dict(self) -> dict:
+        """
+        Возвращает итоги для ответа.
+
+        Returns:
+            dict: Количество строк, загруженные записи по типам, отклоненные
+            строки по причинам и первые ошибки.
+        """
+        return {"lines": self.lines, "imported": self.imported, "rejected": self.rejected, "errors": self.errors}
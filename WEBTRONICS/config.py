@@ -0,0 +1,158 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Бэкенд хранения состояния: "memory" (по умолчанию), "journal" или "sqlite"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "webtronics.db")
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "4"))
+SQLITE_BATCH_SIZE = int(os.getenv("SQLITE_BATCH_SIZE", "256"))
+
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", "journal")
+JOURNAL_FSYNC_WAIT = os.getenv("JOURNAL_FSYNC_WAIT", "true").lower() in ("1", "true", "yes")
+JOURNAL_SNAPSHOT_INTERVAL = float(os.getenv("JOURNAL_SNAPSHOT_INTERVAL", "60"))
+JOURNAL_SNAPSHOT_MIN_RECORDS = int(os.getenv("JOURNAL_SNAPSHOT_MIN_RECORDS", "10000"))
+
+# Стоимость scrypt для хэшей паролей и ограничения пула хэширования
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64"))
+
+# Максимальный размер страницы в GET /posts
+POSTS_PAGE_LIMIT = int(os.getenv("POSTS_PAGE_LIMIT", "10000"))
+
+# Рейтинги постов: максимальный размер выдачи и параметры окна «в тренде» (в секундах)
+RANKING_MAX_K = int(os.getenv("RANKING_MAX_K", "100"))
+TRENDING_WINDOW = float(os.getenv("TRENDING_WINDOW", "3600"))
+TRENDING_BUCKET_SECONDS = float(os.getenv("TRENDING_BUCKET_SECONDS", "60"))
+TRENDING_HALF_LIFE = float(os.getenv("TRENDING_HALF_LIFE", "1800"))
+
+# Максимальное количество реакций в одном запросе POST /reactions/batch и
+# максимальный размер его тела в байтах (тело большего размера не читается)
+REACTIONS_BATCH_LIMIT = int(os.getenv("REACTIONS_BATCH_LIMIT", "10000"))
+REACTIONS_BATCH_MAX_BYTES = int(os.getenv("REACTIONS_BATCH_MAX_BYTES", str(2 << 20)))
+
+# Выгрузка и загрузка данных в NDJSON (GET /export, POST /import): имена
+# пользователей, которым они разрешены (через запятую; по умолчанию никому),
+# число строк, загружаемых одним шагом, максимальная длина строки в байтах и
+# сколько отклоненных строк перечислять в ответе
+BULK_USERS = [name.strip() for name in os.getenv("BULK_USERS", "").split(",") if name.strip()]
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "5000"))
+BULK_MAX_LINE = int(os.getenv("BULK_MAX_LINE", str(1 << 20)))
+BULK_MAX_ERRORS = int(os.getenv("BULK_MAX_ERRORS", "100"))
+
+# Отложенная запись лайков и дизлайков: обработчик ставит реакцию в очередь и
+# сразу отвечает, фоновая задача применяет реакции пачками. Размер очереди,
+# максимальный размер пачки, число повторов пачки после ошибки хранилища и
+# задержка перед первым повтором в секундах (каждый следующий — вдвое дольше)
+REACTIONS_WRITE_BEHIND = os.getenv("REACTIONS_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+REACTIONS_QUEUE_SIZE = int(os.getenv("REACTIONS_QUEUE_SIZE", "100000"))
+REACTIONS_QUEUE_BATCH = int(os.getenv("REACTIONS_QUEUE_BATCH", "1024"))
+REACTIONS_QUEUE_RETRIES = int(os.getenv("REACTIONS_QUEUE_RETRIES", "5"))
+REACTIONS_QUEUE_RETRY_DELAY = float(os.getenv("REACTIONS_QUEUE_RETRY_DELAY", "0.1"))
+
+# Аналитика реакций: срок хранения событий (в секундах, 0 — без ограничения)
+# и максимальное число интервалов в одном ответе /analytics/histogram
+ANALYTICS_RETENTION = float(os.getenv("ANALYTICS_RETENTION", str(7 * 24 * 3600)))
+ANALYTICS_MAX_BUCKETS = int(os.getenv("ANALYTICS_MAX_BUCKETS", "10000"))
+
+# Максимальная глубина выдачи поиска GET /posts/search (offset + limit)
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+
+# Размер кэша сериализованных ответов GET /posts/{post_id} (0 отключает кэш)
+POST_CACHE_SIZE = int(os.getenv("POST_CACHE_SIZE", "10000"))
+
+# Сжатие ответов по Accept-Encoding (gzip; brotli и zstd — если установлены
+# пакеты brotli и zstandard): минимальный размер тела, размер, начиная с
+# которого тело сжимается в пуле потоков, уровни сжатия и объем кэша сжатых
+# ответов с ETag (в байтах, 0 отключает кэш)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_OFFLOAD_SIZE = int(os.getenv("COMPRESSION_OFFLOAD_SIZE", str(64 * 1024)))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(16 * 1024 * 1024)))
+
+# Профилирование: пользователи, которым доступны эндпоинты /admin/profile
+# (через запятую; пустой список отключает профилирование), минимальный
+# интервал выборок стеков (в секундах), максимальная доля времени на выборки,
+# максимальная длительность сеанса (в секундах), число различных стеков и глубина стека
+PROFILING_USERS = [name.strip() for name in os.getenv("PROFILING_USERS", "").split(",") if name.strip()]
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+PROFILING_MAX_OVERHEAD = float(os.getenv("PROFILING_MAX_OVERHEAD", "0.02"))
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "300"))
+PROFILING_MAX_STACKS = int(os.getenv("PROFILING_MAX_STACKS", "20000"))
+PROFILING_MAX_DEPTH = int(os.getenv("PROFILING_MAX_DEPTH", "128"))
+
+# Общие для воркеров счетчики реакций в разделяемой памяти (uvicorn --workers N).
+# Имя сегмента по умолчанию строится по PID родительского процесса, то есть
+# общего для воркеров супервизора; емкость — максимальный ID поста + 1.
+SHARED_COUNTERS = os.getenv("SHARED_COUNTERS", "false").lower() in ("1", "true", "yes")
+SHARED_COUNTERS_NAME = os.getenv("SHARED_COUNTERS_NAME", f"webtronics-counters-{os.getppid()}")
+SHARED_COUNTERS_CAPACITY = int(os.getenv("SHARED_COUNTERS_CAPACITY", "1000000"))
+
+# Сбор метрик запросов и эндпоинт /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Контроль допуска: одновременно обрабатываемые запросы по классам маршрутов,
+# длина очереди ожидания и максимальное время ожидания в ней (в секундах)
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+ADMISSION_READ_CONCURRENCY = int(os.getenv("ADMISSION_READ_CONCURRENCY", "256"))
+ADMISSION_WRITE_CONCURRENCY = int(os.getenv("ADMISSION_WRITE_CONCURRENCY", "64"))
+ADMISSION_AUTH_CONCURRENCY = int(os.getenv("ADMISSION_AUTH_CONCURRENCY", str(2 * PASSWORD_HASH_WORKERS)))
+ADMISSION_QUEUE_LIMIT = int(os.getenv("ADMISSION_QUEUE_LIMIT", "512"))
+ADMISSION_DEADLINE = float(os.getenv("ADMISSION_DEADLINE", "1.0"))
+
+# Ограничение частоты запросов клиента (по sub из JWT или по IP): токенов в
+# секунду и емкость корзины; RATE_LIMIT_RATE=0 отключает ограничение
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "0"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "100"))
+RATE_LIMIT_CLIENTS = int(os.getenv("RATE_LIMIT_CLIENTS", "100000"))
+
+# Подписки на счетчики реакций (WebSocket и SSE): интервал склейки обновлений
+# и heartbeat (в секундах), максимальное число подписок в воркере и время, за
+# которое клиент должен принять сообщение, иначе соединение закрывается
+LIVE_TICK = float(os.getenv("LIVE_TICK", "0.1"))
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", "15"))
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "100000"))
+LIVE_SEND_TIMEOUT = float(os.getenv("LIVE_SEND_TIMEOUT", "10"))
+
+# Срок жизни refresh-токенов (в днях) и параметры списка отозванных токенов:
+# расчетное число записей фильтра Блума и допустимая доля его ложных срабатываний
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+REVOCATION_CAPACITY = int(os.getenv("REVOCATION_CAPACITY", "100000"))
+REVOCATION_ERROR_RATE = float(os.getenv("REVOCATION_ERROR_RATE", "0.001"))
+
+# Размер кэша проверенных JWT-токенов (0 отключает кэш)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+# Запуск в продакшене (serve.py): адрес, порт, число процессов-воркеров (по
+# умолчанию один: отозванные токены, поисковый индекс, рейтинги и аналитика
+# хранятся в памяти каждого процесса), закрепление воркеров за ядрами, цикл событий и
+# парсер HTTP uvicorn, длина очереди соединений, запись журнала доступа,
+# время плавной остановки воркера и ожидания его готовности (в секундах),
+# прогревочные GET-запросы (пути через запятую) и число их повторов
+LAUNCHER_HOST = os.getenv("LAUNCHER_HOST", "0.0.0.0")
+LAUNCHER_PORT = int(os.getenv("LAUNCHER_PORT", "8000"))
+LAUNCHER_WORKERS = int(os.getenv("LAUNCHER_WORKERS", "1"))
+LAUNCHER_PIN_CPUS = os.getenv("LAUNCHER_PIN_CPUS", "false").lower() in ("1", "true", "yes")
+LAUNCHER_LOOP = os.getenv("LAUNCHER_LOOP", "uvloop")
+LAUNCHER_HTTP = os.getenv("LAUNCHER_HTTP", "httptools")
+LAUNCHER_BACKLOG = int(os.getenv("LAUNCHER_BACKLOG", "2048"))
+LAUNCHER_ACCESS_LOG = os.getenv("LAUNCHER_ACCESS_LOG", "false").lower() in ("1", "true", "yes")
+LAUNCHER_GRACEFUL_TIMEOUT = float(os.getenv("LAUNCHER_GRACEFUL_TIMEOUT", "30"))
+LAUNCHER_READY_TIMEOUT = float(os.getenv("LAUNCHER_READY_TIMEOUT", "60"))
+LAUNCHER_WARMUP_PATHS = [
+    path.strip()
+    for path in os.getenv(
+        "LAUNCHER_WARMUP_PATHS", "/openapi.json,/docs,/posts?limit=10,/posts/top,/posts/search?q=warmup,/posts/1",
+    ).split(",")
+    if path.strip()
+]
+LAUNCHER_WARMUP_ROUNDS = int(os.getenv("LAUNCHER_WARMUP_ROUNDS", "3"))
@@ -0,0 +1,402 @@
+import asyncio
+import glob
+import json
+import mmap
+import os
+import pickle
+import queue
+import threading
+from collections import deque
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from storage import MemoryStorage
+
+_LOG_PATTERN = "journal-{:08d}.log"
+_SNAPSHOT_PATTERN = "snapshot-{:08d}.pickle"
+
+
+def _generation(path: str) -> int:
+    return int(os.path.basename(path).split("-")[1].split(".")[0])
+
+
+def _files(directory: str, pattern: str) -> List[str]:
+    # Только файлы с точным суффиксом: недописанный снимок *.pickle.tmp сюда не попадает
+    return sorted(glob.glob(os.path.join(directory, pattern.replace("{:08d}", "*"))), key=_generation)
+
+
+def _read_log(path: str) -> Iterator[list]:
+    """
+    Читает записи журнала через отображение файла в память.
+
+    Оборванная последняя запись (сбой во время записи) пропускается.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in iter(mm.readline, b""):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+def _write_snapshot(path: str, state: tuple) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def _import_record(kind: str, data) -> list:
+    # Загруженные записи журналируются так же, как при восстановлении: restore заменяет запись с тем же ID
+    if kind == "user":
+        return ["user", data["id"], data["username"], data["password"]]
+    if kind == "post":
+        return ["create", data]
+    return ["react", *data]
+
+
+class MutationLog:
+    """
+    Журнал изменений с групповой фиксацией (group commit).
+
+    Записи добавляются в очередь без ожидания диска; отдельный поток пишет
+    накопившиеся записи и выполняет один fsync на всю группу. Журнал разбит на
+    поколения: при снимке состояния начинается новый файл, а старые файлы
+    удаляются, когда снимок записан.
+
+    Attributes:
+        directory (str): Директория с файлами журнала.
+        generation (int): Номер текущего поколения журнала.
+        records (int): Количество записей в текущем поколении.
+    """
+
+    def __init__(self, directory: str, generation: int):
+        self.directory = directory
+        self.generation = generation
+        self.records = 0
+        self._file = self._open(generation)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._seq = 0
+        self._waiters: deque = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = threading.Thread(target=self._writer, name="journal-writer", daemon=True)
+
+    def _open(self, generation: int):
+        return open(os.path.join(self.directory, _LOG_PATTERN.format(generation)), "ab")
+
+    def start(self) -> None:
+        """Запускает поток записи журнала."""
+        self._loop = asyncio.get_running_loop()
+        self._thread.start()
+
+    def append(self, record: list) -> int:
+        """
+        Добавляет запись в журнал, не дожидаясь записи на диск.
+
+        Args:
+            record (list): Запись в виде [операция, *аргументы].
+
+        Returns:
+            int: Порядковый номер записи.
+        """
+        return self.extend((record,))
+
+    def extend(self, records: Iterable[list]) -> int:
+        """
+        Добавляет несколько записей одной порцией, не дожидаясь записи на диск.
+
+        Args:
+            records (Iterable[list]): Записи в виде [операция, *аргументы].
+
+        Returns:
+            int: Порядковый номер порции (0, если записей нет).
+        """
+        lines = [json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() for record in records]
+        if not lines:
+            return 0
+        self._seq += 1
+        self.records += len(lines)
+        lines.append(b"")
+        self._queue.put((self._file, b"\n".join(lines), self._seq))
+        return self._seq
+
+    async def wait(self, seq: int) -> None:
+        """
+        Дожидается, пока запись с указанным номером будет зафиксирована на диске.
+
+        Args:
+            seq (int): Порядковый номер записи.
+        """
+        future = self._loop.create_future()
+        self._waiters.append((seq, future))
+        await future
+
+    def rotate(self) -> int:
+        """
+        Начинает новое поколение журнала.
+
+        Returns:
+            int: Номер нового поколения.
+        """
+        old_file = self._file
+        self.generation += 1
+        self.records = 0
+        self._file = self._open(self.generation)
+        # Старый файл закроется потоком записи после того, как в него попадут все записи
+        self._queue.put((old_file, None, self._seq))
+        return self.generation
+
+    def close(self) -> None:
+        """Дописывает накопленные записи, закрывает файл и останавливает поток."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+
+    def _release(self, durable: int) -> None:
+        while self._waiters and self._waiters[0][0] <= durable:
+            _, future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    def _writer(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Забираем все, что накопилось, пока шла предыдущая запись
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            durable = 0
+            dirty = {}
+            closing = []
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                file, data, seq = item
+                durable = max(durable, seq)
+                if data is None:
+                    closing.append(file)
+                    continue
+                file.write(data)
+                dirty[id(file)] = file
+            for file in list(dirty.values()) + closing:
+                if file.closed:
+                    continue
+                file.flush()
+                os.fsync(file.fileno())
+            for file in closing:
+                file.close()
+            if durable:
+                self._loop.call_soon_threadsafe(self._release, durable)
+            if stop:
+                return
+
+
+class JournaledStorage(MemoryStorage):
+    """
+    Хранилище в памяти с журналом изменений и периодическими снимками.
+
+    Создание, изменение и удаление постов, реакции и регистрации записываются
+    в журнал (MutationLog). В фоне периодически снимается компактный снимок
+    состояния: в цикле событий снимается копия контейнеров (реакции — с
+    copy-on-write), а сериализует ее отдельный поток, не останавливая
+    обработку запросов. fork не используется:
+    дочерний процесс унаследовал бы блокировки, захваченные другими потоками
+    (писателем журнала, пулами потоков), и мог бы зависнуть. При запуске
+    загружается последний снимок и проигрываются более новые поколения журнала;
+    файлы читаются через mmap.
+
+    Attributes:
+        directory (str): Директория с журналом и снимками.
+        fsync_wait (bool): Дожидаться ли fsync перед ответом на запрос.
+        snapshot_interval (float): Интервал проверки необходимости снимка, в секундах.
+        snapshot_min_records (int): Минимальное число новых записей для снимка.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        users: Iterable[dict] = (),
+        posts: Iterable[dict] = (),
+        fsync_wait: bool = True,
+        snapshot_interval: float = 60.0,
+        snapshot_min_records: int = 10000,
+    ):
+        super().__init__(users, posts)
+        self.directory = directory
+        self.fsync_wait = fsync_wait
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_min_records = snapshot_min_records
+        self.log: Optional[MutationLog] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._snapshot_lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        """
+        Восстанавливает состояние с диска и начинает новое поколение журнала.
+
+        Недописанные снимки (*.tmp), оставшиеся после сбоя при записи, удаляются.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for stale in glob.glob(os.path.join(self.directory, "snapshot-*.pickle.tmp")):
+            os.remove(stale)
+        generation = self.recover()
+        self.log = MutationLog(self.directory, generation + 1)
+        self.log.start()
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    async def close(self) -> None:
+        """Останавливает фоновые снимки и дописывает журнал на диск."""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self._snapshot_task = None
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def recover(self) -> int:
+        """
+        Загружает последний снимок и проигрывает журнал поверх него.
+
+        Returns:
+            int: Номер последнего найденного поколения (0, если данных нет).
+        """
+        last_generation = 0
+        snapshots = _files(self.directory, _SNAPSHOT_PATTERN)
+        if snapshots:
+            path = snapshots[-1]
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.users, self.posts, self.reactions = pickle.loads(mm)
+            last_generation = _generation(path)
+        for path in _files(self.directory, _LOG_PATTERN):
+            generation = _generation(path)
+            last_generation = max(last_generation, generation)
+            if snapshots and generation < _generation(snapshots[-1]):
+                continue
+            for record in _read_log(path):
+                self._apply(record)
+        return last_generation
+
+    def _apply(self, record: list) -> None:
+        op = record[0]
+        if op == "user":
+            self.users.restore({"id": record[1], "username": record[2], "password": record[3]})
+        elif op == "password":
+            user = self.users.get(record[1])
+            if user is not None:
+                user["password"] = record[2]
+        elif op == "create":
+            self.posts.restore(record[1])
+        elif op == "update":
+            self.posts.replace(record[1], record[2])
+        elif op == "delete":
+            self.posts.delete(record[1])
+            self.reactions.drop_post(record[1])
+        elif op == "react":
+            self.reactions.set(record[1], record[2], record[3])
+
+    async def _journal(self, *records: list) -> None:
+        seq = self.log.extend(records)
+        if seq and self.fsync_wait:
+            await self.log.wait(seq)
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            if self.log.records >= self.snapshot_min_records:
+                await self.snapshot()
+
+    async def snapshot(self) -> None:
+        """
+        Снимает снимок состояния и удаляет устаревшие файлы журнала.
+
+        Переключение поколения журнала и копирование состояния выполняются без
+        ожиданий, поэтому снимок точно соответствует записям старых поколений.
+        Копия сериализуется и записывается на диск в пуле потоков. Если запись
+        не удалась, старые файлы остаются, и восстановление использует их.
+        """
+        async with self._snapshot_lock:
+            generation = self.log.rotate()
+            state = (self.users.copy(), self.posts.copy(), self.reactions.copy())
+            path = os.path.join(self.directory, _SNAPSHOT_PATTERN.format(generation))
+            try:
+                await asyncio.to_thread(_write_snapshot, path, state)
+            except OSError:
+                return
+            finally:
+                self.reactions.release()
+
+            for old in _files(self.directory, _SNAPSHOT_PATTERN) + _files(self.directory, _LOG_PATTERN):
+                if _generation(old) < generation:
+                    os.remove(old)
+
+    async def add_user(self, username: str, password: str) -> Optional[dict]:
+        user = await super().add_user(username, password)
+        if user is not None:
+            await self._journal(["user", user["id"], username, password])
+        return user
+
+    async def set_password(self, username: str, password: str) -> None:
+        await super().set_password(username, password)
+        await self._journal(["password", username, password])
+
+    async def create_post(self, data: dict) -> dict:
+        post = await super().create_post(data)
+        await self._journal(["create", post])
+        return post
+
+    async def update_post(self, post_id: int, data: dict) -> Optional[dict]:
+        post = await super().update_post(post_id, data)
+        if post is not None:
+            await self._journal(["update", post_id, post])
+        return post
+
+    async def delete_post(self, post_id: int) -> Optional[dict]:
+        post = await super().delete_post(post_id)
+        if post is not None:
+            await self._journal(["delete", post_id])
+        return post
+
+    async def set_reaction(self, post_id: int, user_id: int, kind: int) -> Optional[int]:
+        previous = await super().set_reaction(post_id, user_id, kind)
+        if previous != kind:
+            await self._journal(["react", post_id, user_id, kind])
+        return previous
+
+    async def react(self, post_id: int, user_id: int, kind: int) -> Tuple[str, Optional[int]]:
+        status, previous = await super().react(post_id, user_id, kind)
+        if status == "ok" and previous != kind:
+            await self._journal(["react", post_id, user_id, kind])
+        return status, previous
+
+    async def apply_reactions(self, events: List[Tuple[int, int, int]]) -> List[Tuple[str, Optional[int]]]:
+        results = await super().apply_reactions(events)
+        # Вся пачка фиксируется одним ожиданием fsync
+        await self._journal(*(
+            ["react", post_id, user_id, kind]
+            for (post_id, user_id, kind), (status, previous) in zip(events, results)
+            if status == "ok" and previous != kind
+        ))
+        return results
+
+    async def import_records(self, records: List[Tuple[str, Any]]) -> List[Tuple[str, Optional[int]]]:
+        results = await super().import_records(records)
+        # Вся пачка фиксируется одним ожиданием fsync
+        await self._journal(*(
+            _import_record(kind, data)
+            for (kind, data), (status, previous) in zip(records, results)
+            if status == "ok" and not (kind == "reaction" and previous == data[2])
+        ))
+        return results
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from metrics import Counter, Gauge, registry
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+live_subscribers = registry.register(Gauge(
+    "webtronics_live_subscribers", "Open live count subscriptions (WebSocket and SSE).",
+))
+live_messages = registry.register(Counter(
+    "webtronics_live_messages_total", "Live count updates handed to subscribers.",
+))
+live_conflated = registry.register(Counter(
+    "webtronics_live_conflated_total", "Live count updates replaced by a newer one before a slow subscriber read them.",
+))
+
+
+class Subscription:
+    """
+    Подписка клиента на счетчики реакций одного поста.
+
+    У подписки есть только одно место для неотправленного сообщения: новое
+    обновление заменяет еще не отправленное. Поэтому медленный клиент не
+    накапливает очередь в памяти сервера, а при следующей отправке получает
+    самые свежие счетчики.
+
+    Attributes:
+        post_id (int): Идентификатор поста.
+        conflated (int): Количество обновлений, замененных более новыми.
+    """
+
+    __slots__ = ("post_id", "conflated", "_pending", "_ready")
+
+    def __init__(self, post_id: int):
+        self.post_id = post_id
+        self.conflated = 0
+        self._pending: Optional[bytes] = None
+        self._ready = asyncio.Event()
+
+    def offer(self, message: bytes) -> None:
+        """
+        Кладет сообщение на отправку, заменяя неотправленное.
+
+        Args:
+            message (bytes): Сериализованное обновление.
+        """
+        if self._pending is not None:
+            self.conflated += 1
+            live_conflated.inc()
+        self._pending = message
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        """
+        Дожидается следующего сообщения.
+
+        Args:
+            timeout (float): Максимальное время ожидания в секундах.
+
+        Returns:
+            Optional[bytes]: Сообщение или None, если за timeout его не было.
+        """
+        if self._pending is None:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        message, self._pending = self._pending, None
+        self._ready.clear()
+        return message
+
+
+class LiveCounts:
+    """
+    Рассылка счетчиков реакций подписчикам постов со склейкой по тикам.
+
+    Раз в tick секунд для каждого поста, на который есть подписчики,
+    сравнивается версия поста с версией последней рассылки. Изменившиеся
+    посты читают счетчики один раз, сериализуют одно сообщение и отдают его
+    всем подписчикам поста. Поэтому всплеск из тысяч реакций за тик дает
+    одно сообщение на подписчика, а версии постов, общие для воркеров,
+    позволяют замечать реакции, принятые другими воркерами.
+
+    Attributes:
+        tick (float): Интервал склейки обновлений, в секундах.
+        max_subscribers (int): Максимальное число одновременных подписок.
+        subscribers (int): Текущее число подписок.
+    """
+
+    def __init__(
+        self,
+        version: Callable[[int], int],
+        counts: Callable[[int], Awaitable[Tuple[int, int]]],
+        tick: float,
+        max_subscribers: int,
+    ):
+        self._version = version
+        self._counts = counts
+        self.tick = tick
+        self.max_subscribers = max_subscribers
+        self.subscribers = 0
+        self._posts: Dict[int, Set[Subscription]] = {}
+        # ID поста -> (версия, лайки, дизлайки) последней рассылки
+        self._sent: Dict[int, Tuple[int, int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def message(post_id: int, like_count: int, dislike_count: int) -> bytes:
+        """
+        Сериализует обновление счетчиков поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            like_count (int): Количество лайков.
+            dislike_count (int): Количество дизлайков.
+
+        Returns:
+            bytes: JSON {"post_id", "like_count", "dislike_count"}.
+        """
+        return dumps({"post_id": post_id, "like_count": like_count, "dislike_count": dislike_count})
+
+    async def subscribe(self, post_id: int) -> Optional[Subscription]:
+        """
+        Создает подписку и сразу кладет в нее текущие счетчики поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Optional[Subscription]: Подписка или None, если достигнут max_subscribers.
+        """
+        if self.subscribers >= self.max_subscribers:
+            return None
+        version = self._version(post_id)
+        like_count, dislike_count = await self._counts(post_id)
+        subscription = Subscription(post_id)
+        subscription.offer(self.message(post_id, like_count, dislike_count))
+        subscribers = self._posts.get(post_id)
+        if subscribers is None:
+            subscribers = self._posts[post_id] = set()
+            self._sent[post_id] = (version, like_count, dislike_count)
+        subscribers.add(subscription)
+        self.subscribers += 1
+        live_subscribers.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Удаляет подписку.
+
+        Args:
+            subscription (Subscription): Подписка, возвращенная subscribe.
+        """
+        subscribers = self._posts.get(subscription.post_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.remove(subscription)
+        if not subscribers:
+            del self._posts[subscription.post_id]
+            del self._sent[subscription.post_id]
+        self.subscribers -= 1
+        live_subscribers.dec()
+
+    async def publish(self) -> int:
+        """
+        Рассылает обновления постов, изменившихся с прошлой рассылки.
+
+        Returns:
+            int: Количество сообщений, переданных подписчикам.
+        """
+        version = self._version
+        changed = [
+            (post_id, current)
+            for post_id, (sent_version, _, _) in self._sent.items()
+            if (current := version(post_id)) != sent_version
+        ]
+        delivered = 0
+        for post_id, current in changed:
+            like_count, dislike_count = await self._counts(post_id)
+            subscribers = self._posts.get(post_id)
+            if subscribers is None:
+                continue
+            _, sent_likes, sent_dislikes = self._sent[post_id]
+            self._sent[post_id] = (current, like_count, dislike_count)
+            # Версия меняется и при правке текста поста; счетчики при этом те же
+            if (like_count, dislike_count) == (sent_likes, sent_dislikes):
+                continue
+            message = self.message(post_id, like_count, dislike_count)
+            for subscription in subscribers:
+                subscription.offer(message)
+            delivered += len(subscribers)
+        live_messages.inc(amount=delivered)
+        return delivered
+
+    async def run(self) -> None:
+        """Рассылает обновления каждые tick секунд до отмены задачи."""
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                await self.publish()
+            except Exception:
+                logger.exception("Live counts publish failed")
+
+    def start(self) -> None:
+        """Запускает фоновую рассылку."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновую рассылку."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
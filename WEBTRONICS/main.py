@@ -1,49 +1,357 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from typing import Annotated, AsyncIterator, List, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Path, Query, Request, WebSocket
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-
-from auth import create_access_token
-from models import Post, Like, Dislike
-
-app = FastAPI()
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+
+import config
+from admission import AdmissionLimiter, AdmissionMiddleware, RateLimiter
+from analytics import EVENT_TIME_LIMIT, ReactionEventLog
+from auth import (
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
+    get_current_user,
+    get_current_user_id,
+    revoke_token,
+    revoked_tokens,
+    token_cache,
+)
+from bulk import ImportReport, iter_line_chunks, parse_records
+from live import LiveCounts, Subscription
+from metrics import MetricsMiddleware, Timer, operation_duration, registry
+from passwords import password_hasher
+from profiling import ProfilingMiddleware, RequestProfiler, StackSampler
+from models import ID_LIMIT, Post, PostWithReactions, Like, Dislike, ReactionEvent
+from ranking import TopRanking, TrendingRanking
+from reactions import LIKE, DISLIKE
+from response_cache import PostResponseCache, etag_matches
+from response_compression import CompressedResponseCache, CompressionMiddleware, make_encoders
+from search import SearchIndex
+from serialization import FastJSONResponse, dumps
+from shared_counters import SharedReactionCounters
+from storage import create_storage, normalize_username
+from write_behind import ReactionQueue
+
+# ID поста в пути запроса: вне диапазона uint32 запрос отклоняется с кодом 422, не доходя до хранилища
+PostId = Annotated[int, Path(ge=0, lt=ID_LIMIT)]
+
+# Встроенные /docs и /openapi.json отключены: их заменяют заранее собранные
+# ответы ниже. Обработчики, которые сами собирают ответ, возвращают
+# FastJSONResponse и минуют повторную проверку по response_model.
+app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None, default_response_class=FastJSONResponse)
+
+# Кэш сжатых ответов с ETag (схема OpenAPI, Swagger UI, посты)
+compressed_responses = CompressedResponseCache(config.COMPRESSION_CACHE_BYTES)
+
+# Выборочный профилировщик и профилирование одного запроса через cProfile (/admin/profile)
+stack_sampler = StackSampler(
+    config.PROFILING_INTERVAL, config.PROFILING_MAX_OVERHEAD, config.PROFILING_MAX_STACKS, config.PROFILING_MAX_DEPTH,
+)
+request_profiler = RequestProfiler()
+
+# Middleware, добавленное последним, выполняется первым: метрики учитывают и отказы контроля допуска,
+# а сжатие выполняется внутри слота контроля допуска, и метрики видят размер сжатого ответа
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        encoders=make_encoders(
+            config.COMPRESSION_GZIP_LEVEL, config.COMPRESSION_BROTLI_QUALITY, config.COMPRESSION_ZSTD_LEVEL,
+        ),
+        minimum_size=config.COMPRESSION_MIN_SIZE,
+        offload_size=config.COMPRESSION_OFFLOAD_SIZE,
+        cache=compressed_responses if config.COMPRESSION_CACHE_BYTES > 0 else None,
+    )
+if config.PROFILING_USERS:
+    app.add_middleware(ProfilingMiddleware, sampler=stack_sampler, requests=request_profiler)
+if config.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiters={
+            name: AdmissionLimiter(name, limit, config.ADMISSION_QUEUE_LIMIT, config.ADMISSION_DEADLINE)
+            for name, limit in (
+                ("read", config.ADMISSION_READ_CONCURRENCY),
+                ("write", config.ADMISSION_WRITE_CONCURRENCY),
+                ("auth", config.ADMISSION_AUTH_CONCURRENCY),
+            )
+        },
+        rate_limiter=(
+            RateLimiter(config.RATE_LIMIT_RATE, config.RATE_LIMIT_BURST, config.RATE_LIMIT_CLIENTS)
+            if config.RATE_LIMIT_RATE > 0 else None
+        ),
+    )
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 users_db = [
     {"username": "user1", "password": "password1"},
     {"username": "user2", "password": "password2"},
 ]
 
 posts_db = [
-    {"id": 1, "title": "Post 1", "content": "Content 1"},
-    {"id": 2, "title": "Post 2", "content": "Content 2"},
+    {"id": 1, "title": "Post 1", "content": "Content 1", "user_id": None},
+    {"id": 2, "title": "Post 2", "content": "Content 2", "user_id": None},
 ]
 
-post_likes_cache = {}
-post_dislikes_cache = {}
+# Хранилище состояния; бэкенд выбирается настройкой STORAGE_BACKEND
+db = create_storage(config.STORAGE_BACKEND, users=users_db, posts=posts_db)
+
+# Рейтинги постов поддерживаются инкрементально при каждой реакции и удалении
+top_posts = TopRanking()
+trending_posts = TrendingRanking(
+    window=config.TRENDING_WINDOW,
+    bucket_seconds=config.TRENDING_BUCKET_SECONDS,
+    half_life=config.TRENDING_HALF_LIFE,
+    max_k=config.RANKING_MAX_K,
+)
+
+# Колоночный журнал событий реакций для /analytics
+reaction_log = ReactionEventLog(config.ANALYTICS_RETENTION)
+
+# Полнотекстовый индекс постов, обновляется при создании, изменении и удалении
+search_index = SearchIndex()
+
+# Схема OpenAPI и страница Swagger UI, собранные один раз (см. build_api_docs)
+api_docs: dict = {}
+
+# Счетчики реакций и версии постов, общие для всех воркеров хоста. Предыдущую реакцию
+# пользователя сообщает хранилище, поэтому оно тоже должно быть общим
+if config.SHARED_COUNTERS and config.STORAGE_BACKEND != "sqlite":
+    raise ValueError("SHARED_COUNTERS requires the sqlite storage backend")
+shared_counters = (
+    SharedReactionCounters(config.SHARED_COUNTERS_NAME, config.SHARED_COUNTERS_CAPACITY)
+    if config.SHARED_COUNTERS else None
+)
+
+# Версии постов и кэш сериализованных ответов GET /posts/{post_id}
+post_cache = PostResponseCache(config.POST_CACHE_SIZE, shared=shared_counters)
+
+
+def reaction_applied(post_id: int, user_id: int, previous: Optional[int], kind: int, backfill: bool = False) -> None:
+    """
+    Обновляет рейтинги, версию поста и журнал аналитики после сохраненной реакции.
+
+    Args:
+        post_id (int): Идентификатор поста.
+        user_id (int): Идентификатор пользователя.
+        previous (Optional[int]): Предыдущая реакция пользователя или None.
+        kind (int): Новая реакция: LIKE или DISLIKE.
+        backfill (bool): Реакция загружена из выгрузки (POST /import): она не
+            попадает в рейтинг «в тренде» и журнал аналитики.
+    """
+    top_posts.apply(post_id, previous, kind)
+    if previous != kind:
+        if not backfill:
+            trending_posts.record(post_id)
+            reaction_log.append(post_id, user_id, kind)
+        if shared_counters is not None and shared_counters.covers(post_id):
+            # Общие счетчики сами увеличивают версию поста
+            shared_counters.apply(post_id, previous, kind)
+        else:
+            post_cache.bump(post_id)
+
+
+async def reaction_counts(post_id: int) -> tuple:
+    """
+    Возвращает количество лайков и дизлайков поста.
+
+    Если включены общие счетчики, они читаются из разделяемой памяти и
+    совпадают во всех воркерах; иначе счетчики берутся из хранилища.
+
+    Args:
+        post_id (int): Идентификатор поста.
+
+    Returns:
+        tuple: Пара (лайки, дизлайки).
+    """
+    if shared_counters is not None and shared_counters.covers(post_id):
+        return shared_counters.counts(post_id)
+    return await db.reaction_counts(post_id)
+
+
+# Отложенная запись реакций: обработчики лайков и дизлайков только ставят их в очередь
+reaction_queue = (
+    ReactionQueue(
+        db.apply_reactions, reaction_applied, config.REACTIONS_QUEUE_SIZE, config.REACTIONS_QUEUE_BATCH,
+        config.REACTIONS_QUEUE_RETRIES, config.REACTIONS_QUEUE_RETRY_DELAY,
+    )
+    if config.REACTIONS_WRITE_BEHIND else None
+)
+
+# Подписки на счетчики реакций; изменения замечаются по версиям постов
+live_counts = LiveCounts(post_cache.version, reaction_counts, config.LIVE_TICK, config.LIVE_MAX_SUBSCRIBERS)
+
+
+@app.on_event("startup")
+async def open_storage():
+    """
+    Открывает хранилище при запуске приложения, загружает рейтинг лучших постов
+    и строит поисковый индекс.
+
+    Если включены общие счетчики реакций, подключается к сегменту разделяемой
+    памяти; первый воркер заполняет его из хранилища.
+    """
+    build_api_docs()
+    await db.open()
+    async for post_id, like_count, dislike_count in db.iter_reaction_counts():
+        top_posts.set_score(post_id, like_count - dislike_count)
+    async for post in db.iter_posts(0, sys.maxsize):
+        search_index.add(post)
+    if shared_counters is not None and shared_counters.open():
+        await shared_counters.seed(db.iter_reaction_counts())
+    if reaction_queue is not None:
+        reaction_queue.start()
+    live_counts.start()
+
+
+@app.on_event("shutdown")
+async def close_storage():
+    """
+    Закрывает хранилище при остановке приложения, дописывая накопленные изменения.
+
+    Реакции, оставшиеся в очереди отложенной записи, применяются до закрытия хранилища.
+    """
+    if reaction_queue is not None:
+        await reaction_queue.close()
+    await live_counts.stop()
+    stack_sampler.stop()
+    await db.close()
+    password_hasher.shutdown()
+    if shared_counters is not None:
+        shared_counters.close()
+
+
+def build_api_docs() -> dict:
+    """
+    Собирает схему OpenAPI и страницу Swagger UI в готовые байты.
+
+    Маршруты не меняются после запуска, поэтому документация собирается один
+    раз — при старте приложения или при первом обращении.
+
+    Returns:
+        dict: Байты схемы ("openapi") и HTML-страницы ("swagger") и их ETag
+        ("openapi_etag", "swagger_etag").
+    """
+    if not api_docs:
+        schema = get_openapi(
+            title="Custom OpenAPI",
+            version="1.0.0",
+            routes=app.routes,
+        )
+        api_docs["openapi"] = dumps(schema)
+        api_docs["swagger"] = get_swagger_ui_html(openapi_url="/openapi.json", title="Custom Swagger UI").body
+        for name in ("openapi", "swagger"):
+            api_docs[f"{name}_etag"] = f'"{hashlib.blake2b(api_docs[name], digest_size=8).hexdigest()}"'
+    return api_docs
 
 
 @app.get("/docs", include_in_schema=False)
-async def custom_swagger_ui_html():
+async def custom_swagger_ui_html(request: Request):
     """
     Возвращает HTML-страницу с пользовательским интерфейсом Swagger UI.
 
+    Args:
+        request (Request): HTTP-запрос (нужен заголовок If-None-Match).
+
     Returns:
-        str: HTML-страница с интерфейсом Swagger UI.
+        HTMLResponse: Заранее собранная HTML-страница с интерфейсом Swagger UI
+        или пустой ответ 304 Not Modified.
     """
-    return get_swagger_ui_html(openapi_url="/openapi.json", title="Custom Swagger UI")
+    docs = build_api_docs()
+    if etag_matches(request.headers.get("if-none-match"), docs["swagger_etag"]):
+        return Response(status_code=304, headers={"ETag": docs["swagger_etag"]})
+    return HTMLResponse(docs["swagger"], headers={"ETag": docs["swagger_etag"]})
 
 
 @app.get("/openapi.json", include_in_schema=False)
-async def get_open_api_endpoint():
+async def get_open_api_endpoint(request: Request):
     """
     Возвращает JSON-схему OpenAPI для текущего приложения FastAPI.
 
+    Args:
+        request (Request): HTTP-запрос (нужен заголовок If-None-Match).
+
     Returns:
-        dict: JSON-схема OpenAPI для текущего приложения.
+        Response: Заранее сериализованная JSON-схема OpenAPI или пустой ответ
+        304 Not Modified.
     """
-    return get_openapi(
-        title="Custom OpenAPI",
-        version="1.0.0",
-        routes=app.routes,
-    )
+    docs = build_api_docs()
+    if etag_matches(request.headers.get("if-none-match"), docs["openapi_etag"]):
+        return Response(status_code=304, headers={"ETag": docs["openapi_etag"]})
+    return Response(docs["openapi"], media_type="application/json", headers={"ETag": docs["openapi_etag"]})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Возвращает метрики приложения в текстовом формате Prometheus.
+
+    Returns:
+        Response: Гистограммы задержек и размеров, счетчики запросов и ошибок.
+    """
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/auth/token-cache")
+async def token_cache_stats():
+    """
+    Возвращает счетчики кэша проверенных JWT-токенов.
+
+    Returns:
+        dict: Количество попаданий, промахов и токенов в кэше.
+    """
+    return token_cache.stats()
+
+
+@app.get("/auth/revocations")
+async def revocation_stats():
+    """
+    Возвращает счетчики списка отозванных токенов.
+
+    Returns:
+        dict: Число отозванных токенов, проверок и положительных ответов фильтра Блума.
+    """
+    return revoked_tokens.stats()
+
+
+@app.get("/cache/posts")
+async def post_cache_stats():
+    """
+    Возвращает счетчики кэша ответов GET /posts/{post_id}.
+
+    Returns:
+        dict: Попадания, промахи, ответы 304, доля попаданий и размер кэша.
+    """
+    return post_cache.stats()
+
+
+@app.get("/cache/compression")
+async def compression_cache_stats():
+    """
+    Возвращает счетчики кэша сжатых ответов.
+
+    Returns:
+        dict: Попадания, промахи, доля попаданий, число записей и их размер.
+    """
+    return compressed_responses.stats()
+
+
+@app.get("/reactions/queue")
+async def reaction_queue_stats():
+    """
+    Возвращает счетчики очереди отложенной записи реакций.
+
+    Returns:
+        dict: Глубина очереди, принятые, примененные и склеенные реакции, число
+        пачек и наибольшая задержка применения (пустой словарь, если режим выключен).
+    """
+    return reaction_queue.stats() if reaction_queue is not None else {}
 
 
 @app.post("/register")
@@ -51,26 +359,30 @@ async def register_user(username: str, password: str):
     """
     Регистрирует нового пользователя с заданным именем и паролем.
 
+    Имена сравниваются без учета регистра: "User1" и "user1" — один пользователь.
+
     Args:
         username (str): Имя пользователя.
         password (str): Пароль пользователя.
 
     Returns:
-        dict: Словарь с сообщением об успешной регистрации.
+        dict: Словарь с сообщением об успешной регистрации и ID пользователя.
 
     Raises:
         HTTPException: Если пользователь с таким именем уже существует (код 400).
+        HTTPException: Если пул хэширования паролей перегружен (код 503).
     """
-    # Проверяем, что пользователь с таким именем не существует
-    for user in users_db:
-        if user["username"] == username:
-            raise HTTPException(status_code=400, detail="User already exists")
+    # Не тратим время на хэширование, если имя уже занято
+    if await db.get_user(username) is not None:
+        raise HTTPException(status_code=400, detail="User already exists")
 
-    # Создаем нового пользователя
-    new_user = {"username": username, "password": password}
-    users_db.append(new_user)
+    # Создаем нового пользователя с соленым хэшем пароля
+    password_hash = await password_hasher.hash(password)
+    user = await db.add_user(username, password_hash)
+    if user is None:
+        raise HTTPException(status_code=400, detail="User already exists")
 
-    return {"message": "User registered successfully"}
+    return {"message": "User registered successfully", "user_id": user["id"]}
 
 
 @app.post("/login")
@@ -83,210 +395,1084 @@ async def login(username: str, password: str):
         password (str): Пароль пользователя.
 
     Returns:
-        dict: Словарь с JWT токеном в случае успешной аутентификации.
+        dict: Словарь с JWT токеном доступа и refresh-токеном в случае успешной аутентификации.
 
     Raises:
         HTTPException: Если заданные учетные данные недействительны (код 401).
+        HTTPException: Если пул хэширования паролей перегружен (код 503).
     """
     # Ищем пользователя в "базе данных"
-    for user in users_db:
-        if user["username"] == username and user["password"] == password:
-            # Генерируем JWT токен и отправляем его в ответе
-            token = create_access_token({"sub": username})
-            return {"access_token": token}
+    with Timer(operation_duration, "store.get_user"):
+        user = await db.get_user(username)
+    # Для неизвестного имени хэш все равно проверяется, чтобы время ответа было одинаковым
+    valid, new_hash = await password_hasher.verify(password, user["password"] if user is not None else None)
+    if valid:
+        # Обновляем устаревший хэш (или пароль в открытом виде) после успешного входа
+        if new_hash is not None:
+            await db.set_password(username, new_hash)
+
+        # Генерируем JWT токены и отправляем их в ответе
+        claims = {"sub": user["username"], "uid": user["id"]}
+        return {"access_token": create_access_token(claims), "refresh_token": create_refresh_token(claims)}
 
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
 
+@app.post("/auth/refresh")
+async def refresh_tokens(refresh_token: str):
+    """
+    Выдает новую пару токенов по refresh-токену.
+
+    Использованный refresh-токен отзывается, поэтому каждый refresh-токен
+    можно предъявить только один раз.
+
+    Args:
+        refresh_token (str): Refresh-токен, выданный /login или /auth/refresh.
+
+    Returns:
+        dict: Новые токен доступа и refresh-токен.
+
+    Raises:
+        HTTPException: Если refresh-токен истек, недействителен или отозван (код 401).
+    """
+    payload = decode_refresh_token(refresh_token)
+    revoke_token(payload)
+    claims = {"sub": payload["sub"], "uid": payload.get("uid")}
+    return {"access_token": create_access_token(claims), "refresh_token": create_refresh_token(claims)}
+
+
+@app.post("/auth/logout")
+async def logout(refresh_token: Optional[str] = None, user: dict = Depends(get_current_user)):
+    """
+    Завершает сеанс: отзывает текущий токен доступа и, если передан, refresh-токен.
+
+    Args:
+        refresh_token (Optional[str]): Refresh-токен того же пользователя.
+        user (dict): Содержимое текущего токена доступа.
+
+    Returns:
+        dict: Сообщение об успешном выходе.
+
+    Raises:
+        HTTPException: Если токен доступа отсутствует, истек или недействителен (код 401 или 403).
+        HTTPException: Если refresh-токен недействителен или выдан другому пользователю (код 401).
+    """
+    if refresh_token is not None:
+        refresh_payload = decode_refresh_token(refresh_token)
+        if refresh_payload["sub"] != user["sub"]:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        revoke_token(refresh_payload)
+    revoke_token(user)
+    return {"message": "Logged out"}
+
+
+def check_acting_user(body_user_id: int, user_id: int) -> None:
+    """
+    Проверяет, что ID пользователя из тела запроса совпадает с ID из токена.
+
+    Args:
+        body_user_id (int): ID пользователя из тела запроса.
+        user_id (int): ID текущего пользователя (claim uid токена).
+
+    Raises:
+        HTTPException: Если ID не совпадают (ошибка 403).
+    """
+    if body_user_id != user_id:
+        raise HTTPException(status_code=403, detail="user_id does not match the authenticated user")
+
+
 @app.post("/posts/", response_model=Post)
-async def create_post(post: Post):
+async def create_post(post: Post, user_id: int = Depends(get_current_user_id)):
     """
     Создает новый пост и добавляет его в базу данных.
 
+    Автор поста — текущий пользователь: user_id из тела можно не указывать,
+    а указанный должен совпадать с ID из токена.
+
     Args:
         post (Post): Модель данных для нового поста.
+        user_id (int): ID текущего пользователя.
 
     Returns:
         model_dump: Словарь с данными нового поста, включая сгенерированный уникальный ID.
 
     Raises:
         HTTPException: Если не удалось создать пост или произошла ошибка при добавлении в базу данных.
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403).
+        HTTPException: Если user_id из тела не совпадает с текущим пользователем (ошибка 403).
+    """
+    if post.user_id is None:
+        post.user_id = user_id
+    check_acting_user(post.user_id, user_id)
+
+    # Добавляем новый пост в "базу данных", ID выдается счетчиком хранилища
+    post_data = await db.create_post(post.model_dump())
+    search_index.add(post_data)
+    return FastJSONResponse(post_data)
+
+
+async def stream_posts_page(after: int, limit: int, user_id: Optional[int]) -> AsyncIterator[bytes]:
+    """
+    Формирует страницу постов в виде JSON по частям.
+
+    Args:
+        after (int): Курсор — ID, после которого начинается страница.
+        limit (int): Размер страницы.
+        user_id (Optional[int]): Фильтр по автору.
+
+    Yields:
+        bytes: Очередной фрагмент JSON-ответа.
+    """
+    yield b'{"items":['
+    count = 0
+    last_id = None
+    chunk = []
+    async for post in db.iter_posts(after, limit, user_id):
+        chunk.append(dumps(post))
+        count += 1
+        last_id = post["id"]
+        if len(chunk) == 64:
+            yield (b"," if count > 64 else b"") + b",".join(chunk)
+            chunk = []
+    if chunk:
+        yield (b"," if count > len(chunk) else b"") + b",".join(chunk)
+
+    # Курсор следующей страницы есть, только если страница заполнена целиком
+    next_cursor = last_id if count == limit else None
+    yield b'],"next_cursor":' + dumps(next_cursor) + b"}"
+
+
+@app.get("/posts")
+async def list_posts(
+    after: int = Query(0, ge=0, lt=ID_LIMIT),
+    limit: int = Query(100, ge=1, le=config.POSTS_PAGE_LIMIT),
+    user_id: Optional[int] = Query(None, ge=0, lt=ID_LIMIT),
+):
+    """
+    Возвращает страницу постов в порядке возрастания ID с пагинацией по курсору.
+
+    Ответ формируется потоком (chunked), поэтому память сервера не зависит от
+    размера страницы.
+
+    Args:
+        after (int): Курсор — ID последнего поста предыдущей страницы (0 для первой).
+        limit (int): Размер страницы.
+        user_id (Optional[int]): Если задан, возвращаются только посты этого автора.
+
+    Returns:
+        StreamingResponse: JSON вида {"items": [...], "next_cursor": ID или null}.
+    """
+    return StreamingResponse(stream_posts_page(after, limit, user_id), media_type="application/json")
+
+
+async def ranked_posts(ranking: list) -> list:
+    """
+    Дополняет пары (ID поста, счет) данными постов.
+
+    Args:
+        ranking (list): Пары (ID поста, счет) в порядке рейтинга.
+
+    Returns:
+        list: Посты с полем score; удаленные к этому моменту посты пропускаются.
+    """
+    result = []
+    for post_id, score in ranking:
+        post = await db.get_post(post_id)
+        if post is not None:
+            result.append({**post, "score": score})
+    return result
+
+
+@app.get("/posts/top")
+async def top_posts_list(limit: int = Query(10, ge=1, le=config.RANKING_MAX_K)):
+    """
+    Возвращает посты с наибольшей разницей лайков и дизлайков.
+
+    Args:
+        limit (int): Количество постов.
+
+    Returns:
+        list: Посты с полем score по убыванию счета.
+    """
+    return FastJSONResponse(await ranked_posts(top_posts.top(limit)))
+
+
+@app.get("/posts/trending")
+async def trending_posts_list(limit: int = Query(10, ge=1, le=config.RANKING_MAX_K)):
+    """
+    Возвращает посты «в тренде»: с наибольшим числом недавних реакций с учетом затухания.
+
+    Args:
+        limit (int): Количество постов.
+
+    Returns:
+        list: Посты с полем score по убыванию счета.
     """
-    # Генерируем уникальный ID для нового поста
-    new_post_id = max(post.id for post in posts_db) + 1 if posts_db else 1
-    post_data = post.model_dump()
-    post_data["id"] = new_post_id
+    return FastJSONResponse(await ranked_posts(trending_posts.top(limit)))
 
-    # Добавляем новый пост в "базу данных"
-    posts_db.append(post_data)
-    return post_data
 
+@app.get("/posts/search")
+async def search_posts(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Ищет посты по словам в заголовке и содержании.
+
+    Результаты ранжируются по BM25; регистр и «ё»/«е» не различаются.
+
+    Args:
+        q (str): Поисковый запрос.
+        limit (int): Размер страницы.
+        offset (int): Сколько лучших результатов пропустить.
+
+    Returns:
+        dict: Посты с полем score по убыванию оценки ("items") и offset
+        следующей страницы ("next_offset", null на последней странице).
 
-@app.get("/posts/{post_id}", response_model=Post)
-async def read_post(post_id: int):
+    Raises:
+        HTTPException: Если offset + limit превышает SEARCH_MAX_RESULTS (ошибка 400).
+    """
+    if offset + limit > config.SEARCH_MAX_RESULTS:
+        raise HTTPException(status_code=400, detail="Search results are limited to the first "
+                            f"{config.SEARCH_MAX_RESULTS} posts")
+    ranking = search_index.search(q, limit, offset)
+    next_offset = offset + limit if len(ranking) == limit and offset + limit < config.SEARCH_MAX_RESULTS else None
+    return FastJSONResponse({"items": await ranked_posts(ranking), "next_offset": next_offset})
+
+
+@app.get("/posts/{post_id}", response_model=PostWithReactions)
+async def read_post(post_id: PostId, request: Request):
     """
-    Возвращает данные о посте с указанным ID.
+    Возвращает информацию о посте с указанным ID, включая количество лайков и дизлайков.
+
+    Ответ снабжается заголовком ETag, который меняется вместе с версией поста.
+    Если клиент прислал актуальный ETag в If-None-Match, возвращается 304 без
+    тела; иначе тело берется из кэша сериализованных ответов.
 
     Args:
-        post_id (int): Идентификатор поста, который нужно найти.
+        post_id (int): Идентификатор поста, информацию о котором нужно получить.
+        request (Request): HTTP-запрос (нужен заголовок If-None-Match).
 
     Returns:
-        dict: Словарь с данными о посте, если он найден.
+        Response: JSON с данными о посте, включая количество лайков и дизлайков,
+        или пустой ответ 304 Not Modified.
 
     Raises:
         HTTPException: Если пост с указанным ID не найден (ошибка 404).
     """
-    # Ищем пост с указанным ID в "базе данных"
-    for post in posts_db:
-        if post["id"] == post_id:
-            return post
+    # Версию фиксируем до чтения: если пост изменится во время запроса,
+    # ответ не попадет в кэш, а клиент получит уже устаревший ETag
+    version = post_cache.version(post_id)
+    etag = post_cache.etag(post_id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        post_cache.not_modified += 1
+        return Response(status_code=304, headers={"ETag": etag})
+
+    body = post_cache.get(post_id, version)
+    if body is None:
+        # Ищем пост с указанным ID в "базе данных"
+        with Timer(operation_duration, "store.get_post"):
+            post = await db.get_post(post_id)
+        if post is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        # Счетчики реакций поддерживаются хранилищем и читаются за O(1)
+        like_count, dislike_count = await reaction_counts(post_id)
+        body = dumps({**post, "like_count": like_count, "dislike_count": dislike_count})
+        post_cache.put(post_id, version, body)
+
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+async def stream_live_counts(subscription: Subscription) -> AsyncIterator[bytes]:
+    """
+    Формирует поток Server-Sent Events с обновлениями счетчиков поста.
 
-    raise HTTPException(status_code=404, detail="Post not found")
+    Args:
+        subscription (Subscription): Подписка на пост.
+
+    Yields:
+        bytes: Событие с JSON счетчиков или комментарий-heartbeat.
+    """
+    try:
+        while True:
+            message = await subscription.next(config.LIVE_HEARTBEAT)
+            yield b": heartbeat\n\n" if message is None else b"data: " + message + b"\n\n"
+    finally:
+        live_counts.unsubscribe(subscription)
+
+
+@app.get("/posts/{post_id}/live")
+async def live_counts_sse(post_id: PostId):
+    """
+    Подписка на счетчики реакций поста через Server-Sent Events.
+
+    Первое событие содержит текущие счетчики, следующие приходят не чаще раза
+    за LIVE_TICK секунд и только при изменении счетчиков. Если клиент читает
+    медленнее, промежуточные обновления пропускаются, и он получает последние.
+
+    Args:
+        post_id (int): Идентификатор поста.
+
+    Returns:
+        StreamingResponse: Поток text/event-stream с JSON {"post_id", "like_count", "dislike_count"}.
+
+    Raises:
+        HTTPException: Если пост не найден (ошибка 404).
+        HTTPException: Если достигнуто максимальное число подписок (ошибка 503).
+    """
+    if not await db.post_exists(post_id):
+        raise HTTPException(status_code=404, detail="Post not found")
+    subscription = await live_counts.subscribe(post_id)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many subscribers")
+    return StreamingResponse(
+        stream_live_counts(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def pump_live_counts(websocket: WebSocket, subscription: Subscription) -> None:
+    """
+    Отправляет обновления подписки в WebSocket.
+
+    Если клиент не принимает сообщение за LIVE_SEND_TIMEOUT секунд,
+    соединение закрывается.
+
+    Args:
+        websocket (WebSocket): Соединение клиента.
+        subscription (Subscription): Подписка на пост.
+    """
+    while True:
+        message = await subscription.next(None)
+        try:
+            await asyncio.wait_for(websocket.send_text(message.decode()), config.LIVE_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            await websocket.close(code=1008)
+            return
+
+
+@app.websocket("/posts/{post_id}/live")
+async def live_counts_websocket(websocket: WebSocket, post_id: PostId):
+    """
+    Подписка на счетчики реакций поста через WebSocket.
+
+    Сообщения те же, что и в варианте SSE. Если пост не найден, соединение
+    закрывается с кодом 4404, если достигнуто максимальное число подписок —
+    с кодом 1013.
+
+    Args:
+        websocket (WebSocket): Соединение клиента.
+        post_id (int): Идентификатор поста.
+    """
+    if not await db.post_exists(post_id):
+        await websocket.close(code=4404)
+        return
+    subscription = await live_counts.subscribe(post_id)
+    if subscription is None:
+        await websocket.close(code=1013)
+        return
+    try:
+        await websocket.accept()
+        sender = asyncio.create_task(pump_live_counts(websocket, subscription))
+        try:
+            # Клиент ничего не присылает; читаем, чтобы заметить закрытие соединения
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+    finally:
+        live_counts.unsubscribe(subscription)
+
+
+async def check_post_author(post_id: int, user_id: int) -> None:
+    """
+    Проверяет, что текущий пользователь — автор поста.
+
+    Args:
+        post_id (int): Идентификатор поста.
+        user_id (int): ID текущего пользователя.
+
+    Raises:
+        HTTPException: Если пост не найден (ошибка 404).
+        HTTPException: Если пост принадлежит другому пользователю (ошибка 403).
+    """
+    if not await db.is_author(post_id, user_id):
+        if await db.post_exists(post_id):
+            raise HTTPException(status_code=403, detail="Only the author can change this post")
+        raise HTTPException(status_code=404, detail="Post not found")
 
 
 @app.put("/posts/{post_id}", response_model=Post)
-async def update_post(post_id: int, post: Post):
+async def update_post(post_id: PostId, post: Post, user_id: int = Depends(get_current_user_id)):
     """
     Обновляет данные о посте с указанным ID.
 
+    Изменять пост может только его автор; автор поста при обновлении не меняется.
+
     Args:
         post_id (int): Идентификатор поста, который нужно обновить.
         post (Post): Модель данных Post с новыми данными для обновления.
+        user_id (int): ID текущего пользователя.
 
     Returns:
         dict: Словарь с обновленными данными о посте, если он найден.
 
     Raises:
         HTTPException: Если пост с указанным ID не найден (ошибка 404).
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403).
+        HTTPException: Если пост принадлежит другому пользователю или user_id из тела
+            не совпадает с текущим пользователем (ошибка 403).
     """
-    # Ищем пост с указанным ID в "базе данных"
-    for i, p in enumerate(posts_db):
-        if p["id"] == post_id:
-            # Обновляем данные поста
-            posts_db[i] = post.model_dump()
-            return posts_db[i]
+    if post.user_id is not None:
+        check_acting_user(post.user_id, user_id)
+    await check_post_author(post_id, user_id)
+
+    # Обновляем данные поста, если он есть в "базе данных"
+    updated_post = await db.update_post(post_id, {**post.model_dump(), "user_id": user_id})
+    if updated_post is not None:
+        search_index.add(updated_post)
+        post_cache.bump(post_id)
+        return FastJSONResponse(updated_post)
 
     raise HTTPException(status_code=404, detail="Post not found")
 
 
 @app.delete("/posts/{post_id}", response_model=Post)
-async def delete_post(post_id: int):
+async def delete_post(post_id: PostId, user_id: int = Depends(get_current_user_id)):
     """
     Удаляет пост с указанным ID из "базы данных".
 
+    Удалить пост может только его автор.
+
     Args:
         post_id (int): Идентификатор поста, который нужно удалить.
+        user_id (int): ID текущего пользователя.
 
     Returns:
         dict: Словарь с данными об удаленном посте, если он найден.
 
     Raises:
         HTTPException: Если пост с указанным ID не найден (ошибка 404).
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403).
+        HTTPException: Если пост принадлежит другому пользователю (ошибка 403).
     """
-    # Ищем пост с указанным ID в "базе данных" и удаляем его
-    for i, post in enumerate(posts_db):
-        if post["id"] == post_id:
-            deleted_post = posts_db.pop(i)
-            return deleted_post
+    await check_post_author(post_id, user_id)
+
+    # Удаляем пост с указанным ID и его реакции из "базы данных"
+    deleted_post = await db.delete_post(post_id)
+    if deleted_post is not None:
+        top_posts.remove(post_id)
+        trending_posts.remove(post_id)
+        search_index.remove(post_id)
+        if shared_counters is not None and shared_counters.covers(post_id):
+            shared_counters.reset(post_id)
+        else:
+            post_cache.bump(post_id)
+        return FastJSONResponse(deleted_post)
 
     raise HTTPException(status_code=404, detail="Post not found")
 
 
 @app.post("/posts/{post_id}/like/", response_model=Like)
-async def like_post(post_id: int, like: Like):
+async def like_post(post_id: PostId, like: Like, user_id: int = Depends(get_current_user_id)):
     """
-    Ставит лайк на пост с указанным ID и сохраняет лайк в кэше.
+    Ставит лайк на пост с указанным ID и сохраняет лайк в хранилище реакций.
+
+    При включенной отложенной записи (REACTIONS_WRITE_BEHIND) лайк только
+    ставится в очередь, и сразу возвращается код 202. Фоновая задача
+    применяет его позже и отбрасывает лайки несуществующим постам и
+    собственным постам пользователя.
 
     Args:
         post_id (int): Идентификатор поста, на который нужно поставить лайк.
         like (Like): Модель данных Like, содержащая информацию о лайке (например, ID пользователя).
+        user_id (int): ID текущего пользователя; user_id из тела должен с ним совпадать.
 
     Returns:
-        dict: Словарь с данными о поставленном лайке.
+        dict: Словарь с данными о поставленном лайке (код 200 или 202).
 
     Raises:
         HTTPException: Если пользователь пытается поставить лайк своему собственному посту (ошибка 400).
+        HTTPException: Если user_id из тела не совпадает с текущим пользователем (ошибка 403).
+        HTTPException: Если пост с указанным ID не найден (ошибка 404).
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403).
+        HTTPException: Если очередь отложенной записи заполнена (ошибка 503).
     """
-    # Проверяем, что пользователь не ставит лайк своему посту
-    for post in posts_db:
-        if post["id"] == post_id and post["user_id"] == like.user_id:
-            raise HTTPException(status_code=400, detail="You cannot like your own post")
-
-        # Проверяем, что пост с указанным post_id существует
-    if not any(post["id"] == post_id for post in posts_db):
+    check_acting_user(like.user_id, user_id)
+
+    # В режиме отложенной записи пост и автора проверяет фоновая задача при применении пачки
+    if reaction_queue is not None:
+        if not reaction_queue.offer(post_id, like.user_id, LIKE):
+            raise HTTPException(status_code=503, detail="Reaction queue is full")
+        return FastJSONResponse({**like.model_dump(), "post_id": post_id}, status_code=202)
+
+    # Проверка поста и авторства и запись за один шаг хранилища (в sqlite — одна транзакция),
+    # чтобы удаление поста не вклинилось между ними. Повторная реакция не дублируется,
+    # противоположная заменяется
+    with Timer(operation_duration, "store.react"):
+        status, previous = await db.react(post_id, like.user_id, LIKE)
+    if status == "own_post":
+        raise HTTPException(status_code=400, detail="You cannot like your own post")
+    if status == "not_found":
         raise HTTPException(status_code=404, detail="Post not found")
 
     like_data = like.model_dump()
     like_data["post_id"] = post_id
+    reaction_applied(post_id, like.user_id, previous, LIKE)
 
-    # Добавляем лайк в кэш
-    if post_id not in post_likes_cache:
-        post_likes_cache[post_id] = []
-    post_likes_cache[post_id].append(like_data)
-
-    return like_data
+    return FastJSONResponse(like_data)
 
 
 @app.post("/posts/{post_id}/dislike/", response_model=Dislike)
-async def dislike_post(post_id: int, dislike: Dislike):
+async def dislike_post(post_id: PostId, dislike: Dislike, user_id: int = Depends(get_current_user_id)):
     """
-    Ставит дизлайк на пост с указанным ID и сохраняет дизлайк в кэше.
+    Ставит дизлайк на пост с указанным ID и сохраняет дизлайк в хранилище реакций.
+
+    При включенной отложенной записи (REACTIONS_WRITE_BEHIND) дизлайк только
+    ставится в очередь, и сразу возвращается код 202. Фоновая задача
+    применяет его позже и отбрасывает дизлайки несуществующим постам и
+    собственным постам пользователя.
 
     Args:
         post_id (int): Идентификатор поста, на который нужно поставить дизлайк.
         dislike (Dislike): Модель данных Dislike, содержащая информацию о дизлайке (например, ID пользователя).
+        user_id (int): ID текущего пользователя; user_id из тела должен с ним совпадать.
 
     Returns:
-        dict: Словарь с данными о поставленном дизлайке.
+        dict: Словарь с данными о поставленном дизлайке (код 200 или 202).
 
     Raises:
         HTTPException: Если пользователь пытается поставить дизлайк своему собственному посту (ошибка 400).
+        HTTPException: Если user_id из тела не совпадает с текущим пользователем (ошибка 403).
+        HTTPException: Если пост с указанным ID не найден (ошибка 404).
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403).
+        HTTPException: Если очередь отложенной записи заполнена (ошибка 503).
     """
-    # Проверяем, что пользователь не ставит дизлайк своему посту
-    for post in posts_db:
-        if post["id"] == post_id and post["user_id"] == dislike.user_id:
-            raise HTTPException(status_code=400, detail="You cannot dislike your own post")
-
-    # Проверяем, что пост с указанным post_id существует
-    if not any(post["id"] == post_id for post in posts_db):
+    check_acting_user(dislike.user_id, user_id)
+
+    # В режиме отложенной записи пост и автора проверяет фоновая задача при применении пачки
+    if reaction_queue is not None:
+        if not reaction_queue.offer(post_id, dislike.user_id, DISLIKE):
+            raise HTTPException(status_code=503, detail="Reaction queue is full")
+        return FastJSONResponse({**dislike.model_dump(), "post_id": post_id}, status_code=202)
+
+    # Проверка поста и авторства и запись за один шаг хранилища (в sqlite — одна транзакция),
+    # чтобы удаление поста не вклинилось между ними. Повторная реакция не дублируется,
+    # противоположная заменяется
+    with Timer(operation_duration, "store.react"):
+        status, previous = await db.react(post_id, dislike.user_id, DISLIKE)
+    if status == "own_post":
+        raise HTTPException(status_code=400, detail="You cannot dislike your own post")
+    if status == "not_found":
         raise HTTPException(status_code=404, detail="Post not found")
 
     dislike_data = dislike.model_dump()
     dislike_data["post_id"] = post_id
+    reaction_applied(post_id, dislike.user_id, previous, DISLIKE)
+
+    return FastJSONResponse(dislike_data)
 
-    # Добавляем дизлайк в кэш
-    if post_id not in post_dislikes_cache:
-        post_dislikes_cache[post_id] = []
-    post_dislikes_cache[post_id].append(dislike_data)
 
-    return dislike_data
+reaction_events_adapter = TypeAdapter(List[ReactionEvent])
 
 
-@app.get("/posts/{post_id}", response_model=Post)
-async def read_post(post_id: int):
+def parse_reaction_batch(body: bytes, content_type: str) -> tuple:
     """
-    Возвращает информацию о посте с указанным ID, включая количество лайков и дизлайков из кэша.
+    Разбирает тело пакетного запроса: JSON-массив или NDJSON (по строке на реакцию).
 
     Args:
-        post_id (int): Идентификатор поста, информацию о котором нужно получить.
+        body (bytes): Тело запроса.
+        content_type (str): Заголовок Content-Type.
 
     Returns:
-        dict: Словарь с данными о посте, включая количество лайков и дизлайков.
+        tuple: Список элементов и словарь ошибок разбора {индекс: сообщение}.
 
     Raises:
-        HTTPException: Если пост с указанным ID не найден (ошибка 404).
+        HTTPException: Если тело не является JSON-массивом (ошибка 400).
+    """
+    if content_type.startswith("application/x-ndjson"):
+        items, errors = [], {}
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                errors[len(items)] = "Invalid JSON"
+                items.append(None)
+        return items, errors
+
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of reactions")
+    return items, {}
+
+
+def validate_reaction_batch(items: list, errors: dict) -> list:
     """
-    # Ищем пост с указанным ID в "базе данных"
-    for post in posts_db:
-        if post["id"] == post_id:
-            # Получаем количество лайков и дизлайков из кэша
-            like_count = len(post_likes_cache.get(post_id, set()))
-            dislike_count = len(post_dislikes_cache.get(post_id, set()))
+    Проверяет все реакции пакета одним проходом TypeAdapter.
 
-            # Добавляем информацию о количестве лайков и дизлайков в ответ
-            post["like_count"] = like_count
-            post["dislike_count"] = dislike_count
+    Если в пакете есть ошибки, их индексы добавляются в errors, а остальные
+    элементы проверяются повторно без них.
 
-            return post
+    Args:
+        items (list): Разобранные элементы пакета.
+        errors (dict): Ошибки по индексам элементов; дополняется на месте.
 
-    raise HTTPException(status_code=404, detail="Post not found")
+    Returns:
+        list: Пары (индекс, ReactionEvent) для корректных элементов.
+    """
+    try:
+        events = reaction_events_adapter.validate_python([item for i, item in enumerate(items) if i not in errors])
+    except ValidationError as exc:
+        indexes = [i for i in range(len(items)) if i not in errors]
+        for error in exc.errors():
+            errors.setdefault(indexes[error["loc"][0]], error["msg"])
+        events = reaction_events_adapter.validate_python([item for i, item in enumerate(items) if i not in errors])
+    return list(zip((i for i in range(len(items)) if i not in errors), events))
+
+
+async def read_body_limited(request: Request, limit: int) -> bytes:
+    """
+    Читает тело запроса, не превышая заданный размер.
+
+    Тело с заголовком Content-Length больше лимита отклоняется без чтения, а
+    тело без него (chunked) — как только прочитано больше лимита.
+
+    Args:
+        request (Request): HTTP-запрос.
+        limit (int): Максимальный размер тела в байтах.
+
+    Returns:
+        bytes: Тело запроса.
+
+    Raises:
+        HTTPException: Если тело больше лимита (ошибка 413).
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail="Request body is too large")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Request body is too large")
+    return bytes(body)
+
+
+@app.post("/reactions/batch")
+async def batch_reactions(request: Request, user_id: int = Depends(get_current_user_id)):
+    """
+    Принимает пачку лайков и дизлайков и применяет их за один шаг.
+
+    Тело запроса — JSON-массив объектов {"post_id", "user_id", "kind"} или, при
+    Content-Type: application/x-ndjson, по одному такому объекту на строку.
+    kind принимает значения "like" или "dislike".
+
+    Все реакции ставятся от имени текущего пользователя: элементы с другим
+    user_id не применяются и получают статус "forbidden".
+
+    Args:
+        request (Request): HTTP-запрос с пачкой реакций.
+        user_id (int): ID текущего пользователя.
+
+    Returns:
+        dict: Количество примененных реакций и результат для каждого элемента
+        ("ok", "invalid", "forbidden", "not_found" или "own_post").
+
+    Raises:
+        HTTPException: Если тело не разобрано (ошибка 400), больше REACTIONS_BATCH_MAX_BYTES
+            или содержит больше REACTIONS_BATCH_LIMIT реакций (ошибка 413).
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403).
+    """
+    body = await read_body_limited(request, config.REACTIONS_BATCH_MAX_BYTES)
+    items, errors = parse_reaction_batch(body, request.headers.get("content-type", ""))
+    if len(items) > config.REACTIONS_BATCH_LIMIT:
+        raise HTTPException(status_code=413, detail="Too many reactions in one batch")
+
+    results = [None] * len(items)
+    valid = []
+    for index, event in validate_reaction_batch(items, errors):
+        if event.user_id == user_id:
+            valid.append((index, event))
+        else:
+            results[index] = {"status": "forbidden"}
+    events = [(event.post_id, event.user_id, LIKE if event.kind == "like" else DISLIKE) for _, event in valid]
+    with Timer(operation_duration, "store.apply_reactions"):
+        outcomes = await db.apply_reactions(events)
+
+    for index in errors:
+        results[index] = {"status": "invalid", "detail": errors[index]}
+    applied = 0
+    for (index, _), (post_id, _, kind), (status, previous) in zip(valid, events, outcomes):
+        results[index] = {"status": status}
+        if status == "ok":
+            applied += 1
+            reaction_applied(post_id, user_id, previous, kind)
+
+    return {"applied": applied, "results": results}
+
+
+# Пользователи, которым разрешены выгрузка и загрузка данных
+bulk_users = frozenset(normalize_username(name) for name in config.BULK_USERS)
+
+
+async def require_bulk_access(user: dict = Depends(get_current_user)) -> dict:
+    """
+    Зависимость FastAPI: пропускает только пользователей из BULK_USERS.
+
+    Args:
+        user (dict): Содержимое токена текущего пользователя.
+
+    Returns:
+        dict: Содержимое токена.
+
+    Raises:
+        HTTPException: Если пользователю не разрешены выгрузка и загрузка данных (ошибка 403).
+    """
+    if normalize_username(str(user.get("sub", ""))) not in bulk_users:
+        raise HTTPException(status_code=403, detail="Bulk export and import are not allowed for this user")
+    return user
+
+
+@app.get("/export", dependencies=[Depends(require_bulk_access)])
+async def export_data():
+    """
+    Выгружает пользователей, посты и реакции потоком NDJSON.
+
+    Строки — объекты с полем type: "user" (id, username, password — хэш),
+    "post" (id, title, content, user_id) и "reaction" (post_id, user_id, kind).
+    Выгрузка не останавливает запись, память сервера не зависит от объема
+    данных; согласованность на момент запроса зависит от бэкенда (см.
+    export_ndjson хранилища).
+
+    Returns:
+        StreamingResponse: Поток application/x-ndjson.
+
+    Raises:
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403)
+            или пользователю не разрешена выгрузка (ошибка 403).
+    """
+    return StreamingResponse(db.export_ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/import", dependencies=[Depends(require_bulk_access)])
+async def import_data(request: Request):
+    """
+    Загружает выгрузку NDJSON (формат GET /export), читая тело запроса потоком.
+
+    Строки читаются группами по BULK_CHUNK_SIZE: каждая группа проверяется
+    одним проходом и применяется к хранилищу одним шагом, поэтому память не
+    зависит от размера тела. ID сохраняются: запись с существующим ID
+    заменяет прежнюю. Загруженные реакции обновляют счетчики и рейтинг
+    лучших постов, но не рейтинг «в тренде» и не аналитику.
+
+    Args:
+        request (Request): HTTP-запрос с выгрузкой в теле.
+
+    Returns:
+        dict: Количество прочитанных строк, загруженные записи по типам,
+        отклоненные строки по причинам ("invalid", "conflict", "not_found",
+        "own_post") и первые BULK_MAX_ERRORS ошибок с номерами строк.
+
+    Raises:
+        HTTPException: Если запрос не содержит действительного токена (ошибка 401 или 403)
+            или пользователю не разрешена загрузка (ошибка 403).
+    """
+    report = ImportReport(config.BULK_MAX_ERRORS)
+    applying = None
+    async for lines in iter_line_chunks(request.stream(), config.BULK_CHUNK_SIZE, config.BULK_MAX_LINE):
+        records, errors = parse_records(lines)
+        first_line = report.lines + 1
+        report.lines += len(lines)
+        for index, detail in sorted(errors.items()):
+            report.reject(first_line + index, "invalid", detail)
+        # Следующая группа разбирается, пока предыдущая применяется; группы применяются по порядку
+        if applying is not None:
+            await applying
+        applying = asyncio.ensure_future(apply_import_chunk(records, first_line, report))
+    if applying is not None:
+        await applying
+
+    return report.as_dict()
+
+
+async def apply_import_chunk(records: list, first_line: int, report: ImportReport) -> None:
+    """
+    Применяет группу записей выгрузки к хранилищу и обновляет индексы и рейтинги.
+
+    Args:
+        records (list): Пары (индекс строки в группе, запись) из parse_records.
+        first_line (int): Номер первой строки группы.
+        report (ImportReport): Итоги загрузки; дополняются на месте.
+    """
+    with Timer(operation_duration, "store.import_records"):
+        outcomes = await db.import_records([record for _, record in records])
+
+    for (index, (kind, data)), (status, previous) in zip(records, outcomes):
+        if status != "ok":
+            report.reject(first_line + index, status)
+            continue
+        report.imported[kind] += 1
+        if kind == "post":
+            search_index.add(data)
+            post_cache.bump(data["id"])
+        elif kind == "reaction":
+            reaction_applied(data[0], data[1], previous, data[2], backfill=True)
+
+
+def analytics_period(since: Optional[int], until: Optional[int]) -> tuple:
+    """
+    Определяет период аналитики: по умолчанию последние сутки.
+
+    Args:
+        since (Optional[int]): Начало периода (Unix time).
+        until (Optional[int]): Конец периода (Unix time).
+
+    Returns:
+        tuple: Пара (начало, конец).
+
+    Raises:
+        HTTPException: Если начало периода не раньше конца (ошибка 400).
+    """
+    if until is None:
+        until = int(time.time()) + 1
+    if since is None:
+        since = until - 24 * 3600
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be earlier than until")
+    return since, until
+
+
+@app.get("/analytics/histogram")
+async def analytics_histogram(
+    post_id: Optional[int] = Query(None, ge=0, lt=ID_LIMIT),
+    since: Optional[int] = Query(None, ge=0, lt=EVENT_TIME_LIMIT),
+    until: Optional[int] = Query(None, ge=0, lt=EVENT_TIME_LIMIT),
+    bucket: int = Query(3600, ge=1, lt=EVENT_TIME_LIMIT),
+):
+    """
+    Возвращает число лайков и дизлайков по интервалам времени (по умолчанию по часам).
+
+    Начало периода округляется вниз до кратного bucket.
+
+    Args:
+        post_id (Optional[int]): Идентификатор поста; без него считаются все посты.
+        since (Optional[int]): Начало периода (Unix time); по умолчанию сутки назад.
+        until (Optional[int]): Конец периода (Unix time); по умолчанию сейчас.
+        bucket (int): Длина интервала в секундах.
+
+    Returns:
+        dict: Интервалы ("items") с началом ("start"), числом лайков, дизлайков и
+        долей лайков (null для интервалов без реакций).
+
+    Raises:
+        HTTPException: Если период задан неверно или интервалов больше ANALYTICS_MAX_BUCKETS (ошибка 400).
+    """
+    since, until = analytics_period(since, until)
+    # Интервалы выравниваются по кратным bucket (для часов — по началу часа UTC)
+    since -= since % bucket
+    if -(-(until - since) // bucket) > config.ANALYTICS_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"At most {config.ANALYTICS_MAX_BUCKETS} buckets per request")
+    # Выборка берется в цикле событий, а агрегаты по ней считаются в потоке и не блокируют цикл
+    snapshot = reaction_log.snapshot(since, until)
+    items = [
+        {
+            "start": start,
+            "likes": likes,
+            "dislikes": dislikes,
+            "like_ratio": likes / (likes + dislikes) if likes or dislikes else None,
+        }
+        for start, likes, dislikes in await asyncio.to_thread(snapshot.histogram, post_id, since, until, bucket)
+    ]
+    return FastJSONResponse({"post_id": post_id, "since": since, "until": until, "bucket": bucket, "items": items})
+
+
+@app.get("/analytics/summary")
+async def analytics_summary(
+    post_id: Optional[int] = Query(None, ge=0, lt=ID_LIMIT),
+    since: Optional[int] = Query(None, ge=0, lt=EVENT_TIME_LIMIT),
+    until: Optional[int] = Query(None, ge=0, lt=EVENT_TIME_LIMIT),
+):
+    """
+    Возвращает итоги реакций за период: лайки, дизлайки, уникальных пользователей и долю лайков.
+
+    Args:
+        post_id (Optional[int]): Идентификатор поста; без него считаются все посты.
+        since (Optional[int]): Начало периода (Unix time); по умолчанию сутки назад.
+        until (Optional[int]): Конец периода (Unix time); по умолчанию сейчас.
+
+    Returns:
+        dict: Число событий, лайков, дизлайков, уникальных пользователей и доля лайков.
+
+    Raises:
+        HTTPException: Если период задан неверно (ошибка 400).
+    """
+    since, until = analytics_period(since, until)
+    summary = await asyncio.to_thread(reaction_log.snapshot(since, until).summary, post_id)
+    return FastJSONResponse({"post_id": post_id, "since": since, "until": until, **summary})
+
+
+@app.get("/analytics/log")
+async def analytics_log_stats():
+    """
+    Возвращает размер журнала событий реакций.
+
+    Returns:
+        dict: Число событий и заполненных блоков, объем в байтах и признак векторных вычислений (numpy).
+    """
+    return reaction_log.stats()
+
+
+profiling_users = frozenset(normalize_username(name) for name in config.PROFILING_USERS)
+
+
+async def require_profiling_access(user: dict = Depends(get_current_user)) -> dict:
+    """
+    Зависимость FastAPI: пропускает только пользователей из PROFILING_USERS.
+
+    Args:
+        user (dict): Содержимое токена текущего пользователя.
+
+    Returns:
+        dict: Содержимое токена.
+
+    Raises:
+        HTTPException: Если пользователю не разрешено профилирование (ошибка 403).
+    """
+    if normalize_username(str(user.get("sub", ""))) not in profiling_users:
+        raise HTTPException(status_code=403, detail="Profiling is not allowed for this user")
+    return user
+
+
+def check_route(route: str) -> None:
+    """
+    Проверяет, что шаблон пути принадлежит одному из маршрутов приложения.
+
+    Args:
+        route (str): Шаблон пути (например, /posts/{post_id}).
+
+    Raises:
+        HTTPException: Если такого маршрута нет (ошибка 404).
+    """
+    if not any(getattr(candidate, "path", None) == route for candidate in app.routes):
+        raise HTTPException(status_code=404, detail="Route not found")
+
+
+@app.post("/admin/profile/start", dependencies=[Depends(require_profiling_access)])
+async def start_profiling(
+    seconds: float = Query(10.0, gt=0, le=config.PROFILING_MAX_SECONDS),
+    route: Optional[str] = None,
+    every: int = Query(1, ge=1),
+):
+    """
+    Запускает выборочный профилировщик на заданное время.
+
+    Без route снимаются стеки всех потоков; с route — только стеки цикла
+    событий во время каждого every-го запроса маршрута. Результаты прошлого
+    сеанса сбрасываются.
+
+    Args:
+        seconds (float): Длительность сеанса, в секундах (не больше PROFILING_MAX_SECONDS).
+        route (Optional[str]): Шаблон пути маршрута, например /posts/{post_id}.
+        every (int): Профилировать каждый every-й запрос маршрута.
+
+    Returns:
+        dict: Состояние профилировщика.
+
+    Raises:
+        HTTPException: Если маршрут не найден (ошибка 404) или сеанс уже идет (ошибка 409).
+    """
+    if route is not None:
+        check_route(route)
+    try:
+        stack_sampler.start(seconds, route, every)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return stack_sampler.stats()
+
+
+@app.post("/admin/profile/stop", dependencies=[Depends(require_profiling_access)])
+async def stop_profiling():
+    """
+    Досрочно останавливает выборочный профилировщик.
+
+    Returns:
+        dict: Состояние профилировщика.
+    """
+    stack_sampler.stop()
+    return stack_sampler.stats()
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_profiling_access)])
+async def profiling_stats():
+    """
+    Возвращает состояние профилировщиков.
+
+    Returns:
+        dict: Состояние выборочного профилировщика и маршрут, ожидающий
+        профилирования через cProfile.
+    """
+    return {**stack_sampler.stats(), "request_route": request_profiler.route}
+
+
+@app.get("/admin/profile/flamegraph", dependencies=[Depends(require_profiling_access)])
+async def profiling_flamegraph():
+    """
+    Возвращает стеки последнего сеанса профилирования в формате collapsed stacks.
+
+    Ответ можно передать flamegraph.pl или открыть в speedscope.
+
+    Returns:
+        Response: Текст: стек через ";" и число выборок в каждой строке.
+    """
+    return Response(await asyncio.to_thread(stack_sampler.collapsed), media_type="text/plain")
+
+
+@app.post("/admin/profile/request", dependencies=[Depends(require_profiling_access)])
+async def profile_next_request(route: str):
+    """
+    Включает профилирование следующего запроса маршрута через cProfile.
+
+    Args:
+        route (str): Шаблон пути маршрута, например /posts/{post_id}.
+
+    Returns:
+        dict: Маршрут, ожидающий профилирования.
+
+    Raises:
+        HTTPException: Если маршрут не найден (ошибка 404).
+    """
+    check_route(route)
+    request_profiler.arm(route)
+    return {"request_route": route}
+
+
+@app.get("/admin/profile/request", dependencies=[Depends(require_profiling_access)])
+async def profiled_request_report(
+    limit: int = Query(50, ge=1, le=1000),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+):
+    """
+    Возвращает отчет cProfile о последнем профилированном запросе.
+
+    Args:
+        limit (int): Количество функций в отчете.
+        sort (str): Сортировка: cumulative, tottime или ncalls.
+
+    Returns:
+        Response: Текстовый отчет pstats.
+
+    Raises:
+        HTTPException: Если запрос еще не профилировался (ошибка 404).
+    """
+    report = await asyncio.to_thread(request_profiler.report, limit, sort)
+    if report is None:
+        raise HTTPException(status_code=404, detail="No profiled request yet")
+    return Response(report, media_type="text/plain")
@@ -0,0 +1,345 @@
+import bisect
+import functools
+import time
+from typing import Callable, Dict, List, Sequence
+
+# Границы корзин гистограмм: степени двойки от 1 мкс до ~67 с и от 1 байта до 64 МиБ
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(27))
+SIZE_BUCKETS = tuple(float(2 ** i) for i in range(27))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """
+    Счетчик Prometheus, который только растет.
+
+    Attributes:
+        name (str): Имя метрики.
+        help (str): Описание метрики.
+        labels (Tuple[str, ...]): Имена меток.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Увеличивает счетчик.
+
+        Args:
+            *labels (str): Значения меток в порядке self.labels.
+            amount (float): Величина увеличения.
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Значение Prometheus, которое может как расти, так и уменьшаться."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Устанавливает значение.
+
+        Args:
+            value (float): Новое значение.
+            *labels (str): Значения меток в порядке self.labels.
+        """
+        self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """
+        Уменьшает значение.
+
+        Args:
+            *labels (str): Значения меток в порядке self.labels.
+            amount (float): Величина уменьшения.
+        """
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class Histogram:
+    """
+    Гистограмма Prometheus с фиксированными корзинами.
+
+    Для каждого набора меток хранится список счетчиков по корзинам и сумма
+    наблюдений, поэтому память не зависит от числа запросов. Наблюдение —
+    это двоичный поиск корзины и два увеличения.
+
+    Attributes:
+        name (str): Имя метрики.
+        help (str): Описание метрики.
+        labels (Tuple[str, ...]): Имена меток.
+        buckets (Tuple[float, ...]): Верхние границы корзин по возрастанию.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Последний элемент списка — корзина +Inf, после нее — сумма наблюдений
+        self._series: Dict[tuple, list] = {}
+
+    def series(self, *labels: str) -> list:
+        """
+        Возвращает ряд гистограммы для набора меток, создавая его при необходимости.
+
+        Ряд можно сохранить и обновлять через record, минуя поиск по меткам.
+
+        Args:
+            *labels (str): Значения меток в порядке self.labels.
+
+        Returns:
+            list: Счетчики по корзинам (последняя — +Inf) и сумма наблюдений.
+        """
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        return series
+
+    def record(self, series: list, value: float) -> None:
+        """
+        Добавляет наблюдение в ряд, полученный из series.
+
+        Args:
+            series (list): Ряд гистограммы.
+            value (float): Наблюдаемое значение.
+        """
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Добавляет наблюдение.
+
+        Args:
+            value (float): Наблюдаемое значение.
+            *labels (str): Значения меток в порядке self.labels.
+        """
+        series = self._series.get(labels)
+        if series is None:
+            series = self.series(*labels)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for values, series in sorted(self._series.items()):
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                total += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {total}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Timer:
+    """
+    Контекстный менеджер, записывающий длительность блока в гистограмму.
+
+    Attributes:
+        histogram (Histogram): Гистограмма для записи.
+        labels (Tuple[str, ...]): Значения меток.
+    """
+
+    __slots__ = ("histogram", "labels", "_started")
+
+    def __init__(self, histogram: Histogram, *labels: str):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self._started, *self.labels)
+
+
+class MetricsRegistry:
+    """Набор метрик, который отдается в текстовом формате Prometheus."""
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        """
+        Добавляет метрику в набор.
+
+        Args:
+            metric (Counter | Gauge | Histogram): Метрика.
+
+        Returns:
+            Counter | Gauge | Histogram: Та же метрика.
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        """
+        Формирует текст всех метрик в формате Prometheus (text/plain; version=0.0.4).
+
+        Returns:
+            bytes: Текст для ответа /metrics.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "webtronics_http_request_duration_seconds", "HTTP request latency.", ("method", "route"),
+))
+http_requests = registry.register(Counter(
+    "webtronics_http_requests_total", "HTTP requests by status code.", ("method", "route", "status"),
+))
+http_errors = registry.register(Counter(
+    "webtronics_http_request_errors_total", "HTTP requests that ended with 5xx or an exception.", ("method", "route"),
+))
+http_in_flight = registry.register(Gauge(
+    "webtronics_http_requests_in_flight", "HTTP requests being processed.",
+))
+http_request_size = registry.register(Histogram(
+    "webtronics_http_request_size_bytes", "HTTP request body size.", ("method", "route"), SIZE_BUCKETS,
+))
+http_response_size = registry.register(Histogram(
+    "webtronics_http_response_size_bytes", "HTTP response body size.", ("method", "route"), SIZE_BUCKETS,
+))
+operation_duration = registry.register(Histogram(
+    "webtronics_operation_duration_seconds", "Duration of internal hot-path operations.", ("operation",),
+))
+
+
+def timed(operation: str) -> Callable:
+    """
+    Декоратор, записывающий длительность вызова функции в operation_duration.
+
+    Args:
+        operation (str): Значение метки operation.
+
+    Returns:
+        Callable: Декоратор для синхронной функции.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                operation_duration.observe(time.perf_counter() - started, operation)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, собирающее метрики HTTP-запросов.
+
+    Метка route — шаблон пути маршрута (например, /posts/{post_id}), поэтому
+    число рядов метрик ограничено числом маршрутов; запросы, не попавшие ни в
+    один маршрут, учитываются с route="<unmatched>". Размер запроса берется из
+    заголовка Content-Length, размер ответа — из отправленных частей тела.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # (метод, обработчик) -> (route, ряды задержки, размера запроса и размера ответа)
+        self._routes: Dict[tuple, tuple] = {}
+
+    def _route(self, scope: dict) -> tuple:
+        method = scope["method"]
+        endpoint = scope.get("endpoint")
+        route = self._routes.get((method, endpoint))
+        if route is None:
+            # Маршрутизатор записывает найденный обработчик в scope; путь ищем один раз
+            path = "<unmatched>"
+            if endpoint is not None:
+                for candidate in scope["app"].routes:
+                    if getattr(candidate, "endpoint", None) is endpoint:
+                        path = candidate.path
+                        break
+            route = self._routes[(method, endpoint)] = (
+                path,
+                http_request_duration.series(method, path),
+                http_request_size.series(method, path),
+                http_response_size.series(method, path),
+            )
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, response_size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        request_size = 0
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                request_size = int(value)
+                break
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            method = scope["method"]
+            route, duration_series, request_series, response_series = self._route(scope)
+            http_request_duration.record(duration_series, elapsed)
+            http_request_size.record(request_series, request_size)
+            http_response_size.record(response_series, response_size)
+            http_requests.inc(method, route, str(status))
+            if status >= 500:
+                http_errors.inc(method, route)
@@ -1,4 +1,11 @@
-from pydantic import BaseModel
+from typing import Literal, Optional
+
+from pydantic import BaseModel, conint
+
+# Идентификатор пользователя или поста: журнал аналитики и поисковый индекс хранят их как uint32,
+# а orjson не сериализует целые больше 64 бит
+ID_LIMIT = 2 ** 32
+EntityId = conint(ge=0, lt=ID_LIMIT)
 
 
 class Post(BaseModel):
@@ -9,10 +16,24 @@ class Post(BaseModel):
         id (int): Идентификатор поста.
         title (str): Заголовок поста.
         content (str): Содержание поста.
+        user_id (Optional[int]): Идентификатор автора поста.
     """
-    id: int
+    id: EntityId
     title: str
     content: str
+    user_id: Optional[EntityId] = None
+
+
+class PostWithReactions(Post):
+    """
+    Модель данных поста вместе с количеством реакций.
+
+    Attributes:
+        like_count (int): Количество лайков поста.
+        dislike_count (int): Количество дизлайков поста.
+    """
+    like_count: int = 0
+    dislike_count: int = 0
 
 
 class Like(BaseModel):
@@ -23,8 +44,8 @@ class Like(BaseModel):
         user_id (int): Идентификатор пользователя, который поставил лайк.
         post_id (int): Идентификатор поста, которому был поставлен лайк.
     """
-    user_id: int
-    post_id: int
+    user_id: EntityId
+    post_id: EntityId
 
 
 class Dislike(BaseModel):
@@ -35,5 +56,19 @@ class Dislike(BaseModel):
         user_id (int): Идентификатор пользователя, который поставил дизлайк.
         post_id (int): Идентификатор поста, которому был поставлен дизлайк.
     """
-    user_id: int
-    post_id: int
+    user_id: EntityId
+    post_id: EntityId
+
+
+class ReactionEvent(BaseModel):
+    """
+    Модель данных для реакции в пакетной загрузке (ReactionEvent).
+
+    Attributes:
+        post_id (int): Идентификатор поста.
+        user_id (int): Идентификатор пользователя.
+        kind (str): Тип реакции: "like" или "dislike".
+    """
+    post_id: EntityId
+    user_id: EntityId
+    kind: Literal["like", "dislike"]
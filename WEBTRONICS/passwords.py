@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+import config
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES
+    )
+
+
+def hash_password(password: str, n: int, r: int, p: int) -> str:
+    """
+    Вычисляет соленый хэш пароля функцией scrypt.
+
+    Parameters:
+        password (str): Пароль в открытом виде.
+        n (int): Параметр стоимости CPU/памяти (степень двойки).
+        r (int): Размер блока.
+        p (int): Параметр параллелизма.
+
+    Returns:
+        str: Хэш в формате scrypt$n$r$p$соль$ключ.
+    """
+    salt = os.urandom(SALT_BYTES)
+    key = _derive(password, salt, n, r, p)
+    return f"{SCHEME}${n}${r}${p}${salt.hex()}${key.hex()}"
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Проверяет пароль по сохраненному хэшу.
+
+    Сохраненные ранее пароли в открытом виде сравниваются за постоянное время.
+    Поврежденный хэш scrypt (неверные параметры или соль) считается несовпадением.
+
+    Parameters:
+        password (str): Пароль в открытом виде.
+        stored (str): Сохраненный хэш (или пароль в открытом виде для старых записей).
+
+    Returns:
+        bool: True, если пароль верный.
+    """
+    parts = stored.split("$")
+    if len(parts) != 6 or parts[0] != SCHEME:
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, n, r, p, salt, key = parts
+    try:
+        derived = _derive(password, bytes.fromhex(salt), int(n), int(r), int(p))
+    except (ValueError, OverflowError):
+        return False
+    return hmac.compare_digest(derived.hex(), key)
+
+
+class PasswordHasher:
+    """
+    Хэширование паролей в ограниченном пуле потоков.
+
+    scrypt освобождает GIL на время вычисления, поэтому пул потоков не
+    останавливает цикл событий во время массовых входов. Число ожидающих
+    и выполняемых задач ограничено: при переполнении запрос сразу получает 503.
+
+    Attributes:
+        n (int): Параметр стоимости scrypt для новых хэшей.
+        r (int): Размер блока scrypt.
+        p (int): Параметр параллелизма scrypt.
+        workers (int): Количество потоков пула.
+        queue_limit (int): Максимальное количество задач в пуле (вместе с ожидающими).
+        pending (int): Текущее количество задач в пуле.
+    """
+
+    _dummy: Optional[str] = None
+
+    def __init__(self, n: int, r: int, p: int, workers: int, queue_limit: int):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.queue_limit:
+            raise HTTPException(status_code=503, detail="Too many password operations", headers={"Retry-After": "1"})
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def needs_rehash(self, stored: str) -> bool:
+        """
+        Проверяет, нужно ли пересчитать хэш с текущими параметрами.
+
+        Parameters:
+            stored (str): Сохраненный хэш или пароль в открытом виде.
+
+        Returns:
+            bool: True для паролей в открытом виде и хэшей с другой стоимостью.
+        """
+        return not stored.startswith(f"{SCHEME}${self.n}${self.r}${self.p}$")
+
+    async def hash(self, password: str) -> str:
+        """
+        Вычисляет хэш пароля в пуле потоков.
+
+        Parameters:
+            password (str): Пароль в открытом виде.
+
+        Returns:
+            str: Хэш пароля.
+
+        Raises:
+            HTTPException: Если очередь пула переполнена (код 503).
+        """
+        return await self._submit(hash_password, password, self.n, self.r, self.p)
+
+    async def verify(self, password: str, stored: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Проверяет пароль в пуле потоков и при необходимости пересчитывает хэш.
+
+        Для неизвестного пользователя (stored равен None) пароль проверяется
+        по фиктивному хэшу с текущими параметрами, чтобы время ответа не
+        выдавало, существует ли учетная запись.
+
+        Parameters:
+            password (str): Пароль в открытом виде.
+            stored (Optional[str]): Сохраненный хэш или None для неизвестного пользователя.
+
+        Returns:
+            Tuple[bool, Optional[str]]: Признак верного пароля и новый хэш,
+            если старый нужно заменить (иначе None).
+
+        Raises:
+            HTTPException: Если очередь пула переполнена (код 503).
+        """
+        if stored is None:
+            if self._dummy is None:
+                self._dummy = await self._submit(hash_password, "", self.n, self.r, self.p)
+            await self._submit(verify_password, password, self._dummy)
+            return False, None
+        if not await self._submit(verify_password, password, stored):
+            return False, None
+        if self.needs_rehash(stored):
+            return True, await self._submit(hash_password, password, self.n, self.r, self.p)
+        return True, None
+
+    def shutdown(self) -> None:
+        """Останавливает пул потоков; следующая задача запустит новый пул."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    n=config.PASSWORD_SCRYPT_N,
+    r=config.PASSWORD_SCRYPT_R,
+    p=config.PASSWORD_SCRYPT_P,
+    workers=config.PASSWORD_HASH_WORKERS,
+    queue_limit=config.PASSWORD_HASH_QUEUE_LIMIT,
+)
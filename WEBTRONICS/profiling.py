@@ -0,0 +1,416 @@
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from typing import Dict, Optional, Pattern, Set, Tuple
+
+# Листовые функции, в которых поток ждет работы: такие выборки не учитываются
+_IDLE_FRAMES = frozenset((
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+))
+
+# Ключ выборок, не поместившихся в ограничение числа различных стеков
+_TRUNCATED = (0, ())
+
+
+class StackSampler:
+    """
+    Выборочный профилировщик: периодически снимает стеки всех потоков.
+
+    Стеки агрегируются в счетчики и отдаются в формате collapsed stacks
+    (flamegraph.pl, speedscope). В потоке цикла событий учитываются только
+    выборки, когда выполняется задача (обработчик запроса); в остальных
+    потоках — выборки, когда поток не ждет работы. Если задан маршрут,
+    учитываются только выборки цикла событий во время каждого every-го
+    запроса этого маршрута.
+
+    Если цикл событий работает в главном потоке, выборки снимаются по сигналу
+    таймера процессорного времени (ITIMER_PROF): обработчик выполняется в
+    главном потоке между инструкциями байт-кода и видит, что выполняется на
+    самом деле. Поток-сэмплер, который используется иначе, получает GIL только
+    когда цикл событий его отпускает — обычно в select между обработчиками,
+    поэтому короткие обработчики он почти не видит.
+
+    Выборка выполняется под GIL, поэтому ее стоимость — прямые накладные
+    расходы приложения. Пауза между выборками подбирается так, чтобы их доля
+    времени не превышала max_overhead; число различных стеков и глубина стека
+    ограничены.
+
+    Attributes:
+        interval (float): Минимальный интервал между выборками, в секундах.
+        max_overhead (float): Максимальная доля времени, занятая выборками.
+        max_stacks (int): Максимальное число различных стеков.
+        max_depth (int): Максимальная глубина стека.
+        route (Optional[str]): Шаблон пути профилируемого маршрута (только во время сеанса).
+        every (int): Профилируется каждый every-й запрос маршрута.
+        samples (int): Количество учтенных выборок последнего сеанса.
+    """
+
+    def __init__(self, interval: float, max_overhead: float, max_stacks: int, max_depth: int):
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.route: Optional[str] = None
+        self.every = 1
+        self.samples = 0
+        self._counts: Dict[Tuple[int, tuple], int] = {}
+        self._selected: Set[asyncio.Task] = set()
+        self._seen = 0
+        self._active = False
+        self._signal = False
+        self._previous_handler = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_ident = 0
+        self._labels: Dict[object, str] = {}
+        self._idle: Dict[object, bool] = {}
+        self._names: Dict[int, str] = {}
+        self._started = 0.0
+        self._stopped = 0.0
+        self._deadline = 0.0
+        self._cpu_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        """
+        Returns:
+            bool: True, если идет сеанс профилирования.
+        """
+        if self._active and self._signal and time.monotonic() >= self._deadline:
+            # Сигналы таймера не приходят, пока процесс простаивает: завершаем сеанс здесь
+            self._finish()
+        return self._active
+
+    def start(self, seconds: float, route: Optional[str] = None, every: int = 1) -> None:
+        """
+        Начинает сеанс профилирования; результаты прошлого сеанса сбрасываются.
+
+        Вызывается из цикла событий: его поток и задачи отличаются от остальных.
+
+        Args:
+            seconds (float): Длительность сеанса, в секундах.
+            route (Optional[str]): Шаблон пути маршрута; None — профилировать все.
+            every (int): Профилировать каждый every-й запрос маршрута.
+
+        Raises:
+            RuntimeError: Если сеанс уже идет.
+        """
+        if self.running:
+            raise RuntimeError("Profiling session is already running")
+        self._loop = asyncio.get_running_loop()
+        self._loop_ident = threading.get_ident()
+        self._counts = {}
+        self._selected.clear()
+        self._seen = 0
+        self.samples = 0
+        self._cpu_time = 0.0
+        self.route = route
+        self.every = max(every, 1)
+        self._started = time.monotonic()
+        self._stopped = 0.0
+        self._deadline = self._started + seconds
+        self._active = True
+        self._signal = threading.current_thread() is threading.main_thread() and hasattr(signal, "setitimer")
+        if self._signal:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval)
+        else:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Останавливает сеанс профилирования (результаты сохраняются).
+
+        Вызывается из потока цикла событий.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._finish()
+
+    def _finish(self) -> None:
+        if not self._active:
+            return
+        self._active = False
+        self.route = None
+        self._selected.clear()
+        self._stopped = time.monotonic()
+        if self._signal:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+
+    def select(self) -> Optional[asyncio.Task]:
+        """
+        Решает, профилировать ли очередной запрос маршрута, и отмечает его задачу.
+
+        Returns:
+            Optional[asyncio.Task]: Задача запроса, если он профилируется (ее
+            нужно передать в release по окончании), иначе None.
+        """
+        if not self.running:
+            return None
+        self._seen += 1
+        if self._seen % self.every:
+            return None
+        task = asyncio.current_task()
+        self._selected.add(task)
+        return task
+
+    def release(self, task: asyncio.Task) -> None:
+        """
+        Снимает отметку с задачи профилируемого запроса.
+
+        Args:
+            task (asyncio.Task): Задача, которую вернул select.
+        """
+        self._selected.discard(task)
+
+    def _on_signal(self, signum, frame) -> None:
+        if not self._active:
+            return
+        if time.monotonic() >= self._deadline:
+            self._finish()
+            return
+        started = time.perf_counter()
+        frames = sys._current_frames()
+        # Кадр главного потока в sys._current_frames — сам обработчик; нужен прерванный
+        frames[self._loop_ident] = frame
+        self._sample(frames)
+        cost = time.perf_counter() - started
+        self._cpu_time += cost
+        # Таймер взводится заново: доля времени выборок не больше max_overhead
+        signal.setitimer(signal.ITIMER_PROF, max(self.interval, cost / self.max_overhead - cost))
+
+    def _run(self) -> None:
+        delay = self.interval
+        ident = threading.get_ident()
+        while not self._stop.wait(delay) and time.monotonic() < self._deadline:
+            started = time.thread_time()
+            frames = sys._current_frames()
+            del frames[ident]
+            self._sample(frames)
+            cost = time.thread_time() - started
+            self._cpu_time += cost
+            # Пока поток выборки держит GIL, приложение стоит: доля выборок не больше max_overhead
+            delay = max(self.interval, cost / self.max_overhead - cost)
+        self._finish()
+
+    def _sample(self, frames: dict) -> None:
+        running = asyncio.current_task(self._loop)
+        for ident, frame in frames.items():
+            if ident == self._loop_ident:
+                if running is None or (self.route is not None and running not in self._selected):
+                    continue
+            elif self.route is not None or self._is_idle(frame.f_code):
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            key = (ident, tuple(stack))
+            count = self._counts.get(key)
+            if count is None and len(self._counts) >= self.max_stacks:
+                key = _TRUNCATED
+                count = self._counts.get(key)
+            self._counts[key] = (count or 0) + 1
+            self.samples += 1
+
+    def _is_idle(self, code) -> bool:
+        idle = self._idle.get(code)
+        if idle is None:
+            idle = self._idle[code] = (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES
+        return idle
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+        return label
+
+    def _thread_name(self, ident: int) -> str:
+        name = self._names.get(ident)
+        if name is None:
+            for thread in threading.enumerate():
+                self._names[thread.ident] = thread.name
+            name = self._names.setdefault(ident, f"thread-{ident}")
+        return name
+
+    def collapsed(self) -> bytes:
+        """
+        Возвращает стеки последнего сеанса в формате collapsed stacks.
+
+        Каждая строка — кадры от корня к листу через ";" (первый — имя потока)
+        и число выборок через пробел.
+
+        Returns:
+            bytes: Текст для flamegraph.pl или speedscope.
+        """
+        lines: Dict[str, int] = {}
+        for (ident, stack), count in dict(self._counts).items():
+            if not stack:
+                line = "[truncated]"
+            else:
+                line = ";".join([self._thread_name(ident)] + [self._label(code) for code in reversed(stack)])
+            lines[line] = lines.get(line, 0) + count
+        return "".join(f"{line} {count}\n" for line, count in sorted(lines.items())).encode()
+
+    def stats(self) -> dict:
+        """
+        Возвращает состояние профилировщика.
+
+        Returns:
+            dict: Идет ли сеанс, маршрут, длительность, число выборок и
+            различных стеков и доля времени, занятая выборками.
+        """
+        if not self._started:
+            return {"running": False, "samples": 0}
+        running = self.running
+        elapsed = (self._stopped or time.monotonic()) - self._started
+        return {
+            "running": running,
+            "mode": "signal" if self._signal else "thread",
+            "route": self.route,
+            "every": self.every,
+            "elapsed": elapsed,
+            "remaining": max(self._deadline - time.monotonic(), 0.0) if running else 0.0,
+            "samples": self.samples,
+            "stacks": len(self._counts),
+            "truncated": self._counts.get(_TRUNCATED, 0),
+            "overhead": self._cpu_time / elapsed if elapsed else 0.0,
+        }
+
+
+class RequestProfiler:
+    """
+    Профилирование одного запроса через cProfile по требованию.
+
+    После arm следующий запрос указанного маршрута выполняется под cProfile.
+    Профилировщик перехватывает весь поток цикла событий, поэтому в отчет
+    попадают и задачи других запросов, выполнявшиеся, пока профилируемый
+    ждал ввода-вывода.
+
+    Attributes:
+        route (Optional[str]): Шаблон пути маршрута, ожидающего профилирования.
+    """
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self._active = False
+        self._result: Optional[Tuple[cProfile.Profile, dict]] = None
+
+    def arm(self, route: str) -> None:
+        """
+        Включает профилирование следующего запроса маршрута.
+
+        Args:
+            route (str): Шаблон пути маршрута.
+        """
+        self.route = route
+
+    def take(self) -> Optional[cProfile.Profile]:
+        """
+        Возвращает профилировщик для очередного запроса маршрута.
+
+        Одновременно профилируется не больше одного запроса.
+
+        Returns:
+            Optional[cProfile.Profile]: Профилировщик или None.
+        """
+        if self._active:
+            return None
+        self.route = None
+        self._active = True
+        return cProfile.Profile()
+
+    def finish(self, profile: cProfile.Profile, info: dict) -> None:
+        """
+        Сохраняет результат профилирования запроса.
+
+        Args:
+            profile (cProfile.Profile): Остановленный профилировщик.
+            info (dict): Сведения о запросе (метод, путь, маршрут, длительность).
+        """
+        self._active = False
+        self._result = (profile, info)
+
+    def report(self, limit: int, sort: str = "cumulative") -> Optional[str]:
+        """
+        Формирует текстовый отчет pstats по последнему запросу.
+
+        Args:
+            limit (int): Количество строк отчета.
+            sort (str): Ключ сортировки pstats.
+
+        Returns:
+            Optional[str]: Отчет или None, если запрос еще не профилировался.
+        """
+        if self._result is None:
+            return None
+        profile, info = self._result
+        stream = io.StringIO()
+        stream.write(" ".join(f"{name}={value}" for name, value in info.items()) + "\n")
+        pstats.Stats(profile, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware, подключающее профилировщики к запросам.
+
+    Пока не идет сеанс профилирования маршрута и не ожидается профилирование
+    запроса через cProfile, запрос проходит без дополнительной работы; иначе
+    путь запроса сверяется с регулярным выражением только нужного маршрута.
+    """
+
+    def __init__(self, app, sampler: StackSampler, requests: RequestProfiler):
+        self.app = app
+        self.sampler = sampler
+        self.requests = requests
+        self._patterns: Dict[str, Optional[Pattern]] = {}
+
+    def _matches(self, route: str, scope: dict) -> bool:
+        pattern = self._patterns.get(route, False)
+        if pattern is False:
+            pattern = self._patterns[route] = next(
+                (candidate.path_regex for candidate in scope["app"].routes if getattr(candidate, "path", None) == route),
+                None,
+            )
+        return pattern is not None and pattern.match(scope["path"]) is not None
+
+    async def __call__(self, scope, receive, send):
+        sampled, profiled = self.sampler.route, self.requests.route
+        if scope["type"] != "http" or (sampled is None and profiled is None):
+            await self.app(scope, receive, send)
+            return
+
+        task = self.sampler.select() if sampled is not None and self._matches(sampled, scope) else None
+        profile = self.requests.take() if profiled is not None and self._matches(profiled, scope) else None
+        started = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if profile is not None:
+                profile.disable()
+                self.requests.finish(profile, {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": profiled,
+                    "elapsed": round(time.perf_counter() - started, 6),
+                })
+            if task is not None:
+                self.sampler.release(task)
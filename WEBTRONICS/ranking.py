@@ -0,0 +1,220 @@
+import bisect
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from reactions import LIKE
+
+
+class TopRanking:
+    """
+    Рейтинг постов по разнице лайков и дизлайков, поддерживаемый инкрементально.
+
+    Посты разложены по корзинам с одинаковым счетом, а сами значения счета
+    хранятся в отсортированном списке. Реакция перекладывает пост в соседнюю
+    корзину, а выборка K лучших проходит корзины сверху вниз и стоит O(K).
+    Порядок постов с одинаковым счетом не определен.
+    """
+
+    def __init__(self):
+        self._scores: Dict[int, int] = {}
+        self._buckets: Dict[int, Set[int]] = {}
+        self._levels: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _move(self, post_id: int, old: Optional[int], new: Optional[int]) -> None:
+        if old is not None:
+            bucket = self._buckets[old]
+            bucket.discard(post_id)
+            if not bucket:
+                del self._buckets[old]
+                del self._levels[bisect.bisect_left(self._levels, old)]
+        if new is not None:
+            bucket = self._buckets.get(new)
+            if bucket is None:
+                bucket = self._buckets[new] = set()
+                bisect.insort(self._levels, new)
+            bucket.add(post_id)
+
+    def set_score(self, post_id: int, score: int) -> None:
+        """
+        Устанавливает счет поста (например, при загрузке из хранилища).
+
+        Args:
+            post_id (int): Идентификатор поста.
+            score (int): Разница лайков и дизлайков.
+        """
+        old = self._scores.get(post_id)
+        if old == score:
+            return
+        self._scores[post_id] = score
+        self._move(post_id, old, score)
+
+    def apply(self, post_id: int, previous: Optional[int], kind: int) -> None:
+        """
+        Учитывает новую реакцию пользователя.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            previous (Optional[int]): Предыдущая реакция пользователя или None.
+            kind (int): Новая реакция: LIKE или DISLIKE.
+        """
+        if previous == kind:
+            return
+        delta = (1 if kind == LIKE else -1) - (0 if previous is None else (1 if previous == LIKE else -1))
+        self.set_score(post_id, self._scores.get(post_id, 0) + delta)
+
+    def remove(self, post_id: int) -> None:
+        """
+        Убирает пост из рейтинга (например, при удалении поста).
+
+        Args:
+            post_id (int): Идентификатор поста.
+        """
+        old = self._scores.pop(post_id, None)
+        if old is not None:
+            self._move(post_id, old, None)
+
+    def top(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Возвращает K постов с наибольшим счетом.
+
+        Args:
+            k (int): Количество постов.
+
+        Returns:
+            List[Tuple[int, int]]: Пары (ID поста, счет) по убыванию счета.
+        """
+        result = []
+        for level in reversed(self._levels):
+            for post_id in itertools.islice(self._buckets[level], k - len(result)):
+                result.append((post_id, level))
+            if len(result) >= k:
+                break
+        return result
+
+
+class TrendingRanking:
+    """
+    Рейтинг «в тренде»: реакции за скользящее окно с экспоненциальным затуханием.
+
+    Реакции складываются в счетчики по временным корзинам (по умолчанию
+    минутным). Вклад реакции растет как 2^(t / half_life) от общей точки
+    отсчета, поэтому со временем все счета затухают одинаково и порядок постов
+    не меняется без новых событий. Корзина, вышедшая из окна, вычитается из
+    счетов целиком. Список лучших постов пересчитывается ограниченной кучей не
+    чаще раза в refresh_interval секунд, а запрос K лучших отдает срез за O(K).
+
+    Attributes:
+        window (float): Длина окна в секундах.
+        bucket_seconds (float): Длина временной корзины в секундах.
+        half_life (float): Период полураспада веса реакции в секундах.
+        max_k (int): Сколько лучших постов хранится в готовом списке.
+        refresh_interval (float): Минимальный интервал пересчета списка в секундах.
+    """
+
+    def __init__(
+        self,
+        window: float = 3600.0,
+        bucket_seconds: float = 60.0,
+        half_life: float = 1800.0,
+        max_k: int = 100,
+        refresh_interval: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.half_life = half_life
+        self.max_k = max_k
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._epoch = clock()
+        self._scores: Dict[int, float] = {}
+        self._buckets: deque = deque()
+        self._top: List[Tuple[int, float]] = []
+        self._refreshed_at = float("-inf")
+        self._dirty = False
+
+    def _weight(self, bucket_start: float) -> float:
+        return 2.0 ** ((bucket_start - self._epoch) / self.half_life)
+
+    def _expire(self, now: float) -> None:
+        horizon = now - self.window
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= horizon:
+            bucket_start, counts = self._buckets.popleft()
+            weight = self._weight(bucket_start)
+            for post_id, count in counts.items():
+                score = self._scores.get(post_id)
+                if score is None:
+                    continue
+                score -= count * weight
+                if score <= 1e-9 * weight:
+                    del self._scores[post_id]
+                else:
+                    self._scores[post_id] = score
+            self._dirty = True
+        # Переносим точку отсчета к началу окна, чтобы веса не переполнялись;
+        # назад она не сдвигается, даже если окно длиннее 32 периодов полураспада
+        if horizon - self._epoch > 32 * self.half_life:
+            self._rebase(horizon)
+
+    def _rebase(self, epoch: float) -> None:
+        factor = 2.0 ** ((self._epoch - epoch) / self.half_life)
+        self._epoch = epoch
+        for post_id in self._scores:
+            self._scores[post_id] *= factor
+        self._top = [(post_id, score * factor) for post_id, score in self._top]
+
+    def record(self, post_id: int, count: int = 1) -> None:
+        """
+        Учитывает реакцию на пост в текущий момент.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            count (int): Количество реакций.
+        """
+        now = self._clock()
+        self._expire(now)
+        bucket_start = now - now % self.bucket_seconds
+        if not self._buckets or self._buckets[-1][0] != bucket_start:
+            self._buckets.append((bucket_start, {}))
+        counts = self._buckets[-1][1]
+        counts[post_id] = counts.get(post_id, 0) + count
+        self._scores[post_id] = self._scores.get(post_id, 0.0) + count * self._weight(bucket_start)
+        self._dirty = True
+
+    def remove(self, post_id: int) -> None:
+        """
+        Убирает пост из рейтинга (например, при удалении поста).
+
+        Args:
+            post_id (int): Идентификатор поста.
+        """
+        if self._scores.pop(post_id, None) is not None:
+            for _, counts in self._buckets:
+                counts.pop(post_id, None)
+            self._top = [item for item in self._top if item[0] != post_id]
+
+    def top(self, k: int) -> List[Tuple[int, float]]:
+        """
+        Возвращает K постов с наибольшим затухающим счетом.
+
+        Args:
+            k (int): Количество постов (не больше max_k).
+
+        Returns:
+            List[Tuple[int, float]]: Пары (ID поста, счет) по убыванию счета;
+            счет приведен к текущему моменту.
+        """
+        now = self._clock()
+        self._expire(now)
+        if self._dirty and now - self._refreshed_at >= self.refresh_interval:
+            self._top = heapq.nlargest(self.max_k, self._scores.items(), key=lambda item: item[1])
+            self._refreshed_at = now
+            self._dirty = False
+        scale = 2.0 ** ((self._epoch - now) / self.half_life)
+        return [(post_id, score * scale) for post_id, score in self._top[:k]]
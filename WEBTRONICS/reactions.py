@@ -0,0 +1,181 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+LIKE = 1
+DISLIKE = -1
+
+
+class ReactionStore:
+    """
+    Хранилище реакций (лайков и дизлайков) на посты.
+
+    Для каждой пары (пост, пользователь) хранится не более одной реакции,
+    поэтому повторный лайк ничего не меняет, а лайк после дизлайка переключает
+    реакцию. Количество лайков и дизлайков поддерживается счетчиками и
+    читается за O(1).
+    """
+
+    # ID постов, чьи словари реакций и счетчики общие с копией для снимка (copy-on-write);
+    # атрибут класса — значение по умолчанию и для хранилищ из старых снимков
+    _shared: Optional[Set[int]] = None
+
+    def __init__(self):
+        self._reactions: Dict[int, Dict[int, int]] = {}
+        self._counts: Dict[int, list] = {}
+
+    def __len__(self) -> int:
+        return sum(len(users) for users in self._reactions.values())
+
+    def copy(self) -> "ReactionStore":
+        """
+        Возвращает копию хранилища для снимка состояния.
+
+        Копируются только словари верхнего уровня, поэтому копия снимается
+        быстро. Реакции и счетчики поста остаются общими с копией, пока пост не
+        изменится: перед первым изменением хранилище заменяет их своими
+        (copy-on-write). Когда копия больше не нужна, вызовите release.
+
+        Returns:
+            ReactionStore: Копия хранилища.
+        """
+        clone = ReactionStore()
+        clone._reactions = dict(self._reactions)
+        clone._counts = dict(self._counts)
+        self._shared = set(self._reactions)
+        return clone
+
+    def release(self) -> None:
+        """Прекращает copy-on-write после того, как копия из copy больше не используется."""
+        self._shared = None
+
+    def _own(self, post_id: int) -> None:
+        # Пост больше не делит реакции и счетчики с копией для снимка
+        self._shared.discard(post_id)
+        self._reactions[post_id] = dict(self._reactions[post_id])
+        self._counts[post_id] = list(self._counts[post_id])
+
+    def set(self, post_id: int, user_id: int, kind: int) -> Optional[int]:
+        """
+        Устанавливает реакцию пользователя на пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+            kind (int): Тип реакции: LIKE или DISLIKE.
+
+        Returns:
+            Optional[int]: Предыдущая реакция пользователя или None, если ее не было.
+
+        Raises:
+            ValueError: Если передан неизвестный тип реакции.
+        """
+        if kind not in (LIKE, DISLIKE):
+            raise ValueError(f"Unknown reaction kind: {kind}")
+        if self._shared is not None and post_id in self._shared:
+            self._own(post_id)
+        users = self._reactions.setdefault(post_id, {})
+        previous = users.get(user_id)
+        if previous == kind:
+            return previous
+
+        # Переключаем реакцию и счетчики за один шаг
+        users[user_id] = kind
+        counts = self._counts.setdefault(post_id, [0, 0])
+        if previous is not None:
+            counts[previous != LIKE] -= 1
+        counts[kind != LIKE] += 1
+        return previous
+
+    def remove(self, post_id: int, user_id: int) -> Optional[int]:
+        """
+        Удаляет реакцию пользователя на пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            Optional[int]: Удаленная реакция или None, если ее не было.
+        """
+        users = self._reactions.get(post_id)
+        if not users or user_id not in users:
+            return None
+        if self._shared is not None and post_id in self._shared:
+            self._own(post_id)
+            users = self._reactions[post_id]
+        kind = users.pop(user_id)
+        self._counts[post_id][kind != LIKE] -= 1
+        if not users:
+            del self._reactions[post_id]
+            del self._counts[post_id]
+        return kind
+
+    def get(self, post_id: int, user_id: int) -> Optional[int]:
+        """
+        Возвращает текущую реакцию пользователя на пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            Optional[int]: LIKE, DISLIKE или None.
+        """
+        return self._reactions.get(post_id, {}).get(user_id)
+
+    def counts(self, post_id: int) -> Tuple[int, int]:
+        """
+        Возвращает количество лайков и дизлайков поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Tuple[int, int]: Пара (лайки, дизлайки).
+        """
+        counts = self._counts.get(post_id)
+        if counts is None:
+            return 0, 0
+        return counts[0], counts[1]
+
+    def iter_counts(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Перебирает счетчики реакций всех постов.
+
+        Yields:
+            Tuple[int, int, int]: Тройка (ID поста, лайки, дизлайки).
+        """
+        for post_id, counts in list(self._counts.items()):
+            yield post_id, counts[0], counts[1]
+
+    def iter_reactions(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Перебирает все реакции.
+
+        Yields:
+            Tuple[int, int, int]: Тройка (ID поста, ID пользователя, LIKE или DISLIKE).
+        """
+        for post_id, users in self._reactions.items():
+            for user_id, kind in users.items():
+                yield post_id, user_id, kind
+
+    def post_reactions(self, post_id: int) -> List[Tuple[int, int]]:
+        """
+        Возвращает копию реакций на пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            List[Tuple[int, int]]: Пары (ID пользователя, LIKE или DISLIKE).
+        """
+        return list(self._reactions.get(post_id, {}).items())
+
+    def drop_post(self, post_id: int) -> None:
+        """
+        Удаляет все реакции на пост (например, при удалении поста).
+
+        Args:
+            post_id (int): Идентификатор поста.
+        """
+        self._reactions.pop(post_id, None)
+        self._counts.pop(post_id, None)
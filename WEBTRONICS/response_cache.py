@@ -0,0 +1,150 @@
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from shared_counters import SharedReactionCounters
+
+
+class PostResponseCache:
+    """
+    Кэш сериализованных ответов GET /posts/{post_id} с версиями постов.
+
+    У каждого поста есть счетчик версии, который увеличивается при изменении,
+    удалении и реакциях. В кэше хранятся готовые байты ответа вместе с версией,
+    по которой они построены, поэтому устаревшая запись просто не совпадает по
+    версии. Версия входит в ETag; к нему добавляется случайный идентификатор
+    запуска процесса, чтобы ETag не совпадали после перезапуска.
+
+    Если заданы общие счетчики (SharedReactionCounters), версии постов и
+    идентификатор запуска берутся из них: изменение поста в одном воркере
+    делает устаревшими ответы в кэшах всех воркеров, а ETag, выданный одним
+    воркером, совпадает в других.
+
+    Attributes:
+        maxsize (int): Максимальное количество ответов в кэше.
+        shared (Optional[SharedReactionCounters]): Общие для воркеров версии постов.
+        hits (int): Количество ответов, отданных из кэша.
+        misses (int): Количество ответов, собранных заново.
+        not_modified (int): Количество ответов 304 Not Modified.
+    """
+
+    def __init__(self, maxsize: int, shared: Optional[SharedReactionCounters] = None):
+        self.maxsize = maxsize
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._boot = os.urandom(4).hex()
+        self._versions: Dict[int, int] = {}
+        self._entries: "OrderedDict[int, Tuple[int, bytes]]" = OrderedDict()
+
+    def version(self, post_id: int) -> int:
+        """
+        Возвращает текущую версию поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            int: Номер версии.
+        """
+        if self.shared is not None and self.shared.covers(post_id):
+            return self.shared.version(post_id)
+        return self._versions.get(post_id, 0)
+
+    def bump(self, post_id: int) -> None:
+        """
+        Отмечает, что пост изменился, и выбрасывает его ответ из кэша.
+
+        Версия удаленного поста сохраняется, чтобы старый ETag больше не совпал.
+
+        Args:
+            post_id (int): Идентификатор поста.
+        """
+        if self.shared is not None and self.shared.covers(post_id):
+            self.shared.bump(post_id)
+        else:
+            self._versions[post_id] = self._versions.get(post_id, 0) + 1
+        self._entries.pop(post_id, None)
+
+    def etag(self, post_id: int, version: int) -> str:
+        """
+        Формирует ETag для версии поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            version (int): Номер версии.
+
+        Returns:
+            str: Значение заголовка ETag.
+        """
+        boot = self.shared.boot if self.shared is not None and self.shared.covers(post_id) else self._boot
+        return f'"{boot}-{post_id}-{version}"'
+
+    def get(self, post_id: int, version: int) -> Optional[bytes]:
+        """
+        Возвращает сериализованный ответ, если он построен по указанной версии.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            version (int): Номер версии.
+
+        Returns:
+            Optional[bytes]: Тело ответа или None при промахе.
+        """
+        entry = self._entries.get(post_id)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(post_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, post_id: int, version: int, body: bytes) -> None:
+        """
+        Сохраняет сериализованный ответ, если версия поста не изменилась.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            version (int): Версия, по которой построен ответ.
+            body (bytes): Тело ответа.
+        """
+        if self.maxsize <= 0 or self.version(post_id) != version:
+            return
+        self._entries[post_id] = (version, body)
+        self._entries.move_to_end(post_id)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики кэша.
+
+        Returns:
+            dict: Попадания, промахи, ответы 304, доля попаданий и размер кэша.
+        """
+        requests = self.hits + self.misses + self.not_modified
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": (self.hits + self.not_modified) / requests if requests else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверяет, совпадает ли ETag с заголовком If-None-Match.
+
+    Args:
+        if_none_match (Optional[str]): Значение заголовка If-None-Match.
+        etag (str): Текущий ETag ресурса.
+
+    Returns:
+        bool: True, если клиенту можно ответить 304 Not Modified.
+    """
+    if not if_none_match:
+        return False
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,357 @@
+import asyncio
+import gzip
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import Counter, registry
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard — необязательная зависимость
+    zstandard = None
+
+compression_input = registry.register(Counter(
+    "webtronics_compression_input_bytes_total", "Response bytes before compression.", ("encoding",),
+))
+compression_output = registry.register(Counter(
+    "webtronics_compression_output_bytes_total", "Response bytes after compression.", ("encoding",),
+))
+
+# Типы содержимого, которые имеет смысл сжимать (кроме text/*)
+COMPRESSIBLE_TYPES = frozenset((
+    b"application/json",
+    b"application/javascript",
+    b"application/x-ndjson",
+    b"application/xml",
+    b"image/svg+xml",
+))
+
+# Поток SSE отправляется событиями по мере появления; буфер сжатия их задерживал бы
+_STREAM_TYPES = frozenset((b"text/event-stream",))
+
+# Разобранные заголовки Accept-Encoding: у клиентов их немного разных
+_ACCEPT_CACHE_SIZE = 256
+
+
+def _gzip_stream(level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return (lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def _brotli_stream(quality: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = brotli.Compressor(quality=quality)
+    return (lambda data: compressor.process(data) + compressor.flush()), compressor.finish
+
+
+def _zstd_stream(level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return (
+        (lambda data: compressor.compress(data) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)),
+        compressor.flush,
+    )
+
+
+def make_encoders(gzip_level: int, brotli_quality: int, zstd_level: int) -> Dict[str, tuple]:
+    """
+    Собирает доступные алгоритмы сжатия в порядке предпочтения сервера.
+
+    brotli и zstd используются, только если установлены пакеты brotli и
+    zstandard; gzip доступен всегда.
+
+    Args:
+        gzip_level (int): Уровень сжатия gzip (1–9).
+        brotli_quality (int): Качество сжатия brotli (0–11).
+        zstd_level (int): Уровень сжатия zstd (1–22).
+
+    Returns:
+        Dict[str, tuple]: Кодировка -> (функция сжатия тела целиком, фабрика
+        потокового сжатия, возвращающая пару (сжать фрагмент, завершить)).
+    """
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = (
+            lambda data: brotli.compress(data, quality=brotli_quality),
+            lambda: _brotli_stream(brotli_quality),
+        )
+    if zstandard is not None:
+        # ZstdCompressor нельзя использовать из нескольких потоков одновременно
+        encoders["zstd"] = (
+            lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data),
+            lambda: _zstd_stream(zstd_level),
+        )
+    encoders["gzip"] = (
+        lambda data: gzip.compress(data, gzip_level, mtime=0),
+        lambda: _gzip_stream(gzip_level),
+    )
+    return encoders
+
+
+def choose_encoding(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Выбирает кодировку по заголовку Accept-Encoding.
+
+    Выбирается кодировка с наибольшим весом q; при равных весах — первая по
+    порядку предпочтения сервера. Кодировки, не названные клиентом, получают
+    вес "*", если он указан, иначе не используются; q=0 запрещает кодировку.
+
+    Args:
+        accept_encoding (str): Значение заголовка Accept-Encoding.
+        available (List[str]): Кодировки сервера в порядке предпочтения.
+
+    Returns:
+        Optional[str]: Выбранная кодировка или None, если сжимать нельзя.
+    """
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+    best, best_weight = None, 0.0
+    for name in available:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+class CompressedResponseCache:
+    """
+    LRU-кэш сжатых тел версионированных ответов.
+
+    Ключ — путь, ETag и кодировка: ETag меняется вместе с содержимым (версия
+    поста, хэш схемы OpenAPI), поэтому запись не нужно сбрасывать — ответы
+    устаревших версий вытесняются сами. Размер кэша ограничен суммой байт.
+
+    Attributes:
+        max_bytes (int): Максимальный суммарный размер сжатых тел.
+        size (int): Текущий суммарный размер сжатых тел.
+        hits (int): Количество ответов, отданных из кэша.
+        misses (int): Количество ответов, сжатых заново.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bytes, str], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[str, bytes, str]) -> Optional[bytes]:
+        """
+        Возвращает сжатое тело ответа.
+
+        Args:
+            key (Tuple[str, bytes, str]): Путь, ETag и кодировка.
+
+        Returns:
+            Optional[bytes]: Сжатое тело или None при промахе.
+        """
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: Tuple[str, bytes, str], body: bytes) -> None:
+        """
+        Сохраняет сжатое тело ответа, вытесняя давно не запрашиваемые.
+
+        Args:
+            key (Tuple[str, bytes, str]): Путь, ETag и кодировка.
+            body (bytes): Сжатое тело.
+        """
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики кэша.
+
+        Returns:
+            dict: Попадания, промахи, доля попаданий, число записей и их размер.
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class CompressionMiddleware:
+    """
+    ASGI-middleware сжатия ответов по заголовку Accept-Encoding.
+
+    Сжимаются ответы текстовых типов (JSON, HTML, NDJSON и т. п.) размером не
+    меньше minimum_size байт без собственного Content-Encoding; к ним
+    добавляется Vary: Accept-Encoding, а ETag становится слабым. Тела длиннее
+    offload_size байт сжимаются в пуле потоков, чтобы не задерживать цикл
+    событий. Сжатые тела ответов с ETag хранятся в кэше и повторно не
+    сжимаются. Потоковые ответы (выгрузка) сжимаются по фрагментам, поток SSE
+    не сжимается.
+    """
+
+    def __init__(
+        self,
+        app,
+        encoders: Dict[str, tuple],
+        minimum_size: int,
+        offload_size: int,
+        cache: Optional[CompressedResponseCache] = None,
+    ):
+        self.app = app
+        self.encoders = encoders
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.cache = cache
+        self._available = list(encoders)
+        self._accept: Dict[bytes, Optional[str]] = {}
+
+    def _encoding(self, scope: dict) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = self._accept.get(value, False)
+                if encoding is False:
+                    if len(self._accept) >= _ACCEPT_CACHE_SIZE:
+                        self._accept.clear()
+                    encoding = self._accept[value] = choose_encoding(value.decode("latin-1"), self._available)
+                return encoding
+        return None
+
+    async def _compress(self, compress: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= self.offload_size:
+            return await asyncio.to_thread(compress, data)
+        return compress(data)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._encoding(scope)
+        start = None
+        # Начало тела копится, пока не наберется minimum_size байт: потоковый ответ
+        # тоже может оказаться маленьким, и сжимать его невыгодно
+        pending: List[bytes] = []
+        pending_size = 0
+        stream = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, pending_size, stream, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if self._compressible(message):
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is not None:
+                data = await self._compress(stream[0], body) if body else b""
+                if not more_body:
+                    data += stream[1]()
+                compression_input.inc(encoding, amount=len(body))
+                compression_output.inc(encoding, amount=len(data))
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            if more_body and pending_size + len(body) < self.minimum_size:
+                pending.append(body)
+                pending_size += len(body)
+                return
+            if pending:
+                body = b"".join(pending) + body
+                pending.clear()
+            if not more_body and len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            if encoding is None:
+                passthrough = True
+                await send({**start, "headers": start["headers"] + [(b"vary", b"Accept-Encoding")]})
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            compress, make_stream = self.encoders[encoding]
+            headers, etag = [(b"vary", b"Accept-Encoding"), (b"content-encoding", encoding.encode())], None
+            for name, value in start["headers"]:
+                if name == b"etag":
+                    # Сжатое тело отличается побайтно, поэтому ETag становится слабым
+                    etag = value
+                    headers.append((name, value if value.startswith(b"W/") else b"W/" + value))
+                elif name != b"content-length":
+                    headers.append((name, value))
+            if more_body:
+                # Длина сжатого потока заранее неизвестна: ответ уходит частями без Content-Length
+                stream = make_stream()
+                await send({**start, "headers": headers})
+                data = await self._compress(stream[0], body)
+            else:
+                data = await self._compress_body(scope["path"], etag, encoding, compress, body)
+                headers.append((b"content-length", str(len(data)).encode()))
+                await send({**start, "headers": headers})
+            compression_input.inc(encoding, amount=len(body))
+            compression_output.inc(encoding, amount=len(data))
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(start: dict) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        content_type = b""
+        for name, value in start["headers"]:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.partition(b";")[0].strip().lower()
+        if content_type in _STREAM_TYPES:
+            return False
+        return content_type.startswith(b"text/") or content_type in COMPRESSIBLE_TYPES or content_type.endswith(b"+json")
+
+    async def _compress_body(
+        self, path: str, etag: Optional[bytes], encoding: str, compress: Callable[[bytes], bytes], body: bytes
+    ) -> bytes:
+        if etag is None or self.cache is None:
+            return await self._compress(compress, body)
+        key = (path, etag, encoding)
+        data = self.cache.get(key)
+        if data is None:
+            data = await self._compress(compress, body)
+            self.cache.put(key, data)
+        return data
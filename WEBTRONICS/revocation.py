@@ -0,0 +1,159 @@
+import math
+import time
+from typing import Dict
+
+
+class BloomFilter:
+    """
+    Фильтр Блума по 128-битным ключам.
+
+    Ключи — случайные идентификаторы токенов (jti), поэтому они уже равномерно
+    распределены и отдельная хэш-функция не нужна: позиции битов получаются
+    двойным хэшированием из младшей и старшей половин ключа. Число битов —
+    степень двойки, поэтому позиция вычисляется маской, а не делением.
+
+    Фильтр может ошибочно ответить «есть» (с вероятностью около error_rate
+    при заполнении до capacity), но никогда не отвечает «нет» для
+    добавленного ключа.
+
+    Attributes:
+        capacity (int): Расчетное число ключей.
+        size (int): Число битов.
+        hashes (int): Число позиций на ключ.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        bits = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = 1 << max(6, (bits - 1).bit_length())
+        self.hashes = max(1, round(bits / self.capacity * math.log(2)))
+        self._mask = self.size - 1
+        self._bits = bytearray(self.size // 8)
+
+    def add(self, key: int) -> None:
+        """
+        Добавляет ключ в фильтр.
+
+        Args:
+            key (int): 128-битный ключ.
+        """
+        bits, mask = self._bits, self._mask
+        position, step = key, (key >> 64) | 1
+        for _ in range(self.hashes):
+            index = position & mask
+            bits[index >> 3] |= 1 << (index & 7)
+            position += step
+
+    def __contains__(self, key: int) -> bool:
+        bits, mask = self._bits, self._mask
+        position, step = key, (key >> 64) | 1
+        for _ in range(self.hashes):
+            index = position & mask
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            position += step
+        return True
+
+
+class RevocationList:
+    """
+    Список отозванных токенов: фильтр Блума перед точным множеством.
+
+    Проверка неотозванного токена (обычный случай) почти всегда заканчивается
+    в фильтре и не обращается к словарю отозванных; словарь проверяется
+    только при положительном ответе фильтра. Для каждого отозванного jti
+    хранится его exp: после истечения токен отклоняется и без списка, поэтому
+    запись удаляется при очередной очистке, а фильтр перестраивается по
+    оставшимся записям. Так память ограничена числом токенов, отозванных за
+    время жизни токена.
+
+    Attributes:
+        capacity (int): Расчетное число записей фильтра (растет при переполнении).
+        error_rate (float): Допустимая доля ложных срабатываний фильтра.
+        prune_interval (float): Минимальный интервал между очистками, в секундах.
+        checks (int): Количество проверок.
+        filter_hits (int): Количество положительных ответов фильтра.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, prune_interval: float = 60.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.prune_interval = prune_interval
+        self.checks = 0
+        self.filter_hits = 0
+        self._revoked: Dict[str, float] = {}
+        self._filter = BloomFilter(capacity, error_rate)
+        self._next_prune = time.time() + prune_interval
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def revoke(self, jti: str, exp: float) -> None:
+        """
+        Отзывает токен до момента его истечения.
+
+        Args:
+            jti (str): Идентификатор токена (32 шестнадцатеричных символа).
+            exp (float): Время истечения токена (Unix time).
+        """
+        now = time.time()
+        if now >= self._next_prune:
+            self.prune(now)
+        if exp <= now or jti in self._revoked:
+            return
+        self._revoked[jti] = exp
+        if len(self._revoked) > self._filter.capacity:
+            self._rebuild()
+        else:
+            self._filter.add(int(jti, 16))
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Проверяет, отозван ли токен.
+
+        Args:
+            jti (str): Идентификатор токена.
+
+        Returns:
+            bool: True, если токен отозван.
+        """
+        self.checks += 1
+        if int(jti, 16) not in self._filter:
+            return False
+        self.filter_hits += 1
+        return jti in self._revoked
+
+    def prune(self, now: float) -> None:
+        """
+        Удаляет записи истекших токенов и перестраивает фильтр.
+
+        Args:
+            now (float): Текущее время (Unix time).
+        """
+        self._next_prune = now + self.prune_interval
+        expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+        if expired:
+            for jti in expired:
+                del self._revoked[jti]
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        capacity = max(self.capacity, 2 * len(self._revoked))
+        self._filter = BloomFilter(capacity, self.error_rate)
+        for jti in self._revoked:
+            self._filter.add(int(jti, 16))
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики списка отзыва.
+
+        Returns:
+            dict: Число отозванных токенов, проверок, положительных ответов
+            фильтра и размер фильтра в байтах.
+        """
+        return {
+            "revoked": len(self._revoked),
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "filter_bytes": len(self._filter._bits),
+        }
@@ -0,0 +1,215 @@
+import bisect
+import heapq
+import itertools
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Dict, List, Tuple
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+# Насколько массив длин может вырасти за один пост: длины постов с ID дальше (например, из
+# загруженной выгрузки) хранятся в словаре, и память не растет пропорционально наибольшему ID
+_DENSE_GROWTH = 1 << 16
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Разбивает текст на слова для поиска.
+
+    Слова — последовательности букв и цифр любого алфавита (в том числе
+    кириллицы); регистр не учитывается, «ё» приравнивается к «е».
+
+    Args:
+        text (str): Исходный текст.
+
+    Returns:
+        List[str]: Слова в порядке появления в тексте.
+    """
+    return _TOKEN_RE.findall(text.casefold().replace("ё", "е"))
+
+
+def post_text(post: dict) -> str:
+    """
+    Возвращает индексируемый текст поста: заголовок и содержание.
+
+    Args:
+        post (dict): Данные поста.
+
+    Returns:
+        str: Текст для индексации.
+    """
+    return post["title"] + "\n" + post["content"]
+
+
+class _Lengths:
+    """Длины постов из массива и словаря для постов с разреженными ID."""
+
+    def __init__(self, dense: array, sparse: Dict[int, int]):
+        self.dense = dense
+        self.sparse = sparse
+
+    def __getitem__(self, post_id: int) -> int:
+        length = self.sparse.get(post_id)
+        return self.dense[post_id] if length is None else length
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс постов с ранжированием BM25.
+
+    Для каждого слова хранится список постов в виде отсортированного массива
+    ID (array('I')) и параллельного массива частот слова в посте. Длины постов
+    лежат в массиве, индексированном ID поста; длины постов с ID намного больше
+    уже проиндексированных — в словаре. Чтобы изменение и удаление
+    поста не требовали исходного текста, для каждого поста хранится массив
+    номеров его различных слов.
+
+    Новые посты получают возрастающие ID, поэтому добавление обычно сводится
+    к дописыванию в конец массивов.
+
+    Attributes:
+        k1 (float): Параметр насыщения частоты слова BM25.
+        b (float): Параметр нормализации по длине поста BM25.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._term_ids: Dict[str, int] = {}
+        self._postings: List[array] = []
+        self._frequencies: List[array] = []
+        self._doc_terms: Dict[int, array] = {}
+        self._lengths = array("I")
+        self._sparse_lengths: Dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._postings)
+            self._postings.append(array("I"))
+            self._frequencies.append(array("I"))
+        return term_id
+
+    def add(self, post: dict) -> None:
+        """
+        Добавляет пост в индекс (или заменяет его, если он уже проиндексирован).
+
+        Args:
+            post (dict): Данные поста с полями id, title и content.
+        """
+        post_id = post["id"]
+        if post_id in self._doc_terms:
+            self.remove(post_id)
+        tokens = tokenize(post_text(post))
+        known_terms, all_postings, all_frequencies = self._term_ids, self._postings, self._frequencies
+        term_ids = array("I")
+        for term, frequency in Counter(tokens).items():
+            term_id = known_terms.get(term)
+            if term_id is None:
+                term_id = self._term_id(term)
+            term_ids.append(term_id)
+            postings = all_postings[term_id]
+            if not postings or postings[-1] < post_id:
+                postings.append(post_id)
+                all_frequencies[term_id].append(frequency)
+            else:
+                position = bisect.bisect_left(postings, post_id)
+                postings.insert(position, post_id)
+                all_frequencies[term_id].insert(position, frequency)
+        self._doc_terms[post_id] = term_ids
+
+        lengths = self._lengths
+        if post_id < len(lengths):
+            lengths[post_id] = len(tokens)
+        elif post_id < len(lengths) + max(len(lengths), _DENSE_GROWTH):
+            lengths.frombytes(bytes((post_id + 1 - len(lengths)) * lengths.itemsize))
+            lengths[post_id] = len(tokens)
+        else:
+            self._sparse_lengths[post_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, post_id: int) -> None:
+        """
+        Удаляет пост из индекса.
+
+        Args:
+            post_id (int): Идентификатор поста.
+        """
+        term_ids = self._doc_terms.pop(post_id, None)
+        if term_ids is None:
+            return
+        for term_id in term_ids:
+            postings = self._postings[term_id]
+            position = bisect.bisect_left(postings, post_id)
+            del postings[position]
+            del self._frequencies[term_id][position]
+        if post_id in self._sparse_lengths:
+            self._total_length -= self._sparse_lengths.pop(post_id)
+        else:
+            self._total_length -= self._lengths[post_id]
+            self._lengths[post_id] = 0
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float]]:
+        """
+        Ищет посты по запросу и ранжирует их по BM25.
+
+        Слова запроса обрабатываются от редких к частым (алгоритм MaxScore).
+        Когда K-я лучшая оценка превышает максимально возможный вклад
+        оставшихся слов, новые посты уже не могут попасть в выдачу, и частые
+        слова только добавляют вклад уже найденным постам — длинные списки
+        частых слов при этом не перебираются целиком.
+
+        Args:
+            query (str): Поисковый запрос.
+            limit (int): Количество результатов.
+            offset (int): Сколько лучших результатов пропустить.
+
+        Returns:
+            List[Tuple[int, float]]: Пары (ID поста, оценка) по убыванию оценки.
+        """
+        documents = len(self._doc_terms)
+        if not documents:
+            return []
+        k1, lengths = self.k1, self._lengths
+        if self._sparse_lengths:
+            lengths = _Lengths(lengths, self._sparse_lengths)
+        norm = k1 * (1 - self.b)
+        scale = k1 * self.b / (self._total_length / documents or 1.0)
+
+        terms = []
+        for term in set(tokenize(query)):
+            term_id = self._term_ids.get(term)
+            if term_id is not None and self._postings[term_id]:
+                frequency = len(self._postings[term_id])
+                terms.append((math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5)), term_id))
+        terms.sort(reverse=True)
+        # Верхняя граница вклада слов с i-го до последнего: частота слова в BM25 насыщается до k1 + 1
+        bounds = list(itertools.accumulate((idf * (k1 + 1) for idf, _ in reversed(terms))))[::-1]
+
+        depth = offset + limit
+        scores: Dict[int, float] = {}
+        get = scores.get
+        for (idf, term_id), bound in zip(terms, bounds):
+            postings = self._postings[term_id]
+            frequencies = self._frequencies[term_id]
+            weight = idf * (k1 + 1)
+            if len(scores) < depth or heapq.nlargest(depth, scores.values())[-1] <= bound:
+                for post_id, frequency in zip(postings, frequencies):
+                    scores[post_id] = get(post_id, 0.0) + weight * frequency / (
+                        frequency + norm + scale * lengths[post_id]
+                    )
+                continue
+            # Новые посты в выдачу уже не попадут: дополняем оценки найденных
+            for post_id in scores:
+                position = bisect.bisect_left(postings, post_id)
+                if position < len(postings) and postings[position] == post_id:
+                    frequency = frequencies[position]
+                    scores[post_id] += weight * frequency / (frequency + norm + scale * lengths[post_id])
+        # При равных оценках выше посты с меньшим ID, чтобы страницы не пересекались
+        best = heapq.nlargest(depth, scores.items(), key=lambda item: (item[1], -item[0]))
+        return best[offset:]
@@ -0,0 +1,59 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Сериализует данные в JSON (UTF-8).
+
+    Если установлен orjson, используется он; иначе стандартный модуль json.
+
+    Args:
+        content (Any): Данные из словарей, списков, строк и чисел.
+
+    Returns:
+        bytes: JSON-представление данных.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes) -> Any:
+    """
+    Разбирает JSON (UTF-8).
+
+    Если установлен orjson, используется он; иначе стандартный модуль json.
+
+    Args:
+        data (bytes): JSON-текст.
+
+    Returns:
+        Any: Разобранные данные.
+
+    Raises:
+        ValueError: Если текст не является корректным JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ, сериализуемый функцией dumps.
+
+    Обработчик, вернувший такой ответ, минует повторную проверку по
+    response_model и jsonable_encoder, поэтому его стоит использовать только для
+    данных, которые уже соответствуют модели ответа.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,380 @@
+"""
+Запуск WEBTRONICS в продакшене: несколько процессов-воркеров uvicorn.
+
+Процесс-супервизор создает слушающий сокет и запускает воркеры — отдельные
+интерпретаторы, наследующие сокет: соединения между ними распределяет ядро.
+Воркер использует цикл событий uvloop и парсер HTTP httptools, перед приемом
+соединений выполняет обработчики запуска приложения и прогревочные запросы,
+после чего сообщает супервизору о готовности.
+
+Сигналы супервизору:
+    SIGHUP — поочередный перезапуск воркеров (новый код и настройки): для
+    каждого воркера запускается замена, и только после ее готовности старый
+    воркер получает SIGTERM, перестает принимать соединения и дообрабатывает
+    начатые запросы (не дольше LAUNCHER_GRACEFUL_TIMEOUT секунд);
+    SIGTERM, SIGINT — плавная остановка всех воркеров.
+Упавший воркер перезапускается.
+
+Запуск из директории WEBTRONICS:
+    python serve.py [--host 0.0.0.0] [--port 8000] [--workers N] [--pin-cpus]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Код выхода воркера, если приложение не запустилось (как у gunicorn)
+WORKER_BOOT_ERROR = 3
+
+
+def create_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """
+    Создает слушающий сокет, который наследуют воркеры.
+
+    SO_REUSEADDR и SO_REUSEPORT позволяют новому супервизору занять порт, пока
+    старый еще дообрабатывает соединения.
+
+    Args:
+        host (str): Адрес.
+        port (int): Порт (0 — любой свободный).
+        backlog (int): Длина очереди входящих соединений.
+
+    Returns:
+        socket.socket: Слушающий сокет, наследуемый дочерними процессами.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.create_server(
+        (host, port), family=family, backlog=backlog, reuse_port=hasattr(socket, "SO_REUSEPORT"),
+    )
+    sock.set_inheritable(True)
+    return sock
+
+
+async def warmup(app, paths: List[str], rounds: int, state: Optional[dict] = None) -> Dict[str, int]:
+    """
+    Выполняет прогревочные запросы напрямую через ASGI, без сети.
+
+    Первые запросы к маршрутам заполняют кэши FastAPI и pydantic, кэши
+    ответов и импортируют лениво загружаемые модули; после прогрева первый
+    настоящий запрос не платит за это задержкой.
+
+    Args:
+        app: ASGI-приложение.
+        paths (List[str]): Пути GET-запросов (с параметрами запроса).
+        rounds (int): Сколько раз запросить каждый путь.
+        state (Optional[dict]): Состояние lifespan для scope.
+
+    Returns:
+        Dict[str, int]: Код ответа последнего запроса по каждому пути.
+    """
+    statuses = {}
+    for path in paths:
+        route, _, query = path.partition("?")
+        for _ in range(rounds):
+            scope = {
+                "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": route, "raw_path": route.encode(),
+                "query_string": query.encode(), "root_path": "", "headers": [(b"host", b"warmup")],
+                "server": ("warmup", 80), "client": ("127.0.0.1", 0), "state": dict(state or {}),
+            }
+            sent = False
+            status = 0
+
+            async def receive():
+                nonlocal sent
+                if sent:
+                    return {"type": "http.disconnect"}
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+
+            try:
+                await app(scope, receive, send)
+            except Exception:
+                logger.exception("Warmup request GET %s failed", path)
+                status = 500
+            statuses[path] = status
+    return statuses
+
+
+def run_worker(fd: int, ready_fd: int) -> None:
+    """
+    Точка входа воркера: запускает uvicorn на унаследованном сокете.
+
+    Args:
+        fd (int): Дескриптор слушающего сокета.
+        ready_fd (int): Дескриптор канала, в который пишется байт готовности.
+    """
+    import uvicorn
+
+    class WorkerServer(uvicorn.Server):
+        async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+            # Сначала только обработчики запуска приложения: сокет слушается после прогрева
+            await super().startup(sockets=[])
+            if self.should_exit:
+                return
+            statuses = await warmup(
+                self.config.loaded_app, config.LAUNCHER_WARMUP_PATHS, config.LAUNCHER_WARMUP_ROUNDS,
+                self.lifespan.state,
+            )
+            logger.info("Worker %d warmed up: %s", os.getpid(), statuses)
+
+            loop = asyncio.get_running_loop()
+
+            def create_protocol(_loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.Protocol:
+                return self.config.http_protocol_class(
+                    config=self.config, server_state=self.server_state, app_state=self.lifespan.state, _loop=_loop,
+                )
+
+            for sock in sockets or []:
+                self.servers.append(await loop.create_server(create_protocol, sock=sock, backlog=self.config.backlog))
+            os.write(ready_fd, b"1")
+            os.close(ready_fd)
+
+    server = WorkerServer(uvicorn.Config(
+        "main:app",
+        loop=config.LAUNCHER_LOOP,
+        http=config.LAUNCHER_HTTP,
+        backlog=config.LAUNCHER_BACKLOG,
+        access_log=config.LAUNCHER_ACCESS_LOG,
+        timeout_graceful_shutdown=config.LAUNCHER_GRACEFUL_TIMEOUT,
+    ))
+    server.run(sockets=[socket.socket(fileno=fd)])
+    if not server.started:
+        sys.exit(WORKER_BOOT_ERROR)
+
+
+class Worker:
+    """
+    Процесс-воркер, запущенный супервизором.
+
+    Attributes:
+        slot (int): Номер воркера (определяет ядро при закреплении за ядрами).
+        process (subprocess.Popen): Процесс.
+        ready_fd (int): Дескриптор канала готовности на стороне супервизора.
+        ready (bool): Сообщил ли воркер о готовности.
+        started (float): Время запуска (time.monotonic).
+    """
+
+    def __init__(self, slot: int, process: subprocess.Popen, ready_fd: int):
+        self.slot = slot
+        self.process = process
+        self.ready_fd = ready_fd
+        self.ready = False
+        self.started = time.monotonic()
+
+    def poll_ready(self) -> bool:
+        """
+        Читает байт готовности, если он уже пришел.
+
+        Returns:
+            bool: True, если воркер готов.
+        """
+        if not self.ready and select.select([self.ready_fd], [], [], 0)[0]:
+            self.ready = os.read(self.ready_fd, 1) == b"1"
+            os.close(self.ready_fd)
+            self.ready_fd = -1
+        return self.ready
+
+    def stop(self, timeout: float) -> None:
+        """
+        Плавно останавливает воркер; по истечении времени завершает принудительно.
+
+        Args:
+            timeout (float): Сколько ждать завершения после SIGTERM, в секундах.
+        """
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning("Worker %d did not stop in %.0f s, killing it", self.process.pid, timeout)
+                self.process.kill()
+                self.process.wait()
+        if self.ready_fd >= 0:
+            os.close(self.ready_fd)
+            self.ready_fd = -1
+
+
+class Supervisor:
+    """
+    Супервизор воркеров: запуск, перезапуск упавших, поочередный перезапуск и остановка.
+
+    Attributes:
+        sock (socket.socket): Общий слушающий сокет.
+        workers (int): Количество воркеров.
+        cpus (Optional[List[int]]): Ядра для закрепления воркеров (None — не закреплять).
+        ready_timeout (float): Сколько ждать готовности воркера, в секундах.
+        stop_timeout (float): Сколько ждать плавной остановки воркера, в секундах.
+    """
+
+    def __init__(
+        self, sock: socket.socket, workers: int, cpus: Optional[List[int]], ready_timeout: float, stop_timeout: float,
+    ):
+        self.sock = sock
+        self.workers = workers
+        self.cpus = cpus
+        self.ready_timeout = ready_timeout
+        self.stop_timeout = stop_timeout
+        self._slots: List[Optional[Worker]] = [None] * workers
+        self._reload = False
+        self._stop = False
+
+    def spawn(self, slot: int) -> Worker:
+        """
+        Запускает воркер для слота.
+
+        Args:
+            slot (int): Номер воркера.
+
+        Returns:
+            Worker: Запущенный воркер (еще не готовый).
+        """
+        ready_r, ready_w = os.pipe()
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker-fd", str(self.sock.fileno()),
+             "--ready-fd", str(ready_w)],
+            pass_fds=(self.sock.fileno(), ready_w),
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        os.close(ready_w)
+        if self.cpus:
+            os.sched_setaffinity(process.pid, {self.cpus[slot % len(self.cpus)]})
+        return Worker(slot, process, ready_r)
+
+    def wait_ready(self, workers: List[Worker]) -> bool:
+        """
+        Ждет готовности воркеров.
+
+        Args:
+            workers (List[Worker]): Воркеры.
+
+        Returns:
+            bool: True, если все воркеры сообщили о готовности за ready_timeout.
+        """
+        deadline = time.monotonic() + self.ready_timeout
+        pending = list(workers)
+        while pending and time.monotonic() < deadline and not self._stop:
+            fds = [worker.ready_fd for worker in pending]
+            select.select(fds, [], [], min(deadline - time.monotonic(), 0.5))
+            for worker in list(pending):
+                if worker.poll_ready():
+                    pending.remove(worker)
+                elif worker.ready_fd < 0 or worker.process.poll() is not None:
+                    # Канал закрыт без байта готовности: воркер завершился при запуске
+                    return False
+        return not pending
+
+    def reload(self) -> None:
+        """
+        Поочередно заменяет воркеры: старый останавливается после готовности нового.
+
+        Если замена не стала готовой, она останавливается, а перезапуск прерывается.
+        """
+        logger.info("Rolling restart of %d workers", self.workers)
+        for slot, old in enumerate(self._slots):
+            new = self.spawn(slot)
+            if not self.wait_ready([new]):
+                logger.error("Replacement worker %d did not become ready; restart aborted", new.process.pid)
+                new.stop(self.stop_timeout)
+                return
+            self._slots[slot] = new
+            if old is not None:
+                old.stop(self.stop_timeout)
+            logger.info("Worker %d replaced by %d", old.process.pid if old else 0, new.process.pid)
+
+    def run(self) -> int:
+        """
+        Запускает воркеры и обслуживает их до сигнала остановки.
+
+        Returns:
+            int: Код выхода супервизора.
+        """
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: setattr(self, "_stop", True))
+
+        self._slots = [self.spawn(slot) for slot in range(self.workers)]
+        if not self.wait_ready(self._slots):
+            logger.error("Workers failed to start")
+            self.shutdown()
+            return 1
+        logger.info("%d workers ready on %s", self.workers, self.sock.getsockname()[:2])
+
+        while not self._stop:
+            if self._reload:
+                self._reload = False
+                self.reload()
+            for slot, worker in enumerate(self._slots):
+                code = worker.process.poll()
+                if code is None:
+                    continue
+                logger.error("Worker %d exited with code %s, restarting", worker.process.pid, code)
+                worker.stop(0)
+                if time.monotonic() - worker.started < 1:
+                    # Воркер падает сразу после запуска: не перезапускаем его в цикле без паузы
+                    time.sleep(1)
+                self._slots[slot] = self.spawn(slot)
+            time.sleep(0.2)
+        self.shutdown()
+        return 0
+
+    def shutdown(self) -> None:
+        """
+        Плавно останавливает все воркеры одновременно.
+        """
+        logger.info("Stopping %d workers", self.workers)
+        for worker in self._slots:
+            if worker is not None and worker.process.poll() is None:
+                worker.process.terminate()
+        for worker in self._slots:
+            if worker is not None:
+                worker.stop(self.stop_timeout)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=config.LAUNCHER_HOST)
+    parser.add_argument("--port", type=int, default=config.LAUNCHER_PORT)
+    parser.add_argument("--workers", type=int, default=config.LAUNCHER_WORKERS)
+    parser.add_argument("--pin-cpus", action="store_true", default=config.LAUNCHER_PIN_CPUS)
+    parser.add_argument("--worker-fd", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--ready-fd", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(levelname)s %(message)s")
+
+    if args.worker_fd is not None:
+        run_worker(args.worker_fd, args.ready_fd)
+        return
+
+    if args.workers > 1 and config.STORAGE_BACKEND != "sqlite":
+        # С memory у каждого воркера были бы свои посты, пользователи и отозванные токены,
+        # а журнал и снимки journal испортили бы несколько пишущих процессов
+        parser.error(f"the {config.STORAGE_BACKEND} storage backend supports a single worker only; use sqlite")
+    if args.workers > 1 and not config.SHARED_COUNTERS:
+        # Без общих счетчиков кэш постов у каждого воркера свой: изменение поста или реакция в одном
+        # воркере не сбрасывает кэш другого, и тот отдает старое тело и ETag
+        parser.error("more than one worker requires SHARED_COUNTERS=true")
+    cpus = sorted(os.sched_getaffinity(0)) if args.pin_cpus and hasattr(os, "sched_setaffinity") else None
+    sock = create_socket(args.host, args.port, config.LAUNCHER_BACKLOG)
+    sys.exit(Supervisor(sock, args.workers, cpus, config.LAUNCHER_READY_TIMEOUT,
+                        config.LAUNCHER_GRACEFUL_TIMEOUT + 5).run())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,205 @@
+import fcntl
+import os
+import tempfile
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import AsyncIterable, Iterator, Optional, Tuple
+
+from reactions import LIKE
+
+# Каждой ячейке (слоту) соответствуют три int64: лайки, дизлайки и версия поста.
+# Слот 0 не используется постами (их ID начинаются с 1) и хранит заголовок:
+# число подключенных процессов, емкость сегмента и идентификатор запуска.
+_FIELDS = 3
+_REFCOUNT = 0
+_CAPACITY = 1
+_BOOT = 2
+
+
+class SharedReactionCounters:
+    """
+    Счетчики реакций в разделяемой памяти, общие для всех воркеров одного хоста.
+
+    Сегмент multiprocessing.shared_memory содержит массив счетчиков
+    фиксированной ширины, где номер слота совпадает с ID поста. Чтение — это
+    обращение к памяти без блокировок (выровненные int64 читаются целиком).
+    Изменение слота выполняется под блокировкой записи fcntl.lockf на байт
+    lock-файла с тем же номером, поэтому воркеры, меняющие разные посты, не
+    мешают друг другу. Посты с ID не меньше capacity в сегмент не попадают.
+
+    Первый процесс создает сегмент, записывает в заголовок случайный
+    идентификатор запуска (общий для ETag всех воркеров) и заполняет счетчики
+    из хранилища, остальные подключаются к готовому. Последний отключившийся
+    процесс удаляет сегмент.
+
+    Предыдущую реакцию пользователя сообщает хранилище, поэтому счетчики
+    верны, только если хранилище общее для воркеров (бэкенд sqlite).
+
+    Attributes:
+        name (str): Имя сегмента разделяемой памяти.
+        capacity (int): Количество слотов (максимальный ID поста + 1).
+        created (bool): Создал ли сегмент этот процесс.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.created = False
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._array: Optional[memoryview] = None
+        self._lock_fd: Optional[int] = None
+
+    def open(self) -> bool:
+        """
+        Создает сегмент или подключается к существующему.
+
+        Returns:
+            bool: True, если сегмент создан этим процессом и его нужно заполнить.
+        """
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), self.name + ".lock"), os.O_RDWR | os.O_CREAT)
+        with self._locked(0):
+            try:
+                self._shm = shared_memory.SharedMemory(self.name, create=True, size=self.capacity * _FIELDS * 8)
+                self.created = True
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(self.name)
+            # Временем жизни сегмента управляет счетчик подключений, а не resource_tracker,
+            # который удалил бы сегмент при выходе любого из воркеров
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+            self._array = self._shm.buf.cast("q")
+            if self.created:
+                self._array[_CAPACITY] = self.capacity
+                self._array[_BOOT] = int.from_bytes(os.urandom(4), "big")
+            else:
+                self.capacity = self._array[_CAPACITY]
+            self._array[_REFCOUNT] += 1
+        return self.created
+
+    def close(self) -> None:
+        """Отключается от сегмента; последний процесс удаляет его."""
+        if self._shm is None:
+            return
+        with self._locked(0):
+            self._array[_REFCOUNT] -= 1
+            last = self._array[_REFCOUNT] <= 0
+            self._array.release()
+            self._array = None
+            self._shm.close()
+            if last:
+                # unlink() снимает сегмент с учета resource_tracker, поэтому возвращаем его туда
+                resource_tracker.register(self._shm._name, "shared_memory")
+                self._shm.unlink()
+            self._shm = None
+        os.close(self._lock_fd)
+        self._lock_fd = None
+
+    @contextmanager
+    def _locked(self, slot: int) -> Iterator[None]:
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, slot)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, slot)
+
+    async def seed(self, counts: AsyncIterable[Tuple[int, int, int]]) -> None:
+        """
+        Заполняет счетчики из хранилища (вызывается процессом, создавшим сегмент).
+
+        Args:
+            counts (AsyncIterable[Tuple[int, int, int]]): Тройки (ID поста, лайки, дизлайки).
+        """
+        array = self._array
+        async for post_id, like_count, dislike_count in counts:
+            if self.covers(post_id):
+                base = post_id * _FIELDS
+                array[base] = like_count
+                array[base + 1] = dislike_count
+
+    @property
+    def boot(self) -> str:
+        """
+        Идентификатор запуска, общий для всех воркеров, подключенных к сегменту.
+
+        Returns:
+            str: Шестнадцатеричная строка.
+        """
+        return f"{self._array[_BOOT]:08x}"
+
+    def covers(self, post_id: int) -> bool:
+        """
+        Проверяет, хранится ли пост в сегменте.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            bool: True, если у поста есть слот.
+        """
+        return self._array is not None and 0 < post_id < self.capacity
+
+    def counts(self, post_id: int) -> Tuple[int, int]:
+        """
+        Возвращает количество лайков и дизлайков поста.
+
+        Args:
+            post_id (int): Идентификатор поста (должен попадать в сегмент).
+
+        Returns:
+            Tuple[int, int]: Пара (лайки, дизлайки).
+        """
+        base = post_id * _FIELDS
+        return self._array[base], self._array[base + 1]
+
+    def version(self, post_id: int) -> int:
+        """
+        Возвращает версию поста, общую для всех воркеров.
+
+        Args:
+            post_id (int): Идентификатор поста (должен попадать в сегмент).
+
+        Returns:
+            int: Номер версии.
+        """
+        return self._array[post_id * _FIELDS + 2]
+
+    def apply(self, post_id: int, previous: Optional[int], kind: int) -> None:
+        """
+        Учитывает новую реакцию пользователя и увеличивает версию поста.
+
+        Args:
+            post_id (int): Идентификатор поста (должен попадать в сегмент).
+            previous (Optional[int]): Предыдущая реакция пользователя или None.
+            kind (int): Новая реакция: LIKE или DISLIKE.
+        """
+        if previous == kind:
+            return
+        base = post_id * _FIELDS
+        array = self._array
+        with self._locked(post_id):
+            if previous is not None:
+                array[base + (previous != LIKE)] -= 1
+            array[base + (kind != LIKE)] += 1
+            array[base + 2] += 1
+
+    def bump(self, post_id: int) -> None:
+        """
+        Увеличивает версию поста (например, при изменении поста).
+
+        Args:
+            post_id (int): Идентификатор поста (должен попадать в сегмент).
+        """
+        with self._locked(post_id):
+            self._array[post_id * _FIELDS + 2] += 1
+
+    def reset(self, post_id: int) -> None:
+        """
+        Обнуляет счетчики удаленного поста; версия при этом увеличивается.
+
+        Args:
+            post_id (int): Идентификатор поста (должен попадать в сегмент).
+        """
+        base = post_id * _FIELDS
+        with self._locked(post_id):
+            self._array[base] = 0
+            self._array[base + 1] = 0
+            self._array[base + 2] += 1
@@ -0,0 +1,638 @@
+import asyncio
+import queue
+import sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from bulk import encode_export
+from reactions import LIKE
+from storage import normalize_username
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    username_key TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    user_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS posts_user_id ON posts (user_id);
+CREATE TABLE IF NOT EXISTS reactions (
+    post_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    PRIMARY KEY (post_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS post_counts (
+    post_id INTEGER PRIMARY KEY,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    dislike_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Версия схемы в PRAGMA user_version: 0 — база только что создана, и в нее еще не записаны начальные
+# пользователи и посты. Начальные данные записываются один раз, поэтому удаленный начальный пост
+# не возвращается при следующем открытии
+SCHEMA_VERSION = 1
+
+# Запросы держим константами: модуль sqlite3 кэширует скомпилированные
+# выражения на каждом соединении по тексту запроса (prepared statements).
+_GET_USER = "SELECT id, username, password FROM users WHERE username_key = ?"
+_INSERT_USER = "INSERT OR IGNORE INTO users (username, username_key, password) VALUES (?, ?, ?)"
+_SET_PASSWORD = "UPDATE users SET password = ? WHERE username_key = ?"
+_SEED_POST = "INSERT OR IGNORE INTO posts (id, title, content, user_id) VALUES (?, ?, ?, ?)"
+# В sqlite_sequence есть строки, если в таблицы с AUTOINCREMENT когда-либо что-то записывалось
+_NEVER_WRITTEN = "SELECT NOT EXISTS (SELECT 1 FROM sqlite_sequence)"
+_INSERT_POST = "INSERT INTO posts (title, content, user_id) VALUES (?, ?, ?)"
+_GET_POST = "SELECT id, title, content, user_id FROM posts WHERE id = ?"
+_LIST_POSTS = "SELECT id, title, content, user_id FROM posts WHERE id > ? ORDER BY id LIMIT ?"
+_LIST_AUTHOR_POSTS = "SELECT id, title, content, user_id FROM posts WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?"
+_UPDATE_POST = "UPDATE posts SET title = ?, content = ?, user_id = ? WHERE id = ?"
+_DELETE_POST = "DELETE FROM posts WHERE id = ?"
+_DELETE_POST_REACTIONS = "DELETE FROM reactions WHERE post_id = ?"
+_DELETE_POST_COUNTS = "DELETE FROM post_counts WHERE post_id = ?"
+_POST_EXISTS = "SELECT 1 FROM posts WHERE id = ?"
+_POST_AUTHOR = "SELECT user_id FROM posts WHERE id = ?"
+_IS_AUTHOR = "SELECT 1 FROM posts WHERE id = ? AND user_id = ?"
+_GET_REACTION = "SELECT kind FROM reactions WHERE post_id = ? AND user_id = ?"
+_UPSERT_REACTION = (
+    "INSERT INTO reactions (post_id, user_id, kind) VALUES (?, ?, ?) "
+    "ON CONFLICT (post_id, user_id) DO UPDATE SET kind = excluded.kind"
+)
+_ADD_COUNTS = (
+    "INSERT INTO post_counts (post_id, like_count, dislike_count) VALUES (?, ?, ?) "
+    "ON CONFLICT (post_id) DO UPDATE SET "
+    "like_count = like_count + excluded.like_count, "
+    "dislike_count = dislike_count + excluded.dislike_count"
+)
+_GET_COUNTS = "SELECT like_count, dislike_count FROM post_counts WHERE post_id = ?"
+_LIST_COUNTS = (
+    "SELECT post_id, like_count, dislike_count FROM post_counts WHERE post_id > ? ORDER BY post_id LIMIT ?"
+)
+_USER_ID = "SELECT id FROM users WHERE username_key = ?"
+_RESTORE_USER = (
+    "INSERT INTO users (id, username, username_key, password) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET "
+    "username = excluded.username, username_key = excluded.username_key, password = excluded.password"
+)
+_RESTORE_POST = (
+    "INSERT INTO posts (id, title, content, user_id) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET title = excluded.title, content = excluded.content, user_id = excluded.user_id"
+)
+_EXPORT_USERS = "SELECT id, username, password FROM users ORDER BY id"
+_EXPORT_POSTS = "SELECT id, title, content, user_id FROM posts ORDER BY id"
+_EXPORT_REACTIONS = "SELECT post_id, user_id, kind FROM reactions"
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def _post_row(row: Optional[tuple]) -> Optional[dict]:
+    if row is None:
+        return None
+    return {"id": row[0], "title": row[1], "content": row[2], "user_id": row[3]}
+
+
+class ConnectionPool:
+    """
+    Пул соединений SQLite для чтения.
+
+    Соединения открываются заранее и раздаются потокам исполнителя; в режиме WAL
+    читатели работают параллельно с единственным писателем.
+    """
+
+    def __init__(self, path: str, size: int):
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all: List[sqlite3.Connection] = []
+        for _ in range(size):
+            conn = _connect(path)
+            self._all.append(conn)
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Выдает соединение из пула на время блока with.
+
+        Yields:
+            sqlite3.Connection: Свободное соединение.
+        """
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self) -> None:
+        """Закрывает все соединения пула."""
+        for conn in self._all:
+            conn.close()
+        self._all.clear()
+
+
+class SQLiteStorage:
+    """
+    Бэкенд хранения на локальной базе SQLite.
+
+    Реализует тот же асинхронный интерфейс, что и MemoryStorage. Чтения
+    выполняются в пуле потоков на соединениях из ConnectionPool, а записи
+    накапливаются в очереди и применяются одним писателем пачками: каждая пачка
+    коммитится одной транзакцией (group commit), а ошибка отдельной операции
+    откатывается до ее точки сохранения и не затрагивает остальные.
+
+    Attributes:
+        path (str): Путь к файлу базы данных.
+        pool_size (int): Количество соединений для чтения.
+        batch_size (int): Максимальное количество записей в одной транзакции.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = 4,
+        batch_size: int = 256,
+        users: Iterable[dict] = (),
+        posts: Iterable[dict] = (),
+    ):
+        self.path = path
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self._seed_users = list(users)
+        self._seed_posts = list(posts)
+        self._pool: Optional[ConnectionPool] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Tuple[Callable, tuple, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def open(self) -> None:
+        """Открывает соединения, создает схему и запускает писателя."""
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size + 1, thread_name_prefix="sqlite")
+        self._writer = _connect(self.path)
+        self._writer.executescript(SCHEMA)
+        self._seed(self._writer)
+        self._pool = ConnectionPool(self.path, self.pool_size)
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def close(self) -> None:
+        """Дожидается записи накопленных операций и закрывает соединения."""
+        if self._writer_task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._writer_task
+        self._writer_task = None
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+        self._writer.close()
+
+    def _seed(self, conn: sqlite3.Connection) -> None:
+        # BEGIN IMMEDIATE: воркеры, открывающие одну базу одновременно, проверяют версию по очереди
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # У баз, созданных до появления версии, данные уже есть: начальные записи — только в новую
+                if conn.execute(_NEVER_WRITTEN).fetchone()[0]:
+                    conn.executemany(
+                        _INSERT_USER,
+                        [(u["username"], normalize_username(u["username"]), u["password"]) for u in self._seed_users],
+                    )
+                    conn.executemany(
+                        _SEED_POST,
+                        [(p["id"], p["title"], p["content"], p.get("user_id")) for p in self._seed_posts],
+                    )
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _run_read(self, fn: Callable, args: tuple):
+        with self._pool.connection() as conn:
+            return fn(conn, *args)
+
+    async def _read(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_read, fn, args)
+
+    async def _write(self, fn: Callable, *args):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((fn, args, future))
+        self._wakeup.set()
+        return await future
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    results = await loop.run_in_executor(self._executor, self._apply_batch, batch)
+                except Exception as exc:
+                    results = [(False, exc)] * len(batch)
+                for (_, _, future), (ok, value) in zip(batch, results):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+            if self._closing:
+                return
+
+    def _apply_batch(self, batch: list) -> list:
+        conn = self._writer
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for fn, args, _ in batch:
+                conn.execute("SAVEPOINT op")
+                try:
+                    results.append((True, fn(conn, *args)))
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO op")
+                    results.append((False, exc))
+                conn.execute("RELEASE op")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    @staticmethod
+    def _get_user(conn: sqlite3.Connection, username: str) -> Optional[dict]:
+        row = conn.execute(_GET_USER, (normalize_username(username),)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "username": row[1], "password": row[2]}
+
+    @staticmethod
+    def _add_user(conn: sqlite3.Connection, username: str, password: str) -> Optional[dict]:
+        # Уникальный индекс по нормализованному имени делает проверку и вставку атомарными
+        cursor = conn.execute(_INSERT_USER, (username, normalize_username(username), password))
+        if cursor.rowcount != 1:
+            return None
+        return {"id": cursor.lastrowid, "username": username, "password": password}
+
+    @staticmethod
+    def _create_post(conn: sqlite3.Connection, data: dict) -> dict:
+        cursor = conn.execute(_INSERT_POST, (data["title"], data["content"], data.get("user_id")))
+        data["id"] = cursor.lastrowid
+        return data
+
+    @staticmethod
+    def _get_post(conn: sqlite3.Connection, post_id: int) -> Optional[dict]:
+        return _post_row(conn.execute(_GET_POST, (post_id,)).fetchone())
+
+    @staticmethod
+    def _list_posts(conn: sqlite3.Connection, after_id: int, limit: int, user_id: Optional[int]) -> List[tuple]:
+        if user_id is None:
+            return conn.execute(_LIST_POSTS, (after_id, limit)).fetchall()
+        return conn.execute(_LIST_AUTHOR_POSTS, (user_id, after_id, limit)).fetchall()
+
+    @staticmethod
+    def _update_post(conn: sqlite3.Connection, post_id: int, data: dict) -> Optional[dict]:
+        cursor = conn.execute(_UPDATE_POST, (data["title"], data["content"], data.get("user_id"), post_id))
+        if cursor.rowcount == 0:
+            return None
+        data["id"] = post_id
+        return data
+
+    @staticmethod
+    def _delete_post(conn: sqlite3.Connection, post_id: int) -> Optional[dict]:
+        post = _post_row(conn.execute(_GET_POST, (post_id,)).fetchone())
+        if post is not None:
+            conn.execute(_DELETE_POST, (post_id,))
+            conn.execute(_DELETE_POST_REACTIONS, (post_id,))
+            conn.execute(_DELETE_POST_COUNTS, (post_id,))
+        return post
+
+    @staticmethod
+    def _set_reaction(conn: sqlite3.Connection, post_id: int, user_id: int, kind: int) -> Optional[int]:
+        row = conn.execute(_GET_REACTION, (post_id, user_id)).fetchone()
+        previous = row[0] if row is not None else None
+        if previous == kind:
+            return previous
+        conn.execute(_UPSERT_REACTION, (post_id, user_id, kind))
+        likes = (kind == LIKE) - (previous == LIKE)
+        dislikes = (kind != LIKE) - (previous is not None and previous != LIKE)
+        conn.execute(_ADD_COUNTS, (post_id, likes, dislikes))
+        return previous
+
+    @classmethod
+    def _react(cls, conn: sqlite3.Connection, post_id: int, user_id: int, kind: int) -> Tuple[str, Optional[int]]:
+        row = conn.execute(_POST_AUTHOR, (post_id,)).fetchone()
+        if row is None:
+            return "not_found", None
+        if row[0] == user_id:
+            return "own_post", None
+        return "ok", cls._set_reaction(conn, post_id, user_id, kind)
+
+    @classmethod
+    def _apply_reactions(cls, conn: sqlite3.Connection, events: list) -> List[Tuple[str, Optional[int]]]:
+        return [cls._react(conn, post_id, user_id, kind) for post_id, user_id, kind in events]
+
+    @classmethod
+    def _import_records(cls, conn: sqlite3.Connection, records: list) -> List[Tuple[str, Optional[int]]]:
+        results = []
+        for kind, data in records:
+            if kind == "reaction":
+                results.append(cls._react(conn, *data))
+            elif kind == "post":
+                conn.execute(_RESTORE_POST, (data["id"], data["title"], data["content"], data.get("user_id")))
+                results.append(("ok", None))
+            else:
+                key = normalize_username(data["username"])
+                row = conn.execute(_USER_ID, (key,)).fetchone()
+                if row is not None and row[0] != data["id"]:
+                    results.append(("conflict", None))
+                else:
+                    conn.execute(_RESTORE_USER, (data["id"], data["username"], key, data["password"]))
+                    results.append(("ok", None))
+        return results
+
+    @staticmethod
+    def _export_chunks(conn: sqlite3.Connection) -> Iterator[bytes]:
+        # Все запросы выполняются в одной читающей транзакции и видят один снимок базы (WAL)
+        conn.execute("BEGIN")
+        try:
+            users = ({"id": row[0], "username": row[1], "password": row[2]} for row in conn.execute(_EXPORT_USERS))
+            posts = (_post_row(row) for row in conn.execute(_EXPORT_POSTS))
+            yield from encode_export(users, posts, conn.execute(_EXPORT_REACTIONS))
+        finally:
+            conn.execute("ROLLBACK")
+
+    async def get_user(self, username: str) -> Optional[dict]:
+        """
+        Возвращает пользователя по имени без учета регистра.
+
+        Args:
+            username (str): Имя пользователя.
+
+        Returns:
+            Optional[dict]: Пользователь (id, username, password) или None, если он не найден.
+        """
+        return await self._read(self._get_user, username)
+
+    async def add_user(self, username: str, password: str) -> Optional[dict]:
+        """
+        Добавляет пользователя, если имя еще не занято.
+
+        Args:
+            username (str): Имя пользователя.
+            password (str): Пароль пользователя.
+
+        Returns:
+            Optional[dict]: Новый пользователь или None, если имя занято.
+        """
+        return await self._write(self._add_user, username, password)
+
+    async def set_password(self, username: str, password: str) -> None:
+        """
+        Заменяет сохраненный хэш пароля пользователя.
+
+        Args:
+            username (str): Имя пользователя.
+            password (str): Новый хэш пароля.
+        """
+        await self._write(lambda conn: conn.execute(_SET_PASSWORD, (password, normalize_username(username))))
+
+    async def create_post(self, data: dict) -> dict:
+        """
+        Сохраняет новый пост и присваивает ему ID.
+
+        Args:
+            data (dict): Данные поста.
+
+        Returns:
+            dict: Сохраненный пост.
+        """
+        return await self._write(self._create_post, data)
+
+    async def get_post(self, post_id: int) -> Optional[dict]:
+        """
+        Возвращает пост по ID.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Optional[dict]: Пост или None, если он не найден.
+        """
+        return await self._read(self._get_post, post_id)
+
+    async def iter_posts(self, after_id: int, limit: int, user_id: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Асинхронно перебирает посты по курсору, читая их из базы порциями.
+
+        Args:
+            after_id (int): ID, после которого начинается выдача.
+            limit (int): Максимальное количество постов.
+            user_id (Optional[int]): Если задан, выдаются только посты этого автора.
+
+        Yields:
+            dict: Очередной пост.
+        """
+        while limit > 0:
+            rows = await self._read(self._list_posts, after_id, min(limit, 500), user_id)
+            for row in rows:
+                yield _post_row(row)
+            if len(rows) < min(limit, 500):
+                return
+            limit -= len(rows)
+            after_id = rows[-1][0]
+
+    async def update_post(self, post_id: int, data: dict) -> Optional[dict]:
+        """
+        Заменяет данные поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            data (dict): Новые данные поста.
+
+        Returns:
+            Optional[dict]: Обновленный пост или None, если он не найден.
+        """
+        return await self._write(self._update_post, post_id, data)
+
+    async def delete_post(self, post_id: int) -> Optional[dict]:
+        """
+        Удаляет пост вместе с его реакциями.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Optional[dict]: Удаленный пост или None, если он не найден.
+        """
+        return await self._write(self._delete_post, post_id)
+
+    async def post_exists(self, post_id: int) -> bool:
+        """
+        Проверяет, существует ли пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            bool: True, если пост существует.
+        """
+        return await self._read(lambda conn: conn.execute(_POST_EXISTS, (post_id,)).fetchone() is not None)
+
+    async def is_author(self, post_id: int, user_id: int) -> bool:
+        """
+        Проверяет, является ли пользователь автором поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            bool: True, если пост принадлежит пользователю.
+        """
+        return await self._read(
+            lambda conn: conn.execute(_IS_AUTHOR, (post_id, user_id)).fetchone() is not None
+        )
+
+    async def set_reaction(self, post_id: int, user_id: int, kind: int) -> Optional[int]:
+        """
+        Устанавливает реакцию пользователя на пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+            kind (int): Тип реакции: LIKE или DISLIKE.
+
+        Returns:
+            Optional[int]: Предыдущая реакция пользователя или None.
+        """
+        return await self._write(self._set_reaction, post_id, user_id, kind)
+
+    async def react(self, post_id: int, user_id: int, kind: int) -> Tuple[str, Optional[int]]:
+        """
+        Проверяет пост и авторство и устанавливает реакцию в одной транзакции записи.
+
+        Удаление поста не может вклиниться между проверкой и записью, поэтому
+        реакции на удаленный пост не остаются в таблицах.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+            kind (int): Тип реакции: LIKE или DISLIKE.
+
+        Returns:
+            Tuple[str, Optional[int]]: Статус ("ok", "not_found" или "own_post") и
+            предыдущая реакция пользователя.
+        """
+        return await self._write(self._react, post_id, user_id, kind)
+
+    async def apply_reactions(self, events: List[Tuple[int, int, int]]) -> List[Tuple[str, Optional[int]]]:
+        """
+        Применяет пачку реакций одной операцией записи.
+
+        Args:
+            events (List[Tuple[int, int, int]]): Тройки (ID поста, ID пользователя, LIKE или DISLIKE).
+
+        Returns:
+            List[Tuple[str, Optional[int]]]: Для каждой реакции статус ("ok", "not_found"
+            или "own_post") и предыдущая реакция пользователя.
+        """
+        return await self._write(self._apply_reactions, events)
+
+    async def import_records(self, records: List[Tuple[str, Any]]) -> List[Tuple[str, Optional[int]]]:
+        """
+        Загружает пачку записей выгрузки одной операцией записи, сохраняя их ID.
+
+        Args:
+            records (List[Tuple[str, Any]]): Пары (тип, данные), как в MemoryStorage.import_records.
+
+        Returns:
+            List[Tuple[str, Optional[int]]]: Для каждой записи статус ("ok", "conflict",
+            "not_found" или "own_post") и предыдущая реакция пользователя (для реакций).
+        """
+        return await self._write(self._import_records, records)
+
+    async def export_ndjson(self) -> AsyncIterator[bytes]:
+        """
+        Выгружает пользователей, посты и реакции в NDJSON (см. encode_export).
+
+        Выгрузка читается на отдельном соединении в одной транзакции, поэтому
+        согласована на момент начала и не мешает записи (WAL). Фрагменты
+        формируются в пуле потоков по одному, пока клиент их забирает. Пока
+        выгрузка идет, контрольная точка не может перенести изменения дальше
+        ее снимка, и файл WAL растет.
+
+        Yields:
+            bytes: Очередной фрагмент выгрузки.
+        """
+        loop = asyncio.get_running_loop()
+        conn = _connect(self.path)
+        chunks = self._export_chunks(conn)
+        pending: Optional[Future] = None
+        try:
+            while True:
+                pending = self._executor.submit(next, chunks, None)
+                chunk = await asyncio.wrap_future(pending, loop=loop)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Генератор и соединение закрываются, только когда поток закончил текущий фрагмент;
+            # цикл событий этого не ждет (если фрагмент готов, колбэк вызывается сразу)
+            def release(_: Optional[Future] = None) -> None:
+                chunks.close()
+                conn.close()
+
+            if pending is not None:
+                pending.add_done_callback(release)
+            else:
+                release()
+
+    async def iter_reaction_counts(self) -> AsyncIterator[Tuple[int, int, int]]:
+        """
+        Перебирает счетчики реакций всех постов, читая их из базы порциями.
+
+        Yields:
+            Tuple[int, int, int]: Тройка (ID поста, лайки, дизлайки).
+        """
+        after_id = 0
+        while True:
+            rows = await self._read(lambda conn: conn.execute(_LIST_COUNTS, (after_id, 1000)).fetchall())
+            for row in rows:
+                yield row
+            if len(rows) < 1000:
+                return
+            after_id = rows[-1][0]
+
+    async def reaction_counts(self, post_id: int) -> Tuple[int, int]:
+        """
+        Возвращает количество лайков и дизлайков поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Tuple[int, int]: Пара (лайки, дизлайки).
+        """
+        row = await self._read(lambda conn: conn.execute(_GET_COUNTS, (post_id,)).fetchone())
+        if row is None:
+            return 0, 0
+        return row[0], row[1]
@@ -0,0 +1,741 @@
+import asyncio
+import bisect
+import unicodedata
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from bulk import encode_export
+from reactions import ReactionStore
+
+
+class PostRepository:
+    """
+    Хранилище постов с доступом по ID за O(1).
+
+    Посты хранятся в словаре по ID, новые ID выдаются монотонным счетчиком
+    (удаленные ID повторно не используются), а вторичный индекс по автору
+    (user_id -> отсортированный список ID постов) позволяет проверить авторство
+    и листать посты автора по курсору двоичным поиском.
+    Отсортированный список ID позволяет листать посты по курсору (keyset).
+
+    Attributes:
+        last_id (int): Последний выданный идентификатор поста.
+    """
+
+    def __init__(self, posts: Iterable[dict] = ()):
+        self._posts: Dict[int, dict] = {}
+        self._by_author: Dict[int, List[int]] = {}
+        # ID в порядке возрастания; удаленные ID вычищаются пачкой, когда их накопится много
+        self._order: List[int] = []
+        self._deleted = 0
+        self._compactions = 0
+        self.last_id = 0
+        for post in posts:
+            self._put(post)
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def __contains__(self, post_id: int) -> bool:
+        return post_id in self._posts
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._posts.values())
+
+    def _put(self, post: dict) -> None:
+        post_id = post["id"]
+        if post_id not in self._posts:
+            if not self._order or post_id > self._order[-1]:
+                self._order.append(post_id)
+            else:
+                index = bisect.bisect_left(self._order, post_id)
+                if index == len(self._order) or self._order[index] != post_id:
+                    self._order.insert(index, post_id)
+                else:
+                    self._deleted -= 1
+        self._posts[post_id] = post
+        user_id = post.get("user_id")
+        if user_id is not None:
+            author_posts = self._by_author.setdefault(user_id, [])
+            # Новые ID монотонны, поэтому обычно это добавление в конец
+            if not author_posts or post_id > author_posts[-1]:
+                author_posts.append(post_id)
+            else:
+                index = bisect.bisect_left(author_posts, post_id)
+                if index == len(author_posts) or author_posts[index] != post_id:
+                    author_posts.insert(index, post_id)
+        if post_id > self.last_id:
+            self.last_id = post_id
+
+    def copy(self) -> "PostRepository":
+        """
+        Возвращает независимую копию хранилища, например для снимка состояния.
+
+        Словари постов общие: хранилище не изменяет их на месте, а заменяет целиком.
+
+        Returns:
+            PostRepository: Копия хранилища.
+        """
+        clone = PostRepository.__new__(PostRepository)
+        clone.__dict__.update(self.__dict__)
+        clone._posts = dict(self._posts)
+        clone._by_author = {user_id: list(post_ids) for user_id, post_ids in self._by_author.items()}
+        clone._order = list(self._order)
+        return clone
+
+    def _unindex_author(self, post: dict) -> None:
+        user_id = post.get("user_id")
+        if user_id is None:
+            return
+        author_posts = self._by_author.get(user_id)
+        if author_posts is not None:
+            index = bisect.bisect_left(author_posts, post["id"])
+            if index < len(author_posts) and author_posts[index] == post["id"]:
+                del author_posts[index]
+            if not author_posts:
+                del self._by_author[user_id]
+
+    def next_id(self) -> int:
+        """
+        Выдает следующий уникальный идентификатор поста.
+
+        Returns:
+            int: Новый идентификатор поста.
+        """
+        self.last_id += 1
+        return self.last_id
+
+    def add(self, data: dict) -> dict:
+        """
+        Добавляет новый пост, присваивая ему уникальный ID.
+
+        Args:
+            data (dict): Данные поста (поле id будет перезаписано).
+
+        Returns:
+            dict: Сохраненный пост с присвоенным ID.
+        """
+        data["id"] = self.next_id()
+        self._put(data)
+        return data
+
+    def restore(self, post: dict) -> None:
+        """
+        Сохраняет пост с уже присвоенным ID (например, при восстановлении с диска).
+
+        Пост с тем же ID, если он есть, заменяется.
+
+        Args:
+            post (dict): Данные поста вместе с ID.
+        """
+        old = self._posts.get(post["id"])
+        if old is not None:
+            self._unindex_author(old)
+        self._put(post)
+
+    def get(self, post_id: int) -> Optional[dict]:
+        """
+        Возвращает пост по ID.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Optional[dict]: Пост или None, если он не найден.
+        """
+        return self._posts.get(post_id)
+
+    def replace(self, post_id: int, data: dict) -> Optional[dict]:
+        """
+        Заменяет данные существующего поста, сохраняя его ID.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            data (dict): Новые данные поста.
+
+        Returns:
+            Optional[dict]: Обновленный пост или None, если он не найден.
+        """
+        old = self._posts.get(post_id)
+        if old is None:
+            return None
+        self._unindex_author(old)
+        data["id"] = post_id
+        self._put(data)
+        return data
+
+    def delete(self, post_id: int) -> Optional[dict]:
+        """
+        Удаляет пост по ID.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Optional[dict]: Удаленный пост или None, если он не найден.
+        """
+        post = self._posts.pop(post_id, None)
+        if post is not None:
+            self._unindex_author(post)
+            self._deleted += 1
+            if self._deleted > len(self._order) // 2:
+                self._order = [i for i in self._order if i in self._posts]
+                self._deleted = 0
+                self._compactions += 1
+        return post
+
+    def iter_after(self, after_id: int = 0, user_id: Optional[int] = None) -> Iterator[dict]:
+        """
+        Перебирает посты в порядке возрастания ID, начиная после указанного.
+
+        Перебор устойчив к изменениям хранилища между шагами: новые посты
+        попадают в выдачу, удаленные пропускаются.
+
+        Args:
+            after_id (int): ID, после которого начинается выдача (курсор).
+            user_id (Optional[int]): Если задан, выдаются только посты этого автора.
+
+        Yields:
+            dict: Очередной пост.
+        """
+        if user_id is not None:
+            while True:
+                # Двоичный поиск курсора в отсортированных ID автора на каждом шаге
+                author_posts = self._by_author.get(user_id, ())
+                index = bisect.bisect_right(author_posts, after_id)
+                if index >= len(author_posts):
+                    return
+                after_id = author_posts[index]
+                yield self._posts[after_id]
+
+        compactions = self._compactions
+        index = bisect.bisect_right(self._order, after_id)
+        while True:
+            if compactions != self._compactions:
+                compactions = self._compactions
+                index = bisect.bisect_right(self._order, after_id)
+            if index >= len(self._order):
+                return
+            post_id = self._order[index]
+            index += 1
+            post = self._posts.get(post_id)
+            if post is not None:
+                after_id = post_id
+                yield post
+
+    def is_author(self, post_id: int, user_id: int) -> bool:
+        """
+        Проверяет, является ли пользователь автором поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            bool: True, если пост принадлежит пользователю.
+        """
+        author_posts = self._by_author.get(user_id, ())
+        index = bisect.bisect_left(author_posts, post_id)
+        return index < len(author_posts) and author_posts[index] == post_id
+
+    def posts_by_author(self, user_id: int) -> Set[int]:
+        """
+        Возвращает ID всех постов автора.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            Set[int]: Множество идентификаторов постов.
+        """
+        return set(self._by_author.get(user_id, ()))
+
+
+def normalize_username(username: str) -> str:
+    """
+    Приводит имя пользователя к ключу уникальности (NFKC + casefold).
+
+    Args:
+        username (str): Имя пользователя.
+
+    Returns:
+        str: Нормализованное имя.
+    """
+    return unicodedata.normalize("NFKC", username).casefold()
+
+
+class UserRegistry:
+    """
+    Реестр пользователей с поиском по нормализованному имени за O(1).
+
+    Имена сравниваются без учета регистра (после NFKC и casefold), поэтому
+    "User1" и "user1" считаются одним пользователем. Каждому пользователю
+    выдается постоянный ID из монотонного счетчика. Отсортированный список ID
+    позволяет перебирать пользователей по курсору.
+
+    Attributes:
+        last_id (int): Последний выданный идентификатор пользователя.
+    """
+
+    def __init__(self, users: Iterable[dict] = ()):
+        self._by_name: Dict[str, dict] = {}
+        self._by_id: Dict[int, dict] = {}
+        # ID в порядке возрастания (пользователи не удаляются)
+        self._order: List[int] = []
+        self.last_id = 0
+        for user in users:
+            if "id" in user:
+                self.restore(dict(user))
+            else:
+                self.add(user["username"], user["password"])
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._by_id.values())
+
+    def copy(self) -> "UserRegistry":
+        """
+        Возвращает независимую копию реестра, например для снимка состояния.
+
+        Returns:
+            UserRegistry: Копия реестра.
+        """
+        clone = UserRegistry()
+        # Пароль меняется на месте, поэтому копируются и записи пользователей
+        clone._by_id = {user_id: dict(user) for user_id, user in self._by_id.items()}
+        clone._by_name = {name: clone._by_id[user["id"]] for name, user in self._by_name.items()}
+        clone._order = list(self._order)
+        clone.last_id = self.last_id
+        return clone
+
+    def restore(self, user: dict) -> None:
+        """
+        Сохраняет пользователя с уже присвоенным ID (например, при восстановлении с диска).
+
+        Пользователь с тем же ID, если он есть, заменяется.
+
+        Args:
+            user (dict): Пользователь с полями id, username и password.
+        """
+        old = self._by_id.get(user["id"])
+        if old is not None:
+            del self._by_name[normalize_username(old["username"])]
+        elif user["id"] > self.last_id:
+            self._order.append(user["id"])
+        else:
+            bisect.insort(self._order, user["id"])
+        self._by_name[normalize_username(user["username"])] = user
+        self._by_id[user["id"]] = user
+        if user["id"] > self.last_id:
+            self.last_id = user["id"]
+
+    def add(self, username: str, password: str) -> Optional[dict]:
+        """
+        Добавляет пользователя, если нормализованное имя еще не занято.
+
+        Проверка и вставка выполняются одной операцией словаря (setdefault).
+
+        Args:
+            username (str): Имя пользователя.
+            password (str): Хэш пароля пользователя.
+
+        Returns:
+            Optional[dict]: Новый пользователь или None, если имя занято.
+        """
+        user = {"id": self.last_id + 1, "username": username, "password": password}
+        if self._by_name.setdefault(normalize_username(username), user) is not user:
+            return None
+        self.last_id = user["id"]
+        self._by_id[user["id"]] = user
+        self._order.append(user["id"])
+        return user
+
+    def iter_after(self, after_id: int = 0) -> Iterator[dict]:
+        """
+        Перебирает пользователей в порядке возрастания ID, начиная после указанного.
+
+        Перебор устойчив к добавлению пользователей между шагами.
+
+        Args:
+            after_id (int): ID, после которого начинается выдача (курсор).
+
+        Yields:
+            dict: Очередной пользователь.
+        """
+        while True:
+            index = bisect.bisect_right(self._order, after_id)
+            if index >= len(self._order):
+                return
+            after_id = self._order[index]
+            yield self._by_id[after_id]
+
+    def get(self, username: str) -> Optional[dict]:
+        """
+        Возвращает пользователя по имени без учета регистра.
+
+        Args:
+            username (str): Имя пользователя.
+
+        Returns:
+            Optional[dict]: Пользователь или None, если он не найден.
+        """
+        return self._by_name.get(normalize_username(username))
+
+    def get_by_id(self, user_id: int) -> Optional[dict]:
+        """
+        Возвращает пользователя по ID.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            Optional[dict]: Пользователь или None, если он не найден.
+        """
+        return self._by_id.get(user_id)
+
+
+class MemoryStorage:
+    """
+    Хранилище состояния приложения в памяти процесса (бэкенд по умолчанию).
+
+    Объединяет пользователей, посты и реакции за общим асинхронным интерфейсом,
+    который реализуют все бэкенды хранения. Все операции выполняются без
+    ожиданий, поэтому в рамках цикла событий они атомарны.
+
+    Attributes:
+        users (UserRegistry): Реестр пользователей.
+        posts (PostRepository): Хранилище постов.
+        reactions (ReactionStore): Хранилище реакций.
+    """
+
+    def __init__(self, users: Iterable[dict] = (), posts: Iterable[dict] = ()):
+        self.users = UserRegistry(users)
+        self.posts = PostRepository(posts)
+        self.reactions = ReactionStore()
+
+    async def open(self) -> None:
+        """Подготавливает хранилище к работе (для памяти ничего не требуется)."""
+
+    async def close(self) -> None:
+        """Освобождает ресурсы хранилища (для памяти ничего не требуется)."""
+
+    async def get_user(self, username: str) -> Optional[dict]:
+        """
+        Возвращает пользователя по имени без учета регистра.
+
+        Args:
+            username (str): Имя пользователя.
+
+        Returns:
+            Optional[dict]: Пользователь (id, username, password) или None, если он не найден.
+        """
+        return self.users.get(username)
+
+    async def add_user(self, username: str, password: str) -> Optional[dict]:
+        """
+        Добавляет пользователя, если имя еще не занято.
+
+        Args:
+            username (str): Имя пользователя.
+            password (str): Пароль пользователя.
+
+        Returns:
+            Optional[dict]: Новый пользователь или None, если имя занято.
+        """
+        return self.users.add(username, password)
+
+    async def set_password(self, username: str, password: str) -> None:
+        """
+        Заменяет сохраненный хэш пароля пользователя.
+
+        Args:
+            username (str): Имя пользователя.
+            password (str): Новый хэш пароля.
+        """
+        user = await self.get_user(username)
+        if user is not None:
+            user["password"] = password
+
+    async def create_post(self, data: dict) -> dict:
+        """
+        Сохраняет новый пост и присваивает ему ID.
+
+        Args:
+            data (dict): Данные поста.
+
+        Returns:
+            dict: Сохраненный пост.
+        """
+        return self.posts.add(data)
+
+    async def get_post(self, post_id: int) -> Optional[dict]:
+        """
+        Возвращает пост по ID.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Optional[dict]: Пост или None, если он не найден.
+        """
+        return self.posts.get(post_id)
+
+    async def iter_posts(self, after_id: int, limit: int, user_id: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Асинхронно перебирает посты по курсору в порядке возрастания ID.
+
+        Args:
+            after_id (int): ID, после которого начинается выдача.
+            limit (int): Максимальное количество постов.
+            user_id (Optional[int]): Если задан, выдаются только посты этого автора.
+
+        Yields:
+            dict: Очередной пост.
+        """
+        for count, post in enumerate(self.posts.iter_after(after_id, user_id), 1):
+            yield post
+            if count >= limit:
+                return
+            if count % 256 == 0:
+                # Отдаем управление циклу событий на длинных страницах
+                await asyncio.sleep(0)
+
+    async def update_post(self, post_id: int, data: dict) -> Optional[dict]:
+        """
+        Заменяет данные поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            data (dict): Новые данные поста.
+
+        Returns:
+            Optional[dict]: Обновленный пост или None, если он не найден.
+        """
+        return self.posts.replace(post_id, data)
+
+    async def delete_post(self, post_id: int) -> Optional[dict]:
+        """
+        Удаляет пост вместе с его реакциями.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Optional[dict]: Удаленный пост или None, если он не найден.
+        """
+        post = self.posts.delete(post_id)
+        if post is not None:
+            self.reactions.drop_post(post_id)
+        return post
+
+    async def post_exists(self, post_id: int) -> bool:
+        """
+        Проверяет, существует ли пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            bool: True, если пост существует.
+        """
+        return post_id in self.posts
+
+    async def is_author(self, post_id: int, user_id: int) -> bool:
+        """
+        Проверяет, является ли пользователь автором поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            bool: True, если пост принадлежит пользователю.
+        """
+        return self.posts.is_author(post_id, user_id)
+
+    async def set_reaction(self, post_id: int, user_id: int, kind: int) -> Optional[int]:
+        """
+        Устанавливает реакцию пользователя на пост.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+            kind (int): Тип реакции: LIKE или DISLIKE.
+
+        Returns:
+            Optional[int]: Предыдущая реакция пользователя или None.
+        """
+        return self.reactions.set(post_id, user_id, kind)
+
+    async def react(self, post_id: int, user_id: int, kind: int) -> Tuple[str, Optional[int]]:
+        """
+        Проверяет пост и авторство и устанавливает реакцию за один шаг.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+            kind (int): Тип реакции: LIKE или DISLIKE.
+
+        Returns:
+            Tuple[str, Optional[int]]: Статус ("ok", "not_found" или "own_post") и
+            предыдущая реакция пользователя.
+        """
+        return self._react(post_id, user_id, kind)
+
+    async def apply_reactions(self, events: List[Tuple[int, int, int]]) -> List[Tuple[str, Optional[int]]]:
+        """
+        Применяет пачку реакций за один шаг.
+
+        Args:
+            events (List[Tuple[int, int, int]]): Тройки (ID поста, ID пользователя, LIKE или DISLIKE).
+
+        Returns:
+            List[Tuple[str, Optional[int]]]: Для каждой реакции статус ("ok", "not_found"
+            или "own_post") и предыдущая реакция пользователя.
+        """
+        return [self._react(post_id, user_id, kind) for post_id, user_id, kind in events]
+
+    def _react(self, post_id: int, user_id: int, kind: int) -> Tuple[str, Optional[int]]:
+        if post_id not in self.posts:
+            return "not_found", None
+        if self.posts.is_author(post_id, user_id):
+            return "own_post", None
+        return "ok", self.reactions.set(post_id, user_id, kind)
+
+    async def import_records(self, records: List[Tuple[str, Any]]) -> List[Tuple[str, Optional[int]]]:
+        """
+        Загружает пачку записей выгрузки за один шаг, сохраняя их ID.
+
+        Пользователь или пост с уже существующим ID заменяется. Пользователь,
+        имя которого занято другим ID, отклоняется; реакции проверяются так же,
+        как в apply_reactions.
+
+        Args:
+            records (List[Tuple[str, Any]]): Пары (тип, данные) в порядке применения:
+                ("user", {"id", "username", "password"}), ("post", пост) или
+                ("reaction", (ID поста, ID пользователя, LIKE или DISLIKE)).
+
+        Returns:
+            List[Tuple[str, Optional[int]]]: Для каждой записи статус ("ok", "conflict",
+            "not_found" или "own_post") и предыдущая реакция пользователя (для реакций).
+        """
+        results = []
+        for kind, data in records:
+            if kind == "reaction":
+                results.append(self._react(*data))
+            elif kind == "post":
+                self.posts.restore(data)
+                results.append(("ok", None))
+            else:
+                owner = self.users.get(data["username"])
+                if owner is not None and owner["id"] != data["id"]:
+                    results.append(("conflict", None))
+                else:
+                    self.users.restore(data)
+                    results.append(("ok", None))
+        return results
+
+    def _export_chunks(self) -> Iterator[bytes]:
+        # Все источники — курсоры по живым структурам, устойчивые к изменениям между фрагментами
+        last_post = 0
+
+        def posts() -> Iterator[dict]:
+            nonlocal last_post
+            for post in self.posts.iter_after(0):
+                last_post = post["id"]
+                yield post
+
+        def reactions() -> Iterator[Tuple[int, int, int]]:
+            # Реакции только на выгруженные посты, чтобы выгрузку можно было загрузить обратно
+            for post in self.posts.iter_after(0):
+                if post["id"] > last_post:
+                    return
+                for user_id, kind in self.reactions.post_reactions(post["id"]):
+                    yield post["id"], user_id, kind
+
+        return encode_export(self.users.iter_after(0), posts(), reactions())
+
+    async def export_ndjson(self) -> AsyncIterator[bytes]:
+        """
+        Выгружает пользователей, посты и реакции в NDJSON (см. encode_export).
+
+        Выгрузка читает живые структуры по курсорам (как iter_after) и отдает
+        управление циклу событий после каждого фрагмента, поэтому не
+        останавливает обработку запросов, а память не зависит от объема данных:
+        копируются только реакции одного поста. Выгрузка не согласована на
+        один момент: запись, измененная во время выгрузки, может попасть в нее
+        в новом виде, а созданная — попасть или нет. Реакции выгружаются
+        только для выгруженных постов.
+
+        Yields:
+            bytes: Очередной фрагмент выгрузки.
+        """
+        for chunk in self._export_chunks():
+            yield chunk
+            await asyncio.sleep(0)
+
+    async def iter_reaction_counts(self) -> AsyncIterator[Tuple[int, int, int]]:
+        """
+        Перебирает счетчики реакций всех постов.
+
+        Yields:
+            Tuple[int, int, int]: Тройка (ID поста, лайки, дизлайки).
+        """
+        for item in self.reactions.iter_counts():
+            yield item
+
+    async def reaction_counts(self, post_id: int) -> Tuple[int, int]:
+        """
+        Возвращает количество лайков и дизлайков поста.
+
+        Args:
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            Tuple[int, int]: Пара (лайки, дизлайки).
+        """
+        return self.reactions.counts(post_id)
+
+
+def create_storage(backend: str, users: Iterable[dict] = (), posts: Iterable[dict] = ()):
+    """
+    Создает бэкенд хранения по его имени из конфигурации.
+
+    Args:
+        backend (str): Имя бэкенда: "memory", "journal" или "sqlite".
+        users (Iterable[dict]): Начальные пользователи.
+        posts (Iterable[dict]): Начальные посты.
+
+    Returns:
+        MemoryStorage | JournaledStorage | SQLiteStorage: Экземпляр выбранного бэкенда.
+
+    Raises:
+        ValueError: Если бэкенд с таким именем неизвестен.
+    """
+    if backend == "memory":
+        return MemoryStorage(users, posts)
+    import config
+
+    if backend == "journal":
+        from journal import JournaledStorage
+
+        return JournaledStorage(
+            config.JOURNAL_DIR,
+            users=users,
+            posts=posts,
+            fsync_wait=config.JOURNAL_FSYNC_WAIT,
+            snapshot_interval=config.JOURNAL_SNAPSHOT_INTERVAL,
+            snapshot_min_records=config.JOURNAL_SNAPSHOT_MIN_RECORDS,
+        )
+    if backend == "sqlite":
+        from sqlite_storage import SQLiteStorage
+
+        return SQLiteStorage(
+            config.SQLITE_PATH,
+            pool_size=config.SQLITE_POOL_SIZE,
+            batch_size=config.SQLITE_BATCH_SIZE,
+            users=users,
+            posts=posts,
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+
+def _headers(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+
+
+class ActingUserTest(unittest.TestCase):
+    def test_reactions_act_as_token_user(self):
+        """
+        Лайк, дизлайк и пакет реакций ставятся только от имени пользователя из токена.
+        """
+        with TestClient(main.app) as client:
+            response = client.post("/posts/", json={"id": 0, "title": "Post", "content": "Text"}, headers=_headers(1))
+            self.assertEqual(response.json()["user_id"], 1)
+            post_id = response.json()["id"]
+
+            for kind in ("like", "dislike"):
+                response = client.post(f"/posts/{post_id}/{kind}/", json={"user_id": 3, "post_id": post_id},
+                                       headers=_headers(2))
+                self.assertEqual(response.status_code, 403)
+            response = client.post(f"/posts/{post_id}/like/", json={"user_id": 2, "post_id": post_id},
+                                   headers=_headers(2))
+            self.assertEqual(response.status_code, 200)
+
+            batch = [{"post_id": post_id, "user_id": 2, "kind": "dislike"},
+                     {"post_id": post_id, "user_id": 3, "kind": "like"}]
+            response = client.post("/reactions/batch", json=batch, headers=_headers(2))
+            self.assertEqual(response.json()["results"], [{"status": "ok"}, {"status": "forbidden"}])
+
+    def test_post_author_must_match_token(self):
+        """
+        Пост нельзя создать от имени другого пользователя.
+        """
+        with TestClient(main.app) as client:
+            response = client.post("/posts/", json={"id": 0, "title": "Post", "content": "Text", "user_id": 2},
+                                   headers=_headers(1))
+            self.assertEqual(response.status_code, 403)
+
+    def test_only_author_changes_post(self):
+        """
+        Изменить или удалить пост может только автор, а user_id из тела не меняет автора.
+        """
+        with TestClient(main.app) as client:
+            post_id = client.post("/posts/", json={"id": 0, "title": "Post", "content": "Text"},
+                                  headers=_headers(1)).json()["id"]
+            body = {"id": post_id, "title": "Changed", "content": "Text"}
+
+            self.assertEqual(client.put(f"/posts/{post_id}", json=body, headers=_headers(2)).status_code, 403)
+            self.assertEqual(client.delete(f"/posts/{post_id}", headers=_headers(2)).status_code, 403)
+            response = client.put(f"/posts/{post_id}", json={**body, "user_id": 7}, headers=_headers(1))
+            self.assertEqual(response.status_code, 403)
+            self.assertEqual(client.get(f"/posts/{post_id}").json()["title"], "Post")
+
+            response = client.put(f"/posts/{post_id}", json=body, headers=_headers(1))
+            self.assertEqual(response.json()["user_id"], 1)
+            self.assertEqual(client.get(f"/posts/{post_id}").json()["title"], "Changed")
+            self.assertEqual(client.delete(f"/posts/{post_id}", headers=_headers(1)).status_code, 200)
+            self.assertEqual(client.delete(f"/posts/{post_id}", headers=_headers(1)).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
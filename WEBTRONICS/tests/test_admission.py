@@ -0,0 +1,141 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import admission  # noqa: E402
+from admission import AdmissionLimiter, AdmissionMiddleware, RateLimiter, client_key, route_class  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+
+async def _slow_app(scope, receive, send):
+    await asyncio.sleep(0.05)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+class AdmissionLimiterTest(unittest.TestCase):
+    def test_queue_and_handoff(self):
+        """
+        Запрос сверх лимита ждет в очереди и получает место освободившегося, а при полной очереди отклоняется.
+        """
+        async def scenario():
+            limiter = AdmissionLimiter("test", limit=1, queue_limit=1, deadline=1.0)
+            self.assertIsNone(await limiter.acquire())
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.queued, 1)
+            self.assertEqual(await limiter.acquire(), "queue_full")
+            limiter.release()
+            self.assertIsNone(await waiter)
+            self.assertEqual((limiter.in_flight, limiter.queued), (1, 0))
+            limiter.release()
+            self.assertEqual(limiter.in_flight, 0)
+
+        asyncio.run(scenario())
+
+    def test_deadline(self):
+        """
+        Запрос отклоняется по дедлайну после ожидания или сразу, если оценка ожидания больше дедлайна.
+        """
+        async def scenario():
+            limiter = AdmissionLimiter("test", limit=1, queue_limit=10, deadline=0.01)
+            await limiter.acquire()
+            self.assertEqual(await limiter.acquire(), "deadline")
+            self.assertEqual(limiter.queued, 0)
+            limiter.observe(1.0)
+            self.assertEqual(await limiter.acquire(), "deadline")
+            limiter.release()
+            self.assertEqual(limiter.in_flight, 0)
+
+        asyncio.run(scenario())
+
+    def test_cancelled_waiter_leaves_queue(self):
+        """
+        Отмененный ожидающий запрос уходит из очереди и не занимает место.
+        """
+        async def scenario():
+            limiter = AdmissionLimiter("test", limit=1, queue_limit=10, deadline=1.0)
+            await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            self.assertEqual(limiter.queued, 0)
+            limiter.release()
+            self.assertEqual(limiter.in_flight, 0)
+
+        asyncio.run(scenario())
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_token_bucket(self):
+        """
+        Клиент тратит запас burst, затем ждет пополнения; клиенты не влияют друг на друга.
+        """
+        limiter = RateLimiter(rate=10, burst=2, max_clients=1)
+        with mock.patch.object(admission.time, "monotonic", return_value=100.0) as clock:
+            self.assertEqual([limiter.take("a"), limiter.take("a")], [0.0, 0.0])
+            self.assertAlmostEqual(limiter.take("a"), 0.1)
+            clock.return_value = 100.15
+            self.assertEqual(limiter.take("a"), 0.0)
+            self.assertEqual(limiter.take("b"), 0.0)
+            # Корзина клиента "a" вытеснена, он начинает с полной
+            self.assertEqual([limiter.take("a"), limiter.take("a")], [0.0, 0.0])
+
+
+class RoutingTest(unittest.TestCase):
+    def test_route_class(self):
+        """
+        Маршруты делятся на классы auth, stream, read и write.
+        """
+        self.assertEqual(route_class("POST", "/login"), "auth")
+        self.assertEqual(route_class("POST", "/auth/refresh"), "auth")
+        self.assertEqual(route_class("GET", "/posts/1/live"), "stream")
+        self.assertEqual(route_class("POST", "/import"), "stream")
+        self.assertEqual(route_class("GET", "/posts"), "read")
+        self.assertEqual(route_class("DELETE", "/posts/1"), "write")
+
+    def test_client_key(self):
+        """
+        Ключ клиента — sub из действительного токена, иначе IP-адрес.
+        """
+        token = create_access_token({"sub": "alice", "uid": 1})
+        scope = {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("10.0.0.1", 1)}
+        self.assertEqual(client_key(scope), "user:alice")
+        scope["headers"] = [(b"authorization", b"Bearer broken")]
+        self.assertEqual(client_key(scope), "ip:10.0.0.1")
+        self.assertEqual(client_key({"headers": []}), "ip:unknown")
+
+
+class AdmissionMiddlewareTest(unittest.TestCase):
+    def test_overload_and_rate_limit(self):
+        """
+        Перегрузка дает 503, превышение частоты — 429, оба с Retry-After; /metrics не ограничивается.
+        """
+        async def scenario():
+            app = AdmissionMiddleware(
+                _slow_app,
+                {"read": AdmissionLimiter("read", limit=1, queue_limit=0, deadline=1.0)},
+                rate_limiter=RateLimiter(rate=0.001, burst=3, max_clients=10),
+            )
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                first, second = await asyncio.gather(client.get("/posts"), client.get("/posts"))
+                self.assertEqual(sorted([first.status_code, second.status_code]), [200, 503])
+                self.assertEqual((await client.get("/posts")).status_code, 200)
+                response = await client.get("/posts")
+                self.assertEqual(response.status_code, 429)
+                self.assertGreaterEqual(int(response.headers["retry-after"]), 1)
+                self.assertEqual((await client.get("/metrics")).status_code, 200)
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
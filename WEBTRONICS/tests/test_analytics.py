@@ -0,0 +1,110 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+import config  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from reactions import DISLIKE, LIKE  # noqa: E402
+
+
+class ReactionSummaryTest(unittest.TestCase):
+    def _summary(self) -> dict:
+        log = analytics.ReactionEventLog(chunk_size=4)
+        # Пользователи 2 и 3 реагируют на пост 1 в одну и ту же секунду, пользователь 2 — еще раз позже
+        log.append(1, 2, LIKE, 1000)
+        log.append(1, 3, DISLIKE, 1000)
+        log.append(2, 7, LIKE, 1000)
+        log.append(1, 2, LIKE, 1005)
+        log.append(1, 4, LIKE, 1005)
+        return log.snapshot(0, 2000).summary(1)
+
+    def test_unique_reactors_counts_users(self):
+        """
+        Уникальные пользователи считаются по ID пользователя, а не по времени события.
+        """
+        self.assertEqual(self._summary(), {
+            "events": 4, "likes": 3, "dislikes": 1, "unique_reactors": 3, "like_ratio": 0.75,
+        })
+
+    def test_unique_reactors_counts_users_without_numpy(self):
+        """
+        Без numpy итоги те же.
+        """
+        with mock.patch.object(analytics, "numpy", None):
+            self.assertEqual(self._summary()["unique_reactors"], 3)
+
+
+class ReactionEventLogTest(unittest.TestCase):
+    def test_out_of_range_ids_are_skipped(self):
+        """
+        События с ID вне диапазона uint32 пропускаются, не нарушая выравнивание колонок.
+        """
+        log = analytics.ReactionEventLog()
+        log.append(1, -1, LIKE, 1000)
+        log.append(2 ** 40, 2, LIKE, 1000)
+        log.append(1, 2, DISLIKE, 1000)
+        self.assertEqual(len(log), 1)
+        self.assertEqual(log.stats()["skipped"], 2)
+        self.assertEqual(log.snapshot(0, 2000).summary(1)["dislikes"], 1)
+
+    def test_histogram_across_chunks(self):
+        """
+        Гистограмма за период учитывает события из заполненных блоков и хвоста, с numpy и без него.
+        """
+        log = analytics.ReactionEventLog(chunk_size=3)
+        for second, post_id, kind in ((990, 1, LIKE), (1000, 1, LIKE), (1001, 2, LIKE), (1010, 1, DISLIKE),
+                                      (1020, 1, LIKE), (1025, 1, LIKE), (1030, 1, LIKE)):
+            log.append(post_id, 7, kind, second)
+        log.append(1, 7, LIKE, 900)
+        expected = [(1000, 1, 1), (1020, 2, 0)]
+        self.assertEqual(log.snapshot(1000, 1030).histogram(1, 1000, 1030, 20), expected)
+        with mock.patch.object(analytics, "numpy", None):
+            self.assertEqual(log.snapshot(1000, 1030).histogram(1, 1000, 1030, 20), expected)
+        # Событие с более ранним временем записано временем последнего
+        self.assertEqual(log.snapshot(1030, 1031).summary(None)["events"], 2)
+        self.assertEqual(log.snapshot(1000, 1030).summary(None)["likes"], 4)
+
+    def test_retention_drops_old_chunks(self):
+        """
+        Блоки старше срока хранения удаляются при заполнении следующего блока.
+        """
+        log = analytics.ReactionEventLog(retention=100, chunk_size=2)
+        for second in (1000, 1001, 1050, 1060, 1200, 1201):
+            log.append(1, 2, LIKE, second)
+        self.assertEqual(log.stats()["chunks"], 1)
+        self.assertEqual(log.snapshot(0, 2000).summary(1)["events"], 2)
+
+
+class AnalyticsEndpointTest(unittest.TestCase):
+    def test_reactions_reach_analytics(self):
+        """
+        Лайк попадает в итоги и гистограмму; неверный период и слишком много интервалов дают 400.
+        """
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user1502', 'uid': 1502})}"}
+        author = {"Authorization": f"Bearer {create_access_token({'sub': 'user1501', 'uid': 1501})}"}
+        with TestClient(main.app) as client:
+            post_id = client.post("/posts/", json={"id": 0, "title": "Stats", "content": "Text"},
+                                  headers=author).json()["id"]
+            client.post(f"/posts/{post_id}/like/", json={"user_id": 1502, "post_id": post_id}, headers=headers)
+            summary = client.get("/analytics/summary", params={"post_id": post_id}).json()
+            self.assertEqual((summary["likes"], summary["unique_reactors"], summary["like_ratio"]), (1, 1, 1.0))
+            histogram = client.get("/analytics/histogram", params={"post_id": post_id}).json()
+            self.assertEqual(sum(item["likes"] for item in histogram["items"]), 1)
+            self.assertIn(len(histogram["items"]), (24, 25))
+
+            response = client.get("/analytics/summary", params={"since": 2000, "until": 1000})
+            self.assertEqual(response.status_code, 400)
+            response = client.get("/analytics/histogram",
+                                  params={"since": 0, "until": config.ANALYTICS_MAX_BUCKETS + 1, "bucket": 1})
+            self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
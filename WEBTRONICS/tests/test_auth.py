@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import unittest
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth  # noqa: E402
+import main  # noqa: E402
+from auth import TokenCache, create_access_token, create_refresh_token  # noqa: E402
+
+
+class TokenCacheTest(unittest.TestCase):
+    def test_expired_entries_are_not_served(self):
+        """
+        Токен с наступившим exp не выдается из кэша и удаляется из него.
+        """
+        cache = TokenCache(4)
+        cache.put("live", {"exp": time.time() + 60})
+        cache.put("dead", {"exp": time.time() - 1})
+        cache.put("no-exp", {})
+        self.assertIsNotNone(cache.get("live"))
+        self.assertIsNone(cache.get("dead"))
+        self.assertIsNone(cache.get("no-exp"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "size": 1, "maxsize": 4})
+
+    def test_least_recently_used_is_evicted(self):
+        """
+        При переполнении вытесняется давно не использованный токен.
+        """
+        cache = TokenCache(2)
+        exp = time.time() + 60
+        cache.put("a", {"exp": exp})
+        cache.put("b", {"exp": exp})
+        cache.get("a")
+        cache.put("c", {"exp": exp})
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(TokenCache(0)), 0)
+
+
+class ProtectedRouteTest(unittest.TestCase):
+    def test_write_routes_require_access_token(self):
+        """
+        Запись без токена, с поддельным, истекшим или refresh-токеном отклоняется.
+        """
+        claims = {"sub": "user1", "uid": 1}
+        expired = auth._encode_token(claims, "access", timedelta(seconds=-1))
+        forged = create_access_token(claims)[:-2] + "xx"
+        post = {"id": 0, "title": "Post", "content": "Text"}
+        with TestClient(main.app) as client:
+            self.assertEqual(client.post("/posts/", json=post).status_code, 403)
+            for token, detail in ((expired, "Token has expired"), (forged, "Invalid token"),
+                                  (create_refresh_token(claims), "Invalid token")):
+                response = client.post("/posts/", json=post, headers={"Authorization": f"Bearer {token}"})
+                self.assertEqual((response.status_code, response.json()["detail"]), (401, detail))
+
+            token = create_access_token({"sub": "user1"})
+            response = client.post("/posts/", json=post, headers={"Authorization": f"Bearer {token}"})
+            self.assertEqual(response.status_code, 403)
+
+            token = create_access_token(claims)
+            for _ in range(2):
+                response = client.post("/posts/", json=post, headers={"Authorization": f"Bearer {token}"})
+                self.assertEqual(response.status_code, 200)
+            self.assertGreaterEqual(auth.token_cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+
+def _headers(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+
+
+class BatchReactionsTest(unittest.TestCase):
+    def test_results_per_item(self):
+        """
+        Каждый элемент пакета получает свой статус, а корректные реакции применяются.
+        """
+        with TestClient(main.app) as client:
+            own = client.post("/posts/", json={"id": 0, "title": "Own", "content": "Text"},
+                              headers=_headers(1001)).json()["id"]
+            other = client.post("/posts/", json={"id": 0, "title": "Other", "content": "Text"},
+                                headers=_headers(1002)).json()["id"]
+            batch = [{"post_id": other, "user_id": 1001, "kind": "like"},
+                     {"post_id": other, "user_id": 1001, "kind": "dislike"},
+                     {"post_id": other, "user_id": 1001, "kind": "love"},
+                     {"post_id": own, "user_id": 1001, "kind": "like"},
+                     {"post_id": 2 ** 31, "user_id": 1001, "kind": "like"}]
+            response = client.post("/reactions/batch", json=batch, headers=_headers(1001))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["applied"], 2)
+            self.assertEqual([result["status"] for result in response.json()["results"]],
+                             ["ok", "ok", "invalid", "own_post", "not_found"])
+            post = client.get(f"/posts/{other}").json()
+            self.assertEqual((post["like_count"], post["dislike_count"]), (0, 1))
+
+            body = "\n".join([json.dumps({"post_id": other, "user_id": 1001, "kind": "like"}), "{broken", ""])
+            response = client.post("/reactions/batch", content=body,
+                                   headers={**_headers(1001), "Content-Type": "application/x-ndjson"})
+            self.assertEqual([result["status"] for result in response.json()["results"]], ["ok", "invalid"])
+            post = client.get(f"/posts/{other}").json()
+            self.assertEqual((post["like_count"], post["dislike_count"]), (1, 0))
+
+    def test_rejected_batches(self):
+        """
+        Тело не в виде массива, слишком большое тело и слишком много реакций отклоняются целиком.
+        """
+        item = {"post_id": 1, "user_id": 1001, "kind": "like"}
+        with TestClient(main.app) as client:
+            response = client.post("/reactions/batch", json=item, headers=_headers(1001))
+            self.assertEqual(response.status_code, 400)
+            response = client.post("/reactions/batch", content=b"[", headers=_headers(1001))
+            self.assertEqual(response.status_code, 400)
+            with mock.patch.object(config, "REACTIONS_BATCH_LIMIT", 2):
+                response = client.post("/reactions/batch", json=[item] * 3, headers=_headers(1001))
+                self.assertEqual(response.status_code, 413)
+            with mock.patch.object(config, "REACTIONS_BATCH_MAX_BYTES", 16):
+                response = client.post("/reactions/batch", json=[item], headers=_headers(1001))
+                self.assertEqual(response.status_code, 413)
+            self.assertEqual(client.post("/reactions/batch", json=[item]).status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
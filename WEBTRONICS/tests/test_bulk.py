@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from bulk import iter_line_chunks, parse_records  # noqa: E402
+from reactions import DISLIKE, LIKE  # noqa: E402
+from search import SearchIndex  # noqa: E402
+from storage import MemoryStorage  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token({'sub': 'bulk-admin', 'uid': 1})}"}
+
+
+class ParseRecordsTest(unittest.TestCase):
+    def test_out_of_range_ids_are_rejected(self):
+        """
+        Записи с ID меньше 1 или вне диапазона uint32 отклоняются при разборе, остальные проходят.
+        """
+        records, errors = parse_records([
+            b'{"type":"post","id":-5,"title":"a","content":"b"}',
+            b'{"type":"post","id":1099511627776,"title":"a","content":"b"}',
+            b'{"type":"user","id":0,"username":"x","password":"p"}',
+            b'{"type":"reaction","post_id":8,"user_id":4294967296,"kind":"like"}',
+            b'{"type":"post","id":8,"title":"a","content":"b"}',
+        ])
+        self.assertEqual(sorted(errors), [0, 1, 2, 3])
+        self.assertEqual(records, [(4, ("post", {"id": 8, "title": "a", "content": "b", "user_id": None}))])
+
+    def test_line_chunks(self):
+        """
+        Строки собираются через границы фрагментов, длинная строка заменяется на None.
+        """
+        async def stream():
+            for data in (b"ab\ncd", b"ef\n\nlong-line-", b"continues\nxy"):
+                yield data
+
+        async def collect():
+            return [chunk async for chunk in iter_line_chunks(stream(), 2, 8)]
+
+        self.assertEqual(asyncio.run(collect()), [[b"ab", b"cdef", b""], [None, b"xy"]])
+
+
+async def _export(storage: MemoryStorage) -> bytes:
+    return b"".join([chunk async for chunk in storage.export_ndjson()])
+
+
+class RoundTripTest(unittest.TestCase):
+    def test_export_import_round_trip(self):
+        """
+        Выгрузка, загруженная в пустое хранилище, дает ту же выгрузку; чужое имя с другим ID отклоняется.
+        """
+        async def scenario():
+            source = MemoryStorage(
+                users=[{"username": "alice", "password": "h1"}, {"username": "bob", "password": "h2"}],
+                posts=[{"id": 1, "title": "Один", "content": "a", "user_id": 1},
+                       {"id": 5, "title": "Пять", "content": "b", "user_id": 2}],
+            )
+            await source.react(1, 2, LIKE)
+            await source.react(5, 1, DISLIKE)
+            exported = await _export(source)
+
+            target = MemoryStorage()
+            records, errors = parse_records(exported.split(b"\n"))
+            self.assertEqual(errors, {})
+            outcomes = await target.import_records([record for _, record in records])
+            self.assertTrue(all(status == "ok" for status, _ in outcomes))
+            self.assertEqual(await _export(target), exported)
+            self.assertEqual(await target.reaction_counts(5), (0, 1))
+
+            outcomes = await target.import_records([("user", {"id": 9, "username": "ALICE", "password": "x"})])
+            self.assertEqual(outcomes, [("conflict", None)])
+
+        asyncio.run(scenario())
+
+
+class ImportTest(unittest.TestCase):
+    def test_bad_ids_do_not_stop_the_chunk(self):
+        """
+        Строки с недопустимыми ID отклоняются, а остальные строки той же группы загружаются и индексируются.
+        """
+        body = b"\n".join([
+            b'{"type":"post","id":900001,"title":"importedword one","content":"x"}',
+            b'{"type":"post","id":-5,"title":"importedword bad","content":"x"}',
+            b'{"type":"post","id":1099511627776,"title":"importedword big","content":"x"}',
+            b'{"type":"post","id":900002,"title":"importedword two","content":"x"}',
+        ])
+        with mock.patch.object(main, "bulk_users", {"bulk-admin"}), TestClient(main.app) as client:
+            report = client.post("/import", content=body, headers=HEADERS).json()
+            self.assertEqual(report["imported"]["post"], 2)
+            self.assertEqual(sum(report["rejected"].values()), 2)
+            found = client.get("/posts/search", params={"q": "importedword"}).json()
+            self.assertEqual(sorted(item["id"] for item in found["items"]), [900001, 900002])
+            exported = client.get("/export", headers=HEADERS).content
+            self.assertIn(b'"id":900002', exported)
+
+    def test_bulk_access_is_restricted(self):
+        """
+        Пользователь не из BULK_USERS не может выгружать и загружать данные.
+        """
+        with mock.patch.object(main, "bulk_users", {"bulk-admin"}), TestClient(main.app) as client:
+            other = {"Authorization": f"Bearer {create_access_token({'sub': 'someone', 'uid': 2})}"}
+            self.assertEqual(client.get("/export", headers=other).status_code, 403)
+            self.assertEqual(client.post("/import", content=b"", headers=other).status_code, 403)
+            self.assertEqual(client.get("/export").status_code, 403)
+
+
+class SparseIdsTest(unittest.TestCase):
+    def test_large_id_does_not_grow_the_length_array(self):
+        """
+        Пост с ID около 2**32 не раздувает массив длин индекса и находится поиском.
+        """
+        index = SearchIndex()
+        index.add({"id": 1, "title": "cats dogs", "content": ""})
+        index.add({"id": 2 ** 32 - 1, "title": "cats", "content": ""})
+        self.assertLess(len(index._lengths), 1 << 17)
+        self.assertEqual([post_id for post_id, _ in index.search("cats", 10)], [4294967295, 1])
+        index.remove(2 ** 32 - 1)
+        self.assertEqual([post_id for post_id, _ in index.search("cats", 10)], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
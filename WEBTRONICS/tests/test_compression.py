@@ -0,0 +1,93 @@
+import asyncio
+import os
+import sys
+import unittest
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_compression import (  # noqa: E402
+    CompressedResponseCache, CompressionMiddleware, choose_encoding, make_encoders,
+)
+
+BODY = b'{"text":"' + b"compressible " * 200 + b'"}'
+
+
+async def _app(scope, receive, send):
+    path = scope["path"]
+    content_type = b"text/event-stream" if path == "/events" else b"application/json"
+    headers = [(b"content-type", content_type)]
+    if path == "/cached":
+        headers.append((b"etag", b'"v1"'))
+    body = b'{"small":true}' if path == "/small" else BODY
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    if path in ("/stream", "/events"):
+        for offset in range(0, len(body), 500):
+            await send({"type": "http.response.body", "body": body[offset:offset + 500], "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    else:
+        await send({"type": "http.response.body", "body": body})
+
+
+class ChooseEncodingTest(unittest.TestCase):
+    def test_weights_and_server_preference(self):
+        """
+        Выбирается кодировка с наибольшим q, при равенстве — предпочтение сервера; q=0 запрещает.
+        """
+        available = ["br", "zstd", "gzip"]
+        self.assertEqual(choose_encoding("gzip, br", available), "br")
+        self.assertEqual(choose_encoding("gzip;q=1.0, br;q=0.5", available), "gzip")
+        self.assertEqual(choose_encoding("*;q=0.1, br;q=0", available), "zstd")
+        self.assertIsNone(choose_encoding("identity", available))
+        self.assertIsNone(choose_encoding("gzip;q=bad", available))
+
+
+class CompressedResponseCacheTest(unittest.TestCase):
+    def test_size_is_bounded(self):
+        """
+        Суммарный размер кэша ограничен, вытесняются давно не запрошенные тела.
+        """
+        cache = CompressedResponseCache(10)
+        cache.put(("/a", b'"1"', "gzip"), b"12345")
+        cache.put(("/b", b'"1"', "gzip"), b"12345")
+        cache.get(("/a", b'"1"', "gzip"))
+        cache.put(("/c", b'"1"', "gzip"), b"123")
+        cache.put(("/d", b'"1"', "gzip"), b"x" * 11)
+        self.assertIsNone(cache.get(("/b", b'"1"', "gzip")))
+        self.assertIsNone(cache.get(("/d", b'"1"', "gzip")))
+        self.assertEqual(cache.stats()["bytes"], 8)
+
+
+class CompressionMiddlewareTest(unittest.TestCase):
+    def test_responses(self):
+        """
+        Большие и потоковые JSON-ответы сжимаются, маленькие и SSE — нет; сжатое тело с ETag берется из кэша.
+        """
+        async def scenario():
+            cache = CompressedResponseCache(1 << 20)
+            app = CompressionMiddleware(_app, {"gzip": make_encoders(6, 4, 3)["gzip"]}, 1024, 2048, cache)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test",
+                                         headers={"Accept-Encoding": "gzip"}) as client:
+                for path in ("/large", "/stream", "/cached"):
+                    response = await client.get(path)
+                    self.assertEqual(response.headers.get("content-encoding"), "gzip", path)
+                    self.assertEqual(response.content, BODY, path)
+                    self.assertEqual(response.headers["vary"], "Accept-Encoding", path)
+                self.assertEqual(response.headers["etag"], 'W/"v1"')
+                self.assertLess(int(response.headers["content-length"]), len(BODY))
+                await client.get("/cached")
+                self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+                for path in ("/small", "/events"):
+                    response = await client.get(path)
+                    self.assertNotIn("content-encoding", response.headers, path)
+                response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+                self.assertEqual((response.content, response.headers["vary"]), (BODY, "Accept-Encoding"))
+                self.assertNotIn("content-encoding", response.headers)
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import serialization  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token({'sub': 'user1', 'uid': 1})}"}
+
+
+class IdBoundsTest(unittest.TestCase):
+    def test_out_of_range_ids_are_rejected_before_storing(self):
+        """
+        ID вне диапазона uint32 в теле, пути и параметрах запроса отклоняются с кодом 422, а пост остается читаемым.
+        """
+        with TestClient(main.app) as client:
+            post_id = client.post("/posts/", json={"id": 0, "title": "Post", "content": "Text"},
+                                  headers=HEADERS).json()["id"]
+            body = {"id": post_id, "title": "Changed", "content": "Text", "user_id": 2 ** 70}
+            self.assertEqual(client.put(f"/posts/{post_id}", json=body, headers=HEADERS).status_code, 422)
+            self.assertEqual(client.post("/posts/", json={**body, "id": -1, "user_id": None},
+                                         headers=HEADERS).status_code, 422)
+            response = client.get(f"/posts/{post_id}")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["title"], "Post")
+
+            for path in (f"/posts/{2 ** 70}", f"/posts?after={2 ** 70}", f"/posts?user_id={2 ** 70}",
+                         f"/analytics/summary?post_id={2 ** 70}", f"/analytics/histogram?until={2 ** 70}"):
+                self.assertEqual(client.get(path).status_code, 422, path)
+            self.assertEqual(client.delete(f"/posts/{2 ** 70}", headers=HEADERS).status_code, 422)
+
+
+class SerializationTest(unittest.TestCase):
+    def test_fallback_matches_orjson(self):
+        """
+        Без orjson dumps и loads дают тот же компактный UTF-8 JSON, что и с ним.
+        """
+        data = {"title": "Пост", "items": [1, 2.5, None, True], "nested": {"a": "b"}}
+        encoded = serialization.dumps(data)
+        with mock.patch.object(serialization, "orjson", None):
+            self.assertEqual(serialization.dumps(data), encoded)
+            self.assertEqual(serialization.loads(encoded), data)
+        self.assertEqual(json.loads(encoded), data)
+
+
+class ApiDocsTest(unittest.TestCase):
+    def test_docs_are_prebuilt_with_etag(self):
+        """
+        Схема OpenAPI и Swagger UI отдаются с ETag, а повторный запрос с ним получает 304.
+        """
+        with TestClient(main.app) as client:
+            for path in ("/openapi.json", "/docs"):
+                response = client.get(path)
+                self.assertEqual(response.status_code, 200, path)
+                etag = response.headers["etag"]
+                response = client.get(path, headers={"If-None-Match": etag})
+                self.assertEqual(response.status_code, 304, path)
+            self.assertIn("/posts/{post_id}", client.get("/openapi.json").json()["paths"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import asyncio
+import glob
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import journal  # noqa: E402
+from journal import JournaledStorage  # noqa: E402
+from reactions import DISLIKE, LIKE  # noqa: E402
+
+
+class JournalRecoveryTest(unittest.TestCase):
+    def test_truncated_snapshot_tmp_is_ignored(self):
+        """
+        Недописанный снимок *.pickle.tmp не мешает восстановлению и удаляется при открытии.
+        """
+        directory = tempfile.mkdtemp()
+
+        async def run():
+            storage = JournaledStorage(directory)
+            await storage.open()
+            await storage.create_post({"id": 0, "title": "Post", "content": "Text", "user_id": None})
+            await storage.snapshot()
+            await storage.close()
+            with open(os.path.join(directory, "snapshot-00000009.pickle.tmp"), "wb") as file:
+                file.write(b"\x80\x05truncated")
+
+            storage = JournaledStorage(directory)
+            await storage.open()
+            exists = await storage.post_exists(1)
+            await storage.snapshot()
+            await storage.close()
+            return exists
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertFalse([name for name in os.listdir(directory) if name.endswith(".tmp")])
+
+    def test_log_is_replayed_after_restart(self):
+        """
+        Без снимка состояние восстанавливается из журнала, а оборванная последняя запись пропускается.
+        """
+        directory = tempfile.mkdtemp()
+
+        async def run():
+            storage = JournaledStorage(directory)
+            await storage.open()
+            user = await storage.add_user("alice", "hash")
+            kept = await storage.create_post({"id": 0, "title": "Kept", "content": "Text", "user_id": user["id"]})
+            deleted = await storage.create_post({"id": 0, "title": "Gone", "content": "Text", "user_id": user["id"]})
+            await storage.update_post(kept["id"], {**kept, "title": "Edited"})
+            await storage.set_reaction(kept["id"], 7, LIKE)
+            await storage.set_reaction(kept["id"], 8, DISLIKE)
+            await storage.set_reaction(deleted["id"], 7, LIKE)
+            await storage.delete_post(deleted["id"])
+            await storage.close()
+            path = glob.glob(os.path.join(directory, "journal-*.log"))[-1]
+            with open(path, "ab") as file:
+                file.write(b'["react", 1, 9')
+
+            storage = JournaledStorage(directory)
+            await storage.open()
+            result = (
+                await storage.get_post(kept["id"]),
+                await storage.post_exists(deleted["id"]),
+                await storage.reaction_counts(kept["id"]),
+                await storage.reaction_counts(deleted["id"]),
+                await storage.get_user("Alice"),
+            )
+            await storage.close()
+            return result
+
+        post, deleted_exists, counts, deleted_counts, user = asyncio.run(run())
+        self.assertEqual(post["title"], "Edited")
+        self.assertFalse(deleted_exists)
+        self.assertEqual(counts, (1, 1))
+        self.assertEqual(deleted_counts, (0, 0))
+        self.assertEqual(user["password"], "hash")
+
+    def test_snapshot_is_consistent_while_writes_continue(self):
+        """
+        Снимок соответствует состоянию на момент переключения журнала, даже если реакции меняются во время записи,
+        а восстановление из снимка и журнала дает итоговое состояние. fork не используется.
+        """
+        directory = tempfile.mkdtemp()
+
+        async def run():
+            storage = JournaledStorage(directory, fsync_wait=False)
+            await storage.open()
+            post = await storage.create_post({"id": 0, "title": "Post", "content": "Text", "user_id": 1})
+            for user_id in range(2, 102):
+                await storage.set_reaction(post["id"], user_id, LIKE)
+
+            # Поток записи снимка ждет, пока реакции не изменятся
+            written = threading.Event()
+            write_snapshot = journal._write_snapshot
+
+            def delayed_write(path, state):
+                written.wait(10)
+                write_snapshot(path, state)
+
+            with mock.patch("os.fork", side_effect=AssertionError("fork is not allowed")), \
+                    mock.patch.object(journal, "_write_snapshot", delayed_write):
+                snapshot = asyncio.ensure_future(storage.snapshot())
+                await asyncio.sleep(0)
+                for user_id in range(2, 12):
+                    await storage.set_reaction(post["id"], user_id, DISLIKE)
+                await storage.set_reaction(post["id"], 500, LIKE)
+                written.set()
+                await snapshot
+            live = await storage.reaction_counts(post["id"])
+            await storage.close()
+
+            path = glob.glob(os.path.join(directory, "snapshot-*.pickle"))[-1]
+            with open(path, "rb") as file:
+                _, _, reactions = pickle.load(file)
+
+            storage = JournaledStorage(directory)
+            await storage.open()
+            recovered = await storage.reaction_counts(post["id"])
+            await storage.close()
+            return reactions.counts(post["id"]), live, recovered
+
+        snapshot, live, recovered = asyncio.run(run())
+        self.assertEqual(snapshot, (100, 0))
+        self.assertEqual(live, (91, 10))
+        self.assertEqual(recovered, live)
+
+
+if __name__ == "__main__":
+    unittest.main()
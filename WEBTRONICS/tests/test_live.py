@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from live import LiveCounts, Subscription  # noqa: E402
+
+
+def _headers(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+
+
+class _Posts:
+    def __init__(self):
+        self.versions = {}
+        self.counts = {}
+
+    def react(self, post_id: int, like_count: int, dislike_count: int) -> None:
+        self.versions[post_id] = self.versions.get(post_id, 0) + 1
+        self.counts[post_id] = (like_count, dislike_count)
+
+    def version(self, post_id: int) -> int:
+        return self.versions.get(post_id, 0)
+
+    async def read_counts(self, post_id: int):
+        return self.counts.get(post_id, (0, 0))
+
+
+def _counts(message: bytes) -> tuple:
+    data = json.loads(message)
+    return data["like_count"], data["dislike_count"]
+
+
+class LiveCountsTest(unittest.TestCase):
+    def test_publish_coalesces_changes(self):
+        """
+        Подписчик сразу получает текущие счетчики, затем одно сообщение за тик и только при их изменении.
+        """
+        async def scenario():
+            posts = _Posts()
+            posts.react(1, 1, 0)
+            live = LiveCounts(posts.version, posts.read_counts, tick=1.0, max_subscribers=2)
+            first, second = await live.subscribe(1), await live.subscribe(1)
+            self.assertEqual(_counts(await first.next(0)), (1, 0))
+            await second.next(0)
+
+            posts.react(1, 2, 0)
+            posts.react(1, 3, 0)
+            self.assertEqual(await live.publish(), 2)
+            self.assertEqual(_counts(await first.next(0)), (3, 0))
+            self.assertEqual(await live.publish(), 0)
+            # Правка текста меняет версию, но не счетчики
+            posts.versions[1] += 1
+            self.assertEqual(await live.publish(), 0)
+            self.assertIsNone(await first.next(0.01))
+
+            self.assertIsNone(await live.subscribe(2))
+            live.unsubscribe(first)
+            live.unsubscribe(first)
+            live.unsubscribe(second)
+            self.assertEqual(live.subscribers, 0)
+            self.assertIsNotNone(await live.subscribe(2))
+
+        asyncio.run(scenario())
+
+    def test_slow_subscriber_gets_latest(self):
+        """
+        Неотправленное сообщение заменяется новым, поэтому медленный клиент получает последние счетчики.
+        """
+        async def scenario():
+            subscription = Subscription(1)
+            for count in range(3):
+                subscription.offer(str(count).encode())
+            self.assertEqual(await subscription.next(0), b"2")
+            self.assertEqual(subscription.conflated, 2)
+
+        asyncio.run(scenario())
+
+
+class LiveEndpointTest(unittest.TestCase):
+    def test_websocket_receives_updates(self):
+        """
+        WebSocket получает текущие счетчики и обновление после лайка; для неизвестного поста закрывается с 4404.
+        """
+        with TestClient(main.app) as client:
+            post_id = client.post("/posts/", json={"id": 0, "title": "Live", "content": "Text"},
+                                  headers=_headers(1301)).json()["id"]
+            with client.websocket_connect(f"/posts/{post_id}/live") as websocket:
+                self.assertEqual(websocket.receive_json(),
+                                 {"post_id": post_id, "like_count": 0, "dislike_count": 0})
+                client.post(f"/posts/{post_id}/like/", json={"user_id": 1302, "post_id": post_id},
+                            headers=_headers(1302))
+                self.assertEqual(websocket.receive_json()["like_count"], 1)
+
+            with self.assertRaises(WebSocketDisconnect) as error:
+                with client.websocket_connect("/posts/999999/live") as websocket:
+                    websocket.receive_json()
+            self.assertEqual(error.exception.code, 4404)
+            self.assertEqual(client.get("/posts/999999/live").status_code, 404)
+            self.assertEqual(main.live_counts.subscribers, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loadtest  # noqa: E402
+
+
+def _results(rps: float, p99_ms: float) -> dict:
+    return {"routes": {"read": {"rps": rps, "p99_ms": p99_ms}}}
+
+
+class LoadTestTest(unittest.TestCase):
+    def test_parse_mix(self):
+        """
+        Смесь операций разбирается в веса, неизвестная операция отклоняется.
+        """
+        self.assertEqual(loadtest.parse_mix("read=50, like=5"), {"read": 50, "like": 5})
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("read=50,explode=1")
+
+    def test_compare_with_baseline(self):
+        """
+        Регрессией считается падение пропускной способности или рост p99 больше порога.
+        """
+        baseline = _results(1000, 10)
+        self.assertEqual(loadtest.compare(_results(900, 11), baseline, 0.15), [])
+        self.assertEqual(len(loadtest.compare(_results(800, 12), baseline, 0.15)), 2)
+        self.assertEqual(loadtest.compare({"routes": {}}, baseline, 0.15), [])
+
+    def test_short_run(self):
+        """
+        Короткий прогон выполняет все операции смеси без ошибок в операциях с постами.
+        """
+        mix = loadtest.parse_mix("read=4,create=2,update=2,delete=1,like=2,dislike=1")
+        results = asyncio.run(loadtest.run(300, 4, mix, seed=3, initial_posts=20))
+        self.assertEqual(set(results["routes"]), set(mix))
+        self.assertEqual(sum(route["requests"] for route in results["routes"].values()), 300)
+        for name, route in results["routes"].items():
+            self.assertEqual(route["errors"], 0, name)
+            self.assertLessEqual(route["p50_ms"], route["p99_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
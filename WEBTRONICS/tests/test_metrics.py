@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from metrics import Counter, Gauge, Histogram, MetricsRegistry  # noqa: E402
+
+
+def _value(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class MetricsFormatTest(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        """
+        Метрики выводятся в текстовом формате Prometheus с накопленными корзинами гистограммы.
+        """
+        registry = MetricsRegistry()
+        requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+        in_flight = registry.register(Gauge("in_flight", "In flight."))
+        sizes = registry.register(Histogram("size", "Sizes.", ("route",), buckets=(1.0, 10.0)))
+        requests.inc('/a"b')
+        requests.inc('/a"b', amount=2)
+        in_flight.inc()
+        in_flight.dec()
+        for value in (0.5, 5, 50):
+            sizes.observe(value, "/a")
+        self.assertEqual(registry.render().decode().splitlines(), [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{route="/a\\"b"} 3',
+            "# HELP in_flight In flight.",
+            "# TYPE in_flight gauge",
+            "in_flight 0",
+            "# HELP size Sizes.",
+            "# TYPE size histogram",
+            'size_bucket{route="/a",le="1.0"} 1',
+            'size_bucket{route="/a",le="10.0"} 2',
+            'size_bucket{route="/a",le="+Inf"} 3',
+            'size_sum{route="/a"} 55.5',
+            'size_count{route="/a"} 3',
+        ])
+
+
+class MetricsMiddlewareTest(unittest.TestCase):
+    def test_requests_are_labelled_by_route_template(self):
+        """
+        Запросы учитываются по шаблону маршрута и коду ответа, а не по фактическому пути.
+        """
+        with TestClient(main.app) as client:
+            before = client.get("/metrics").text
+            client.get("/posts/999999")
+            client.get("/posts/999998")
+            client.get("/no/such/path")
+            after = client.get("/metrics").text
+        self.assertTrue(after.startswith("# HELP"))
+        for prefix in ('webtronics_http_requests_total{method="GET",route="/posts/{post_id}",status="404"}',
+                       'webtronics_http_request_duration_seconds_count{method="GET",route="/posts/{post_id}"}'):
+            self.assertEqual(_value(after, prefix) - _value(before, prefix), 2, prefix)
+        prefix = 'webtronics_http_requests_total{method="GET",route="<unmatched>",status="404"}'
+        self.assertEqual(_value(after, prefix) - _value(before, prefix), 1)
+        self.assertNotIn("999999", after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+
+def _headers(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+
+
+def _pages(client: TestClient, **params) -> list:
+    pages, after = [], 0
+    while after is not None:
+        page = client.get("/posts", params={**params, "after": after}).json()
+        pages.append([post["id"] for post in page["items"]])
+        after = page["next_cursor"]
+    return pages
+
+
+class PaginationTest(unittest.TestCase):
+    def test_cursor_walks_author_posts(self):
+        """
+        Курсор проходит посты автора по возрастанию ID без пропусков и повторов.
+        """
+        with TestClient(main.app) as client:
+            created = [client.post("/posts/", json={"id": 0, "title": f"Page {i}", "content": "Text"},
+                                   headers=_headers(801)).json()["id"] for i in range(5)]
+            client.delete(f"/posts/{created[2]}", headers=_headers(801))
+            expected = created[:2] + created[3:]
+            # За заполненной страницей следует пустая: курсор выдается без заглядывания вперед
+            self.assertEqual(_pages(client, limit=2, user_id=801), [expected[:2], expected[2:], []])
+            self.assertEqual(_pages(client, limit=3, user_id=801), [expected[:3], expected[3:]])
+
+            ids = [post_id for page in _pages(client, limit=3) for post_id in page]
+            self.assertEqual(ids, sorted(set(ids)))
+            self.assertTrue(set(expected) <= set(ids))
+            self.assertEqual(client.get("/posts", params={"user_id": 802}).json(), {"items": [], "next_cursor": None})
+
+    def test_page_size_is_bounded(self):
+        """
+        Размер страницы вне допустимого диапазона отклоняется с кодом 422.
+        """
+        with TestClient(main.app) as client:
+            for limit in (0, config.POSTS_PAGE_LIMIT + 1):
+                self.assertEqual(client.get("/posts", params={"limit": limit}).status_code, 422)
+            self.assertEqual(client.get("/posts", params={"after": -1}).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import passwords  # noqa: E402
+from passwords import PasswordHasher, hash_password, verify_password  # noqa: E402
+
+
+class VerifyPasswordTest(unittest.TestCase):
+    def test_hash_round_trip(self):
+        """
+        Хэш scrypt проверяется верным паролем и отклоняет неверный.
+        """
+        stored = hash_password("secret", 1024, 8, 1)
+        self.assertTrue(verify_password("secret", stored))
+        self.assertFalse(verify_password("wrong", stored))
+
+    def test_malformed_hash_is_mismatch(self):
+        """
+        Поврежденный хэш scrypt считается несовпадением, а не ошибкой.
+        """
+        for stored in ("scrypt$x$8$1$00$00", "scrypt$1024$8$1$zz$00", "scrypt$1000$8$1$00$00",
+                       "scrypt$1024$8$1$$00", "scrypt$99999999999999999999$8$1$00$00"):
+            self.assertFalse(verify_password("secret", stored), stored)
+
+
+class PasswordHasherTest(unittest.TestCase):
+    def test_unknown_user_verifies_dummy_hash(self):
+        """
+        Для неизвестного пользователя пароль проверяется по фиктивному хэшу.
+        """
+        hasher = PasswordHasher(n=1024, r=8, p=1, workers=1, queue_limit=4)
+        try:
+            with mock.patch.object(passwords, "verify_password", wraps=verify_password) as verify:
+                self.assertEqual(asyncio.run(hasher.verify("secret", None)), (False, None))
+                self.assertEqual(asyncio.run(hasher.verify("secret", None)), (False, None))
+            self.assertEqual(verify.call_count, 2)
+            self.assertTrue(hasher.needs_rehash("plain") and not hasher.needs_rehash(verify.call_args.args[1]))
+        finally:
+            hasher.shutdown()
+
+    def test_queue_limit(self):
+        """
+        При переполненной очереди пула хэширование сразу отклоняется с кодом 503.
+        """
+        hasher = PasswordHasher(n=1024, r=8, p=1, workers=1, queue_limit=0)
+        try:
+            with self.assertRaises(main.HTTPException) as error:
+                asyncio.run(hasher.hash("secret"))
+            self.assertEqual(error.exception.status_code, 503)
+        finally:
+            hasher.shutdown()
+
+
+class LoginTest(unittest.TestCase):
+    def test_login_failures_are_401(self):
+        """
+        Неизвестное имя, неверный пароль и поврежденный хэш дают одинаковый ответ 401.
+        """
+        with TestClient(main.app) as client:
+            self.assertEqual(client.post("/register", params={"username": "hashuser", "password": "pw"}).status_code,
+                             200)
+            self.assertEqual(client.post("/login", params={"username": "hashuser", "password": "pw"}).status_code,
+                             200)
+            for username, password in (("nobody", "pw"), ("hashuser", "bad")):
+                response = client.post("/login", params={"username": username, "password": password})
+                self.assertEqual((response.status_code, response.json()), (401, {"detail": "Invalid credentials"}))
+
+            asyncio.run(main.db.set_password("hashuser", "scrypt$1024$8$1$zz$00"))
+            response = client.post("/login", params={"username": "hashuser", "password": "pw"})
+            self.assertEqual(response.status_code, 401)
+
+    def test_plaintext_password_is_rehashed(self):
+        """
+        Пароль, сохраненный в открытом виде, заменяется хэшем после успешного входа.
+        """
+        with TestClient(main.app) as client:
+            client.post("/register", params={"username": "legacyuser", "password": "pw"})
+            asyncio.run(main.db.set_password("legacyuser", "pw"))
+            self.assertEqual(client.post("/login", params={"username": "legacyuser", "password": "pw"}).status_code,
+                             200)
+            stored = asyncio.run(main.db.get_user("legacyuser"))["password"]
+            self.assertTrue(stored.startswith("scrypt$") and verify_password("pw", stored))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from profiling import ProfilingMiddleware, RequestProfiler, StackSampler  # noqa: E402
+
+ADMIN = {"Authorization": f"Bearer {create_access_token({'sub': 'prof-admin', 'uid': 1})}"}
+
+
+def _busy_handler(seconds: float) -> None:
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        pass
+
+
+class StackSamplerTest(unittest.TestCase):
+    def test_samples_running_task(self):
+        """
+        Сэмплер видит функцию, выполняющуюся в задаче цикла событий, и выдает стеки в формате collapsed.
+        """
+        async def scenario():
+            sampler = StackSampler(interval=0.001, max_overhead=0.5, max_stacks=100, max_depth=64)
+            sampler.start(10)
+            with self.assertRaises(RuntimeError):
+                sampler.start(10)
+            await asyncio.create_task(self._busy())
+            sampler.stop()
+            return sampler
+
+        sampler = asyncio.run(scenario())
+        stats = sampler.stats()
+        self.assertFalse(stats["running"])
+        self.assertGreater(stats["samples"], 0)
+        lines = sampler.collapsed().decode().splitlines()
+        self.assertTrue(any("_busy_handler" in line for line in lines))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+
+    async def _busy(self) -> None:
+        _busy_handler(0.2)
+
+    def test_route_counts_only_selected_requests(self):
+        """
+        При профилировании маршрута учитываются только выборки во время отмеченных запросов.
+        """
+        async def scenario():
+            sampler = StackSampler(interval=0.001, max_overhead=0.5, max_stacks=100, max_depth=64)
+            sampler.start(10, route="/posts/{post_id}", every=2)
+
+            async def request():
+                task = sampler.select()
+                try:
+                    _busy_handler(0.1)
+                finally:
+                    if task is not None:
+                        sampler.release(task)
+                return task is not None
+
+            selected = [await asyncio.create_task(request()) for _ in range(2)]
+            await asyncio.create_task(self._busy())
+            sampler.stop()
+            return sampler, selected
+
+        sampler, selected = asyncio.run(scenario())
+        self.assertEqual(selected, [False, True])
+        self.assertGreater(sampler.samples, 0)
+        # Нагрузка вне отмеченных запросов в выборки не попадает
+        self.assertNotIn(b":StackSamplerTest._busy;", sampler.collapsed())
+
+
+class ProfilingMiddlewareTest(unittest.TestCase):
+    def test_profile_next_request(self):
+        """
+        После arm под cProfile выполняется только следующий запрос указанного маршрута.
+        """
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def read_item(item_id: int):
+            return {"id": item_id}
+
+        @app.get("/other")
+        async def read_other():
+            return {}
+
+        requests = RequestProfiler()
+        app.add_middleware(ProfilingMiddleware, sampler=StackSampler(0.005, 0.02, 100, 64), requests=requests)
+        with TestClient(app) as client:
+            requests.arm("/items/{item_id}")
+            client.get("/other")
+            self.assertIsNone(requests.report(5))
+            client.get("/items/7")
+            client.get("/items/8")
+            self.assertIsNone(requests.route)
+        report = requests.report(5)
+        self.assertIn("path=/items/7 route=/items/{item_id}", report)
+        self.assertIn("function calls", report)
+
+
+class ProfilingEndpointTest(unittest.TestCase):
+    def test_admin_endpoints(self):
+        """
+        Профилированием управляют только PROFILING_USERS; неизвестный маршрут — 404, повторный запуск — 409.
+        """
+        other = {"Authorization": f"Bearer {create_access_token({'sub': 'someone', 'uid': 2})}"}
+        with mock.patch.object(main, "profiling_users", {"prof-admin"}), TestClient(main.app) as client:
+            self.assertEqual(client.get("/admin/profile", headers=other).status_code, 403)
+            response = client.post("/admin/profile/request", params={"route": "/nope"}, headers=ADMIN)
+            self.assertEqual(response.status_code, 404)
+            response = client.post("/admin/profile/request", params={"route": "/posts/{post_id}"}, headers=ADMIN)
+            self.assertEqual(client.get("/admin/profile", headers=ADMIN).json()["request_route"], "/posts/{post_id}")
+            main.request_profiler.route = None
+
+            response = client.post("/admin/profile/start", params={"seconds": 5}, headers=ADMIN)
+            self.assertTrue(response.json()["running"])
+            response = client.post("/admin/profile/start", params={"seconds": 5}, headers=ADMIN)
+            self.assertEqual(response.status_code, 409)
+            self.assertFalse(client.post("/admin/profile/stop", headers=ADMIN).json()["running"])
+            response = client.get("/admin/profile/flamegraph", headers=ADMIN)
+            self.assertEqual(response.headers["content-type"].split(";")[0], "text/plain")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import TopRanking, TrendingRanking  # noqa: E402
+from reactions import DISLIKE, LIKE  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        # Начало минутной корзины
+        self.now = 1_000_020.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TopRankingTest(unittest.TestCase):
+    def test_reactions_move_posts(self):
+        """
+        Лайк, дизлайк и переключение реакции меняют счет поста на нужную величину.
+        """
+        ranking = TopRanking()
+        ranking.apply(1, None, LIKE)
+        ranking.apply(1, None, LIKE)
+        ranking.apply(2, None, LIKE)
+        ranking.apply(3, None, DISLIKE)
+        self.assertEqual(ranking.top(3), [(1, 2), (2, 1), (3, -1)])
+
+        ranking.apply(1, LIKE, DISLIKE)
+        ranking.apply(2, LIKE, LIKE)
+        self.assertEqual(ranking.top(2), [(2, 1), (1, 0)])
+        ranking.remove(2)
+        self.assertEqual(ranking.top(10), [(1, 0), (3, -1)])
+        self.assertEqual(len(ranking), 2)
+
+
+class TrendingRankingTest(unittest.TestCase):
+    def test_recent_reactions_outweigh_old_ones(self):
+        """
+        Недавние реакции весят больше старых, а вышедшие из окна не учитываются.
+        """
+        clock = _Clock()
+        ranking = TrendingRanking(window=600, bucket_seconds=60, half_life=60, refresh_interval=0, clock=clock)
+        ranking.record(1, 3)
+        clock.now += 120
+        ranking.record(2, 1)
+        self.assertEqual([post_id for post_id, _ in ranking.top(2)], [2, 1])
+        self.assertAlmostEqual(ranking.top(1)[0][1], 1.0)
+
+        clock.now += 600
+        self.assertEqual([post_id for post_id, _ in ranking.top(2)], [2])
+        clock.now += 120
+        self.assertEqual(ranking.top(2), [])
+
+    def test_remove_and_refresh_interval(self):
+        """
+        Удаленный пост сразу пропадает, а новые реакции видны после интервала пересчета.
+        """
+        clock = _Clock()
+        ranking = TrendingRanking(refresh_interval=5, clock=clock)
+        ranking.record(1)
+        self.assertEqual([post_id for post_id, _ in ranking.top(5)], [1])
+        ranking.record(2, 2)
+        self.assertEqual([post_id for post_id, _ in ranking.top(5)], [1])
+        clock.now += 5
+        self.assertEqual([post_id for post_id, _ in ranking.top(5)], [2, 1])
+        ranking.remove(2)
+        self.assertEqual([post_id for post_id, _ in ranking.top(5)], [1])
+
+    def test_scores_survive_rebase(self):
+        """
+        Перенос точки отсчета весов не меняет приведенный счет.
+        """
+        clock = _Clock()
+        ranking = TrendingRanking(window=600, bucket_seconds=60, half_life=60, refresh_interval=0, clock=clock)
+        ranking.record(1)
+        clock.now += 2400
+        ranking.record(1)
+        clock.now += 180
+        ranking.record(2)
+        scores = dict(ranking.top(2))
+        self.assertAlmostEqual(scores[1], 0.125)
+        self.assertAlmostEqual(scores[2], 1.0)
+
+    def test_long_window_rebases_rarely(self):
+        """
+        При окне длиннее 32 периодов полураспада точка отсчета не переносится на каждой реакции.
+        """
+        clock = _Clock()
+        ranking = TrendingRanking(window=86400, bucket_seconds=60, half_life=600, refresh_interval=0, clock=clock)
+        with mock.patch.object(ranking, "_rebase", wraps=ranking._rebase) as rebase:
+            for _ in range(30):
+                ranking.record(1)
+                clock.now += 3600
+            ranking.record(2)
+        self.assertLessEqual(rebase.call_count, 1)
+        self.assertEqual([post_id for post_id, _ in ranking.top(2)], [2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reactions import DISLIKE, LIKE, ReactionStore  # noqa: E402
+
+
+class ReactionStoreTest(unittest.TestCase):
+    def test_reactions_are_deduplicated(self):
+        """
+        Повторный лайк не меняет счетчики, а дизлайк после лайка переключает реакцию.
+        """
+        store = ReactionStore()
+        self.assertIsNone(store.set(1, 10, LIKE))
+        self.assertEqual(store.set(1, 10, LIKE), LIKE)
+        self.assertEqual(store.counts(1), (1, 0))
+        self.assertEqual(store.set(1, 10, DISLIKE), LIKE)
+        store.set(1, 11, DISLIKE)
+        self.assertEqual(store.counts(1), (0, 2))
+        self.assertEqual(store.get(1, 10), DISLIKE)
+        self.assertEqual(len(store), 2)
+
+    def test_remove_and_drop(self):
+        """
+        Удаление реакции уменьшает счетчик, удаление поста убирает все его реакции.
+        """
+        store = ReactionStore()
+        store.set(1, 10, LIKE)
+        store.set(2, 10, LIKE)
+        store.set(2, 11, DISLIKE)
+        self.assertEqual(store.remove(1, 10), LIKE)
+        self.assertIsNone(store.remove(1, 10))
+        self.assertEqual(store.counts(1), (0, 0))
+        store.drop_post(2)
+        self.assertEqual(list(store.iter_counts()), [])
+        self.assertEqual(list(store.iter_reactions()), [])
+
+    def test_unknown_kind(self):
+        """
+        Неизвестный тип реакции отклоняется с ValueError.
+        """
+        with self.assertRaises(ValueError):
+            ReactionStore().set(1, 10, 0)
+
+    def test_copy_on_write(self):
+        """
+        Копия сохраняет состояние на момент снятия, пока оригинал продолжает меняться.
+        """
+        store = ReactionStore()
+        store.set(1, 10, LIKE)
+        store.set(2, 10, LIKE)
+        clone = store.copy()
+        store.set(1, 11, DISLIKE)
+        store.remove(2, 10)
+        store.set(3, 10, LIKE)
+        self.assertEqual(sorted(clone.iter_reactions()), [(1, 10, LIKE), (2, 10, LIKE)])
+        self.assertEqual(clone.counts(1), (1, 0))
+        self.assertEqual(store.counts(1), (1, 1))
+        store.release()
+        store.set(1, 12, LIKE)
+        self.assertEqual(clone.counts(1), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
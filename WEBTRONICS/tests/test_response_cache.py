@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from response_cache import PostResponseCache, etag_matches  # noqa: E402
+
+
+def _headers(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+
+
+class PostResponseCacheTest(unittest.TestCase):
+    def test_stale_versions_are_not_served(self):
+        """
+        Ответ, построенный по старой версии поста, не выдается и не сохраняется.
+        """
+        cache = PostResponseCache(2)
+        version = cache.version(1)
+        cache.put(1, version, b"v0")
+        self.assertEqual(cache.get(1, version), b"v0")
+        etag = cache.etag(1, version)
+        cache.bump(1)
+        self.assertIsNone(cache.get(1, cache.version(1)))
+        cache.put(1, version, b"stale")
+        self.assertIsNone(cache.get(1, cache.version(1)))
+        self.assertNotEqual(cache.etag(1, cache.version(1)), etag)
+
+    def test_least_recently_used_is_evicted(self):
+        """
+        При переполнении вытесняется давно не запрошенный ответ.
+        """
+        cache = PostResponseCache(2)
+        for post_id in (1, 2):
+            cache.put(post_id, 0, b"body")
+        cache.get(1, 0)
+        cache.put(3, 0, b"body")
+        self.assertIsNone(cache.get(2, 0))
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_etag_matches(self):
+        """
+        If-None-Match совпадает со слабым ETag и с любым ETag из списка.
+        """
+        self.assertTrue(etag_matches('"a", W/"b"', '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+
+class ConditionalGetTest(unittest.TestCase):
+    def test_etag_follows_post_changes(self):
+        """
+        Актуальный ETag дает 304, а реакция, изменение и удаление поста делают его устаревшим.
+        """
+        with TestClient(main.app) as client:
+            post_id = client.post("/posts/", json={"id": 0, "title": "Cached", "content": "Text"},
+                                  headers=_headers(1101)).json()["id"]
+            response = client.get(f"/posts/{post_id}")
+            etag = response.headers["etag"]
+            response = client.get(f"/posts/{post_id}", headers={"If-None-Match": etag})
+            self.assertEqual((response.status_code, response.content), (304, b""))
+
+            client.post(f"/posts/{post_id}/like/", json={"user_id": 1102, "post_id": post_id}, headers=_headers(1102))
+            response = client.get(f"/posts/{post_id}", headers={"If-None-Match": etag})
+            self.assertEqual((response.status_code, response.json()["like_count"]), (200, 1))
+            etag = response.headers["etag"]
+
+            client.put(f"/posts/{post_id}", json={"id": post_id, "title": "Changed", "content": "Text"},
+                       headers=_headers(1101))
+            response = client.get(f"/posts/{post_id}", headers={"If-None-Match": etag})
+            self.assertEqual((response.status_code, response.json()["title"]), (200, "Changed"))
+            etag = response.headers["etag"]
+
+            client.delete(f"/posts/{post_id}", headers=_headers(1101))
+            response = client.get(f"/posts/{post_id}", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import secrets
+import sys
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from revocation import BloomFilter, RevocationList  # noqa: E402
+
+
+class RevocationListTest(unittest.TestCase):
+    def test_bloom_filter_has_no_false_negatives(self):
+        """
+        Фильтр Блума всегда находит добавленные ключи и редко — чужие.
+        """
+        bloom = BloomFilter(1000, 0.01)
+        keys = [int(secrets.token_hex(16), 16) for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(int(secrets.token_hex(16), 16) in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_revoke_grow_and_prune(self):
+        """
+        Отозванные токены находятся и после роста фильтра, а истекшие записи удаляются очисткой.
+        """
+        revoked = RevocationList(capacity=4, error_rate=0.01, prune_interval=3600)
+        now = time.time()
+        live = [secrets.token_hex(16) for _ in range(10)]
+        for jti in live:
+            revoked.revoke(jti, now + 60)
+        short = secrets.token_hex(16)
+        revoked.revoke(short, now + 1)
+        revoked.revoke(secrets.token_hex(16), now - 1)
+        self.assertEqual(len(revoked), 11)
+        self.assertTrue(all(revoked.is_revoked(jti) for jti in live + [short]))
+        self.assertFalse(revoked.is_revoked(secrets.token_hex(16)))
+
+        revoked.prune(now + 2)
+        self.assertEqual(len(revoked), 10)
+        self.assertFalse(revoked.is_revoked(short))
+        self.assertTrue(all(revoked.is_revoked(jti) for jti in live))
+
+
+class RefreshAndLogoutTest(unittest.TestCase):
+    def test_refresh_tokens_are_single_use(self):
+        """
+        Refresh-токен обменивается на новую пару один раз; токен доступа refresh не принимается.
+        """
+        with TestClient(main.app) as client:
+            client.post("/register", params={"username": "refresher", "password": "pw"})
+            tokens = client.post("/login", params={"username": "refresher", "password": "pw"}).json()
+            response = client.post("/auth/refresh", params={"refresh_token": tokens["refresh_token"]})
+            self.assertEqual(response.status_code, 200)
+            renewed = response.json()
+            response = client.post("/auth/refresh", params={"refresh_token": tokens["refresh_token"]})
+            self.assertEqual((response.status_code, response.json()["detail"]), (401, "Token has been revoked"))
+            response = client.post("/auth/refresh", params={"refresh_token": renewed["access_token"]})
+            self.assertEqual(response.status_code, 401)
+            headers = {"Authorization": f"Bearer {renewed['access_token']}"}
+            response = client.post("/posts/", json={"id": 0, "title": "Post", "content": "Text"}, headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+    def test_logout_revokes_tokens(self):
+        """
+        После выхода токен доступа и refresh-токен отклоняются; чужой refresh-токен не принимается.
+        """
+        with TestClient(main.app) as client:
+            sessions = []
+            for username in ("leaver", "bystander"):
+                client.post("/register", params={"username": username, "password": "pw"})
+                sessions.append(client.post("/login", params={"username": username, "password": "pw"}).json())
+            leaver, bystander = sessions
+            headers = {"Authorization": f"Bearer {leaver['access_token']}"}
+
+            response = client.post("/auth/logout", params={"refresh_token": bystander["refresh_token"]},
+                                   headers=headers)
+            self.assertEqual(response.status_code, 401)
+            response = client.post("/auth/logout", params={"refresh_token": leaver["refresh_token"]}, headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+            response = client.post("/posts/", json={"id": 0, "title": "Post", "content": "Text"}, headers=headers)
+            self.assertEqual((response.status_code, response.json()["detail"]), (401, "Token has been revoked"))
+            response = client.post("/auth/refresh", params={"refresh_token": leaver["refresh_token"]})
+            self.assertEqual(response.status_code, 401)
+            response = client.post("/auth/refresh", params={"refresh_token": bystander["refresh_token"]})
+            self.assertEqual(response.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
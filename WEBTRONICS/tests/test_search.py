@@ -0,0 +1,118 @@
+import math
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from search import SearchIndex, tokenize  # noqa: E402
+
+
+def _post(post_id: int, title: str, content: str = "") -> dict:
+    return {"id": post_id, "title": title, "content": content}
+
+
+def _bm25(posts: list, query: str, k1: float = 1.2, b: float = 0.75) -> dict:
+    documents = {post["id"]: Counter(tokenize(post["title"] + "\n" + post["content"])) for post in posts}
+    average = sum(sum(terms.values()) for terms in documents.values()) / len(documents)
+    scores = {}
+    for term in set(tokenize(query)):
+        matching = [post_id for post_id, terms in documents.items() if term in terms]
+        idf = math.log(1 + (len(documents) - len(matching) + 0.5) / (len(matching) + 0.5))
+        for post_id in matching:
+            frequency = documents[post_id][term]
+            length = sum(documents[post_id].values())
+            scores[post_id] = scores.get(post_id, 0.0) + idf * frequency * (k1 + 1) / (
+                frequency + k1 * (1 - b + b * length / average))
+    return scores
+
+
+class SearchIndexTest(unittest.TestCase):
+    def test_tokenize(self):
+        """
+        Слова выделяются в любом алфавите без учета регистра, «ё» приравнивается к «е».
+        """
+        self.assertEqual(tokenize("Ёжик в тумане, HELLO_world 42"), ["ежик", "в", "тумане", "hello", "world", "42"])
+
+    def test_scores_match_exhaustive_bm25(self):
+        """
+        Оценки и порядок совпадают с полным перебором BM25, в том числе при отсечении частых слов.
+        """
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(40)]
+        posts = [_post(post_id, " ".join(rng.choices(words, weights=range(40, 0, -1), k=rng.randint(3, 30))))
+                 for post_id in range(1, 400)]
+        index = SearchIndex()
+        for post in posts:
+            index.add(post)
+        for query in ("w0 w39", "w1 w2 w3 w30", "w5", "missing w38"):
+            expected = sorted(_bm25(posts, query).items(), key=lambda item: (-item[1], item[0]))
+            for limit, offset in ((5, 0), (5, 5), (50, 0)):
+                result = index.search(query, limit, offset)
+                self.assertEqual([post_id for post_id, _ in result],
+                                 [post_id for post_id, _ in expected[offset:offset + limit]], query)
+                for (_, score), (_, reference) in zip(result, expected[offset:]):
+                    self.assertAlmostEqual(score, reference)
+
+    def test_update_and_remove(self):
+        """
+        Измененный пост ищется по новому тексту, удаленный не ищется совсем.
+        """
+        index = SearchIndex()
+        index.add(_post(1, "Кошки", "и собаки"))
+        index.add(_post(2, "Собаки"))
+        index.add(_post(1, "Птицы"))
+        self.assertEqual([post_id for post_id, _ in index.search("кошки", 10)], [])
+        self.assertEqual([post_id for post_id, _ in index.search("собаки птицы", 10)], [1, 2])
+        index.remove(2)
+        index.remove(2)
+        self.assertEqual([post_id for post_id, _ in index.search("собаки", 10)], [])
+        self.assertEqual(len(index), 1)
+
+    def test_sparse_ids(self):
+        """
+        Посты с очень большими ID ищутся так же, как обычные, и не раздувают массив длин.
+        """
+        index = SearchIndex()
+        index.add(_post(1, "alpha beta"))
+        index.add(_post(2 ** 32 - 1, "alpha"))
+        self.assertLess(len(index._lengths), 2 ** 20)
+        self.assertEqual([post_id for post_id, _ in index.search("alpha", 10)], [2 ** 32 - 1, 1])
+        index.remove(2 ** 32 - 1)
+        self.assertEqual([post_id for post_id, _ in index.search("alpha", 10)], [1])
+
+
+class SearchEndpointTest(unittest.TestCase):
+    def test_search_pages(self):
+        """
+        Поиск листается по offset, отражает изменения постов и ограничен SEARCH_MAX_RESULTS.
+        """
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user1201', 'uid': 1201})}"}
+        with TestClient(main.app) as client:
+            ids = [client.post("/posts/", json={"id": 0, "title": f"Зебра {i}", "content": "зебра " * i},
+                               headers=headers).json()["id"] for i in range(1, 4)]
+            page = client.get("/posts/search", params={"q": "ЗЕБРА", "limit": 2}).json()
+            self.assertEqual([post["id"] for post in page["items"]], [ids[2], ids[1]])
+            page = client.get("/posts/search", params={"q": "зебра", "limit": 2, "offset": page["next_offset"]}).json()
+            self.assertEqual(([post["id"] for post in page["items"]], page["next_offset"]), ([ids[0]], None))
+
+            client.delete(f"/posts/{ids[2]}", headers=headers)
+            page = client.get("/posts/search", params={"q": "зебра"}).json()
+            self.assertEqual([post["id"] for post in page["items"]], [ids[1], ids[0]])
+
+            with mock.patch.object(config, "SEARCH_MAX_RESULTS", 10):
+                response = client.get("/posts/search", params={"q": "зебра", "limit": 5, "offset": 6})
+                self.assertEqual(response.status_code, 400)
+            self.assertEqual(client.get("/posts/search", params={"q": ""}).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
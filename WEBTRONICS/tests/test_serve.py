@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _serve(env: dict) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "serve.py", "--workers", "2", "--port", "0"], cwd=ROOT, env={**os.environ, **env},
+        capture_output=True, text=True, timeout=60,
+    )
+
+
+class WorkersTest(unittest.TestCase):
+    def test_several_workers_require_sqlite_and_shared_counters(self):
+        """
+        Несколько воркеров без бэкенда sqlite или без общих счетчиков не запускаются.
+        """
+        result = _serve({"STORAGE_BACKEND": "memory"})
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("single worker only", result.stderr)
+
+        result = _serve({"STORAGE_BACKEND": "sqlite", "SHARED_COUNTERS": "false"})
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("SHARED_COUNTERS", result.stderr)
+
+    def test_default_is_one_worker(self):
+        """
+        По умолчанию запускается один воркер при любом бэкенде.
+        """
+        env = {**os.environ, "STORAGE_BACKEND": "sqlite"}
+        env.pop("LAUNCHER_WORKERS", None)
+        result = subprocess.run([sys.executable, "-c", "import config; print(config.LAUNCHER_WORKERS)"],
+                                cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.stdout.strip(), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
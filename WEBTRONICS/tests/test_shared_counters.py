@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+import unittest
+from multiprocessing import shared_memory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reactions import DISLIKE, LIKE  # noqa: E402
+from response_cache import PostResponseCache  # noqa: E402
+from shared_counters import SharedReactionCounters  # noqa: E402
+
+
+class SharedEtagTest(unittest.TestCase):
+    def test_etag_matches_across_workers(self):
+        """
+        ETag поста, выданный одним воркером, совпадает в другом воркере с тем же сегментом.
+        """
+        name = f"webtronics-test-{os.getpid()}"
+        first, second = SharedReactionCounters(name, 16), SharedReactionCounters(name, 16)
+        self.assertTrue(first.open())
+        self.assertFalse(second.open())
+        try:
+            first.apply(3, None, LIKE)
+            caches = PostResponseCache(8, shared=first), PostResponseCache(8, shared=second)
+            etags = [cache.etag(3, cache.version(3)) for cache in caches]
+            self.assertEqual(etags[0], etags[1])
+            self.assertEqual(second.counts(3), (1, 0))
+        finally:
+            second.close()
+            first.close()
+
+
+class SharedReactionCountersTest(unittest.TestCase):
+    def setUp(self):
+        self.name = f"webtronics-counters-{os.getpid()}"
+        self.counters = SharedReactionCounters(self.name, 8)
+        self.assertTrue(self.counters.open())
+
+    def tearDown(self):
+        self.counters.close()
+
+    def test_apply_switches_reaction_and_bumps_version(self):
+        """
+        Смена реакции переносит голос, повтор той же реакции ничего не меняет.
+        """
+        counters = self.counters
+        counters.apply(2, None, LIKE)
+        counters.apply(2, LIKE, DISLIKE)
+        version = counters.version(2)
+        counters.apply(2, DISLIKE, DISLIKE)
+        self.assertEqual(counters.counts(2), (0, 1))
+        self.assertEqual(counters.version(2), version)
+        self.assertEqual(version, 2)
+
+    def test_reset_and_bump_change_version(self):
+        """
+        Обнуление счетчиков и изменение поста увеличивают версию.
+        """
+        counters = self.counters
+        counters.apply(3, None, LIKE)
+        counters.bump(3)
+        counters.reset(3)
+        self.assertEqual(counters.counts(3), (0, 0))
+        self.assertEqual(counters.version(3), 3)
+
+    def test_covers_and_seed(self):
+        """
+        Слот нулевого ID и ID за пределами сегмента не используются, seed пропускает такие посты.
+        """
+        counters = self.counters
+
+        async def counts():
+            for row in ((1, 4, 2), (7, 1, 0), (8, 9, 9)):
+                yield row
+
+        asyncio.run(counters.seed(counts()))
+        self.assertEqual([counters.covers(post_id) for post_id in (0, 1, 7, 8)], [False, True, True, False])
+        self.assertEqual(counters.counts(1), (4, 2))
+        self.assertEqual(counters.counts(7), (1, 0))
+
+    def test_last_process_unlinks_segment(self):
+        """
+        Сегмент удаляется только после отключения последнего воркера; второй воркер видит ту же емкость.
+        """
+        other = SharedReactionCounters(self.name, 100)
+        self.assertFalse(other.open())
+        self.assertEqual(other.capacity, 8)
+        self.assertEqual(other.boot, self.counters.boot)
+        other.close()
+        self.counters.apply(1, None, LIKE)
+        self.assertEqual(self.counters.counts(1), (1, 0))
+        self.counters.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(self.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
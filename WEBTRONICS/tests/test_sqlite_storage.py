@@ -0,0 +1,93 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reactions import DISLIKE, LIKE  # noqa: E402
+from sqlite_storage import SQLiteStorage  # noqa: E402
+
+SEED = {
+    "users": [{"username": "user1", "password": "password1"}],
+    "posts": [{"id": 1, "title": "Post 1", "content": "Content 1", "user_id": None}],
+}
+
+
+class SQLiteStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "test.db")
+
+    def _run(self, scenario):
+        async def run():
+            storage = SQLiteStorage(self.path, **SEED)
+            await storage.open()
+            try:
+                return await scenario(storage)
+            finally:
+                await storage.close()
+
+        return asyncio.run(run())
+
+    def test_seed_is_written_once(self):
+        """
+        Начальные данные записываются только в новую базу: удаленный начальный пост не возвращается.
+        """
+        async def delete_seed(storage):
+            self.assertIsNotNone(await storage.get_user("user1"))
+            return await storage.delete_post(1)
+
+        async def seed_post_exists(storage):
+            return await storage.post_exists(1)
+
+        self.assertIsNotNone(self._run(delete_seed))
+        self.assertFalse(self._run(seed_post_exists))
+
+    def test_react_statuses(self):
+        """
+        Реакция проверяет пост и автора в одной транзакции и возвращает предыдущую реакцию.
+        """
+        async def scenario(storage):
+            post = await storage.create_post({"id": 0, "title": "t", "content": "c", "user_id": 7})
+            return [
+                await storage.react(post["id"], 8, LIKE),
+                await storage.react(post["id"], 8, DISLIKE),
+                await storage.react(post["id"], 7, LIKE),
+                await storage.react(10 ** 6, 8, LIKE),
+                await storage.reaction_counts(post["id"]),
+            ]
+
+        self.assertEqual(self._run(scenario), [("ok", None), ("ok", LIKE), ("own_post", None),
+                                               ("not_found", None), (0, 1)])
+
+    def test_delete_post_removes_reactions(self):
+        """
+        Удаление поста удаляет его реакции и счетчики.
+        """
+        async def scenario(storage):
+            post = await storage.create_post({"id": 0, "title": "t", "content": "c", "user_id": 7})
+            await storage.react(post["id"], 8, LIKE)
+            await storage.delete_post(post["id"])
+            return await storage.reaction_counts(post["id"]), [row async for row in storage.iter_reaction_counts()]
+
+        counts, rows = self._run(scenario)
+        self.assertEqual(counts, (0, 0))
+        self.assertEqual(rows, [])
+
+    def test_iter_posts_by_author(self):
+        """
+        Страницы постов автора идут по возрастанию ID начиная после курсора.
+        """
+        async def scenario(storage):
+            ids = [(await storage.create_post({"id": 0, "title": "t", "content": "c", "user_id": i % 2}))["id"]
+                   for i in range(6)]
+            page = [post["id"] async for post in storage.iter_posts(ids[1], 2, user_id=1)]
+            return ids, page
+
+        ids, page = self._run(scenario)
+        self.assertEqual(page, [ids[3], ids[5]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import sys
+import unittest
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from auth import decode_access_token  # noqa: E402
+from storage import PostRepository, UserRegistry  # noqa: E402
+
+
+def _post(post_id: int, user_id: int) -> dict:
+    return {"id": post_id, "title": f"Post {post_id}", "content": "Text", "user_id": user_id}
+
+
+class PostRepositoryTest(unittest.TestCase):
+    def test_ids_are_not_reused(self):
+        """
+        Новые посты получают монотонные ID, удаленные ID повторно не выдаются.
+        """
+        posts = PostRepository([_post(1, 1), _post(5, 2)])
+        self.assertEqual(posts.add({"title": "New", "content": "Text", "user_id": 1})["id"], 6)
+        self.assertEqual(posts.delete(6)["id"], 6)
+        self.assertIsNone(posts.delete(6))
+        self.assertEqual(posts.add({"title": "New", "content": "Text", "user_id": 1})["id"], 7)
+        self.assertEqual(posts.get(5)["user_id"], 2)
+        self.assertIsNone(posts.get(6))
+        self.assertEqual(len(posts), 3)
+
+    def test_author_index_follows_changes(self):
+        """
+        Индекс по автору обновляется при замене, восстановлении и удалении поста.
+        """
+        posts = PostRepository([_post(1, 1), _post(2, 1), _post(3, 2)])
+        self.assertTrue(posts.is_author(2, 1))
+        self.assertFalse(posts.is_author(3, 1))
+
+        posts.replace(2, {"title": "Moved", "content": "Text", "user_id": 2})
+        self.assertEqual(posts.posts_by_author(1), {1})
+        self.assertEqual(posts.posts_by_author(2), {2, 3})
+        self.assertIsNone(posts.replace(9, {"title": "Missing", "content": "Text", "user_id": 1}))
+
+        posts.restore(_post(3, 1))
+        self.assertEqual(posts.posts_by_author(1), {1, 3})
+        posts.delete(1)
+        self.assertFalse(posts.is_author(1, 1))
+        self.assertEqual(posts.posts_by_author(1), {3})
+
+    def test_iter_after_skips_deleted_and_sees_new(self):
+        """
+        Перебор по курсору идет по возрастанию ID, пропускает удаленные и видит новые посты.
+        """
+        posts = PostRepository([_post(post_id, post_id % 2) for post_id in range(1, 11)])
+        iterator = posts.iter_after(3)
+        self.assertEqual(next(iterator)["id"], 4)
+        # Удаление больше половины постов вызывает уплотнение списка ID во время перебора
+        for post_id in range(5, 11):
+            posts.delete(post_id)
+        posts.add({"title": "New", "content": "Text", "user_id": 1})
+        self.assertEqual([post["id"] for post in iterator], [11])
+        self.assertEqual([post["id"] for post in posts.iter_after(0, user_id=1)], [1, 3, 11])
+
+    def test_copy_is_independent(self):
+        """
+        Копия хранилища не видит изменений оригинала.
+        """
+        posts = PostRepository([_post(1, 1)])
+        clone = posts.copy()
+        posts.add({"title": "New", "content": "Text", "user_id": 1})
+        posts.delete(1)
+        self.assertEqual([post["id"] for post in clone], [1])
+        self.assertTrue(clone.is_author(1, 1))
+        self.assertEqual(clone.next_id(), 2)
+
+
+class UserRegistryTest(unittest.TestCase):
+    def test_names_are_case_folded(self):
+        """
+        Имена, отличающиеся регистром или формой записи Unicode, считаются одним пользователем.
+        """
+        users = UserRegistry([{"username": "Straße", "password": "hash"}])
+        self.assertIsNone(users.add("STRASSE", "other"))
+        self.assertIsNone(users.add("\uff33traße", "other"))
+        self.assertEqual(users.get("strasse")["password"], "hash")
+        self.assertEqual(users.add("User2", "hash")["id"], 2)
+        self.assertEqual(users.get_by_id(2)["username"], "User2")
+        self.assertIsNone(users.get("nobody"))
+        self.assertEqual(len(users), 2)
+
+    def test_restore_keeps_ids_stable(self):
+        """
+        Восстановленные пользователи сохраняют ID, а новые получают следующий ID.
+        """
+        users = UserRegistry([{"id": 7, "username": "seven", "password": "hash"},
+                              {"id": 3, "username": "three", "password": "hash"}])
+        self.assertEqual(users.add("eight", "hash")["id"], 8)
+        users.restore({"id": 3, "username": "Renamed", "password": "hash"})
+        self.assertIsNone(users.get("three"))
+        self.assertEqual(users.get("renamed")["id"], 3)
+        self.assertEqual([user["id"] for user in users.iter_after(3)], [7, 8])
+
+    def test_register_and_login_ignore_case(self):
+        """
+        Регистрация отклоняет имя, занятое в другом регистре, а вход принимает любой регистр.
+        """
+        with TestClient(main.app) as client:
+            response = client.post("/register", params={"username": "CaseUser", "password": "pw"})
+            user_id = response.json()["user_id"]
+            response = client.post("/register", params={"username": "caseuser", "password": "pw"})
+            self.assertEqual((response.status_code, response.json()["detail"]), (400, "User already exists"))
+            response = client.post("/login", params={"username": "CASEUSER", "password": "pw"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(decode_access_token(response.json()["access_token"])["uid"], user_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from reactions import DISLIKE, LIKE  # noqa: E402
+from write_behind import ReactionQueue  # noqa: E402
+
+
+class ReactionQueueRetryTest(unittest.TestCase):
+    def _run(self, failures: int, retries: int) -> tuple:
+        calls = 0
+        applied = []
+
+        async def apply(events):
+            nonlocal calls
+            calls += 1
+            if calls <= failures:
+                raise OSError("disk I/O error")
+            return [("ok", None)] * len(events)
+
+        async def run():
+            queue = ReactionQueue(apply, lambda *event: applied.append(event), 100, 10, retries, 0)
+            queue.start()
+            queue.offer(1, 2, LIKE)
+            queue.offer(1, 3, LIKE)
+            await queue.close()
+            return queue.stats()
+
+        return asyncio.run(run()), applied
+
+    def test_failed_batch_is_retried(self):
+        """
+        Пачка, которую хранилище не приняло, применяется повторно.
+        """
+        stats, applied = self._run(failures=2, retries=5)
+        self.assertEqual((stats["applied"], stats["lost"], stats["retries"]), (2, 0, 2))
+        self.assertEqual(len(applied), 2)
+
+    def test_lost_batch_is_counted(self):
+        """
+        Реакции пачки, не примененной после всех повторов, учитываются как потерянные.
+        """
+        stats, applied = self._run(failures=10, retries=3)
+        self.assertEqual((stats["applied"], stats["lost"], stats["retries"]), (0, 2, 3))
+        self.assertEqual(applied, [])
+
+
+class ReactionQueueTest(unittest.TestCase):
+    def test_batch_keeps_last_reaction(self):
+        """
+        В пачке для пары (пост, пользователь) применяется только последняя реакция, отклоненные учитываются.
+        """
+        batches = []
+        applied = []
+
+        async def apply(events):
+            batches.append(list(events))
+            return [("not_found", None) if post_id == 9 else ("ok", None) for post_id, _, _ in events]
+
+        def on_applied(*event):
+            applied.append(event)
+            raise RuntimeError("index update failed")
+
+        async def run():
+            queue = ReactionQueue(apply, on_applied, 100, 10, 0, 0)
+            queue.start()
+            queue.offer(1, 2, LIKE)
+            queue.offer(1, 2, DISLIKE)
+            queue.offer(1, 3, LIKE)
+            queue.offer(9, 2, LIKE)
+            await queue.close()
+            self.assertFalse(queue.offer(1, 4, LIKE))
+            return queue.stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual(batches, [[(1, 2, DISLIKE), (1, 3, LIKE), (9, 2, LIKE)]])
+        self.assertEqual(applied, [(1, 2, None, DISLIKE), (1, 3, None, LIKE)])
+        self.assertEqual((stats["accepted"], stats["applied"], stats["merged"], stats["dropped"]), (4, 2, 1, 1))
+
+    def test_full_queue_rejects(self):
+        """
+        Заполненная очередь и очередь до запуска не принимают реакции.
+        """
+        async def apply(events):
+            return [("ok", None)] * len(events)
+
+        async def run():
+            queue = ReactionQueue(apply, lambda *event: None, 2, 10, 0, 0)
+            self.assertFalse(queue.offer(1, 2, LIKE))
+            queue.start()
+            self.assertEqual([queue.offer(1, user_id, LIKE) for user_id in range(3)], [True, True, False])
+            await queue.close()
+            return queue.stats()
+
+        self.assertEqual(asyncio.run(run())["applied"], 2)
+
+
+class WriteBehindEndpointTest(unittest.TestCase):
+    def test_like_is_accepted_then_applied(self):
+        """
+        В режиме отложенной записи лайк отвечает 202, а счетчики обновляются после применения очереди.
+        """
+        def headers(user_id: int) -> dict:
+            return {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'uid': user_id})}"}
+
+        queue = ReactionQueue(main.db.apply_reactions, main.reaction_applied, 100, config.REACTIONS_QUEUE_BATCH, 0, 0)
+        with mock.patch.object(main, "reaction_queue", queue), TestClient(main.app) as client:
+            post_id = client.post("/posts/", json={"id": 0, "title": "Queued", "content": "Text"},
+                                  headers=headers(1401)).json()["id"]
+            response = client.post(f"/posts/{post_id}/like/", json={"user_id": 1402, "post_id": post_id},
+                                   headers=headers(1402))
+            self.assertEqual(response.status_code, 202)
+            response = client.post(f"/posts/{post_id}/dislike/", json={"user_id": 1401, "post_id": post_id},
+                                   headers=headers(1401))
+            self.assertEqual(response.status_code, 202)
+            client.portal.call(queue._queue.join)
+            self.assertEqual(client.get(f"/posts/{post_id}").json()["like_count"], 1)
+            stats = client.get("/reactions/queue").json()
+            self.assertEqual((stats["applied"], stats["dropped"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
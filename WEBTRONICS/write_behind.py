@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from metrics import SIZE_BUCKETS, Counter, Gauge, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+reaction_queue_depth = registry.register(Gauge(
+    "webtronics_reaction_queue_depth", "Reactions accepted but not yet applied.",
+))
+reaction_queue_lag = registry.register(Histogram(
+    "webtronics_reaction_queue_lag_seconds", "Time from accepting the oldest reaction of a batch to applying it.",
+))
+reaction_queue_batch = registry.register(Histogram(
+    "webtronics_reaction_queue_batch_size", "Reactions taken off the queue per batch.", (), SIZE_BUCKETS,
+))
+reaction_queue_merged = registry.register(Counter(
+    "webtronics_reaction_queue_merged_total", "Queued reactions superseded by a later reaction of the same user.",
+))
+reaction_queue_rejected = registry.register(Counter(
+    "webtronics_reaction_queue_rejected_total", "Reactions rejected because the queue was full.",
+))
+reaction_queue_retries = registry.register(Counter(
+    "webtronics_reaction_queue_retries_total", "Failed attempts to apply a batch of queued reactions.",
+))
+reaction_queue_lost = registry.register(Counter(
+    "webtronics_reaction_queue_lost_total", "Accepted reactions lost because their batch failed after all retries.",
+))
+
+
+class ReactionQueue:
+    """
+    Отложенная запись реакций (write-behind).
+
+    Обработчик кладет реакцию в ограниченную очередь и сразу отвечает.
+    Фоновая задача забирает из очереди все накопившиеся реакции (не больше
+    batch_size), оставляет для каждой пары (пост, пользователь) только
+    последнюю и применяет пачку одним вызовом apply — так в хранилище с
+    журналом одна пачка стоит одной записи и одного fsync. Существование
+    поста и авторство проверяет apply; отклоненные реакции (несуществующий
+    или собственный пост) только учитываются в dropped. После применения
+    для каждой успешной реакции вызывается on_applied.
+
+    Если apply завершается ошибкой, пачка применяется повторно через
+    retry_delay, 2 * retry_delay и т. д., до retries повторов (реакции уже
+    подтверждены клиентам кодом 202, а повторное применение той же реакции
+    ничего не меняет). Реакции пачки, не примененной и после всех повторов,
+    учитываются в lost и в метрике webtronics_reaction_queue_lost_total.
+
+    Под нагрузкой пачки растут сами: пока обработчики занимают цикл событий,
+    реакции копятся в очереди.
+
+    Attributes:
+        maxsize (int): Максимальное число реакций в очереди.
+        batch_size (int): Максимальное число реакций в одной пачке.
+        max_retries (int): Сколько раз повторять применение пачки после ошибки.
+        retry_delay (float): Задержка перед первым повтором, в секундах.
+        accepted (int): Количество принятых реакций.
+        applied (int): Количество примененных реакций (после склейки).
+        merged (int): Количество реакций, замененных более поздними.
+        dropped (int): Количество реакций, отклоненных при применении.
+        lost (int): Количество реакций, потерянных из-за ошибок применения.
+        retries (int): Количество повторных попыток применить пачку.
+        batches (int): Количество примененных пачек.
+        max_lag (float): Наибольшая задержка применения, в секундах.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[List[Tuple[int, int, int]]], Awaitable[List[Tuple[str, Optional[int]]]]],
+        on_applied: Callable[[int, int, Optional[int], int], None],
+        maxsize: int,
+        batch_size: int,
+        retries: int = 5,
+        retry_delay: float = 0.1,
+    ):
+        self._apply = apply
+        self._on_applied = on_applied
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.max_retries = retries
+        self.retry_delay = retry_delay
+        self.accepted = 0
+        self.applied = 0
+        self.merged = 0
+        self.dropped = 0
+        self.lost = 0
+        self.retries = 0
+        self.batches = 0
+        self.max_lag = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def start(self) -> None:
+        """Создает очередь и запускает фоновое применение реакций."""
+        if self._task is None:
+            self._closing = False
+            self._queue = asyncio.Queue(self.maxsize)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def offer(self, post_id: int, user_id: int, kind: int) -> bool:
+        """
+        Кладет реакцию в очередь, не дожидаясь ее применения.
+
+        Args:
+            post_id (int): Идентификатор поста.
+            user_id (int): Идентификатор пользователя.
+            kind (int): Тип реакции: LIKE или DISLIKE.
+
+        Returns:
+            bool: False, если очередь заполнена или закрывается.
+        """
+        if self._closing or self._queue is None:
+            reaction_queue_rejected.inc()
+            return False
+        try:
+            self._queue.put_nowait((post_id, user_id, kind, time.perf_counter()))
+        except asyncio.QueueFull:
+            reaction_queue_rejected.inc()
+            return False
+        self.accepted += 1
+        reaction_queue_depth.set(self._queue.qsize())
+        return True
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._apply_batch(batch)
+            except Exception:
+                logger.exception("Failed to process %d queued reactions", len(batch))
+            finally:
+                reaction_queue_depth.set(queue.qsize())
+                for _ in batch:
+                    queue.task_done()
+
+    async def _apply_batch(self, batch: list) -> None:
+        # Для пары (пост, пользователь) важна только последняя реакция пачки
+        latest = {}
+        for post_id, user_id, kind, _ in batch:
+            latest[(post_id, user_id)] = kind
+        events = [(post_id, user_id, kind) for (post_id, user_id), kind in latest.items()]
+        merged = len(batch) - len(events)
+        if merged:
+            self.merged += merged
+            reaction_queue_merged.inc(amount=merged)
+
+        outcomes = await self._apply_with_retries(events)
+        if outcomes is None:
+            self.lost += len(events)
+            reaction_queue_lost.inc(amount=len(events))
+            return
+        for (post_id, user_id, kind), (status, previous) in zip(events, outcomes):
+            if status != "ok":
+                self.dropped += 1
+                continue
+            self.applied += 1
+            try:
+                self._on_applied(post_id, user_id, previous, kind)
+            except Exception:
+                # Реакция уже сохранена: ошибка обновления рейтингов не отменяет остальные
+                logger.exception("Failed to update indexes after reaction to post %d", post_id)
+
+        lag = time.perf_counter() - batch[0][3]
+        self.max_lag = max(self.max_lag, lag)
+        self.batches += 1
+        reaction_queue_lag.observe(lag)
+        reaction_queue_batch.observe(len(batch))
+
+    async def _apply_with_retries(self, events: list) -> Optional[List[Tuple[str, Optional[int]]]]:
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._apply(events)
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("Lost %d queued reactions after %d retries", len(events), self.max_retries)
+                    return None
+                logger.warning("Failed to apply %d queued reactions, retrying in %.2f s", len(events), delay,
+                               exc_info=True)
+                self.retries += 1
+                reaction_queue_retries.inc()
+                await asyncio.sleep(delay)
+                delay *= 2
+        return None
+
+    async def close(self) -> None:
+        """Перестает принимать реакции, применяет оставшиеся в очереди и останавливает задачу."""
+        if self._task is None:
+            return
+        self._closing = True
+        if not self._task.done():
+            await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики очереди.
+
+        Returns:
+            dict: Глубина очереди, принятые, примененные, склеенные,
+            отклоненные и потерянные реакции, число повторов и пачек и
+            наибольшая задержка применения.
+        """
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "maxsize": self.maxsize,
+            "accepted": self.accepted,
+            "applied": self.applied,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "lost": self.lost,
+            "retries": self.retries,
+            "batches": self.batches,
+            "max_lag_ms": self.max_lag * 1000,
+        }